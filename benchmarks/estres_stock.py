@@ -0,0 +1,98 @@
+"""
+Prueba de estrés de ajustes de stock concurrentes sobre un mismo producto.
+
+Uso:
+    python -m benchmarks.estres_stock [--tareas 64] [--ajustes 50]
+
+Lanza muchas tareas asyncio que descuentan stock del mismo SKU desde un pool
+de hilos, en cada modo de almacenamiento, y comprueba que no se pierde
+ninguna actualización ni se vende por debajo de cero.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from fastapi import HTTPException
+
+from src.helpers.json_utils import escribir_json
+from src.helpers.sqlite_utils import PoolSqlite
+from src.repositories.producto_store import (
+    ProductoStore,
+    ProductoStoreJournal,
+    ProductoStoreSqlite,
+)
+from src.services.producto_service import ProductoService
+
+
+def _crear_service(modo: str, directorio: str, stock: int) -> ProductoService:
+    """
+    Crea un servicio con un único producto sobre un almacén del modo indicado.
+    """
+    ruta = os.path.join(directorio, f"{modo}-{stock}.json")
+    escribir_json(ruta, [{
+        "id": 1, "nombre": "SKU", "descripcion": "estrés",
+        "precio": 1.0, "cantidad": stock, "ventas": 0,
+    }])
+    if modo == "journal":
+        store = ProductoStoreJournal(ruta)
+    elif modo == "sqlite":
+        store = ProductoStoreSqlite(PoolSqlite(os.path.join(directorio, f"estres-{stock}.db")))
+        store.guardar(ProductoStore(ruta).obtener(1))
+    else:
+        store = ProductoStore(ruta)
+    return ProductoService(ruta, store=store)
+
+
+async def _martillar(service: ProductoService, tareas: int, ajustes: int) -> int:
+    """
+    Lanza las tareas concurrentes y retorna cuántos descuentos fueron rechazados.
+    """
+    async def tarea() -> int:
+        rechazados = 0
+        for _ in range(ajustes):
+            try:
+                await asyncio.to_thread(service.ajustar_stock, 1, -1)
+            except HTTPException:
+                rechazados += 1
+        return rechazados
+
+    return sum(await asyncio.gather(*(tarea() for _ in range(tareas))))
+
+
+def main() -> int:
+    """
+    Ejecuta la prueba en los tres modos de almacenamiento.
+
+    Returns:
+        int: Código de salida (0 si todas las comprobaciones pasan).
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tareas", type=int, default=64)
+    parser.add_argument("--ajustes", type=int, default=50)
+    args = parser.parse_args()
+    total = args.tareas * args.ajustes
+    fallos = 0
+    with tempfile.TemporaryDirectory() as directorio:
+        for modo in ("json", "journal", "sqlite"):
+            for stock_inicial in (total + 100, total // 2):
+                service = _crear_service(modo, directorio, stock_inicial)
+                inicio = time.perf_counter()
+                rechazados = asyncio.run(_martillar(service, args.tareas, args.ajustes))
+                duracion = time.perf_counter() - inicio
+                final = service.store.obtener(1)["cantidad"]
+                esperado = max(stock_inicial - total, 0)
+                ok = final == esperado and rechazados == total - (stock_inicial - esperado)
+                fallos += not ok
+                print(
+                    f"{modo:8} stock={stock_inicial:6} final={final:6} esperado={esperado:6} "
+                    f"rechazados={rechazados:6} {duracion:6.2f}s {'OK' if ok else 'FALLO'}"
+                )
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
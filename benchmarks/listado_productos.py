@@ -0,0 +1,86 @@
+"""
+Benchmark del listado de productos: ruta validada frente a ruta rápida.
+
+Uso:
+    python -m benchmarks.listado_productos [--tamanos 1000 10000] [--peticiones 50]
+
+Compara, en proceso y sin red, la ruta anterior (ProductoResponse por fila y
+revalidación por response_model) con la ruta rápida (bytes precodificados por
+producto y Response sin validar) sobre el mismo catálogo sintético.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI, Response
+
+from src.helpers.json_utils import escribir_json
+from src.schemas.producto_schema import ProductoResponse
+from src.services.producto_service import ProductoService
+
+
+def _crear_app(service: ProductoService) -> FastAPI:
+    """
+    Crea una app con las dos variantes del listado sobre el mismo servicio.
+    """
+    app = FastAPI()
+
+    @app.get("/antes", response_model=List[ProductoResponse])
+    async def antes():
+        return [ProductoResponse(**p) for p in service.store.listar()]
+
+    @app.get("/despues")
+    async def despues():
+        return Response(content=service.listar_productos_json(), media_type="application/json")
+
+    return app
+
+
+async def _medir(app: FastAPI, ruta: str, peticiones: int) -> float:
+    """
+    Ejecuta las peticiones en serie y retorna peticiones por segundo.
+    """
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        await cliente.get(ruta)
+        inicio = time.perf_counter()
+        for _ in range(peticiones):
+            respuesta = await cliente.get(ruta)
+            respuesta.raise_for_status()
+        return peticiones / (time.perf_counter() - inicio)
+
+
+def main() -> None:
+    """
+    Mide ambas variantes para cada tamaño de catálogo e imprime la mejora.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--peticiones", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in args.tamanos:
+            ruta = os.path.join(directorio, f"productos-{tamano}.json")
+            escribir_json(ruta, [
+                {
+                    "id": i, "nombre": f"Producto {i}", "descripcion": "Sintético",
+                    "precio": 100.0 + i, "cantidad": i % 50, "ventas": 0,
+                }
+                for i in range(1, tamano + 1)
+            ])
+            app = _crear_app(ProductoService(ruta))
+            antes = asyncio.run(_medir(app, "/antes", args.peticiones))
+            despues = asyncio.run(_medir(app, "/despues", args.peticiones))
+            print(
+                f"{tamano:8} productos  antes {antes:8.1f} req/s  "
+                f"después {despues:8.1f} req/s  x{despues / antes:5.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
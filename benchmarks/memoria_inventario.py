@@ -0,0 +1,102 @@
+"""
+Benchmark de memoria del almacén de productos: diccionarios frente a columnas.
+
+Uso:
+    python -m benchmarks.memoria_inventario [--tamanos 100000 1000000]
+
+Para cada tamaño escribe un catálogo sintético, lo carga con el almacén en su
+representación actual (un diccionario por producto, índice de stock con
+diccionario y lista de tuplas) y en la compacta (PRODUCTOS_COMPACTOS) y mide
+con tracemalloc la memoria que queda retenida tras la carga y el pico durante
+ella. También compara registros Inventario con y sin __slots__.
+"""
+
+import argparse
+import dataclasses
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from src.helpers.json_utils import escribir_json
+from src.models.inventario import Inventario
+from src.repositories.producto_store import ProductoStore
+
+
+def _medir(construir: Callable[[], object]) -> Tuple[object, int, int, float]:
+    """
+    Construye un objeto bajo tracemalloc.
+
+    Returns:
+        Tuple[object, int, int, float]: Objeto, bytes retenidos, pico en bytes y segundos.
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objeto = construir()
+    segundos = time.perf_counter() - inicio
+    gc.collect()
+    retenidos, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, retenidos, pico, segundos
+
+
+def _cargar(ruta: str, compacto: bool) -> ProductoStore:
+    """
+    Crea un almacén y fuerza la carga del catálogo.
+    """
+    store = ProductoStore(ruta, compacto=compacto)
+    store.stock_total()
+    return store
+
+
+def _mib(cantidad: int) -> str:
+    """
+    Formatea bytes como MiB.
+    """
+    return f"{cantidad / 2 ** 20:8.1f} MiB"
+
+
+def main() -> None:
+    """
+    Mide ambas representaciones para cada tamaño e imprime la comparación.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+    InventarioSinSlots = dataclasses.make_dataclass(
+        "InventarioSinSlots", [(campo.name, campo.type) for campo in dataclasses.fields(Inventario)]
+    )
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in args.tamanos:
+            ruta = os.path.join(directorio, f"productos-{tamano}.json")
+            escribir_json(ruta, [
+                {
+                    "id": i, "nombre": f"Producto {i}", "descripcion": f"Descripción {i % 997}",
+                    "precio": 100.0 + i, "cantidad": i % 500, "ventas": i % 7, "version": 1,
+                }
+                for i in range(1, tamano + 1)
+            ])
+            print(f"{tamano} productos")
+            resultados = {}
+            for nombre, compacto in (("diccionarios", False), ("compacto", True)):
+                store, retenidos, pico, segundos = _medir(lambda: _cargar(ruta, compacto))
+                resultados[nombre] = retenidos
+                print(
+                    f"  {nombre:14} retenido {_mib(retenidos)}  pico {_mib(pico)}  "
+                    f"{retenidos / tamano:6.0f} B/producto  carga {segundos:5.2f} s"
+                )
+                del store
+            print(f"  ahorro x{resultados['diccionarios'] / resultados['compacto']:.1f}")
+            for nombre, clase in (("Inventario sin slots", InventarioSinSlots), ("Inventario con slots", Inventario)):
+                registros, retenidos, _, _ = _medir(
+                    lambda: [clase(i, i, i % 500) for i in range(tamano)]
+                )
+                print(f"  {nombre:22} {_mib(retenidos)}  {retenidos / tamano:6.0f} B/registro")
+                del registros
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+"""
+Suite de benchmarks de las rutas de productos e inventario, en proceso.
+
+Uso:
+    python -m benchmarks.rutas [--tamanos 1000 100000 1000000] [--peticiones 200]
+        [--concurrencia 8] [--almacenamiento json] [--salida resultados.json]
+        [--base base.json] [--tolerancia 0.25] [--escenarios GET-producto ...]
+
+Para cada tamaño genera productos.json y ventas.json sintéticos en un
+directorio temporal y lanza un proceso hijo que apunta la configuración a esos
+archivos e importa src.app:app; las peticiones van por httpx.ASGITransport,
+sin red. Cada escenario (una ruta, o una mezcla de lecturas y escrituras)
+reporta peticiones por segundo, latencias p50/p95/p99, errores y el tiempo de
+la primera petición (calentamiento: cargas, índices, cachés).
+
+Los resultados se escriben como JSON. Con --base se comparan contra una
+corrida anterior: un escenario cuyo p95 sube, o cuyo throughput baja, más que
+la tolerancia se marca como regresión y el proceso termina con código 1.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+# (método, URL, argumentos extra de httpx)
+Peticion = Tuple[str, str, dict]
+
+_CLIENTES = ["Ana Pérez", "Juan Gómez", "María López", "José Núñez", "Lucía Díaz", None]
+_PALABRAS = ["teclado", "mouse", "monitor", "cable", "parlante", "cámara", "disco", "memoria"]
+
+
+class Contexto:
+    """
+    Estado compartido por las peticiones de un proceso de benchmark.
+
+    Atributos:
+        tamano (int): Productos del catálogo sintético.
+        rng (random.Random): Generador con semilla fija, para corridas comparables.
+        creados (List[int]): IDs creados por el benchmark, que DELETE consume.
+        etags (Dict[str, str]): ETag conocido por URL, para las lecturas condicionales.
+    """
+
+    def __init__(self, tamano: int) -> None:
+        """
+        Inicializa el contexto para un catálogo del tamaño indicado.
+        """
+        self.tamano = tamano
+        self.rng = random.Random(tamano)
+        self.creados: List[int] = []
+        self.etags: Dict[str, str] = {}
+
+    def producto_id(self) -> int:
+        """
+        Retorna un ID existente del catálogo sintético al azar.
+        """
+        return self.rng.randint(1, self.tamano)
+
+
+class Escenario(NamedTuple):
+    """
+    Carga a medir: qué petición generar y qué fracción de --peticiones enviar.
+
+    Atributos:
+        nombre (str): Identificador del escenario en los resultados.
+        peticion (Callable[[Contexto], Peticion]): Genera la siguiente petición.
+        fraccion (float): Parte de --peticiones a enviar (las rutas que
+            devuelven el catálogo completo usan menos).
+        preparar (Optional[Callable]): Corrutina que se ejecuta antes de medir.
+    """
+    nombre: str
+    peticion: Callable[[Contexto], Peticion]
+    fraccion: float = 1.0
+    preparar: Optional[Callable[[httpx.AsyncClient, Contexto], Awaitable[None]]] = None
+
+
+def _producto_nuevo(ctx: Contexto) -> dict:
+    """
+    Retorna el cuerpo de un producto sintético.
+    """
+    return {
+        "nombre": f"{ctx.rng.choice(_PALABRAS)} bench",
+        "descripcion": "creado por el benchmark",
+        "precio": round(ctx.rng.uniform(1, 1000), 2),
+        "cantidad": ctx.rng.randint(0, 100),
+    }
+
+
+async def _preparar_etags(cliente: httpx.AsyncClient, ctx: Contexto) -> None:
+    """
+    Obtiene los ETag de las URL que piden las lecturas condicionales.
+    """
+    for url in ("/productos/1", "/productos/?limit=100"):
+        ctx.etags[url] = (await cliente.get(url)).headers.get("etag", "")
+
+
+async def _preparar_borrados(cliente: httpx.AsyncClient, ctx: Contexto) -> None:
+    """
+    Crea los productos que el escenario de borrado va a eliminar.
+    """
+    respuesta = await cliente.post("/productos/bulk", json=[_producto_nuevo(ctx) for _ in range(1000)])
+    ctx.creados.extend(p["id"] for p in respuesta.json())
+
+
+def _lote(ctx: Contexto, item: Callable[[int], dict]) -> List[dict]:
+    """
+    Arma un lote de 10 ítems sobre productos al azar.
+    """
+    return [item(ctx.producto_id()) for _ in range(10)]
+
+
+def _mezcla(opciones: List[Tuple[float, Callable[[Contexto], Peticion]]]) -> Callable[[Contexto], Peticion]:
+    """
+    Combina generadores de peticiones con pesos.
+    """
+    pesos = [peso for peso, _ in opciones]
+    generadores = [generador for _, generador in opciones]
+
+    def peticion(ctx: Contexto) -> Peticion:
+        return ctx.rng.choices(generadores, pesos)[0](ctx)
+
+    return peticion
+
+
+def _leer_producto(ctx: Contexto) -> Peticion:
+    return "GET", f"/productos/{ctx.producto_id()}", {}
+
+
+def _leer_pagina(ctx: Contexto) -> Peticion:
+    return "GET", f"/productos/?limit=100&cursor={ctx.rng.randint(0, ctx.tamano)}", {}
+
+
+def _buscar(ctx: Contexto) -> Peticion:
+    return "GET", f"/productos/buscar?q={ctx.rng.choice(_PALABRAS)[:3]}&limite=20", {}
+
+
+def _leer_stock(ctx: Contexto) -> Peticion:
+    return "GET", f"/inventario/{ctx.producto_id()}", {}
+
+
+def _ajustar_stock(ctx: Contexto) -> Peticion:
+    return "PUT", f"/productos/{ctx.producto_id()}/ajustar-stock", {"json": 1}
+
+
+def _vender(ctx: Contexto) -> Peticion:
+    return "POST", f"/productos/{ctx.producto_id()}/venta", {}
+
+
+def _actualizar(ctx: Contexto) -> Peticion:
+    return "PUT", f"/productos/{ctx.producto_id()}", {"json": {"precio": round(ctx.rng.uniform(1, 1000), 2)}}
+
+
+def _condicional(url: str) -> Callable[[Contexto], Peticion]:
+    def peticion(ctx: Contexto) -> Peticion:
+        return "GET", url, {"headers": {"If-None-Match": ctx.etags.get(url, "")}}
+    return peticion
+
+
+def _borrar(ctx: Contexto) -> Peticion:
+    producto_id = ctx.creados.pop() if ctx.creados else ctx.tamano + 10 ** 9
+    return "DELETE", f"/productos/{producto_id}", {}
+
+
+ESCENARIOS = [
+    # Lecturas (antes que las escrituras, para que las condicionales den 304).
+    Escenario("GET-catalogo", lambda ctx: ("GET", "/productos/", {}), 0.05),
+    Escenario("GET-pagina", _leer_pagina),
+    Escenario("GET-pagina-304", _condicional("/productos/?limit=100"), preparar=_preparar_etags),
+    Escenario("GET-ndjson", lambda ctx: ("GET", "/productos/?formato=ndjson&limit=1000", {}), 0.25),
+    Escenario("GET-producto", _leer_producto),
+    Escenario("GET-producto-304", _condicional("/productos/1"), preparar=_preparar_etags),
+    Escenario("GET-buscar", _buscar),
+    Escenario("GET-inventario-total", lambda ctx: ("GET", "/inventario/total", {})),
+    Escenario("GET-inventario-bajo-stock", lambda ctx: ("GET", "/inventario/bajo-stock?umbral=5", {}), 0.25),
+    Escenario("GET-inventario-agotados", lambda ctx: ("GET", "/inventario/agotados", {}), 0.25),
+    Escenario("GET-inventario-producto", _leer_stock),
+    # Escrituras.
+    Escenario("POST-producto", lambda ctx: ("POST", "/productos/", {"json": _producto_nuevo(ctx)})),
+    Escenario("PUT-producto", _actualizar),
+    Escenario("DELETE-producto", _borrar, preparar=_preparar_borrados),
+    Escenario("PUT-ajustar-stock", _ajustar_stock),
+    Escenario("POST-venta", _vender),
+    Escenario("POST-bulk", lambda ctx: ("POST", "/productos/bulk", {
+        "json": [_producto_nuevo(ctx) for _ in range(10)]
+    })),
+    Escenario("PUT-bulk", lambda ctx: ("PUT", "/productos/bulk", {
+        "json": _lote(ctx, lambda pid: {"producto_id": pid, "datos": {"precio": 10.0}})
+    })),
+    Escenario("PUT-ajustar-stock-bulk", lambda ctx: ("PUT", "/productos/ajustar-stock/bulk", {
+        "json": _lote(ctx, lambda pid: {"producto_id": pid, "cantidad": 1})
+    })),
+    Escenario("POST-ventas-bulk", lambda ctx: ("POST", "/productos/ventas/bulk", {
+        "json": _lote(ctx, lambda pid: {"producto_id": pid})
+    })),
+    Escenario("PUT-inventario", lambda ctx: (
+        "PUT", f"/inventario/{ctx.producto_id()}", {"json": {"cantidad": ctx.rng.randint(0, 100)}}
+    )),
+    Escenario("PUT-inventario-agregar", lambda ctx: (
+        "PUT", f"/inventario/{ctx.producto_id()}/agregar-stock", {"json": {"cantidad": 1}}
+    )),
+    # Cargas mixtas.
+    Escenario("mixto-90-10", _mezcla([
+        (40, _leer_producto), (20, _leer_pagina), (15, _buscar), (15, _leer_stock),
+        (5, _ajustar_stock), (5, _vender),
+    ])),
+    Escenario("mixto-50-50", _mezcla([
+        (25, _leer_producto), (15, _leer_pagina), (10, _leer_stock),
+        (20, _ajustar_stock), (20, _vender), (10, _actualizar),
+    ])),
+]
+
+
+def _percentil(ordenadas: List[float], fraccion: float) -> float:
+    """
+    Percentil por el método del rango más cercano sobre una lista ordenada.
+    """
+    indice = min(len(ordenadas) - 1, max(0, round(fraccion * len(ordenadas)) - 1))
+    return ordenadas[indice]
+
+
+async def _medir(
+    cliente: httpx.AsyncClient, escenario: Escenario, ctx: Contexto, peticiones: int, concurrencia: int
+) -> dict:
+    """
+    Envía las peticiones de un escenario con la concurrencia indicada y resume las latencias.
+    """
+    if escenario.preparar is not None:
+        await escenario.preparar(cliente, ctx)
+    metodo, url, opciones = escenario.peticion(ctx)
+    inicio = time.perf_counter()
+    await cliente.request(metodo, url, **opciones)
+    calentamiento = time.perf_counter() - inicio
+
+    latencias: List[float] = []
+    estados: Dict[int, int] = {}
+    pendientes = peticiones
+
+    async def trabajador() -> None:
+        nonlocal pendientes
+        while pendientes > 0:
+            pendientes -= 1
+            metodo, url, opciones = escenario.peticion(ctx)
+            comienzo = time.perf_counter()
+            respuesta = await cliente.request(metodo, url, **opciones)
+            latencias.append(time.perf_counter() - comienzo)
+            estados[respuesta.status_code] = estados.get(respuesta.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "rps": round(len(latencias) / duracion, 1),
+        "p50_ms": round(_percentil(latencias, 0.50) * 1000, 3),
+        "p95_ms": round(_percentil(latencias, 0.95) * 1000, 3),
+        "p99_ms": round(_percentil(latencias, 0.99) * 1000, 3),
+        "errores": sum(n for estado, n in estados.items() if estado >= 400),
+        "estados": {str(estado): n for estado, n in sorted(estados.items())},
+        "calentamiento_ms": round(calentamiento * 1000, 3),
+    }
+
+
+async def _correr_trabajador(
+    tamano: int, peticiones: int, concurrencia: int, nombres: Optional[List[str]]
+) -> Dict[str, dict]:
+    """
+    Mide los escenarios contra src.app:app, ya configurada por el entorno.
+    """
+    from src.app import app
+
+    ctx = Contexto(tamano)
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+        for escenario in ESCENARIOS:
+            if nombres and escenario.nombre not in nombres:
+                continue
+            cantidad = max(3, int(peticiones * escenario.fraccion))
+            resultados[escenario.nombre] = await _medir(
+                cliente, escenario, ctx, cantidad, concurrencia
+            )
+            print(f"  {tamano:>8} {escenario.nombre:28} listo", file=sys.stderr)
+    return resultados
+
+
+def _generar_datos(directorio: str, tamano: int) -> Tuple[str, str]:
+    """
+    Escribe productos.json y ventas.json sintéticos con tantas filas como el tamaño.
+    """
+    rng = random.Random(tamano)
+    productos_path = os.path.join(directorio, "productos.json")
+    ventas_path = os.path.join(directorio, "ventas.json")
+    with open(productos_path, "w", encoding="utf-8") as f:
+        json.dump([
+            {
+                "id": i,
+                "nombre": f"{rng.choice(_PALABRAS)} {i}",
+                "descripcion": f"{rng.choice(_PALABRAS)} modelo {i % 997}",
+                "precio": round(rng.uniform(1, 1000), 2),
+                "cantidad": i % 500,
+                "ventas": 0,
+            }
+            for i in range(1, tamano + 1)
+        ], f, ensure_ascii=False)
+    ahora = datetime.now(timezone.utc)
+    with open(ventas_path, "w", encoding="utf-8") as f:
+        json.dump([
+            {
+                "id": i,
+                "producto_id": rng.randint(1, tamano),
+                "cantidad": (cantidad := rng.randint(1, 5)),
+                "total": round(cantidad * rng.uniform(1, 1000), 2),
+                "cliente": rng.choice(_CLIENTES),
+                "fecha": (ahora - timedelta(minutes=rng.randint(0, 90 * 24 * 60))).isoformat(),
+            }
+            for i in range(1, tamano + 1)
+        ], f, ensure_ascii=False)
+    return productos_path, ventas_path
+
+
+def _medir_tamano(tamano: int, args: argparse.Namespace) -> Dict[str, dict]:
+    """
+    Genera los datos de un tamaño y mide en un proceso hijo con la configuración apuntada a ellos.
+
+    Un proceso por tamaño: la configuración y los almacenes compartidos se
+    crean al importar la app, así que cada catálogo necesita un intérprete nuevo.
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        print(f"Generando {tamano} productos y ventas...", file=sys.stderr)
+        productos_path, ventas_path = _generar_datos(directorio, tamano)
+        entorno = dict(
+            os.environ,
+            PRODUCTOS_PATH=productos_path,
+            VENTAS_PATH=ventas_path,
+            VENTAS_SEGMENTOS_DIR=os.path.join(directorio, "ventas"),
+            SQLITE_PATH=os.path.join(directorio, "inventario.db"),
+            ALMACENAMIENTO=args.almacenamiento,
+        )
+        comando = [
+            sys.executable, "-m", "benchmarks.rutas", "--trabajador",
+            "--tamanos", str(tamano),
+            "--peticiones", str(args.peticiones),
+            "--concurrencia", str(args.concurrencia),
+            "--almacenamiento", args.almacenamiento,
+        ]
+        if args.escenarios:
+            comando += ["--escenarios", *args.escenarios]
+        proceso = subprocess.run(comando, env=entorno, stdout=subprocess.PIPE, check=True, text=True)
+        return json.loads(proceso.stdout)
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> List[str]:
+    """
+    Compara dos corridas y describe cada regresión encontrada.
+
+    Args:
+        actual (dict): Resultado de esta corrida.
+        base (dict): Resultado de referencia.
+        tolerancia (float): Empeoramiento relativo aceptado (0.25 = 25 %).
+
+    Returns:
+        List[str]: Una línea por escenario y métrica que empeoró más que la tolerancia.
+    """
+    regresiones = []
+    for tamano, escenarios in actual["resultados"].items():
+        for nombre, medida in escenarios.items():
+            referencia = base.get("resultados", {}).get(tamano, {}).get(nombre)
+            if referencia is None:
+                continue
+            if medida["p95_ms"] > referencia["p95_ms"] * (1 + tolerancia):
+                regresiones.append(
+                    f"{tamano} {nombre}: p95 {referencia['p95_ms']} -> {medida['p95_ms']} ms"
+                )
+            if medida["rps"] < referencia["rps"] * (1 - tolerancia):
+                regresiones.append(
+                    f"{tamano} {nombre}: throughput {referencia['rps']} -> {medida['rps']} req/s"
+                )
+    return regresiones
+
+
+def _imprimir(resultados: Dict[str, Dict[str, dict]]) -> None:
+    """
+    Imprime los resultados como tabla.
+    """
+    print(f"{'tamaño':>8} {'escenario':28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>4}")
+    for tamano, escenarios in resultados.items():
+        for nombre, m in escenarios.items():
+            print(
+                f"{tamano:>8} {nombre:28} {m['rps']:9.1f} {m['p50_ms']:9.3f} "
+                f"{m['p95_ms']:9.3f} {m['p99_ms']:9.3f} {m['errores']:4}"
+            )
+
+
+def main() -> None:
+    """
+    Mide todos los tamaños, guarda el JSON y lo compara con la base si se indicó.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--peticiones", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--almacenamiento", choices=["json", "journal", "sqlite"], default="json")
+    parser.add_argument("--escenarios", nargs="+", help="Medir solo estos escenarios")
+    parser.add_argument("--salida", default="resultados_rutas.json", help="Archivo JSON de resultados")
+    parser.add_argument("--base", help="Resultados de referencia para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument("--trabajador", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trabajador:
+        if args.almacenamiento == "sqlite":
+            from src.config.settings import settings
+            from src.helpers.migrar_sqlite import migrar_json_a_sqlite
+
+            migrar_json_a_sqlite(
+                settings.productos_path, settings.ventas_path, settings.sqlite_path,
+                settings.ventas_segmentos_dir,
+            )
+        resultados = asyncio.run(_correr_trabajador(
+            args.tamanos[0], args.peticiones, args.concurrencia, args.escenarios
+        ))
+        json.dump(resultados, sys.stdout)
+        return
+
+    corrida = {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "almacenamiento": args.almacenamiento,
+            "peticiones": args.peticiones,
+            "concurrencia": args.concurrencia,
+        },
+        "resultados": {str(tamano): _medir_tamano(tamano, args) for tamano in args.tamanos},
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(corrida, f, indent=2, ensure_ascii=False)
+    _imprimir(corrida["resultados"])
+    print(f"Resultados en {args.salida}")
+
+    if args.base:
+        with open(args.base, "r", encoding="utf-8") as f:
+            regresiones = comparar(corrida, json.load(f), args.tolerancia)
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion}")
+        if regresiones:
+            sys.exit(1)
+        print(f"Sin regresiones respecto de {args.base} (tolerancia {args.tolerancia:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
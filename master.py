@@ -2,14 +2,66 @@
 Script de arranque de la aplicación FastAPI con Uvicorn.
 
 Este archivo ejecuta la aplicación importando la instancia de FastAPI definida en app.py.
+
+Sin argumentos arranca un único proceso de desarrollo con recarga automática.
+Con --produccion arranca WORKERS procesos (o los indicados con --workers) sin
+recarga; con más de uno, los almacenes coordinan sus escrituras entre
+procesos (ver src/helpers/coordinacion.py).
 """
 
+import argparse
+import os
+import sys
+
 import uvicorn
 
+from src.config.settings import settings
+from src.helpers.coordinacion import fcntl
+from src.helpers.logger import configurar_logging
+
+
+def validar_workers(workers: int) -> None:
+    """
+    Comprueba que el almacenamiento configurado admita varios procesos.
+
+    Args:
+        workers (int): Procesos a arrancar.
+
+    Raises:
+        SystemExit: Si la combinación no es segura.
+    """
+    if workers <= 1:
+        return
+    if settings.almacenamiento == "journal":
+        sys.exit('ALMACENAMIENTO="journal" no admite varios workers; use "json" o "sqlite".')
+    if fcntl is None:
+        sys.exit("Varios workers requieren fcntl (no disponible en esta plataforma).")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arranca la API Inventario Sicurezza.")
+    parser.add_argument(
+        "--produccion", action="store_true",
+        help="Varios procesos y sin recarga automática.",
+    )
+    parser.add_argument("--workers", type=int, help="Procesos a arrancar (por defecto WORKERS).")
+    args = parser.parse_args()
+
+    workers = (args.workers or settings.workers) if args.produccion else 1
+    validar_workers(workers)
+    # Los workers leen la configuración del entorno al arrancar.
+    os.environ["WORKERS"] = str(workers)
+
+    # Logging por cola también en este proceso (el del recargador o el gestor de workers)
+    configurar_logging()
     uvicorn.run(
         "src.app:app",
-        host="127.0.0.1",
-        port=8000,
-        reload=True,
+        host=settings.host,
+        port=settings.port,
+        reload=not args.produccion,
+        workers=workers if args.produccion else None,
+        # Los logs de Uvicorn pasan por la cola del logger raíz; los accesos
+        # los registra la aplicación, muestreados (LOG_MUESTREO_ACCESOS).
+        log_config=None,
+        access_log=False,
     )
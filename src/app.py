@@ -2,15 +2,46 @@
 Archivo principal de configuración de la aplicación FastAPI.
 
 Define y configura la instancia de FastAPI, incluyendo los routers principales.
+Importarla no carga datos: el ciclo de vida configura el logging, precalienta
+los datos en segundo plano (PRECALENTAR) y al cerrar guarda las instantáneas.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from src.config.settings import settings
+from src.controllers.salud_controller import SaludController
+from src.helpers.admision import MiddlewareAdmision
+from src.helpers.logger import MiddlewareAccesos, configurar_logging
+from src.helpers.metricas import MiddlewareMetricas
 from src.routes.api_router import api_router
+from src.services.salud_service import salud_service
+
+salud = SaludController(salud_service)
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """
+    Arranque y cierre de la aplicación.
+
+    El precalentamiento no bloquea el arranque: la API atiende peticiones
+    mientras tanto y /salud/listo responde 503 hasta que termina.
+    """
+    configurar_logging()
+    precalentamiento = asyncio.create_task(salud.precalentar()) if settings.precalentar else None
+    yield
+    if precalentamiento is not None and not precalentamiento.done():
+        precalentamiento.cancel()
+    await salud.guardar_instantaneas()
+
 
 app = FastAPI(
     title="Inventario Sicurezza API",
     description="API para gestionar productos, ventas y analizar rentabilidad.",
     version="1.0.0",
+    lifespan=ciclo_de_vida,
 )
 
 # Ruta de prueba en la raíz
@@ -26,3 +57,24 @@ async def root():
 
 # Incluir todos los routers desde el router principal
 app.include_router(api_router)
+
+# Control de admisión: límites por clase y 503 rápido ante una ráfaga. Va
+# dentro de métricas y accesos, que así registran también los rechazos.
+if settings.admision:
+    app.add_middleware(
+        MiddlewareAdmision,
+        lecturas=settings.admision_lecturas,
+        escrituras=settings.admision_escrituras,
+        cola=settings.admision_cola,
+        presupuesto=settings.admision_presupuesto,
+        tasa_cliente=settings.admision_tasa_cliente,
+        rafaga_cliente=settings.admision_rafaga_cliente,
+        cabecera_cliente=settings.admision_cabecera_cliente,
+    )
+
+# Medir latencia por ruta y agregar la cabecera Server-Timing
+if settings.metricas_peticiones:
+    app.add_middleware(MiddlewareMetricas)
+
+# Log de accesos muestreado (los errores 5xx se registran siempre)
+app.add_middleware(MiddlewareAccesos, tasa=settings.log_muestreo_accesos)
@@ -2,8 +2,18 @@
 Configuración de variables de entorno para la aplicación.
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
+from src.data.rutas import (
+    RUTA_IDEMPOTENCIA,
+    RUTA_PRODUCTOS,
+    RUTA_SQLITE,
+    RUTA_VENTAS,
+    RUTA_VENTAS_SEGMENTOS,
+)
+
 
 class Settings(BaseSettings):
     """
@@ -11,14 +21,102 @@ class Settings(BaseSettings):
 
     Atributos:
         productos_path (str): Ruta al archivo JSON de productos.
-        ventas_path (str): Ruta al archivo JSON de ventas.
+        ventas_path (str): Ruta al archivo JSON de ventas (solo para importarlo al libro).
+        ventas_segmentos_dir (str): Carpeta de los segmentos NDJSON del libro de ventas.
+        ventas_segmento_max_bytes (int): Tamaño a partir del cual se abre un segmento nuevo.
         host (str): Dirección host para el servidor.
         port (int): Puerto para el servidor.
+        workers (int): Procesos de Uvicorn en modo producción; con más de uno
+            los almacenes coordinan sus escrituras entre procesos.
+        almacenamiento (str): Modo de persistencia ("json", "journal" o "sqlite").
+        sqlite_path (str): Ruta a la base de datos SQLite.
+        productos_compactos (bool): Guardar los productos en memoria en columnas
+            (modos "json" y "journal") para reducir el consumo de memoria.
+        catalogo_mapeado (bool): Con varios workers en modo "json", leer el
+            catálogo de un archivo binario mapeado en memoria y compartido
+            entre procesos en lugar de parsearlo en cada uno.
+        journal_lote_fsync (int): Registros de bitácora que fuerzan un fsync inmediato.
+        journal_intervalo_fsync (float): Segundos máximos entre fsync agrupados.
+        journal_esperar_fsync (bool): Confirmar cada escritura de bitácora
+            recién cuando un fsync la cubre (sobrevive a una caída del sistema).
+        journal_umbral_compactacion (int): Registros de bitácora que disparan la compactación.
+        io_hilos (int): Hilos del pool que ejecuta el acceso a datos fuera del event loop.
+        lote_max_items (int): Máximo de ítems aceptados por una operación por lote.
+        pagina_max_limite (int): Máximo de productos por página en GET /productos/.
+        ndjson_tramo (int): Productos leídos por tramo al transmitir en NDJSON.
+        cache_control_productos (str): Cabecera Cache-Control de las lecturas
+            de productos; "no-cache" obliga a revalidar con If-None-Match.
+        metricas_peticiones (bool): Medir cada petición (histogramas por ruta
+            y cabecera Server-Timing). GET /metrics se expone igual.
+        log_nivel (str): Nivel mínimo de los logs ("DEBUG", "INFO", ...).
+        log_formato (str): "texto" o "json" (un objeto JSON por línea).
+        log_cola_max (int): Registros pendientes a partir de los cuales se descartan.
+        log_muestreo_accesos (float): Fracción de peticiones con línea de
+            acceso (0 a 1); las respuestas 5xx se registran siempre.
+        precalentar (bool): Cargar almacén y ventas en segundo plano al
+            arrancar; /salud/listo responde 503 hasta que termina.
+        instantaneas (bool): Usar y guardar la instantánea binaria del libro de ventas.
+        instantanea_umbral (int): Registros reproducidos al arrancar (además de
+            la instantánea) a partir de los cuales se escribe una nueva.
+        idempotencia_path (str): Bitácora NDJSON de las respuestas guardadas
+            por Idempotency-Key.
+        idempotencia_max (int): Claves de idempotencia que se conservan
+            (se descartan las menos usadas).
+        idempotencia_ttl (float): Segundos durante los que se repite la
+            respuesta de una clave.
+        admision (bool): Activar el control de admisión (límites de
+            peticiones en curso y descarte con 503).
+        admision_lecturas (int): Lecturas (GET, HEAD, OPTIONS) en curso como máximo.
+        admision_escrituras (int): Escrituras en curso como máximo.
+        admision_cola (int): Peticiones en espera por clase como máximo.
+        admision_presupuesto (float): Segundos que una petición puede esperar
+            en la cola; si la espera estimada lo supera se responde 503.
+        admision_tasa_cliente (float): Peticiones por segundo por cliente
+            (cubo de tokens); 0 desactiva el límite.
+        admision_rafaga_cliente (int): Peticiones seguidas que admite el cubo
+            de un cliente.
+        admision_cabecera_cliente (str): Cabecera que identifica al cliente
+            (por ejemplo "X-Api-Key"); vacía usa la IP.
     """
-    productos_path: str
-    ventas_path: str
+    productos_path: str = RUTA_PRODUCTOS
+    ventas_path: str = RUTA_VENTAS
+    ventas_segmentos_dir: str = RUTA_VENTAS_SEGMENTOS
+    ventas_segmento_max_bytes: int = 16 * 1024 * 1024
     host: str = "127.0.0.1"
     port: int = 8000
+    workers: int = 1
+    almacenamiento: Literal["json", "journal", "sqlite"] = "json"
+    sqlite_path: str = RUTA_SQLITE
+    productos_compactos: bool = False
+    catalogo_mapeado: bool = True
+    journal_lote_fsync: int = 64
+    journal_intervalo_fsync: float = 0.05
+    journal_esperar_fsync: bool = False
+    journal_umbral_compactacion: int = 10000
+    io_hilos: int = 8
+    lote_max_items: int = 10000
+    pagina_max_limite: int = 1000
+    ndjson_tramo: int = 500
+    cache_control_productos: str = "no-cache"
+    metricas_peticiones: bool = True
+    log_nivel: str = "INFO"
+    log_formato: str = "texto"
+    log_cola_max: int = 10000
+    log_muestreo_accesos: float = 1.0
+    precalentar: bool = True
+    instantaneas: bool = True
+    instantanea_umbral: int = 10000
+    idempotencia_path: str = RUTA_IDEMPOTENCIA
+    idempotencia_max: int = 10000
+    idempotencia_ttl: float = 24 * 60 * 60
+    admision: bool = True
+    admision_lecturas: int = 64
+    admision_escrituras: int = 16
+    admision_cola: int = 256
+    admision_presupuesto: float = 2.0
+    admision_tasa_cliente: float = 0.0
+    admision_rafaga_cliente: int = 20
+    admision_cabecera_cliente: str = ""
 
     class Config:
         """
@@ -0,0 +1,77 @@
+"""
+Controlador de analítica de ventas.
+
+Las agregaciones corren en el ejecutor de E/S para no bloquear el event loop.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+from src.helpers.ejecutor import ejecutor_io
+from src.schemas.analitica_schema import (
+    CubetaVentas,
+    RentabilidadProducto,
+    ResumenVentas,
+    TotalesPeriodo,
+)
+from src.services.analitica_service import AnaliticaService
+
+
+class AnaliticaController:
+    """
+    Controlador que conecta los endpoints de analítica con su servicio.
+    """
+
+    def __init__(self, service: AnaliticaService) -> None:
+        self.service = service
+
+    async def rentabilidad_por_producto(
+        self, desde: Optional[datetime], hasta: Optional[datetime]
+    ) -> List[RentabilidadProducto]:
+        """
+        Retorna la rentabilidad de cada producto vendido.
+        """
+        return await ejecutor_io.ejecutar(self.service.rentabilidad_por_producto, desde, hasta)
+
+    async def top_productos(
+        self, por: str, limite: int, desde: Optional[datetime], hasta: Optional[datetime]
+    ) -> List[RentabilidadProducto]:
+        """
+        Retorna el ranking de productos según el criterio indicado.
+        """
+        return await ejecutor_io.ejecutar(self.service.top_productos, por, limite, desde, hasta)
+
+    async def resumen(
+        self, desde: Optional[datetime], hasta: Optional[datetime]
+    ) -> ResumenVentas:
+        """
+        Retorna los totales de ventas.
+        """
+        return await ejecutor_io.ejecutar(self.service.resumen, desde, hasta)
+
+    async def serie(
+        self,
+        producto_id: int,
+        granularidad: str,
+        desde: Optional[datetime],
+        hasta: Optional[datetime],
+    ) -> List[CubetaVentas]:
+        """
+        Retorna las ventas de un producto por hora, día o mes.
+        """
+        return await ejecutor_io.ejecutar(
+            self.service.serie, producto_id, granularidad, desde, hasta
+        )
+
+    async def totales_periodo(
+        self, producto_id: int, desde: Optional[datetime], hasta: Optional[datetime]
+    ) -> TotalesPeriodo:
+        """
+        Retorna las ventas de un producto acumuladas en un rango.
+        """
+        return await ejecutor_io.ejecutar(self.service.totales_periodo, producto_id, desde, hasta)
+
+    async def reconstruir_rollups(self) -> dict:
+        """
+        Recalcula los rollups desde el historial de ventas.
+        """
+        return await ejecutor_io.ejecutar(self.service.reconstruir_rollups)
@@ -1,11 +1,16 @@
 """
 Controlador de inventario. Contiene lógica para operaciones relacionadas con el stock
-de productos como listar productos con bajo stock o productos agotados.
+de productos como consultar o ajustar cantidades y listar productos con bajo stock
+o agotados.
+
+Como en productos, cada llamada al servicio se despacha al ejecutor de E/S.
 """
 
 from typing import List
-from src.models.producto import Producto
-from src.services.producto_service import ProductoService
+from src.helpers.ejecutor import ejecutor_io
+from src.schemas.inventario_schema import InventarioResponse
+from src.schemas.producto_schema import ProductoResponse
+from src.services.inventario_service import InventarioService
 
 
 class InventarioController:
@@ -13,13 +18,63 @@ class InventarioController:
     Controlador para operaciones relacionadas con el inventario de productos.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, service: InventarioService) -> None:
+        """
+        Inicializa el controlador con el servicio de inventario.
+
+        Args:
+            service (InventarioService): Servicio de inventario.
+        """
+        self.service = service
+
+    async def obtener_stock(self, producto_id: int) -> InventarioResponse:
         """
-        Inicializa el controlador con el servicio de productos.
+        Retorna el stock de un producto.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            InventarioResponse: Stock actual del producto.
+        """
+        return await ejecutor_io.ejecutar(self.service.obtener_stock, producto_id)
+
+    async def agregar_stock(self, producto_id: int, cantidad: int) -> InventarioResponse:
+        """
+        Suma una cantidad (positiva o negativa) al stock de un producto.
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Unidades a sumar.
+
+        Returns:
+            InventarioResponse: Stock resultante.
+        """
+        return await ejecutor_io.ejecutar(self.service.agregar_stock, producto_id, cantidad)
+
+    async def establecer_stock(self, producto_id: int, cantidad: int) -> InventarioResponse:
+        """
+        Fija el stock exacto de un producto.
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Stock a establecer.
+
+        Returns:
+            InventarioResponse: Stock resultante.
+        """
+        return await ejecutor_io.ejecutar(self.service.establecer_stock, producto_id, cantidad)
+
+    async def obtener_stock_total(self) -> int:
+        """
+        Retorna la suma del stock de todos los productos.
+
+        Returns:
+            int: Stock total.
         """
-        self.service = ProductoService()
+        return await ejecutor_io.ejecutar(self.service.obtener_stock_total)
 
-    def listar_productos_stock_bajo(self, umbral: int) -> List[Producto]:
+    async def listar_productos_stock_bajo(self, umbral: int) -> List[ProductoResponse]:
         """
         Retorna los productos cuyo stock es menor o igual al umbral proporcionado.
 
@@ -27,15 +82,15 @@ class InventarioController:
             umbral (int): Límite máximo de stock permitido.
 
         Returns:
-            List[Producto]: Lista de productos con stock bajo.
+            List[ProductoResponse]: Lista de productos con stock bajo.
         """
-        return [p for p in self.service.productos if p.stock <= umbral]
+        return await ejecutor_io.ejecutar(self.service.listar_productos_bajo_stock, umbral)
 
-    def listar_productos_agotados(self) -> List[Producto]:
+    async def listar_productos_agotados(self) -> List[ProductoResponse]:
         """
         Retorna los productos cuyo stock es exactamente 0.
 
         Returns:
-            List[Producto]: Lista de productos agotados.
+            List[ProductoResponse]: Lista de productos agotados.
         """
-        return [p for p in self.service.productos if p.stock == 0]
+        return await ejecutor_io.ejecutar(self.service.listar_productos_agotados)
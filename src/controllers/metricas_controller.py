@@ -0,0 +1,25 @@
+"""
+Controlador de métricas.
+
+La exportación lee contadores protegidos por los locks de los almacenes, que
+pueden estar tomados durante una escritura larga, así que corre en el
+ejecutor de E/S como el resto del acceso a datos.
+"""
+
+from src.helpers.ejecutor import ejecutor_io
+from src.helpers.metricas import RegistroMetricas
+
+
+class MetricasController:
+    """
+    Controlador que conecta el endpoint de métricas con el registro.
+    """
+
+    def __init__(self, registro: RegistroMetricas) -> None:
+        self.registro = registro
+
+    async def exportar(self) -> str:
+        """
+        Retorna las métricas en formato de texto de Prometheus.
+        """
+        return await ejecutor_io.ejecutar(self.registro.exportar)
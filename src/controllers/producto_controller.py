@@ -1,9 +1,21 @@
 """
 Controlador para la lógica de negocio de productos.
+
+El servicio es síncrono y hace E/S bloqueante, por lo que cada llamada se
+despacha al ejecutor de E/S en lugar de correr sobre el event loop.
 """
 
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from src.helpers.ejecutor import ejecutor_io
 from src.services.producto_service import ProductoService
-from src.schemas.producto_schema import ProductoCreate, ProductoUpdate
+from src.config.settings import settings
+from src.schemas.producto_schema import (
+    ActualizacionLote,
+    AjusteStockLote,
+    ProductoCreate,
+    ProductoUpdate,
+    VentaLote,
+)
 
 
 class ProductoController:
@@ -14,44 +26,166 @@ class ProductoController:
     def __init__(self, service: ProductoService):
         self.service = service
 
-    async def listar_productos(self):
+    async def listar_pagina_json(self, cursor: int, limite: int) -> Tuple[bytes, Optional[int]]:
+        """
+        Lista una página de productos a partir de un cursor, ya codificada como JSON.
+        """
+        return await ejecutor_io.ejecutar(self.service.listar_pagina_json, cursor, limite)
+
+    async def transmitir_productos(
+        self, cursor: int = 0, limite: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Genera los productos como NDJSON, leyendo el almacén por tramos.
+
+        Solo hay un tramo en memoria a la vez, así que la memoria y el tiempo
+        hasta el primer byte no dependen del tamaño del catálogo.
+        """
+        restantes = limite
+        while restantes is None or restantes > 0:
+            tamano = settings.ndjson_tramo
+            if restantes is not None:
+                tamano = min(tamano, restantes)
+            lineas, ultimo_id, cantidad = await ejecutor_io.ejecutar(
+                self.service.tramo_productos_json, cursor, tamano
+            )
+            if cantidad == 0:
+                return
+            yield lineas
+            cursor = ultimo_id
+            if restantes is not None:
+                restantes -= cantidad
+            if cantidad < tamano:
+                return
+
+    async def etag_catalogo(self) -> str:
         """
-        Lista todos los productos.
+        Retorna el ETag actual del catálogo.
         """
-        return self.service.listar_productos()
+        return await ejecutor_io.ejecutar(self.service.etag_catalogo)
 
-    async def obtener_producto(self, producto_id: int):
+    async def etag_producto(self, producto_id: int) -> Optional[str]:
         """
-        Retorna un producto por ID.
+        Retorna el ETag actual de un producto, o None si no existe.
         """
-        return self.service.obtener_producto(producto_id)
+        return await ejecutor_io.ejecutar(self.service.etag_producto, producto_id)
+
+    async def listar_productos_json(self) -> bytes:
+        """
+        Lista todos los productos ya codificados como JSON.
+        """
+        return await ejecutor_io.ejecutar(self.service.listar_productos_json)
+
+    async def obtener_producto_json(self, producto_id: int) -> bytes:
+        """
+        Retorna un producto por ID ya codificado como JSON.
+        """
+        return await ejecutor_io.ejecutar(self.service.obtener_producto_json, producto_id)
+
+    async def buscar_productos_json(self, consulta: str, limite: int) -> bytes:
+        """
+        Busca productos por texto y los retorna ya codificados como JSON.
+        """
+        return await ejecutor_io.ejecutar(self.service.buscar_productos_json, consulta, limite)
 
     async def crear_producto(self, data: ProductoCreate):
         """
         Crea un nuevo producto.
         """
-        return self.service.crear_producto(data.dict())
+        return await ejecutor_io.ejecutar(self.service.crear_producto, data.dict())
 
-    async def actualizar_producto(self, producto_id: int, data: ProductoUpdate):
+    async def actualizar_producto(
+        self, producto_id: int, data: ProductoUpdate, version_esperada: Optional[int] = None
+    ):
         """
         Actualiza los datos de un producto.
         """
-        return self.service.actualizar_producto(producto_id, data.dict(exclude_unset=True))
+        return await ejecutor_io.ejecutar(
+            self.service.actualizar_producto,
+            producto_id,
+            data.dict(exclude_unset=True),
+            version_esperada,
+        )
 
     async def eliminar_producto(self, producto_id: int):
         """
         Elimina un producto por ID.
         """
-        return self.service.eliminar_producto(producto_id)
+        return await ejecutor_io.ejecutar(self.service.eliminar_producto, producto_id)
 
-    async def ajustar_stock(self, producto_id: int, cantidad: int):
+    async def ajustar_stock(
+        self,
+        producto_id: int,
+        cantidad: int,
+        version_esperada: Optional[int] = None,
+        clave_idempotencia: Optional[str] = None,
+    ) -> Tuple[int, Any, bool]:
         """
         Ajusta el stock del producto.
+
+        Retorna el estado, la respuesta y si se repitió una anterior por
+        Idempotency-Key.
         """
-        return self.service.ajustar_stock(producto_id, cantidad)
+        if clave_idempotencia is None:
+            return 200, await ejecutor_io.ejecutar(
+                self.service.ajustar_stock, producto_id, cantidad, version_esperada
+            ), False
+        huella = f"PUT /productos/{producto_id}/ajustar-stock {cantidad} {version_esperada}"
+        return await ejecutor_io.ejecutar(
+            self.service.idempotente, clave_idempotencia, huella,
+            self.service.ajustar_stock, producto_id, cantidad, version_esperada,
+        )
 
-    async def registrar_venta(self, producto_id: int):
+    async def registrar_venta(
+        self, producto_id: int, clave_idempotencia: Optional[str] = None
+    ) -> Tuple[int, Any, bool]:
         """
         Registra una venta del producto.
+
+        Retorna el estado, la respuesta y si se repitió una anterior por
+        Idempotency-Key.
+        """
+        if clave_idempotencia is None:
+            return 200, await ejecutor_io.ejecutar(self.service.registrar_venta, producto_id), False
+        return await ejecutor_io.ejecutar(
+            self.service.idempotente, clave_idempotencia, f"POST /productos/{producto_id}/venta",
+            self.service.registrar_venta, producto_id,
+        )
+
+    async def crear_productos(self, productos: List[ProductoCreate]):
+        """
+        Crea varios productos en un solo ciclo de lectura y escritura.
+        """
+        return await ejecutor_io.ejecutar(
+            self.service.crear_productos, [p.dict() for p in productos]
+        )
+
+    async def actualizar_productos(self, items: List[ActualizacionLote], todo_o_nada: bool):
+        """
+        Actualiza varios productos en un solo ciclo de lectura y escritura.
+        """
+        datos = [
+            {
+                "producto_id": i.producto_id,
+                "datos": i.datos.dict(exclude_unset=True),
+                "version": i.version,
+            }
+            for i in items
+        ]
+        return await ejecutor_io.ejecutar(self.service.actualizar_productos, datos, todo_o_nada)
+
+    async def ajustar_stock_lote(self, items: List[AjusteStockLote], todo_o_nada: bool):
+        """
+        Ajusta el stock de varios productos en un solo ciclo de lectura y escritura.
+        """
+        return await ejecutor_io.ejecutar(
+            self.service.ajustar_stock_lote, [i.dict() for i in items], todo_o_nada
+        )
+
+    async def registrar_ventas_lote(self, items: List[VentaLote], todo_o_nada: bool):
+        """
+        Registra varias ventas en un solo ciclo de lectura y escritura.
         """
-        return self.service.registrar_venta(producto_id)
+        return await ejecutor_io.ejecutar(
+            self.service.registrar_ventas_lote, [i.producto_id for i in items], todo_o_nada
+        )
@@ -0,0 +1,38 @@
+"""
+Controlador de salud.
+
+La carga de datos y la instantánea de cierre corren en el ejecutor de E/S;
+consultar el estado no hace E/S, así que responde aunque el pool esté ocupado.
+"""
+
+from src.helpers.ejecutor import ejecutor_io
+from src.schemas.salud_schema import EstadoSalud
+from src.services.salud_service import SaludService
+
+
+class SaludController:
+    """
+    Controlador que conecta el arranque y los endpoints de salud con su servicio.
+    """
+
+    def __init__(self, service: SaludService) -> None:
+        self.service = service
+
+    async def precalentar(self) -> None:
+        """
+        Carga los datos en el ejecutor de E/S.
+        """
+        self.service.marcar_precalentando()
+        await ejecutor_io.ejecutar(self.service.precalentar)
+
+    async def guardar_instantaneas(self) -> None:
+        """
+        Guarda las instantáneas de cierre.
+        """
+        await ejecutor_io.ejecutar(self.service.guardar_instantaneas)
+
+    def estado_arranque(self) -> EstadoSalud:
+        """
+        Retorna el estado de arranque.
+        """
+        return self.service.estado_arranque()
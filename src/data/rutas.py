@@ -1,5 +1,5 @@
 """
-Rutas absolutas o relativas para archivos JSON.
+Rutas absolutas o relativas para archivos de datos (JSON, NDJSON y SQLite).
 """
 
 import os
@@ -8,3 +8,6 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 RUTA_PRODUCTOS = os.path.join(BASE_DIR, "productos.json")
 RUTA_VENTAS = os.path.join(BASE_DIR, "ventas.json")
+RUTA_VENTAS_SEGMENTOS = os.path.join(BASE_DIR, "ventas")
+RUTA_SQLITE = os.path.join(BASE_DIR, "inventario.db")
+RUTA_IDEMPOTENCIA = os.path.join(BASE_DIR, "idempotencia.ndjson")
@@ -0,0 +1,334 @@
+"""
+Control de admisión: limita las peticiones en curso y descarta las que no
+llegarían a tiempo.
+
+Ante una ráfaga, todas las peticiones terminan esperando detrás de la E/S
+de datos y la latencia sube para todas. En lugar de eso, cada clase de
+petición (lecturas y escrituras) tiene un máximo de peticiones en curso y
+una cola de espera acotada. Al llegar una petición se estima cuánto
+esperaría en la cola (las que ya esperan por el tiempo medio de atención); si
+supera el presupuesto de latencia, o la cola está llena, se responde de
+inmediato 503 con Retry-After. Una petición que espera más que el
+presupuesto también sale con 503.
+
+Opcionalmente, cada cliente (por IP o por una cabecera) tiene un cubo de
+tokens; sin tokens se responde 429 con Retry-After.
+
+Los límites son por proceso: con varios workers, cada uno aplica los suyos.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+
+from src.helpers.metricas import registro_metricas
+
+# Peticiones que nunca se limitan: las sondas de salud y las métricas.
+_EXENTAS = ("/salud/", "/metrics")
+
+_METODOS_LECTURA = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Peso de la última petición en el tiempo medio de atención.
+_PESO_MEDIA = 0.1
+
+admision_total = registro_metricas.contador(
+    "inventario_admision_total",
+    "Peticiones por clase y resultado del control de admisión.",
+    ("clase", "resultado"),
+)
+admision_espera_segundos = registro_metricas.histograma(
+    "inventario_admision_espera_segundos",
+    "Tiempo en la cola de admisión de las peticiones admitidas.",
+    ("clase",),
+)
+
+
+class LimiteConcurrencia:
+    """
+    Máximo de peticiones en curso con una cola de espera acotada.
+
+    Solo se usa desde el event loop, así que no necesita locks.
+
+    Atributos:
+        clase (str): Nombre de la clase de peticiones ("lectura", "escritura").
+        limite (int): Peticiones en curso como máximo.
+        cola (int): Peticiones en espera como máximo.
+        presupuesto (float): Segundos máximos de espera en la cola.
+        en_curso (int): Peticiones que se están atendiendo.
+        atencion_media (float): Media móvil de la duración de las peticiones.
+    """
+
+    def __init__(self, clase: str, limite: int, cola: int, presupuesto: float) -> None:
+        """
+        Inicializa el límite sin peticiones en curso.
+
+        Args:
+            clase (str): Nombre de la clase de peticiones.
+            limite (int): Peticiones en curso como máximo.
+            cola (int): Peticiones en espera como máximo.
+            presupuesto (float): Segundos máximos de espera en la cola.
+        """
+        self.clase = clase
+        self.limite = max(1, limite)
+        self.cola = max(0, cola)
+        self.presupuesto = presupuesto
+        self.en_curso = 0
+        self.atencion_media = 0.0
+        self._espera: Deque[asyncio.Future] = deque()
+
+    @property
+    def en_espera(self) -> int:
+        """
+        Peticiones esperando un lugar.
+        """
+        return len(self._espera)
+
+    def espera_estimada(self) -> float:
+        """
+        Retorna los segundos que esperaría una petición que llega ahora.
+        """
+        return (len(self._espera) + 1) / self.limite * self.atencion_media
+
+    async def entrar(self) -> Optional[str]:
+        """
+        Espera un lugar para atender la petición.
+
+        Returns:
+            Optional[str]: None si se admitió (hay que llamar a salir() al
+                terminar), o el motivo del rechazo: "cola" (llena),
+                "presupuesto" (la espera estimada lo supera) o "vencida"
+                (esperó más que el presupuesto).
+        """
+        if self.en_curso < self.limite and not self._espera:
+            self.en_curso += 1
+            return None
+        if len(self._espera) >= self.cola:
+            return "cola"
+        if self.espera_estimada() > self.presupuesto:
+            return "presupuesto"
+        turno = asyncio.get_running_loop().create_future()
+        self._espera.append(turno)
+        try:
+            await asyncio.wait_for(turno, self.presupuesto)
+        except asyncio.TimeoutError:
+            self._devolver(turno)
+            return "vencida"
+        except asyncio.CancelledError:
+            self._devolver(turno)
+            raise
+        return None
+
+    def _devolver(self, turno: asyncio.Future) -> None:
+        """
+        Retira una espera que terminó sin admitirse. Si salir() ya le había
+        cedido el lugar (vence o se cancela en el mismo instante), lo libera;
+        si no, ese lugar quedaría ocupado para siempre.
+        """
+        if turno.done() and not turno.cancelled():
+            self.salir(0.0)
+        else:
+            self._quitar(turno)
+
+    def salir(self, duracion: float) -> None:
+        """
+        Libera el lugar de una petición admitida y se lo cede a la primera en espera.
+
+        Args:
+            duracion (float): Segundos que llevó atenderla.
+        """
+        if duracion > 0:
+            self.atencion_media += _PESO_MEDIA * (duracion - self.atencion_media)
+        while self._espera:
+            turno = self._espera.popleft()
+            if not turno.done():
+                turno.set_result(None)
+                return
+        self.en_curso -= 1
+
+    def _quitar(self, turno: asyncio.Future) -> None:
+        """
+        Saca de la cola una espera que terminó sin lugar.
+        """
+        try:
+            self._espera.remove(turno)
+        except ValueError:
+            pass
+
+
+class CuboTokens:
+    """
+    Limitador de tasa por cubo de tokens.
+
+    Atributos:
+        tasa (float): Tokens que se reponen por segundo.
+        capacidad (float): Tokens como máximo (la ráfaga admitida).
+    """
+
+    def __init__(self, tasa: float, capacidad: float) -> None:
+        """
+        Inicializa el cubo lleno.
+        """
+        self.tasa = tasa
+        self.capacidad = max(1.0, capacidad)
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+
+    def consumir(self) -> float:
+        """
+        Toma un token si hay.
+
+        Returns:
+            float: 0 si se tomó el token, o los segundos hasta que haya uno.
+        """
+        ahora = time.monotonic()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.tasa
+
+
+class MiddlewareAdmision:
+    """
+    Middleware ASGI de control de admisión y limitación de tasa por cliente.
+
+    Es ASGI puro, como los de métricas y accesos. Las peticiones de lectura
+    (GET, HEAD, OPTIONS) y las de escritura tienen límites separados, para que
+    una ráfaga de escrituras no demore las lecturas. Las sondas de salud y
+    /metrics no se limitan.
+
+    Atributos:
+        limites (Dict[str, LimiteConcurrencia]): Límite de cada clase.
+        tasa_cliente (float): Peticiones por segundo por cliente (0 desactiva).
+        rafaga_cliente (int): Peticiones seguidas que admite el cubo de un cliente.
+        cabecera_cliente (str): Cabecera que identifica al cliente; vacía usa la IP.
+        clientes_max (int): Cubos de clientes que se conservan.
+    """
+
+    def __init__(
+        self,
+        app,
+        lecturas: int,
+        escrituras: int,
+        cola: int,
+        presupuesto: float,
+        tasa_cliente: float = 0.0,
+        rafaga_cliente: int = 1,
+        cabecera_cliente: str = "",
+        clientes_max: int = 10000,
+    ) -> None:
+        """
+        Envuelve una aplicación ASGI.
+
+        Args:
+            app: Aplicación ASGI.
+            lecturas (int): Lecturas en curso como máximo.
+            escrituras (int): Escrituras en curso como máximo.
+            cola (int): Peticiones en espera por clase como máximo.
+            presupuesto (float): Segundos máximos de espera en la cola.
+            tasa_cliente (float): Peticiones por segundo por cliente (0 desactiva).
+            rafaga_cliente (int): Peticiones seguidas admitidas por cliente.
+            cabecera_cliente (str): Cabecera que identifica al cliente.
+            clientes_max (int): Cubos de clientes que se conservan.
+        """
+        self.app = app
+        self.limites: Dict[str, LimiteConcurrencia] = {
+            "lectura": LimiteConcurrencia("lectura", lecturas, cola, presupuesto),
+            "escritura": LimiteConcurrencia("escritura", escrituras, cola, presupuesto),
+        }
+        self.tasa_cliente = tasa_cliente
+        self.rafaga_cliente = rafaga_cliente
+        self.cabecera_cliente = cabecera_cliente
+        self._cabecera = cabecera_cliente.lower().encode("latin-1")
+        self.clientes_max = max(1, clientes_max)
+        self._cubos: "OrderedDict[str, CuboTokens]" = OrderedDict()
+        registro_metricas.colector("admision", self.muestras_metricas)
+
+    async def __call__(self, scope, receive, send) -> None:
+        """
+        Atiende la petición si hay lugar, o la rechaza con 503 o 429.
+        """
+        if scope["type"] != "http" or scope["path"].startswith(_EXENTAS):
+            await self.app(scope, receive, send)
+            return
+        clase = "lectura" if scope["method"] in _METODOS_LECTURA else "escritura"
+        if self.tasa_cliente > 0:
+            espera = self._cubo(scope).consumir()
+            if espera > 0:
+                admision_total.incrementar(clase, "limitada")
+                await _rechazar(send, 429, "Demasiadas peticiones", espera)
+                return
+        limite = self.limites[clase]
+        llegada = time.perf_counter()
+        motivo = await limite.entrar()
+        if motivo is not None:
+            admision_total.incrementar(clase, motivo)
+            await _rechazar(send, 503, "Servicio saturado", max(limite.espera_estimada(), 1.0))
+            return
+        inicio = time.perf_counter()
+        admision_total.incrementar(clase, "admitida")
+        admision_espera_segundos.observar(inicio - llegada, clase)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limite.salir(time.perf_counter() - inicio)
+
+    def _cubo(self, scope) -> CuboTokens:
+        """
+        Retorna el cubo de tokens del cliente de la petición, creándolo si no existe.
+        """
+        cliente = None
+        if self._cabecera:
+            for nombre, valor in scope.get("headers", ()):
+                if nombre == self._cabecera:
+                    cliente = valor.decode("latin-1")
+                    break
+        if cliente is None:
+            direccion = scope.get("client")
+            cliente = direccion[0] if direccion else ""
+        cubo = self._cubos.get(cliente)
+        if cubo is None:
+            cubo = self._cubos[cliente] = CuboTokens(self.tasa_cliente, self.rafaga_cliente)
+            if len(self._cubos) > self.clientes_max:
+                self._cubos.popitem(last=False)
+        else:
+            self._cubos.move_to_end(cliente)
+        return cubo
+
+    def muestras_metricas(self) -> list:
+        """
+        Retorna las peticiones en curso y en espera de cada clase para /metrics.
+
+        Returns:
+            list: Muestras (nombre, tipo, ayuda, series) de metricas.py.
+        """
+        return [
+            ("inventario_admision_en_curso", "gauge", "Peticiones admitidas en curso por clase.",
+             [({"clase": clase}, limite.en_curso) for clase, limite in self.limites.items()]),
+            ("inventario_admision_en_espera", "gauge", "Peticiones en la cola de admisión por clase.",
+             [({"clase": clase}, limite.en_espera) for clase, limite in self.limites.items()]),
+            ("inventario_admision_atencion_media_segundos", "gauge",
+             "Duración media de las peticiones admitidas por clase.",
+             [({"clase": clase}, limite.atencion_media) for clase, limite in self.limites.items()]),
+        ]
+
+
+async def _rechazar(send, estado: int, detalle: str, reintentar: float) -> None:
+    """
+    Responde un rechazo en JSON con la cabecera Retry-After (en segundos enteros).
+    """
+    cuerpo = json.dumps({"detail": detalle}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": estado,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(reintentar))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
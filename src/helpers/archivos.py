@@ -0,0 +1,33 @@
+"""
+Utilidades comunes para la escritura atómica de archivos.
+
+Las escrituras atómicas vuelcan a un temporal de tempfile.mkstemp() y lo
+renombran sobre el destino. mkstemp crea el temporal con permisos 0600, así
+que sin corregirlos el archivo final dejaría de ser legible por el grupo y
+otros usuarios (por ejemplo, un proceso de respaldo o de solo lectura).
+"""
+
+import os
+import stat
+
+# Máscara de creación del proceso. os.umask() solo se puede leer cambiándola,
+# así que se lee una vez al importar, antes de que haya otros hilos.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def permisos_destino(ruta: str) -> int:
+    """
+    Retorna los permisos que debe tener el archivo que reemplaza a ruta.
+
+    Args:
+        ruta (str): Ruta del archivo de destino.
+
+    Returns:
+        int: Los permisos del archivo actual, o si no existe, los que tendría
+            uno recién creado con open() (0666 menos la máscara del proceso).
+    """
+    try:
+        return stat.S_IMODE(os.stat(ruta).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
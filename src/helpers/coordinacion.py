@@ -0,0 +1,138 @@
+"""
+Coordinación entre procesos que comparten los mismos archivos de datos.
+
+Con varios workers (WORKERS > 1) cada proceso guarda su propia copia del
+catálogo y de las ventas en memoria. Para que escribir no pise lo que escribió
+otro proceso y para que cada copia sepa cuándo quedó vieja se usan:
+
+- BloqueoProcesos: lock exclusivo (fcntl.flock) sobre un archivo ".lock",
+  tomado alrededor de cada lectura-modificación-escritura.
+- ContadorGeneracion: contadores de 64 bits en un archivo pequeño mapeado en
+  memoria (mmap). Quien escribe incrementa el contador con el lock tomado;
+  quien lee lo compara con el último valor que vio, con un acceso a memoria y
+  sin llamadas al sistema, y solo recarga si cambió.
+
+Sin fcntl (Windows) el lock solo excluye a los hilos del proceso, así que ahí
+no se admite más de un worker.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depende del entorno
+    fcntl = None
+
+_ENTERO = struct.Struct("<Q")
+
+
+class BloqueoProcesos:
+    """
+    Lock exclusivo entre procesos, reentrante dentro del hilo que lo toma.
+
+    Los hilos de un mismo proceso se excluyen con un RLock (flock no distingue
+    hilos que comparten el descriptor); el primer nivel de anidamiento toma
+    además el flock del archivo.
+
+    Atributos:
+        ruta (str): Archivo usado como lock (se crea si no existe).
+    """
+
+    def __init__(self, ruta: str) -> None:
+        """
+        Prepara el lock; el archivo se abre la primera vez que se toma.
+
+        Args:
+            ruta (str): Archivo usado como lock.
+        """
+        self.ruta = ruta
+        self._lock = threading.RLock()
+        self._nivel = 0
+        self._descriptor: Optional[int] = None
+
+    def __enter__(self) -> "BloqueoProcesos":
+        """
+        Toma el lock, esperando a que lo suelte el proceso que lo tenga.
+        """
+        self._lock.acquire()
+        if self._nivel == 0 and fcntl is not None:
+            try:
+                if self._descriptor is None:
+                    self._descriptor = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._descriptor, fcntl.LOCK_EX)
+            except BaseException:
+                self._lock.release()
+                raise
+        self._nivel += 1
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        """
+        Suelta un nivel del lock; el último libera también el flock.
+        """
+        self._nivel -= 1
+        if self._nivel == 0 and self._descriptor is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+        self._lock.release()
+
+
+class ContadorGeneracion:
+    """
+    Contadores compartidos entre procesos en un archivo mapeado en memoria.
+
+    Atributos:
+        ruta (str): Archivo de los contadores (se crea en cero si no existe).
+        ranuras (int): Cantidad de contadores del archivo.
+    """
+
+    def __init__(self, ruta: str, ranuras: int = 1) -> None:
+        """
+        Abre (o crea) el archivo y lo mapea en memoria.
+
+        Args:
+            ruta (str): Archivo de los contadores.
+            ranuras (int): Cantidad de contadores.
+        """
+        self.ruta = ruta
+        self.ranuras = max(1, ranuras)
+        tamano = _ENTERO.size * self.ranuras
+        descriptor = os.open(ruta, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Agrandar nunca borra lo escrito, así que no importa si otro
+            # proceso lo hace a la vez.
+            if os.fstat(descriptor).st_size < tamano:
+                os.ftruncate(descriptor, tamano)
+            self._mapa = mmap.mmap(descriptor, tamano)
+        finally:
+            os.close(descriptor)
+
+    def leer(self, ranura: int = 0) -> int:
+        """
+        Retorna el valor actual de un contador.
+
+        Args:
+            ranura (int): Contador a leer.
+
+        Returns:
+            int: Valor del contador.
+        """
+        return _ENTERO.unpack_from(self._mapa, ranura * _ENTERO.size)[0]
+
+    def incrementar(self, ranura: int = 0) -> int:
+        """
+        Suma uno a un contador. Debe llamarse con el BloqueoProcesos de los
+        datos que protege tomado.
+
+        Args:
+            ranura (int): Contador a incrementar.
+
+        Returns:
+            int: Nuevo valor del contador.
+        """
+        valor = self.leer(ranura) + 1
+        _ENTERO.pack_into(self._mapa, ranura * _ENTERO.size, valor)
+        return valor
@@ -0,0 +1,151 @@
+"""
+Ejecutor de E/S bloqueante fuera del event loop.
+
+Los controladores son asíncronos, pero el acceso a datos (archivos JSON,
+bitácora, SQLite) es síncrono. Este módulo despacha esas llamadas a un pool
+de hilos acotado para que una escritura lenta no detenga el resto de
+peticiones, y lleva métricas de profundidad de cola.
+
+Cada llamada se ejecuta en una copia del contexto de quien la envía, de modo
+que las fases que mida (ver metricas.py) se atribuyen a su petición; la espera
+en cola y la ejecución se registran como fases "cola_io" e "io".
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.config.settings import settings
+from src.helpers.metricas import io_espera_segundos, io_segundos, registrar_fase, registro_metricas
+
+
+class EjecutorIO:
+    """
+    Pool de hilos acotado con métricas de cola para llamadas bloqueantes.
+
+    Atributos:
+        hilos (Optional[int]): Máximo de hilos del pool; si no se indica, se
+            toma de IO_HILOS al crear el pool en la primera llamada.
+        en_cola (int): Llamadas enviadas que aún no empezaron.
+        en_curso (int): Llamadas ejecutándose en este momento.
+        completadas (int): Llamadas terminadas (con o sin error).
+        max_en_cola (int): Mayor profundidad de cola observada.
+    """
+
+    def __init__(self, hilos: Optional[int] = None) -> None:
+        """
+        Prepara el ejecutor; el pool se crea en la primera llamada y sus
+        hilos se arrancan bajo demanda.
+
+        Args:
+            hilos (Optional[int]): Máximo de hilos del pool.
+        """
+        self.hilos = max(1, hilos) if hilos is not None else None
+        self.en_cola = 0
+        self.en_curso = 0
+        self.completadas = 0
+        self.max_en_cola = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _obtener_pool(self) -> ThreadPoolExecutor:
+        """
+        Retorna el pool, creándolo la primera vez. Debe llamarse con el lock tomado.
+        """
+        if self._pool is None:
+            if self.hilos is None:
+                self.hilos = max(1, settings.io_hilos)
+            self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="io")
+        return self._pool
+
+    def _ejecutar_en_hilo(
+        self, funcion: Callable[..., Any], args: tuple, kwargs: dict, enviada: float
+    ) -> Any:
+        """
+        Ejecuta la función en un hilo del pool actualizando las métricas.
+        """
+        inicio = time.perf_counter()
+        with self._lock:
+            self.en_cola -= 1
+            self.en_curso += 1
+        io_espera_segundos.observar(inicio - enviada)
+        registrar_fase("cola_io", inicio - enviada)
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            segundos = time.perf_counter() - inicio
+            with self._lock:
+                self.en_curso -= 1
+                self.completadas += 1
+            io_segundos.observar(segundos, getattr(funcion, "__name__", "desconocida"))
+            registrar_fase("io", segundos)
+
+    async def ejecutar(self, funcion: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Ejecuta una función bloqueante en el pool y espera su resultado.
+
+        Args:
+            funcion (Callable[..., Any]): Función síncrona a ejecutar.
+            *args (Any): Argumentos posicionales.
+            **kwargs (Any): Argumentos con nombre.
+
+        Returns:
+            Any: Resultado de la función. Sus excepciones se propagan tal cual.
+        """
+        with self._lock:
+            self.en_cola += 1
+            self.max_en_cola = max(self.max_en_cola, self.en_cola)
+            pool = self._obtener_pool()
+        contexto = contextvars.copy_context()
+        futuro = pool.submit(
+            contexto.run, self._ejecutar_en_hilo, funcion, args, kwargs, time.perf_counter()
+        )
+        try:
+            return await asyncio.wrap_future(futuro)
+        except asyncio.CancelledError:
+            if futuro.cancelled():
+                with self._lock:
+                    self.en_cola -= 1
+            raise
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna las métricas actuales del pool.
+
+        Returns:
+            dict: Hilos (0 si el pool aún no se creó), llamadas en cola, en curso, completadas y cola máxima.
+        """
+        with self._lock:
+            return {
+                "hilos": self.hilos or 0,
+                "en_cola": self.en_cola,
+                "en_curso": self.en_curso,
+                "completadas": self.completadas,
+                "max_en_cola": self.max_en_cola,
+            }
+
+    def muestras_metricas(self) -> list:
+        """
+        Retorna las métricas del pool para la exportación de Prometheus.
+
+        Returns:
+            list: Muestras (nombre, tipo, ayuda, series) de metricas.py.
+        """
+        datos = self.estadisticas()
+        return [
+            (f"inventario_ejecutor_{clave}", tipo, ayuda, [({}, datos[dato])])
+            for clave, dato, tipo, ayuda in (
+                ("hilos", "hilos", "gauge", "Máximo de hilos del pool de E/S."),
+                ("en_cola", "en_cola", "gauge", "Llamadas esperando en la cola del pool de E/S."),
+                ("en_curso", "en_curso", "gauge", "Llamadas ejecutándose en el pool de E/S."),
+                ("completadas_total", "completadas", "counter", "Llamadas terminadas en el pool de E/S."),
+                ("max_en_cola", "max_en_cola", "gauge", "Mayor profundidad de cola observada."),
+            )
+        ]
+
+
+ejecutor_io = EjecutorIO()
+registro_metricas.colector("ejecutor_io", ejecutor_io.muestras_metricas)
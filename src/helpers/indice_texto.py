@@ -0,0 +1,311 @@
+"""
+Índice invertido en memoria para búsqueda de texto.
+
+Los textos se normalizan (minúsculas, sin tildes ni diacríticos) y se parten
+en palabras. Cada palabra apunta a los documentos que la contienen, con el
+peso del campo donde aparece. Para encontrar palabras por prefijo o por
+subcadena sin recorrer el vocabulario se indexan también sus trigramas y sus
+prefijos de hasta tres letras (para autocompletado).
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+
+# Calidad de una coincidencia entre un término de la consulta y una palabra.
+EXACTA, PREFIJO, SUBCADENA = 3, 2, 1
+
+# Pares (calidad, peso de campo) en orden de puntaje decreciente.
+_NIVELES = ((EXACTA, 2), (PREFIJO, 2), (EXACTA, 1), (PREFIJO, 1), (SUBCADENA, 2), (SUBCADENA, 1))
+
+_LARGOS_PREFIJO = (1, 2, 3)
+
+
+def normalizar(texto: str) -> str:
+    """
+    Pasa un texto a minúsculas y le quita tildes y diacríticos.
+
+    Args:
+        texto (str): Texto original.
+
+    Returns:
+        str: Texto normalizado.
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Parte un texto normalizado en palabras alfanuméricas.
+
+    Args:
+        texto (str): Texto original.
+
+    Returns:
+        List[str]: Palabras normalizadas, en orden de aparición.
+    """
+    return _PALABRA.findall(normalizar(texto))
+
+
+def _trigramas(palabra: str) -> Set[str]:
+    """
+    Retorna los trigramas de una palabra de al menos tres letras.
+    """
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+class IndiceTexto:
+    """
+    Índice invertido con coincidencia exacta, por prefijo y por subcadena.
+
+    Un documento coincide si cada término de la consulta coincide con alguna
+    de sus palabras. Su puntaje suma, por término, la mejor calidad de
+    coincidencia (exacta > prefijo > subcadena) por el peso del campo.
+
+    Los postings de cada palabra se separan por peso, de modo que una consulta
+    de un solo término (autocompletado) recorre los documentos de mayor a
+    menor puntaje y se detiene al llegar al límite.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa el índice vacío.
+        """
+        self._documentos: Dict[int, Dict[str, int]] = {}
+        self._postings: Dict[str, Dict[int, Dict[int, None]]] = {}
+        self._trigramas: Dict[str, Set[str]] = {}
+        self._prefijos: Dict[str, Set[str]] = {}
+        self._prefijos_ordenados: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """
+        Retorna la cantidad de documentos indexados.
+        """
+        return len(self._documentos)
+
+    def agregar(self, doc_id: int, campos: Iterable[Tuple[Optional[str], int]]) -> None:
+        """
+        Indexa (o reindexa) un documento.
+
+        Args:
+            doc_id (int): ID del documento.
+            campos (Iterable[Tuple[Optional[str], int]]): Pares (texto, peso).
+        """
+        palabras: Dict[str, int] = {}
+        for texto, peso in campos:
+            for palabra in tokenizar(texto or ""):
+                palabras[palabra] = max(peso, palabras.get(palabra, 0))
+        with self._lock:
+            self.quitar(doc_id)
+            self._documentos[doc_id] = palabras
+            for palabra, peso in palabras.items():
+                por_peso = self._postings.get(palabra)
+                if por_peso is None:
+                    por_peso = self._postings[palabra] = {}
+                    self._registrar_palabra(palabra)
+                por_peso.setdefault(peso, {})[doc_id] = None
+
+    def quitar(self, doc_id: int) -> None:
+        """
+        Quita un documento del índice.
+
+        Args:
+            doc_id (int): ID del documento.
+        """
+        with self._lock:
+            for palabra, peso in self._documentos.pop(doc_id, {}).items():
+                por_peso = self._postings[palabra]
+                del por_peso[peso][doc_id]
+                if not por_peso[peso]:
+                    del por_peso[peso]
+                if not por_peso:
+                    del self._postings[palabra]
+                    self._olvidar_palabra(palabra)
+
+    def exportar(self) -> tuple:
+        """
+        Retorna el contenido del índice para una instantánea, sin copiarlo:
+        debe serializarse antes de la siguiente modificación.
+
+        Returns:
+            tuple: Documentos, postings, trigramas y prefijos.
+        """
+        with self._lock:
+            return self._documentos, self._postings, self._trigramas, self._prefijos
+
+    def importar(self, datos: tuple) -> None:
+        """
+        Reemplaza el contenido del índice por el de una instantánea (ver exportar()).
+
+        Args:
+            datos (tuple): Valores retornados por exportar().
+        """
+        with self._lock:
+            self._documentos, self._postings, self._trigramas, self._prefijos = datos
+            self._prefijos_ordenados = {}
+
+    def _registrar_palabra(self, palabra: str) -> None:
+        """
+        Agrega una palabra nueva del vocabulario a los índices de trigramas y prefijos.
+        """
+        for trigrama in _trigramas(palabra):
+            self._trigramas.setdefault(trigrama, set()).add(palabra)
+        for largo in _LARGOS_PREFIJO:
+            if len(palabra) >= largo:
+                self._prefijos.setdefault(palabra[:largo], set()).add(palabra)
+                self._prefijos_ordenados.pop(palabra[:largo], None)
+
+    def _olvidar_palabra(self, palabra: str) -> None:
+        """
+        Quita una palabra que ya no aparece en ningún documento.
+        """
+        for clave, indice in [(t, self._trigramas) for t in _trigramas(palabra)] + [
+            (palabra[:largo], self._prefijos) for largo in _LARGOS_PREFIJO if len(palabra) >= largo
+        ]:
+            palabras = indice[clave]
+            palabras.discard(palabra)
+            if not palabras:
+                del indice[clave]
+            if indice is self._prefijos:
+                self._prefijos_ordenados.pop(clave, None)
+
+    def _con_prefijo(self, clave: str) -> List[str]:
+        """
+        Retorna las palabras que empiezan por un prefijo indexado, las más
+        cortas primero. La lista ordenada se guarda hasta que cambie el vocabulario.
+        """
+        ordenadas = self._prefijos_ordenados.get(clave)
+        if ordenadas is None:
+            ordenadas = sorted(self._prefijos.get(clave, ()), key=lambda p: (len(p), p))
+            self._prefijos_ordenados[clave] = ordenadas
+        return ordenadas
+
+    def _candidatas(self, termino: str) -> Set[str]:
+        """
+        Retorna las palabras del vocabulario que pueden contener al término.
+
+        Con tres letras o más se intersecan sus trigramas (coincidencia por
+        subcadena); con menos, solo se buscan palabras que empiecen por él.
+        """
+        if len(termino) < 3:
+            return self._prefijos.get(termino, set())
+        conjuntos = sorted((self._trigramas.get(t, set()) for t in _trigramas(termino)), key=len)
+        return set(conjuntos[0]).intersection(*conjuntos[1:])
+
+    def _coincidencias(self, termino: str) -> Dict[str, int]:
+        """
+        Retorna cada palabra que coincide con un término junto con su calidad.
+        """
+        coincidencias = {}
+        for palabra in self._candidatas(termino):
+            if palabra == termino:
+                coincidencias[palabra] = EXACTA
+            elif palabra.startswith(termino):
+                coincidencias[palabra] = PREFIJO
+            elif termino in palabra:
+                coincidencias[palabra] = SUBCADENA
+        return coincidencias
+
+    def _recorrer(self, termino: str) -> Iterator[Tuple[int, Dict[int, None]]]:
+        """
+        Recorre los postings que coinciden con un término, de mayor a menor puntaje.
+
+        Las palabras se visitan de la más corta a la más larga y solo a medida
+        que se consumen, así que un autocompletado con límite se detiene sin
+        recorrer todo el vocabulario que empieza por el término.
+
+        Yields:
+            Tuple[int, Dict[int, None]]: Puntaje y documentos con ese puntaje.
+        """
+        subcadenas: List[List[str]] = []
+
+        def palabras(calidad: int) -> Iterable[str]:
+            if calidad == EXACTA:
+                return [termino] if termino in self._postings else []
+            if calidad == PREFIJO:
+                return (
+                    p for p in self._con_prefijo(termino[:3])
+                    if p != termino and p.startswith(termino)
+                )
+            if len(termino) < 3:
+                return []
+            if not subcadenas:
+                subcadenas.append(sorted(
+                    (p for p in self._candidatas(termino) if termino in p and not p.startswith(termino)),
+                    key=lambda p: (len(p), p),
+                ))
+            return subcadenas[0]
+
+        for calidad, peso in _NIVELES:
+            for palabra in palabras(calidad):
+                documentos = self._postings[palabra].get(peso)
+                if documentos:
+                    yield calidad * peso, documentos
+
+    def buscar(self, consulta: str, limite: Optional[int] = None) -> List[int]:
+        """
+        Retorna los documentos que coinciden con todos los términos, del mejor
+        puntaje al peor (a igual puntaje, en orden de indexación).
+
+        Con un solo término el recorrido se corta al llegar al límite. Con
+        varios, el término más selectivo aporta los candidatos y los demás
+        solo se comprueban sobre ellos.
+
+        Args:
+            consulta (str): Texto a buscar.
+            limite (Optional[int]): Máximo de resultados.
+
+        Returns:
+            List[int]: IDs de los documentos.
+        """
+        terminos = list(dict.fromkeys(tokenizar(consulta)))
+        if not terminos:
+            return []
+        with self._lock:
+            if len(terminos) == 1:
+                encontrados: Dict[int, None] = {}
+                for _, documentos in self._recorrer(terminos[0]):
+                    for doc_id in documentos:
+                        if doc_id not in encontrados:
+                            encontrados[doc_id] = None
+                            if limite is not None and len(encontrados) >= limite:
+                                return list(encontrados)
+                return list(encontrados)
+
+            por_termino = []
+            for termino in terminos:
+                coincidencias = self._coincidencias(termino)
+                if not coincidencias:
+                    return []
+                tamano = sum(
+                    len(docs) for p in coincidencias for docs in self._postings[p].values()
+                )
+                por_termino.append((tamano, termino, coincidencias))
+            por_termino.sort(key=lambda item: item[0])
+
+            puntajes: Dict[int, int] = {}
+            for puntaje, documentos in self._recorrer(por_termino[0][1]):
+                for doc_id in documentos:
+                    puntajes.setdefault(doc_id, puntaje)
+
+            for _, _, coincidencias in por_termino[1:]:
+                siguientes: Dict[int, int] = {}
+                for doc_id, acumulado in puntajes.items():
+                    mejor = 0
+                    for palabra, peso in self._documentos[doc_id].items():
+                        calidad = coincidencias.get(palabra)
+                        if calidad is not None and calidad * peso > mejor:
+                            mejor = calidad * peso
+                    if mejor:
+                        siguientes[doc_id] = acumulado + mejor
+                puntajes = siguientes
+                if not puntajes:
+                    return []
+
+        orden = sorted(puntajes, key=puntajes.__getitem__, reverse=True)
+        return orden if limite is None else orden[:limite]
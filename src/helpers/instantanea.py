@@ -0,0 +1,96 @@
+"""
+Instantáneas binarias del estado en memoria.
+
+Una instantánea guarda estructuras de valores simples (tuplas, listas,
+diccionarios, conjuntos, números, cadenas y bytes) con "marshal", que las
+lee mucho más rápido que json.load seguido de validar modelos, porque no hay
+texto que parsear ni objetos que validar.
+
+El archivo empieza con una cabecera fija y lleva la versión del formato, la
+de marshal y la de Python con que se escribió, y un tipo. Si algo no coincide
+o el archivo está dañado, la instantánea se ignora y quien la pidió reconstruye
+desde el origen de datos, así que borrarla nunca pierde información.
+"""
+
+import marshal
+import os
+import sys
+import tempfile
+from typing import Any, Optional
+
+from src.helpers.archivos import permisos_destino
+from src.helpers.metricas import bytes_escritos_total, bytes_leidos_total, cronometrar
+
+_CABECERA = b"INVSNAP\n"
+
+# Se incrementa al cambiar la forma de los datos guardados.
+VERSION_FORMATO = 1
+
+
+def _version() -> tuple:
+    """
+    Retorna la versión de formato, de marshal y de Python de este proceso.
+    """
+    return (VERSION_FORMATO, marshal.version, sys.version_info[:2])
+
+
+def guardar_instantanea(ruta: str, tipo: str, datos: Any) -> int:
+    """
+    Escribe una instantánea de forma atómica (archivo temporal + renombrado).
+
+    Args:
+        ruta (str): Ruta del archivo.
+        tipo (str): Qué contiene (se comprueba al cargar).
+        datos (Any): Valores simples serializables con marshal.
+
+    Returns:
+        int: Bytes escritos.
+    """
+    with cronometrar("instantanea_escribir"):
+        contenido = _CABECERA + marshal.dumps((_version(), tipo, datos))
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            os.chmod(temporal, permisos_destino(ruta))
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(contenido)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+    bytes_escritos_total.incrementar("instantanea", valor=len(contenido))
+    return len(contenido)
+
+
+def cargar_instantanea(ruta: str, tipo: str) -> Optional[Any]:
+    """
+    Lee una instantánea escrita por guardar_instantanea().
+
+    Args:
+        ruta (str): Ruta del archivo.
+        tipo (str): Tipo esperado.
+
+    Returns:
+        Optional[Any]: Datos guardados, o None si no existe, está dañada o es
+            de otra versión o tipo.
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            contenido = archivo.read()
+    except FileNotFoundError:
+        return None
+    bytes_leidos_total.incrementar("instantanea", valor=len(contenido))
+    if not contenido.startswith(_CABECERA):
+        return None
+    with cronometrar("instantanea_leer"):
+        try:
+            version, tipo_guardado, datos = marshal.loads(memoryview(contenido)[len(_CABECERA):])
+        except (EOFError, ValueError, TypeError):
+            return None
+    if version != _version() or tipo_guardado != tipo:
+        return None
+    return datos
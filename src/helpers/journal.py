@@ -0,0 +1,310 @@
+"""
+Bitácora (journal) de mutaciones en formato NDJSON de solo anexado.
+
+Cada mutación se escribe como una línea JSON compacta y pasa al sistema
+operativo antes de confirmarse, así que sobrevive a que se mate el proceso.
+Los fsync se agrupan: se fuerzan al alcanzar un lote de registros o, en
+segundo plano, tras un intervalo máximo, de modo que varias escrituras
+comparten un mismo fsync. Con esperar_fsync quien anexa espera además, con
+confirmar(), al fsync que cubre su registro (commit agrupado), y el registro
+sobrevive también a una caída del sistema. Anexar y esperar van por separado
+para que quien anexa bajo un lock propio lo suelte antes de esperar; si no,
+las escrituras concurrentes no llegan a agruparse.
+
+Una línea a medio escribir por una caída se descarta al abrir la bitácora,
+antes de anexar nada detrás.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import threading
+from typing import Iterator, List
+
+from src.helpers.metricas import bytes_escritos_total, bytes_leidos_total
+
+# Bytes que se leen de una vez al buscar el último salto de línea.
+_TRAMO_COLA = 64 * 1024
+
+
+def recortar_cola(ruta: str) -> None:
+    """
+    Descarta una última línea incompleta (sin salto de línea final).
+
+    Una caída a mitad de una escritura deja el final de la bitácora cortado;
+    si se anexara detrás, el registro siguiente quedaría pegado a esa basura
+    y se perdería al leer. Solo lee el final del archivo.
+
+    Args:
+        ruta (str): Ruta de la bitácora; si no existe no se hace nada.
+    """
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, "r+b") as archivo:
+        fin = archivo.seek(0, os.SEEK_END)
+        posicion = fin
+        while posicion > 0:
+            inicio = max(0, posicion - _TRAMO_COLA)
+            archivo.seek(inicio)
+            tramo = archivo.read(posicion - inicio)
+            salto = tramo.rfind(b"\n")
+            if salto >= 0:
+                posicion = inicio + salto + 1
+                break
+            posicion = inicio
+        if posicion < fin:
+            archivo.truncate(posicion)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+
+class Journal:
+    """
+    Bitácora de solo anexado con commit agrupado.
+
+    Atributos:
+        ruta (str): Ruta al archivo de la bitácora.
+        registros (int): Registros escritos desde la apertura o la última
+            rotación. Al abrir no se relee el archivo para contarlos: quien
+            reproduce la bitácora puede sumar los que ya tenía.
+        tamano (int): Bytes del archivo actual, incluidos los aún no sincronizados.
+        inodo (int): Inodo del archivo actual; cambia al rotar.
+    """
+
+    def __init__(
+        self,
+        ruta: str,
+        lote_fsync: int = 64,
+        intervalo_fsync: float = 0.05,
+        esperar_fsync: bool = False,
+    ) -> None:
+        """
+        Abre la bitácora en modo anexado y arranca el hilo de fsync periódico.
+
+        Args:
+            ruta (str): Ruta al archivo de la bitácora.
+            lote_fsync (int): Registros pendientes que fuerzan un fsync inmediato.
+            intervalo_fsync (float): Segundos máximos entre fsync en segundo plano.
+            esperar_fsync (bool): Confirmar cada registro recién cuando un
+                fsync lo cubre.
+        """
+        self.ruta = ruta
+        self.lote_fsync = max(1, lote_fsync)
+        self.intervalo_fsync = intervalo_fsync
+        self.esperar_fsync = esperar_fsync
+        recortar_cola(ruta)
+        self.registros = 0
+        self.tamano = os.path.getsize(ruta) if os.path.exists(ruta) else 0
+        # Registros anexados y registros cubiertos por un fsync, desde la apertura.
+        self._escritos = 0
+        self._sincronizados = 0
+        self._sincronizando = False
+        self._lock = threading.Lock()
+        self._condicion = threading.Condition(self._lock)
+        self._cerrado = threading.Event()
+        self._archivo = open(ruta, "a", encoding="utf-8")
+        self.inodo = os.fstat(self._archivo.fileno()).st_ino
+        self._hilo = threading.Thread(target=self._fsync_periodico, daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    @staticmethod
+    def leer(ruta: str, desde: int = 0) -> Iterator[dict]:
+        """
+        Recorre los registros de una bitácora en orden.
+
+        Una última línea incompleta (escritura interrumpida por una caída, o
+        que otro proceso todavía escribe) se ignora; una línea completa que no
+        se puede leer se salta y se sigue con las siguientes.
+
+        Args:
+            ruta (str): Ruta al archivo de la bitácora.
+            desde (int): Byte donde empezar; debe ser el comienzo de un registro.
+
+        Yields:
+            dict: Registro de mutación.
+        """
+        if not os.path.exists(ruta):
+            return
+        bytes_leidos_total.incrementar("journal", valor=max(0, os.path.getsize(ruta) - desde))
+        with open(ruta, "rb") as archivo:
+            archivo.seek(desde)
+            for linea in archivo:
+                if not linea.endswith(b"\n"):
+                    return
+                try:
+                    yield json.loads(linea)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+
+    def registrar(self, registro: dict) -> int:
+        """
+        Anexa un registro a la bitácora.
+
+        Al retornar, el registro ya está en el sistema operativo; con
+        esperar_fsync, llega a disco al llamar a confirmar() con el número
+        retornado.
+
+        Args:
+            registro (dict): Mutación a registrar.
+
+        Returns:
+            int: Número de secuencia del registro.
+        """
+        return self.registrar_lote([registro])
+
+    def registrar_lote(self, registros: List[dict]) -> int:
+        """
+        Anexa varios registros con una sola escritura, sin esperar al fsync.
+
+        Args:
+            registros (List[dict]): Mutaciones a registrar, en orden.
+
+        Returns:
+            int: Número de secuencia del último registro del lote, para
+                pasarlo a confirmar().
+        """
+        lineas = "".join(
+            json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for registro in registros
+        )
+        with self._lock:
+            if not registros:
+                return self._escritos
+            self._archivo.write(lineas)
+            self._archivo.flush()
+            self._escritos += len(registros)
+            self.registros += len(registros)
+            escritos = len(lineas.encode("utf-8"))
+            self.tamano += escritos
+            bytes_escritos_total.incrementar("journal", valor=escritos)
+            if not self.esperar_fsync and self._escritos - self._sincronizados >= self.lote_fsync:
+                self._fsync()
+            return self._escritos
+
+    def confirmar(self, numero: int) -> None:
+        """
+        Con esperar_fsync, espera a que un fsync cubra el registro `numero`;
+        sin él no hace nada.
+
+        Debe llamarse sin locks propios tomados, así los registros que otros
+        hilos anexan mientras tanto comparten el mismo fsync.
+
+        Args:
+            numero (int): Número retornado por registrar() o registrar_lote().
+        """
+        if not self.esperar_fsync:
+            return
+        with self._lock:
+            self._esperar_fsync(numero)
+
+    def _esperar_fsync(self, numero: int) -> None:
+        """
+        Espera a que un fsync cubra el registro número `numero`. Debe
+        llamarse con el lock tomado.
+
+        El primero que llega hace el fsync fuera del lock, cubriendo todo lo
+        escrito hasta ese momento; los que anexan mientras tanto esperan y el
+        siguiente hace un único fsync para todos ellos.
+        """
+        while self._sincronizados < numero and not self._archivo.closed:
+            if self._sincronizando:
+                self._condicion.wait()
+                continue
+            self._sincronizando = True
+            hasta = self._escritos
+            descriptor = self._archivo.fileno()
+            self._lock.release()
+            try:
+                os.fsync(descriptor)
+            finally:
+                self._lock.acquire()
+                self._sincronizando = False
+                self._condicion.notify_all()
+            self._sincronizados = max(self._sincronizados, hasta)
+
+    def vaciar(self) -> int:
+        """
+        Pasa al sistema operativo los registros escritos, sin esperar el fsync,
+        para que otros procesos puedan leerlos.
+
+        El tamaño se toma del archivo, así que incluye lo que hayan anexado
+        otros procesos.
+
+        Returns:
+            int: Tamaño del archivo en bytes.
+        """
+        with self._lock:
+            self._archivo.flush()
+            self.tamano = os.fstat(self._archivo.fileno()).st_size
+            return self.tamano
+
+    def _fsync(self) -> None:
+        """
+        Vuelca a disco los registros pendientes. Debe llamarse con el lock tomado.
+        """
+        if self._sincronizados == self._escritos or self._archivo.closed:
+            return
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._sincronizados = self._escritos
+        self._condicion.notify_all()
+
+    def _esperar_sincronizacion(self) -> None:
+        """
+        Espera a que termine un fsync hecho fuera del lock, antes de cerrar el
+        archivo. Debe llamarse con el lock tomado.
+        """
+        while self._sincronizando:
+            self._condicion.wait()
+
+    def _fsync_periodico(self) -> None:
+        """
+        Bucle en segundo plano que agrupa los fsync pendientes por intervalo.
+        """
+        while not self._cerrado.wait(self.intervalo_fsync):
+            with self._lock:
+                self._fsync()
+
+    def rotar(self) -> str:
+        """
+        Cierra la bitácora actual, la renombra para compactarla y abre una vacía.
+
+        Si quedó una bitácora rotada de una compactación que no terminó, la
+        actual se anexa a ella en lugar de reemplazarla, así no se pierden
+        los registros que todavía no se plegaron.
+
+        Returns:
+            str: Ruta de la bitácora rotada.
+        """
+        rotada = self.ruta + ".compactando"
+        with self._lock:
+            self._esperar_sincronizacion()
+            self._fsync()
+            self._archivo.close()
+            if os.path.exists(rotada):
+                recortar_cola(rotada)
+                with open(self.ruta, "rb") as origen, open(rotada, "ab") as destino:
+                    shutil.copyfileobj(origen, destino)
+                    destino.flush()
+                    os.fsync(destino.fileno())
+                os.remove(self.ruta)
+            else:
+                os.replace(self.ruta, rotada)
+            self._archivo = open(self.ruta, "a", encoding="utf-8")
+            self.inodo = os.fstat(self._archivo.fileno()).st_ino
+            self.registros = 0
+            self.tamano = 0
+        return rotada
+
+    def cerrar(self) -> None:
+        """
+        Vuelca los registros pendientes y cierra la bitácora.
+        """
+        self._cerrado.set()
+        with self._lock:
+            self._esperar_sincronizacion()
+            self._fsync()
+            self._archivo.close()
+        atexit.unregister(self.cerrar)
@@ -1,10 +1,18 @@
 """
 Utilidades para operaciones de lectura y escritura de archivos JSON.
+
+Ambas operaciones se miden como fases "json_leer" y "json_escribir" y suman
+los bytes procesados a las métricas de E/S.
 """
 
 import json
+import os
+import tempfile
 from typing import Any
 
+from src.helpers.archivos import permisos_destino
+from src.helpers.metricas import bytes_escritos_total, bytes_leidos_total, cronometrar
+
 
 def leer_json(path: str) -> Any:
     """
@@ -16,7 +24,8 @@ def leer_json(path: str) -> Any:
     Returns:
         Any: Contenido del archivo JSON parseado como objeto Python.
     """
-    with open(path, "r", encoding="utf-8") as archivo:
+    with cronometrar("json_leer"), open(path, "r", encoding="utf-8") as archivo:
+        bytes_leidos_total.incrementar("json", valor=os.fstat(archivo.fileno()).st_size)
         return json.load(archivo)
 
 
@@ -24,9 +33,25 @@ def escribir_json(path: str, data: Any) -> None:
     """
     Escribe un objeto Python en un archivo JSON en el path especificado.
 
+    La escritura es atómica: se vuelca a un archivo temporal en el mismo
+    directorio y se renombra sobre el destino, de modo que una caída nunca
+    deja el archivo truncado.
+
     Args:
         path (str): Ruta al archivo JSON.
         data (Any): Objeto Python a serializar en formato JSON.
     """
-    with open(path, "w", encoding="utf-8") as archivo:
-        json.dump(data, archivo, ensure_ascii=False, indent=4)
+    directorio = os.path.dirname(os.path.abspath(path))
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    try:
+        os.chmod(temporal, permisos_destino(path))
+        with cronometrar("json_escribir"), os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+            json.dump(data, archivo, ensure_ascii=False, indent=4)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+            bytes_escritos_total.incrementar("json", valor=os.fstat(archivo.fileno()).st_size)
+        os.replace(temporal, path)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
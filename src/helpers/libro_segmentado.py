@@ -0,0 +1,211 @@
+"""
+Libro de registros NDJSON de solo anexado, partido en segmentos rotativos.
+
+Cada segmento es una bitácora (ver journal.py) con commit agrupado. Se abre un
+segmento nuevo al cambiar el día (UTC) o al superar un tamaño máximo, así que
+ningún archivo crece sin límite y escribir cuesta lo mismo con un historial
+de un día que con uno de un año. La lectura recorre los segmentos en orden,
+de uno en uno, sin cargar el historial completo en memoria.
+
+Anexar no espera al fsync: registrar() retorna el segmento y el número del
+registro, y confirmar() espera a que un fsync lo cubra. Quien anexa con un
+lock propio tomado lo suelta antes de confirmar.
+"""
+
+import os
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from src.helpers.journal import Journal
+
+# Segmento y número de secuencia de un registro anexado, pendiente de confirmar.
+Pendiente = Optional[Tuple[Journal, int]]
+
+
+class LibroSegmentado:
+    """
+    Libro de solo anexado dividido en segmentos "<prefijo>-AAAAMMDD-NNNN.ndjson".
+
+    Atributos:
+        directorio (str): Carpeta que contiene los segmentos.
+        prefijo (str): Prefijo de los nombres de segmento.
+        max_bytes (int): Tamaño a partir del cual se abre un segmento nuevo.
+    """
+
+    def __init__(
+        self,
+        directorio: str,
+        prefijo: str,
+        max_bytes: int = 16 * 1024 * 1024,
+        lote_fsync: int = 64,
+        intervalo_fsync: float = 0.05,
+        esperar_fsync: bool = False,
+    ) -> None:
+        """
+        Prepara el libro sin abrir todavía ningún segmento.
+
+        Args:
+            directorio (str): Carpeta de los segmentos (se crea si no existe).
+            prefijo (str): Prefijo de los nombres de segmento.
+            max_bytes (int): Tamaño máximo de un segmento antes de rotar.
+            lote_fsync (int): Registros pendientes que fuerzan un fsync inmediato.
+            intervalo_fsync (float): Segundos máximos entre fsync agrupados.
+            esperar_fsync (bool): Confirmar cada registro recién cuando un
+                fsync lo cubre.
+        """
+        self.directorio = directorio
+        self.prefijo = prefijo
+        self.max_bytes = max_bytes
+        self.lote_fsync = lote_fsync
+        self.intervalo_fsync = intervalo_fsync
+        self.esperar_fsync = esperar_fsync
+        self._actual: Optional[Journal] = None
+        self._dia_actual = ""
+        self._lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def segmentos(self) -> List[str]:
+        """
+        Retorna las rutas de los segmentos existentes, del más antiguo al más nuevo.
+
+        Returns:
+            List[str]: Rutas de los segmentos.
+        """
+        nombres = sorted(
+            nombre for nombre in os.listdir(self.directorio)
+            if nombre.startswith(self.prefijo + "-") and nombre.endswith(".ndjson")
+        )
+        return [os.path.join(self.directorio, nombre) for nombre in nombres]
+
+    def leer(self) -> Iterator[dict]:
+        """
+        Recorre los registros de todos los segmentos en orden de escritura.
+
+        Los segmentos se abren de a uno y se leen línea a línea.
+
+        Yields:
+            dict: Registro almacenado.
+        """
+        for ruta in self.segmentos():
+            yield from Journal.leer(ruta)
+
+    def _ruta_segmento(self, dia: str, numero: int) -> str:
+        """
+        Construye la ruta de un segmento.
+        """
+        return os.path.join(self.directorio, f"{self.prefijo}-{dia}-{numero:04d}.ndjson")
+
+    def _abrir(self, dia: str) -> Journal:
+        """
+        Abre el segmento donde anexar: el último del día si aún tiene espacio,
+        o uno nuevo en caso contrario. Debe llamarse con el lock tomado.
+        """
+        if self._actual is not None:
+            self._actual.cerrar()
+        del_dia = [ruta for ruta in self.segmentos() if f"-{dia}-" in os.path.basename(ruta)]
+        numero = 0
+        if del_dia:
+            ultimo = del_dia[-1]
+            numero = int(os.path.basename(ultimo)[:-len(".ndjson")].rsplit("-", 1)[1])
+            if os.path.getsize(ultimo) >= self.max_bytes:
+                numero += 1
+        self._dia_actual = dia
+        self._actual = Journal(
+            self._ruta_segmento(dia, numero),
+            lote_fsync=self.lote_fsync,
+            intervalo_fsync=self.intervalo_fsync,
+            esperar_fsync=self.esperar_fsync,
+        )
+        return self._actual
+
+    def registrar(self, registro: dict) -> Pendiente:
+        """
+        Anexa un registro al segmento actual, rotando si cambió el día o se
+        superó el tamaño máximo.
+
+        Args:
+            registro (dict): Registro a anexar.
+
+        Returns:
+            Pendiente: Segmento y número del registro, para confirmar().
+        """
+        return self.registrar_lote([registro])
+
+    def registrar_lote(self, registros: List[dict]) -> Pendiente:
+        """
+        Anexa varios registros al segmento actual con una sola escritura. El
+        lote entero va al mismo segmento, aunque lo deje por encima del
+        tamaño máximo.
+
+        Args:
+            registros (List[dict]): Registros a anexar, en orden.
+
+        Returns:
+            Pendiente: Segmento y número del último registro, para
+                confirmar(), o None si el lote está vacío.
+        """
+        if not registros:
+            return None
+        dia = time.strftime("%Y%m%d", time.gmtime())
+        with self._lock:
+            segmento = self._actual
+            if segmento is None or dia != self._dia_actual or segmento.tamano >= self.max_bytes:
+                segmento = self._abrir(dia)
+            return segmento, segmento.registrar_lote(registros)
+
+    @staticmethod
+    def confirmar(pendiente: Pendiente) -> None:
+        """
+        Con esperar_fsync, espera al fsync que cubre un registro anexado.
+        Debe llamarse sin locks propios tomados. Si el segmento ya se cerró,
+        el cierre lo sincronizó y no se espera.
+
+        Args:
+            pendiente (Pendiente): Lo que retornó registrar() o registrar_lote().
+        """
+        if pendiente is not None:
+            segmento, numero = pendiente
+            segmento.confirmar(numero)
+
+    def vaciar(self) -> Optional[Tuple[str, int]]:
+        """
+        Pasa al sistema operativo lo escrito en el segmento actual, sin fsync.
+
+        Returns:
+            Optional[Tuple[str, int]]: Ruta y tamaño del segmento actual, o
+                None si no hay uno abierto.
+        """
+        with self._lock:
+            if self._actual is None:
+                return None
+            return self._actual.ruta, self._actual.vaciar()
+
+    def seguir_ultimo(self, segmentos: List[str]) -> None:
+        """
+        Ajusta el segmento actual a lo que escribieron otros procesos.
+
+        Si otro proceso abrió un segmento posterior, cierra el actual para que
+        el próximo registro vaya al último; si no, actualiza su tamaño. Así
+        todos los procesos anexan al mismo segmento y rotan a la vez.
+
+        Args:
+            segmentos (List[str]): Segmentos existentes, como los de segmentos().
+        """
+        with self._lock:
+            if self._actual is None:
+                return
+            if segmentos and segmentos[-1] != self._actual.ruta:
+                self._actual.cerrar()
+                self._actual = None
+            else:
+                self._actual.vaciar()
+
+    def cerrar(self) -> None:
+        """
+        Vuelca los registros pendientes y cierra el segmento actual.
+        """
+        with self._lock:
+            if self._actual is not None:
+                self._actual.cerrar()
+                self._actual = None
@@ -0,0 +1,59 @@
+"""
+Locks segmentados (striped locks) por clave.
+
+Reparte las claves entre un número fijo de locks reentrantes, de modo que
+operaciones sobre claves distintas rara vez compiten por el mismo lock y la
+memoria usada no crece con la cantidad de claves.
+"""
+
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Hashable, Iterable, Iterator, List
+
+
+class LocksPorClave:
+    """
+    Conjunto fijo de locks reentrantes indexado por el hash de la clave.
+
+    Atributos:
+        segmentos (int): Cantidad de locks del conjunto.
+    """
+
+    def __init__(self, segmentos: int = 64) -> None:
+        """
+        Crea los locks del conjunto.
+
+        Args:
+            segmentos (int): Cantidad de locks a crear.
+        """
+        self.segmentos = max(1, segmentos)
+        self._locks: List[threading.RLock] = [threading.RLock() for _ in range(self.segmentos)]
+
+    def bloqueo(self, clave: Hashable) -> threading.RLock:
+        """
+        Retorna el lock que protege a una clave.
+
+        Args:
+            clave (Hashable): Clave a proteger, por ejemplo el ID de un producto.
+
+        Returns:
+            threading.RLock: Lock asociado a la clave.
+        """
+        return self._locks[hash(clave) % self.segmentos]
+
+    @contextmanager
+    def bloqueo_multiple(self, claves: Iterable[Hashable]) -> Iterator[None]:
+        """
+        Toma los locks de varias claves a la vez, siempre en el mismo orden.
+
+        Adquirir los segmentos en orden creciente evita interbloqueos entre
+        dos operaciones por lote que comparten claves.
+
+        Args:
+            claves (Iterable[Hashable]): Claves a proteger.
+        """
+        indices = sorted({hash(clave) % self.segmentos for clave in claves})
+        with ExitStack() as pila:
+            for indice in indices:
+                pila.enter_context(self._locks[indice])
+            yield
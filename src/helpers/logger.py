@@ -1,14 +1,202 @@
 """
-Configuración básica de logging para la aplicación.
+Configuración de logging de la aplicación, sin E/S en el hilo que registra.
+
+Los registros se encolan en una cola acotada (QueueHandler) y un hilo aparte
+(QueueListener) los formatea y escribe. Si la cola está llena el registro se
+descarta y se cuenta, en lugar de bloquear el event loop esperando al disco o
+a la terminal. El formato es texto o JSON por línea (LOG_FORMATO=json).
+
+La configuración se instala con configurar_logging(), que llaman el arranque
+de la aplicación (lifespan) y master.py.
+
+Los logs de acceso por petición los emite un middleware ASGI y se muestrean
+(LOG_MUESTREO_ACCESOS); las respuestas 5xx se registran siempre.
 """
 
+import atexit
+import json
 import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from src.config.settings import settings
+from src.helpers.metricas import registro_metricas
+
+_FORMATO_TEXTO = "%(asctime)s - %(levelname)s - %(message)s"
 
-# Configuración del logger
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
+# Atributos que todo LogRecord tiene; el resto viene de extra=... y va al JSON.
+_ATRIBUTOS_ESTANDAR = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "taskName",
+}
+
+logs_descartados_total = registro_metricas.contador(
+    "inventario_logs_descartados_total", "Registros de log descartados por cola llena."
 )
 
+
+class FormateadorJson(logging.Formatter):
+    """
+    Formatea cada registro como un objeto JSON en una línea.
+
+    Incluye fecha (UTC, ISO 8601), nivel, logger y mensaje, la traza si hubo
+    excepción y los campos pasados con extra=....
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Retorna el registro como una línea JSON.
+        """
+        datos = {
+            "fecha": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        if record.exc_info:
+            datos["traza"] = self.formatException(record.exc_info)
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_ESTANDAR:
+                datos[clave] = valor
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ColaAcotadaHandler(QueueHandler):
+    """
+    QueueHandler que descarta (y cuenta) los registros cuando la cola está llena.
+
+    Atributos:
+        descartados (int): Registros descartados desde el arranque.
+    """
+
+    def __init__(self, cola: queue.Queue) -> None:
+        """
+        Inicializa el handler sobre una cola acotada.
+        """
+        super().__init__(cola)
+        self.descartados = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Resuelve el mensaje con sus argumentos antes de encolar.
+
+        La cola no sale del proceso, así que a diferencia de QueueHandler no
+        copia ni formatea el registro: el formato completo (fecha, traza de
+        la excepción) lo arma el hilo escritor.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Encola el registro sin esperar.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+            logs_descartados_total.incrementar()
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configurar_logging() -> QueueListener:
+    """
+    Instala el handler de cola en el logger raíz y arranca el hilo escritor.
+
+    Reemplaza los handlers previos del logger raíz. El hilo se detiene al
+    salir del proceso, vaciando antes la cola. Llamarla de nuevo no hace nada.
+
+    Returns:
+        QueueListener: Hilo que escribe los registros.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    cola: queue.Queue = queue.Queue(maxsize=max(1, settings.log_cola_max))
+    salida = logging.StreamHandler(sys.stderr)
+    salida.setFormatter(FormateadorJson() if settings.log_formato == "json" else logging.Formatter(_FORMATO_TEXTO))
+    listener = QueueListener(cola, salida, respect_handler_level=True)
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(ColaAcotadaHandler(cola))
+    raiz.setLevel(settings.log_nivel.upper())
+    listener.start()
+    atexit.register(listener.stop)
+    registro_metricas.colector("logs", lambda: [(
+        "inventario_logs_en_cola", "gauge", "Registros de log pendientes de escribir.",
+        [({}, cola.qsize())],
+    )])
+    _listener = listener
+    return listener
+
+
+class MiddlewareAccesos:
+    """
+    Middleware ASGI que registra una línea de acceso por petición muestreada.
+
+    La decisión de muestreo se toma al llegar la petición, así que las no
+    muestreadas solo pagan un número aleatorio (y, para no perder errores,
+    leer el estado de la respuesta). Los campos van también como extra, para
+    el formato JSON.
+
+    Atributos:
+        tasa (float): Fracción de peticiones a registrar (0 a 1).
+    """
+
+    def __init__(self, app, tasa: float) -> None:
+        """
+        Envuelve una aplicación ASGI.
+        """
+        self.app = app
+        self.tasa = tasa
+
+    async def __call__(self, scope, receive, send) -> None:
+        """
+        Atiende la petición y registra el acceso si corresponde.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        muestreada = random.random() < self.tasa
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje) -> None:
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if muestreada or estado >= 500:
+                duracion_ms = round((time.perf_counter() - inicio) * 1000, 3)
+                cliente = scope.get("client")
+                accesos.info(
+                    "%s %s %s %.3fms", scope["method"], scope["path"], estado, duracion_ms,
+                    extra={
+                        "metodo": scope["method"],
+                        "path": scope["path"],
+                        "consulta": scope.get("query_string", b"").decode("latin-1"),
+                        "estado": estado,
+                        "duracion_ms": duracion_ms,
+                        "cliente": cliente[0] if cliente else None,
+                    },
+                )
+
+
 # Logger global de la aplicación
 logger = logging.getLogger("inventario_app")
+
+# Logger de los accesos HTTP muestreados
+accesos = logging.getLogger("inventario_app.accesos")
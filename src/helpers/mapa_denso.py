@@ -0,0 +1,114 @@
+"""
+Mapa compacto de IDs enteros a enteros.
+
+Los IDs de productos se asignan de forma consecutiva, así que un arreglo
+"array('q')" indexado por el propio ID ocupa 8 bytes por entrada, frente a
+los ~100 bytes de una entrada de diccionario con claves y valores enteros
+encajonados. Los IDs que dejarían el arreglo mayormente vacío (negativos o
+muy por encima del máximo actual) se guardan aparte en un diccionario.
+"""
+
+from array import array
+from typing import Dict, Iterator
+
+# Margen de crecimiento del arreglo antes de considerar disperso un ID.
+_MARGEN_DENSO = 1024
+
+
+class MapaDenso:
+    """
+    Mapa ID → entero de 64 bits respaldado por un arreglo indexado por ID.
+
+    Atributos:
+        vacio (int): Valor que marca una posición sin entrada.
+    """
+
+    def __init__(self, vacio: int = -1) -> None:
+        """
+        Inicializa el mapa vacío.
+
+        Args:
+            vacio (int): Valor reservado para las posiciones sin entrada.
+        """
+        self.vacio = vacio
+        self._valores = array("q")
+        self._dispersos: Dict[int, int] = {}
+        self._largo = 0
+
+    def __len__(self) -> int:
+        """
+        Retorna la cantidad de entradas.
+        """
+        return self._largo
+
+    def get(self, clave: int) -> int:
+        """
+        Retorna el valor asociado a un ID, o "vacio" si no tiene.
+
+        Args:
+            clave (int): ID a buscar.
+
+        Returns:
+            int: Valor asociado.
+        """
+        if type(clave) is int and 0 <= clave < len(self._valores):
+            return self._valores[clave]
+        return self._dispersos.get(clave, self.vacio)
+
+    def __setitem__(self, clave: int, valor: int) -> None:
+        """
+        Asocia un valor a un ID, agrandando el arreglo si el ID es cercano.
+
+        Args:
+            clave (int): ID.
+            valor (int): Valor distinto de "vacio".
+        """
+        largo = len(self._valores)
+        if 0 <= clave < largo:
+            if self._valores[clave] == self.vacio:
+                self._largo += 1
+            self._valores[clave] = valor
+            return
+        if 0 <= clave < 2 * largo + _MARGEN_DENSO:
+            self._valores.extend(array("q", [self.vacio]) * (clave + 1 - largo))
+            self._valores[clave] = valor
+            self._largo += 1
+            return
+        if clave not in self._dispersos:
+            self._largo += 1
+        self._dispersos[clave] = valor
+
+    def quitar(self, clave: int) -> int:
+        """
+        Quita la entrada de un ID.
+
+        Args:
+            clave (int): ID a quitar.
+
+        Returns:
+            int: Valor que tenía, o "vacio" si no tenía entrada.
+        """
+        if type(clave) is int and 0 <= clave < len(self._valores):
+            anterior = self._valores[clave]
+            self._valores[clave] = self.vacio
+        else:
+            anterior = self._dispersos.pop(clave, self.vacio)
+        if anterior != self.vacio:
+            self._largo -= 1
+        return anterior
+
+    def claves(self) -> Iterator[int]:
+        """
+        Recorre los IDs con entrada en orden ascendente.
+
+        Yields:
+            int: ID.
+        """
+        dispersos = sorted(self._dispersos)
+        negativos = [clave for clave in dispersos if clave < 0]
+        yield from negativos
+        vacio = self.vacio
+        for clave, valor in enumerate(self._valores):
+            if valor != vacio:
+                yield clave
+        yield from dispersos[len(negativos):]
@@ -0,0 +1,420 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+
+Un registro global guarda contadores, medidores e histogramas con etiquetas,
+más colectores que leen al exportar contadores que ya existen en otros
+módulos (ejecutor de E/S, almacén de productos, caché JSON).
+
+El middleware mide cada petición: cuenta peticiones por ruta y estado,
+registra su latencia en un histograma y añade la cabecera Server-Timing con
+el desglose de fases (espera en la cola de E/S, ejecución en el pool,
+lectura y escritura de JSON, serialización). Las fases se acumulan en una
+variable de contexto; el ejecutor de E/S copia el contexto al hilo, así que
+las fases medidas dentro del pool se atribuyen a la petición que las pidió.
+
+Cada medición cuesta un perf_counter y una actualización bajo lock (unos
+microsegundos), pensado para dejarlo activo en producción.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Límites en segundos de los histogramas de latencia (los de Prometheus por defecto).
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Muestra que produce un colector: (nombre, tipo, ayuda, [(etiquetas, valor)]).
+Muestra = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+# Fases de la petición en curso: nombre → segundos acumulados.
+_fases: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "fases_peticion", default=None
+)
+
+
+def _escapar(valor: str) -> str:
+    """
+    Escapa el valor de una etiqueta para el formato de texto.
+    """
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    """
+    Formatea un conjunto de etiquetas como {a="x",b="y"}.
+    """
+    pares = [f'{n}="{_escapar(str(v))}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    """
+    Formatea un valor numérico: los enteros sin decimales.
+    """
+    if valor == int(valor) and abs(valor) < 2 ** 53:
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    """
+    Base de las métricas con etiquetas de nombre fijo.
+
+    Atributos:
+        nombre (str): Nombre de la métrica en Prometheus.
+        ayuda (str): Texto de la línea HELP.
+        etiquetas (Tuple[str, ...]): Nombres de las etiquetas, en orden.
+    """
+
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()) -> None:
+        """
+        Inicializa la métrica sin series.
+        """
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._lock = threading.Lock()
+
+    def _cabecera(self) -> List[str]:
+        """
+        Retorna las líneas HELP y TYPE.
+        """
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    """
+    Valor que solo crece, por combinación de etiquetas.
+    """
+
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()) -> None:
+        """
+        Inicializa el contador sin series.
+        """
+        super().__init__(nombre, ayuda, etiquetas)
+        # Sin etiquetas la única serie existe desde el inicio, en cero.
+        self._valores: Dict[Tuple[str, ...], float] = {} if etiquetas else {(): 0}
+
+    def incrementar(self, *etiquetas: str, valor: float = 1) -> None:
+        """
+        Suma un valor a la serie de las etiquetas dadas.
+
+        Args:
+            *etiquetas (str): Valores de las etiquetas, en el orden declarado.
+            valor (float): Cantidad a sumar.
+        """
+        with self._lock:
+            self._valores[etiquetas] = self._valores.get(etiquetas, 0) + valor
+
+    def exportar(self) -> List[str]:
+        """
+        Retorna las líneas de texto de la métrica.
+        """
+        with self._lock:
+            series = sorted(self._valores.items())
+        return self._cabecera() + [
+            f"{self.nombre}{_etiquetas(self.etiquetas, claves)} {_numero(valor)}"
+            for claves, valor in series
+        ]
+
+
+class Medidor(Contador):
+    """
+    Valor que sube y baja (peticiones en curso, por ejemplo).
+    """
+
+    tipo = "gauge"
+
+
+class Histograma(_Metrica):
+    """
+    Distribución de valores en cubetas acumulativas, con suma y cantidad.
+
+    Atributos:
+        limites (Tuple[float, ...]): Límites superiores de las cubetas, crecientes.
+    """
+
+    tipo = "histogram"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Tuple[str, ...] = (),
+        limites: Tuple[float, ...] = LIMITES_LATENCIA,
+    ) -> None:
+        """
+        Inicializa el histograma sin series.
+        """
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(limites)
+        # Por serie: conteo por cubeta (la última es +Inf), suma y cantidad.
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observar(self, valor: float, *etiquetas: str) -> None:
+        """
+        Registra una observación en la serie de las etiquetas dadas.
+
+        Args:
+            valor (float): Valor observado (segundos, en los de latencia).
+            *etiquetas (str): Valores de las etiquetas, en el orden declarado.
+        """
+        cubeta = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][cubeta] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self) -> List[str]:
+        """
+        Retorna las líneas de texto de la métrica, con las cubetas acumuladas.
+        """
+        with self._lock:
+            series = sorted((claves, (list(s[0]), s[1], s[2])) for claves, s in self._series.items())
+        lineas = self._cabecera()
+        for claves, (conteos, suma, cantidad) in series:
+            acumulado = 0
+            for limite, conteo in zip(self.limites + (float("inf"),), conteos):
+                acumulado += conteo
+                le = "+Inf" if limite == float("inf") else _numero(limite)
+                cubeta = _etiquetas(self.etiquetas, claves, 'le="' + le + '"')
+                lineas.append(f"{self.nombre}_bucket{cubeta} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, claves)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, claves)} {cantidad}")
+        return lineas
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas y colectores que se exportan juntos.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa el registro vacío.
+        """
+        self._metricas: Dict[str, _Metrica] = {}
+        self._colectores: Dict[str, Callable[[], Iterable[Muestra]]] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        """
+        Agrega una métrica, o retorna la ya registrada con ese nombre.
+        """
+        with self._lock:
+            return self._metricas.setdefault(metrica.nombre, metrica)
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()) -> Contador:
+        """
+        Retorna el contador con ese nombre, creándolo si no existe.
+        """
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()) -> Medidor:
+        """
+        Retorna el medidor con ese nombre, creándolo si no existe.
+        """
+        return self._registrar(Medidor(nombre, ayuda, etiquetas))
+
+    def histograma(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Tuple[str, ...] = (),
+        limites: Tuple[float, ...] = LIMITES_LATENCIA,
+    ) -> Histograma:
+        """
+        Retorna el histograma con ese nombre, creándolo si no existe.
+        """
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, limites))
+
+    def colector(self, clave: str, funcion: Callable[[], Iterable[Muestra]]) -> None:
+        """
+        Registra una función que produce muestras al exportar.
+
+        Una segunda llamada con la misma clave reemplaza al colector anterior.
+
+        Args:
+            clave (str): Identificador del colector.
+            funcion (Callable[[], Iterable[Muestra]]): Genera las muestras.
+        """
+        with self._lock:
+            self._colectores[clave] = funcion
+
+    def exportar(self) -> str:
+        """
+        Retorna todas las métricas en formato de texto de Prometheus 0.0.4.
+
+        Returns:
+            str: Texto de la exposición, terminado en salto de línea.
+        """
+        with self._lock:
+            metricas = list(self._metricas.values())
+            colectores = list(self._colectores.values())
+        lineas: List[str] = []
+        for metrica in metricas:
+            lineas.extend(metrica.exportar())
+        for funcion in colectores:
+            for nombre, tipo, ayuda, series in funcion():
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for etiquetas, valor in series:
+                    claves = tuple(etiquetas)
+                    valores = tuple(etiquetas[c] for c in claves)
+                    lineas.append(f"{nombre}{_etiquetas(claves, valores)} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+registro_metricas = RegistroMetricas()
+
+peticiones_total = registro_metricas.contador(
+    "inventario_peticiones_total", "Peticiones HTTP atendidas.", ("metodo", "ruta", "estado")
+)
+peticion_segundos = registro_metricas.histograma(
+    "inventario_peticion_segundos", "Latencia de las peticiones HTTP.", ("metodo", "ruta")
+)
+peticiones_en_curso = registro_metricas.medidor(
+    "inventario_peticiones_en_curso", "Peticiones HTTP en curso."
+)
+fase_segundos = registro_metricas.histograma(
+    "inventario_fase_segundos",
+    "Duración de las fases internas (lectura y escritura de JSON, serialización).",
+    ("fase",),
+)
+io_segundos = registro_metricas.histograma(
+    "inventario_io_segundos", "Duración de las llamadas al acceso a datos en el pool de E/S.", ("operacion",)
+)
+io_espera_segundos = registro_metricas.histograma(
+    "inventario_io_espera_segundos", "Espera en la cola del pool de E/S antes de ejecutar."
+)
+bytes_leidos_total = registro_metricas.contador(
+    "inventario_bytes_leidos_total", "Bytes leídos de archivos de datos.", ("origen",)
+)
+bytes_escritos_total = registro_metricas.contador(
+    "inventario_bytes_escritos_total", "Bytes escritos en archivos de datos.", ("origen",)
+)
+
+
+def registrar_fase(fase: str, segundos: float) -> None:
+    """
+    Suma la duración de una fase a la petición en curso, si la hay.
+
+    Args:
+        fase (str): Nombre de la fase (aparece en Server-Timing).
+        segundos (float): Duración medida.
+    """
+    fases = _fases.get()
+    if fases is not None:
+        fases[fase] = fases.get(fase, 0.0) + segundos
+
+
+@contextmanager
+def cronometrar(fase: str) -> Iterator[None]:
+    """
+    Mide un bloque como fase: la registra en el histograma de fases y en la
+    cabecera Server-Timing de la petición en curso.
+
+    Args:
+        fase (str): Nombre de la fase.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        fase_segundos.observar(segundos, fase)
+        registrar_fase(fase, segundos)
+
+
+def _server_timing(fases: Dict[str, float], total: float) -> bytes:
+    """
+    Formatea las fases de una petición como valor de la cabecera Server-Timing.
+    """
+    partes = [f"{fase};dur={segundos * 1000:.3f}" for fase, segundos in fases.items()]
+    partes.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(partes).encode("latin-1")
+
+
+def _plantilla_ruta(scope) -> str:
+    """
+    Retorna la plantilla completa de la ruta que atendió la petición.
+
+    La ruta coincidente puede conocer solo su parte relativa al prefijo con
+    que se incluyó su router ("/{producto_id}"); el prefijo se recupera
+    quitando del path la parte relativa ya resuelta con sus parámetros.
+    """
+    ruta = scope.get("route")
+    plantilla = getattr(ruta, "path_format", None) or getattr(ruta, "path", None)
+    if plantilla is None:
+        return "sin_ruta"
+    try:
+        resuelta = plantilla.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return plantilla
+    path = scope["path"]
+    if resuelta and path.endswith(resuelta):
+        return path[:len(path) - len(resuelta)] + plantilla
+    return plantilla
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mide cada petición HTTP.
+
+    Es ASGI puro (no BaseHTTPMiddleware) para no copiar el cuerpo de las
+    respuestas ni romper las transmitidas. La ruta se etiqueta con su plantilla
+    ("/productos/{producto_id}"), no con la URL, para acotar las series; las
+    peticiones que no coinciden con ninguna ruta se agrupan como "sin_ruta".
+    Server-Timing se arma al enviar las cabeceras, así que en las respuestas
+    transmitidas solo incluye las fases previas al primer byte.
+    """
+
+    def __init__(self, app) -> None:
+        """
+        Envuelve una aplicación ASGI.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        """
+        Atiende la petición midiendo su duración y sus fases.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        fases: Dict[str, float] = {}
+        token = _fases.set(fases)
+        estado = 500
+        peticiones_en_curso.incrementar()
+
+        async def enviar(mensaje) -> None:
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                mensaje["headers"] = list(mensaje.get("headers", ())) + [
+                    (b"server-timing", _server_timing(fases, time.perf_counter() - inicio))
+                ]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _fases.reset(token)
+            peticiones_en_curso.incrementar(valor=-1)
+            ruta = _plantilla_ruta(scope)
+            segundos = time.perf_counter() - inicio
+            peticiones_total.incrementar(scope["method"], ruta, str(estado))
+            peticion_segundos.observar(segundos, scope["method"], ruta)
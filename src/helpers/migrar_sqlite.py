@@ -0,0 +1,100 @@
+"""
+Migrador único del catálogo JSON de productos y del libro de ventas a SQLite.
+
+Uso:
+    python -m src.helpers.migrar_sqlite
+
+Toma las rutas de la configuración. Es idempotente: volver a ejecutarlo
+reemplaza las filas con el mismo ID.
+"""
+
+import os
+from typing import List
+
+from src.config.settings import settings
+from src.helpers.json_utils import leer_json
+from src.helpers.libro_segmentado import LibroSegmentado
+from src.helpers.sqlite_utils import RECONSTRUIR_ROLLUPS, obtener_pool
+
+
+def _leer_ventas(ventas_path: str, ventas_segmentos_dir: str) -> List[dict]:
+    """
+    Reproduce el libro de ventas (o, si aún no existe, el antiguo archivo JSON).
+
+    Args:
+        ventas_path (str): Ruta al archivo JSON de ventas.
+        ventas_segmentos_dir (str): Carpeta de los segmentos del libro de ventas.
+
+    Returns:
+        List[dict]: Ventas vigentes, sin las eliminadas por lápidas.
+    """
+    libro = LibroSegmentado(ventas_segmentos_dir, "ventas")
+    if not libro.segmentos():
+        return leer_json(ventas_path) if os.path.exists(ventas_path) else []
+    ventas = {}
+    for registro in libro.leer():
+        if registro["op"] == "put":
+            ventas[registro["venta"]["id"]] = registro["venta"]
+        else:
+            ventas.pop(registro["id"], None)
+    return list(ventas.values())
+
+
+def migrar_json_a_sqlite(
+    productos_path: str, ventas_path: str, sqlite_path: str, ventas_segmentos_dir: str
+) -> dict:
+    """
+    Copia productos (con su stock) y ventas a la base de datos SQLite.
+
+    Args:
+        productos_path (str): Ruta al archivo JSON de productos.
+        ventas_path (str): Ruta al archivo JSON de ventas.
+        sqlite_path (str): Ruta a la base de datos SQLite de destino.
+        ventas_segmentos_dir (str): Carpeta de los segmentos del libro de ventas.
+
+    Returns:
+        dict: Cantidad de productos y ventas migrados.
+    """
+    productos = leer_json(productos_path) if os.path.exists(productos_path) else []
+    ventas = _leer_ventas(ventas_path, ventas_segmentos_dir)
+    with obtener_pool(sqlite_path).transaccion() as conexion:
+        conexion.executemany(
+            "INSERT OR REPLACE INTO productos "
+            "(id, nombre, descripcion, precio, cantidad, ventas, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    p["id"], p["nombre"], p.get("descripcion", ""),
+                    p["precio"], p.get("cantidad", 0), p.get("ventas", 0),
+                    p.get("version", 1),
+                )
+                for p in productos
+            ],
+        )
+        conexion.executemany(
+            "INSERT OR REPLACE INTO ventas (id, producto_id, cantidad, total, cliente, fecha) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    v["id"], v["producto_id"], v["cantidad"], v["total"],
+                    v.get("cliente"), v.get("fecha"),
+                )
+                for v in ventas
+            ],
+        )
+        # INSERT OR REPLACE no dispara los triggers de borrado: se recalculan el total y los rollups.
+        conexion.execute(
+            "UPDATE agregados_stock SET total = "
+            "(SELECT COALESCE(SUM(cantidad), 0) FROM productos) WHERE id = 1"
+        )
+        for sentencia in RECONSTRUIR_ROLLUPS:
+            conexion.execute(sentencia)
+    return {"productos": len(productos), "ventas": len(ventas)}
+
+
+if __name__ == "__main__":
+    resultado = migrar_json_a_sqlite(
+        settings.productos_path, settings.ventas_path, settings.sqlite_path,
+        settings.ventas_segmentos_dir,
+    )
+    print(f"Migrados {resultado['productos']} productos y {resultado['ventas']} ventas.")
@@ -0,0 +1,140 @@
+"""
+Serialización rápida de productos a JSON.
+
+Los productos guardados ya fueron validados al entrar, así que para responder
+se codifican directamente a bytes, sin volver a construir ni validar modelos
+Pydantic. Usa orjson si está instalado y, si no, el serializador de Pydantic
+(TypeAdapter) sobre modelos construidos sin validación.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from src.helpers.metricas import cronometrar
+from src.schemas.producto_schema import ProductoResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+_adaptador = TypeAdapter(ProductoResponse)
+
+
+def codificar_producto(producto: dict) -> bytes:
+    """
+    Codifica un producto guardado con la misma forma que ProductoResponse.
+
+    Args:
+        producto (dict): Producto tal como lo devuelve el almacén.
+
+    Returns:
+        bytes: Objeto JSON del producto.
+    """
+    campos = {
+        "nombre": producto["nombre"],
+        "descripcion": producto["descripcion"],
+        "precio": float(producto["precio"]),
+        "cantidad": int(producto["cantidad"]),
+        "id": producto["id"],
+        "version": producto.get("version", 0),
+    }
+    if orjson is not None:
+        return orjson.dumps(campos)
+    return _adaptador.dump_json(ProductoResponse.model_construct(**campos))
+
+
+class CacheJson:
+    """
+    Caché de productos ya codificados a JSON, invalidada por versión.
+
+    Cada mutación de un producto incrementa su versión, por lo que una
+    entrada con otra versión se considera obsoleta y se vuelve a codificar.
+
+    Atributos:
+        aciertos (int): Productos servidos desde la caché.
+        fallos (int): Productos que hubo que codificar.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa la caché vacía.
+        """
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: Dict[int, Tuple[int, bytes]] = {}
+
+    def codificar(self, producto: dict) -> bytes:
+        """
+        Retorna el JSON de un producto, codificándolo solo si cambió.
+
+        Args:
+            producto (dict): Producto tal como lo devuelve el almacén.
+
+        Returns:
+            bytes: Objeto JSON del producto.
+        """
+        version = producto.get("version", 0)
+        entrada = self._entradas.get(producto["id"])
+        if entrada is not None and entrada[0] == version:
+            self.aciertos += 1
+            return entrada[1]
+        codificado = codificar_producto(producto)
+        self._entradas[producto["id"]] = (version, codificado)
+        self.fallos += 1
+        return codificado
+
+    def codificar_lista(self, productos: Iterable[dict]) -> bytes:
+        """
+        Retorna el arreglo JSON de varios productos reutilizando la caché.
+
+        Args:
+            productos (Iterable[dict]): Productos tal como los devuelve el almacén.
+
+        Returns:
+            bytes: Arreglo JSON.
+        """
+        with cronometrar("serializar"):
+            return b"[" + b",".join(self.codificar(p) for p in productos) + b"]"
+
+    def olvidar(self, producto_id: Optional[int] = None) -> None:
+        """
+        Descarta la entrada de un producto, o toda la caché si no se indica ID.
+
+        Args:
+            producto_id (Optional[int]): ID del producto a descartar.
+        """
+        if producto_id is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(producto_id, None)
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores de la caché.
+
+        Returns:
+            dict: Aciertos, fallos y entradas almacenadas.
+        """
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self._entradas)}
+
+    def muestras_metricas(self) -> list:
+        """
+        Retorna los contadores de la caché para la exportación de Prometheus.
+
+        Returns:
+            list: Muestras (nombre, tipo, ayuda, series) de metricas.py.
+        """
+        consultas = self.aciertos + self.fallos
+        return [
+            ("inventario_cache_json_aciertos_total", "counter",
+             "Productos servidos desde la caché JSON.", [({}, self.aciertos)]),
+            ("inventario_cache_json_fallos_total", "counter",
+             "Productos que hubo que codificar a JSON.", [({}, self.fallos)]),
+            ("inventario_cache_json_entradas", "gauge",
+             "Productos guardados en la caché JSON.", [({}, len(self._entradas))]),
+            ("inventario_cache_json_ratio_aciertos", "gauge",
+             "Fracción de aciertos de la caché JSON desde el arranque.",
+             [({}, self.aciertos / consultas if consultas else 0)]),
+        ]
@@ -0,0 +1,229 @@
+"""
+Utilidades de acceso a SQLite: pool de conexiones por hilo y esquema de tablas.
+
+Cada hilo obtiene su propia conexión (sqlite3 no permite compartirlas de forma
+segura) configurada en modo WAL, de modo que las lecturas no bloquean a la
+escritura en curso. Las sentencias usan parámetros "?" y quedan preparadas en
+la caché de sentencias de cada conexión.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    descripcion TEXT NOT NULL DEFAULT '',
+    precio REAL NOT NULL,
+    cantidad INTEGER NOT NULL DEFAULT 0,
+    ventas INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS ventas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    producto_id INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    total REAL NOT NULL,
+    cliente TEXT,
+    fecha TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ventas_producto_id ON ventas (producto_id);
+CREATE INDEX IF NOT EXISTS idx_productos_cantidad ON productos (cantidad);
+CREATE TABLE IF NOT EXISTS agregados_stock (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO agregados_stock (id, total)
+    SELECT 1, COALESCE(SUM(cantidad), 0) FROM productos;
+CREATE TRIGGER IF NOT EXISTS trg_stock_insert AFTER INSERT ON productos BEGIN
+    UPDATE agregados_stock SET total = total + NEW.cantidad WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_stock_update AFTER UPDATE OF cantidad ON productos BEGIN
+    UPDATE agregados_stock SET total = total + NEW.cantidad - OLD.cantidad WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_stock_delete AFTER DELETE ON productos BEGIN
+    UPDATE agregados_stock SET total = total - OLD.cantidad WHERE id = 1;
+END;
+CREATE TABLE IF NOT EXISTS cambios_catalogo (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cambios INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cambios_catalogo (id, cambios) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS trg_cambios_insert AFTER INSERT ON productos BEGIN
+    UPDATE cambios_catalogo SET cambios = cambios + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_cambios_update AFTER UPDATE ON productos BEGIN
+    UPDATE cambios_catalogo SET cambios = cambios + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_cambios_delete AFTER DELETE ON productos BEGIN
+    UPDATE cambios_catalogo SET cambios = cambios + 1 WHERE id = 1;
+END;
+"""
+
+# Columnas añadidas después de la primera versión del esquema: (tabla, columna, definición).
+COLUMNAS_AGREGADAS = [
+    ("productos", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("ventas", "fecha", "TEXT"),
+]
+
+# Cubeta de cada granularidad a partir de una fecha ISO 8601 (convertida a UTC).
+_CUBETAS_SQL = {
+    "hora": "CAST(strftime('%s', {f}) AS INTEGER) / 3600",
+    "dia": "CAST(strftime('%s', {f}) AS INTEGER) / 86400",
+    "mes": "CAST(strftime('%Y', {f}) AS INTEGER) * 12 + CAST(strftime('%m', {f}) AS INTEGER) - 1",
+}
+
+# Rollups de ventas por hora, día y mes. Se crea después de COLUMNAS_AGREGADAS
+# porque los triggers leen ventas.fecha.
+ESQUEMA_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS ventas_rollup (
+    producto_id INTEGER NOT NULL,
+    granularidad TEXT NOT NULL,
+    cubeta INTEGER NOT NULL,
+    ventas INTEGER NOT NULL,
+    unidades INTEGER NOT NULL,
+    ingresos REAL NOT NULL,
+    PRIMARY KEY (producto_id, granularidad, cubeta)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_insert AFTER INSERT ON ventas
+WHEN NEW.fecha IS NOT NULL BEGIN
+    INSERT INTO ventas_rollup (producto_id, granularidad, cubeta, ventas, unidades, ingresos)
+    VALUES {valores}
+    ON CONFLICT (producto_id, granularidad, cubeta) DO UPDATE SET
+        ventas = ventas + 1,
+        unidades = unidades + excluded.unidades,
+        ingresos = ingresos + excluded.ingresos;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_delete AFTER DELETE ON ventas
+WHEN OLD.fecha IS NOT NULL BEGIN
+    {descuentos}
+    DELETE FROM ventas_rollup WHERE producto_id = OLD.producto_id AND ventas = 0;
+END;
+""".format(
+    valores=",\n           ".join(
+        f"(NEW.producto_id, '{g}', {c.format(f='NEW.fecha')}, 1, NEW.cantidad, NEW.total)"
+        for g, c in _CUBETAS_SQL.items()
+    ),
+    descuentos="\n    ".join(
+        "UPDATE ventas_rollup SET ventas = ventas - 1, unidades = unidades - OLD.cantidad, "
+        f"ingresos = ingresos - OLD.total WHERE producto_id = OLD.producto_id "
+        f"AND granularidad = '{g}' AND cubeta = {c.format(f='OLD.fecha')};"
+        for g, c in _CUBETAS_SQL.items()
+    ),
+)
+
+# Sentencias que recalculan los rollups desde la tabla de ventas.
+RECONSTRUIR_ROLLUPS = ["DELETE FROM ventas_rollup"] + [
+    "INSERT INTO ventas_rollup (producto_id, granularidad, cubeta, ventas, unidades, ingresos) "
+    f"SELECT producto_id, '{g}', {c.format(f='fecha')} AS cubeta, COUNT(*), SUM(cantidad), SUM(total) "
+    "FROM ventas WHERE fecha IS NOT NULL GROUP BY producto_id, cubeta"
+    for g, c in _CUBETAS_SQL.items()
+]
+
+
+class PoolSqlite:
+    """
+    Pool de conexiones SQLite con una conexión por hilo.
+
+    Atributos:
+        ruta (str): Ruta al archivo de base de datos.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        """
+        Inicializa el pool y crea el esquema si no existe.
+
+        Args:
+            ruta (str): Ruta al archivo de base de datos.
+        """
+        self.ruta = ruta
+        self._local = threading.local()
+        self._conexiones: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._crear_esquema()
+
+    def _crear_esquema(self) -> None:
+        """
+        Crea las tablas e índices y agrega las columnas que falten en bases antiguas.
+        """
+        conexion = self.conexion()
+        conexion.executescript(ESQUEMA)
+        for tabla, columna, definicion in COLUMNAS_AGREGADAS:
+            existentes = {fila["name"] for fila in conexion.execute(f"PRAGMA table_info({tabla})")}
+            if columna not in existentes:
+                conexion.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+        conexion.executescript(ESQUEMA_ROLLUPS)
+
+    def conexion(self) -> sqlite3.Connection:
+        """
+        Retorna la conexión del hilo actual, creándola si hace falta.
+
+        Returns:
+            sqlite3.Connection: Conexión en modo autocommit con WAL activado.
+        """
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(
+                self.ruta,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conexion.row_factory = sqlite3.Row
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute("PRAGMA busy_timeout=5000")
+            self._local.conexion = conexion
+            with self._lock:
+                self._conexiones.append(conexion)
+        return conexion
+
+    @contextmanager
+    def transaccion(self) -> Iterator[sqlite3.Connection]:
+        """
+        Ejecuta un bloque dentro de una transacción de escritura inmediata.
+
+        Yields:
+            sqlite3.Connection: Conexión del hilo actual con la transacción abierta.
+        """
+        conexion = self.conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield conexion
+        except BaseException:
+            conexion.execute("ROLLBACK")
+            raise
+        conexion.execute("COMMIT")
+
+    def cerrar(self) -> None:
+        """
+        Cierra todas las conexiones abiertas por el pool.
+        """
+        with self._lock:
+            for conexion in self._conexiones:
+                conexion.close()
+            self._conexiones.clear()
+        self._local = threading.local()
+
+
+_pools: Dict[str, PoolSqlite] = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(ruta: str) -> PoolSqlite:
+    """
+    Retorna el pool compartido para una base de datos, creándolo la primera vez.
+
+    Args:
+        ruta (str): Ruta al archivo de base de datos.
+
+    Returns:
+        PoolSqlite: Pool asociado a la ruta.
+    """
+    with _pools_lock:
+        if ruta not in _pools:
+            _pools[ruta] = PoolSqlite(ruta)
+        return _pools[ruta]
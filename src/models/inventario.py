@@ -7,11 +7,14 @@ Define la estructura del inventario en memoria, utilizada por los repositorios.
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Inventario:
     """
     Representa un registro de inventario asociado a un producto.
 
+    Usa __slots__: sin diccionario por instancia, cada registro ocupa unos
+    pocos punteros.
+
     Atributos:
         id (int): Identificador único del inventario.
         producto_id (int): ID del producto al que pertenece el inventario.
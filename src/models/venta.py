@@ -2,6 +2,8 @@
 Modelo Pydantic para representar una venta realizada.
 """
 
+from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, Field
 
 
@@ -14,9 +16,13 @@ class Venta(BaseModel):
         producto_id (int): ID del producto vendido.
         cantidad (int): Cantidad vendida.
         total (float): Total recaudado por la venta.
+        cliente (Optional[str]): Nombre del cliente, si se registró.
+        fecha (Optional[datetime]): Momento de la venta; se completa al guardarla.
     """
 
     id: int = Field(..., example=1)
     producto_id: int = Field(..., example=1)
     cantidad: int = Field(..., gt=0, example=5)
     total: float = Field(..., gt=0, example=100.0)
+    cliente: Optional[str] = Field(None, example="Ana Pérez")
+    fecha: Optional[datetime] = Field(None, example="2024-05-01T10:30:00+00:00")
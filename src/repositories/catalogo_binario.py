@@ -0,0 +1,339 @@
+"""
+Catálogo de productos en un archivo binario que los workers mapean en memoria.
+
+Con varios workers, tener el catálogo parseado en cada proceso multiplica la
+memoria por la cantidad de procesos. Este archivo guarda los productos en un
+formato que se lee sin parsear: cada worker lo mapea con mmap (las páginas las
+comparte el sistema operativo entre procesos) y decodifica solo los productos
+que lee.
+
+Formato (enteros little-endian):
+
+- Cabecera: marca, cantidad de productos y firma del JSON del que se generó
+  (mtime_ns, tamaño, inodo).
+- Columnas de ancho fijo, una tras otra: IDs (ordenados), precio, cantidad,
+  ventas y versión, 8 bytes por producto cada una, y los desplazamientos de
+  cada registro de texto (n + 1 valores).
+- Registros de texto: largos de nombre y descripción, los dos en UTF-8, y los
+  campos que no caben en las columnas como JSON (vacío si no hay).
+
+Buscar un producto es una búsqueda binaria sobre la columna de IDs (una vista
+memoryview del mapa, sin copiarla) y leer su registro es un corte del mapa.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.helpers.archivos import permisos_destino
+from src.helpers.metricas import bytes_escritos_total, cronometrar
+from src.repositories.tabla_productos import CAMPOS, NUMERICAS, cabe
+
+_MARCA = b"INVCAT01"
+_CABECERA = struct.Struct("<8sQqqq")
+_LARGOS = struct.Struct("<II")
+
+# Firma del archivo JSON: (mtime_ns, tamaño, inodo).
+Firma = Tuple[int, int, int]
+
+
+def escribir_catalogo(ruta: str, productos: Iterable[dict], firma: Firma) -> int:
+    """
+    Escribe el catálogo binario de forma atómica (archivo temporal + renombrado).
+
+    No hace fsync: el catálogo se deriva del JSON, que es el que se persiste;
+    si se pierde o queda viejo, se regenera al abrirlo.
+
+    Args:
+        ruta (str): Ruta del archivo binario.
+        productos (Iterable[dict]): Productos completos, con su ID.
+        firma (Firma): Firma del JSON que contiene esos mismos productos.
+
+    Returns:
+        int: Bytes escritos.
+    """
+    with cronometrar("catalogo_escribir"):
+        ordenados = sorted(productos, key=lambda producto: producto["id"])
+        ids = array("q")
+        numeros = {campo: array(tipo) for campo, tipo in NUMERICAS}
+        desplazamientos = array("q", [0])
+        registros: List[bytes] = []
+        total = 0
+        for producto in ordenados:
+            ids.append(producto["id"])
+            extras = {campo: valor for campo, valor in producto.items() if campo not in CAMPOS}
+            for campo, tipo in NUMERICAS:
+                valor = producto.get(campo, 0)
+                if cabe(valor, tipo):
+                    numeros[campo].append(valor)
+                else:
+                    numeros[campo].append(0)
+                    extras[campo] = valor
+            textos = []
+            for campo in ("nombre", "descripcion"):
+                valor = producto.get(campo, "")
+                if type(valor) is not str:
+                    extras[campo] = valor
+                    valor = ""
+                textos.append(valor.encode("utf-8"))
+            registro = b"".join((
+                _LARGOS.pack(len(textos[0]), len(textos[1])), *textos,
+                json.dumps(extras, ensure_ascii=False).encode("utf-8") if extras else b"",
+            ))
+            registros.append(registro)
+            total += len(registro)
+            desplazamientos.append(total)
+        contenido = b"".join((
+            _CABECERA.pack(_MARCA, len(ids), *firma),
+            ids.tobytes(), *(numeros[campo].tobytes() for campo, _ in NUMERICAS),
+            desplazamientos.tobytes(), *registros,
+        ))
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            os.chmod(temporal, permisos_destino(ruta))
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(contenido)
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+    bytes_escritos_total.incrementar("catalogo", valor=len(contenido))
+    return len(contenido)
+
+
+class CatalogoBinario:
+    """
+    Vista de solo lectura de un catálogo binario mapeado en memoria.
+
+    Atributos:
+        ruta (str): Ruta del archivo.
+        firma (Firma): Firma del JSON del que se generó.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        """
+        Mapea el archivo y arma las vistas de sus columnas, sin leerlas.
+
+        Args:
+            ruta (str): Ruta del archivo.
+
+        Raises:
+            ValueError: Si el archivo no es un catálogo o está truncado.
+        """
+        self.ruta = ruta
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(self._mapa)
+        if len(vista) < _CABECERA.size:
+            raise ValueError(f"Catálogo truncado: {ruta}")
+        marca, cantidad, *firma = _CABECERA.unpack_from(vista)
+        if marca != _MARCA:
+            raise ValueError(f"No es un catálogo binario: {ruta}")
+        self.firma: Firma = tuple(firma)
+        inicio = _CABECERA.size
+        columnas = {}
+        for campo, tipo in (("id", "q"), *NUMERICAS):
+            columnas[campo] = vista[inicio:inicio + 8 * cantidad].cast(tipo)
+            inicio += 8 * cantidad
+        self._desplazamientos = vista[inicio:inicio + 8 * (cantidad + 1)].cast("q")
+        inicio += 8 * (cantidad + 1)
+        if len(vista) != inicio + (self._desplazamientos[-1] if cantidad else 0):
+            raise ValueError(f"Catálogo truncado: {ruta}")
+        self._ids = columnas.pop("id")
+        self._numeros = columnas
+        self._registros = vista[inicio:]
+
+    def __len__(self) -> int:
+        """
+        Retorna la cantidad de productos.
+        """
+        return len(self._ids)
+
+    def posicion(self, producto_id: int) -> int:
+        """
+        Retorna la posición de un producto en las columnas, o -1 si no está.
+        """
+        posicion = bisect.bisect_left(self._ids, producto_id)
+        if posicion < len(self._ids) and self._ids[posicion] == producto_id:
+            return posicion
+        return -1
+
+    def ids(self) -> memoryview:
+        """
+        Retorna la columna de IDs (ordenados), sin copiarla.
+        """
+        return self._ids
+
+    def producto(self, posicion: int) -> dict:
+        """
+        Decodifica el producto de una posición.
+
+        Args:
+            posicion (int): Posición, como la de posicion().
+
+        Returns:
+            dict: Producto nuevo, que quien lo recibe puede modificar.
+        """
+        registro = self._registros[self._desplazamientos[posicion]:self._desplazamientos[posicion + 1]]
+        largo_nombre, largo_descripcion = _LARGOS.unpack_from(registro)
+        inicio = _LARGOS.size
+        fin_nombre = inicio + largo_nombre
+        fin_descripcion = fin_nombre + largo_descripcion
+        numeros = self._numeros
+        producto = {
+            "id": self._ids[posicion],
+            "nombre": str(registro[inicio:fin_nombre], "utf-8"),
+            "descripcion": str(registro[fin_nombre:fin_descripcion], "utf-8"),
+            "precio": numeros["precio"][posicion],
+            "cantidad": numeros["cantidad"][posicion],
+            "ventas": numeros["ventas"][posicion],
+            "version": numeros["version"][posicion],
+        }
+        if fin_descripcion < len(registro):
+            producto.update(json.loads(bytes(registro[fin_descripcion:])))
+        return producto
+
+    def cantidades(self) -> Iterator[Tuple[int, int]]:
+        """
+        Recorre los pares (ID, cantidad) sin decodificar los registros.
+
+        Los productos cuya cantidad no cupo en la columna se decodifican.
+        """
+        for posicion, (producto_id, cantidad) in enumerate(zip(self._ids, self._numeros["cantidad"])):
+            if cantidad == 0 and self._tiene_extras(posicion):
+                cantidad = self.producto(posicion).get("cantidad", 0)
+            yield producto_id, cantidad
+
+    def _tiene_extras(self, posicion: int) -> bool:
+        """
+        Indica si el registro de una posición lleva campos extra.
+        """
+        inicio = self._desplazamientos[posicion]
+        largo_nombre, largo_descripcion = _LARGOS.unpack_from(self._registros, inicio)
+        return inicio + _LARGOS.size + largo_nombre + largo_descripcion < self._desplazamientos[posicion + 1]
+
+
+def abrir_catalogo(ruta: str, firma: Firma) -> Optional[CatalogoBinario]:
+    """
+    Abre el catálogo binario si existe y corresponde al JSON con esa firma.
+
+    Args:
+        ruta (str): Ruta del archivo binario.
+        firma (Firma): Firma actual del JSON.
+
+    Returns:
+        Optional[CatalogoBinario]: Catálogo, o None si falta, está dañado o
+            se generó desde otra versión del JSON.
+    """
+    try:
+        catalogo = CatalogoBinario(ruta)
+    except (FileNotFoundError, ValueError):
+        return None
+    return catalogo if catalogo.firma == firma else None
+
+
+class CatalogoMapeado(MutableMapping):
+    """
+    Productos de un catálogo binario más los cambios aún no volcados.
+
+    Se comporta como TablaProductos: leer un producto construye un
+    diccionario nuevo y los IDs se recorren en orden ascendente. Las altas,
+    modificaciones y bajas quedan en memoria hasta que el almacén vuelca el
+    catálogo y lo vuelve a mapear.
+    """
+
+    def __init__(self, catalogo: CatalogoBinario) -> None:
+        """
+        Envuelve un catálogo binario sin cambios.
+
+        Args:
+            catalogo (CatalogoBinario): Catálogo mapeado.
+        """
+        self.catalogo = catalogo
+        self._cambios: Dict[int, dict] = {}
+        self._eliminados: Set[int] = set()
+
+    def __len__(self) -> int:
+        """
+        Retorna la cantidad de productos.
+        """
+        if not self._cambios and not self._eliminados:
+            return len(self.catalogo)
+        return sum(1 for _ in self)
+
+    def __contains__(self, producto_id: object) -> bool:
+        """
+        Indica si hay un producto con ese ID.
+        """
+        if producto_id in self._cambios:
+            return True
+        return producto_id not in self._eliminados and self.catalogo.posicion(producto_id) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Recorre los IDs en orden ascendente.
+        """
+        if not self._cambios and not self._eliminados:
+            return iter(self.catalogo.ids())
+        ids = set(self.catalogo.ids()) - self._eliminados
+        ids.update(self._cambios)
+        return iter(sorted(ids))
+
+    def __getitem__(self, producto_id: int) -> dict:
+        """
+        Retorna un diccionario nuevo con los datos del producto.
+
+        Raises:
+            KeyError: Si no hay un producto con ese ID.
+        """
+        cambiado = self._cambios.get(producto_id)
+        if cambiado is not None:
+            return dict(cambiado)
+        posicion = -1 if producto_id in self._eliminados else self.catalogo.posicion(producto_id)
+        if posicion < 0:
+            raise KeyError(producto_id)
+        return self.catalogo.producto(posicion)
+
+    def get(self, producto_id: int, defecto: Any = None) -> Any:
+        """
+        Retorna el producto o el valor por defecto si no existe.
+        """
+        try:
+            return self[producto_id]
+        except KeyError:
+            return defecto
+
+    def __setitem__(self, producto_id: int, producto: dict) -> None:
+        """
+        Registra el alta o modificación de un producto.
+        """
+        self._cambios[producto_id] = dict(producto)
+        self._eliminados.discard(producto_id)
+
+    def __delitem__(self, producto_id: int) -> None:
+        """
+        Registra la baja de un producto.
+
+        Raises:
+            KeyError: Si no hay un producto con ese ID.
+        """
+        if producto_id not in self:
+            raise KeyError(producto_id)
+        self._cambios.pop(producto_id, None)
+        self._eliminados.add(producto_id)
+
+    def cantidades(self) -> Iterator[Tuple[int, int]]:
+        """
+        Recorre los pares (ID, cantidad) en orden de ID.
+        """
+        if not self._cambios and not self._eliminados:
+            return self.catalogo.cantidades()
+        return ((producto_id, self[producto_id].get("cantidad", 0)) for producto_id in self)
@@ -0,0 +1,392 @@
+"""
+Registro de respuestas por clave de idempotencia (cabecera Idempotency-Key).
+
+Un cliente que reintenta una escritura tras un timeout manda la misma clave;
+la primera vez la operación se ejecuta y su resultado se guarda, y las
+siguientes devuelven ese resultado sin volver a ejecutarla. Cada clave en
+ejecución tiene un Future: los duplicados que llegan mientras la primera
+todavía se ejecuta esperan ese resultado en lugar de ejecutar otra vez, y las
+claves distintas no se esperan entre sí.
+
+El registro es una caché acotada: guarda hasta `maximo` claves, descarta la
+menos usada cuando se llena y cada clave vence a los `ttl` segundos. Cada
+resultado se anexa a una bitácora NDJSON junto a los datos, que se relee al
+arrancar y se reescribe con las claves vigentes cuando crece demasiado.
+
+El resultado se anota después de ejecutar la operación: si el proceso cae
+entre las dos cosas, un reintento con la misma clave vuelve a ejecutarla.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.config.settings import settings
+from src.helpers.archivos import permisos_destino
+from src.helpers.coordinacion import BloqueoProcesos, ContadorGeneracion
+from src.helpers.journal import Journal
+from src.helpers.metricas import bytes_escritos_total, registro_metricas
+
+# Entrada del registro: (vence, huella, estado, cuerpo).
+Entrada = Tuple[float, str, int, Any]
+
+# Bitácora y número de secuencia de un registro anexado, pendiente de confirmar.
+Anexado = Optional[Tuple[Journal, int]]
+
+idempotencia_total = registro_metricas.contador(
+    "inventario_idempotencia_total",
+    "Peticiones con Idempotency-Key por resultado (ejecutada, repetida, conflicto).",
+    ("resultado",),
+)
+
+
+def _registro(clave: str, entrada: Entrada) -> dict:
+    """
+    Retorna el registro de bitácora de una entrada.
+    """
+    vence, huella, estado, cuerpo = entrada
+    return {"clave": clave, "vence": vence, "huella": huella, "estado": estado, "cuerpo": cuerpo}
+
+
+def _linea(registro: dict) -> str:
+    """
+    Retorna un registro como línea NDJSON.
+    """
+    return json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class ClaveReutilizadaError(Exception):
+    """
+    La clave de idempotencia ya se usó con otra petición.
+    """
+
+
+class RegistroIdempotencia:
+    """
+    Caché LRU con vencimiento de resultados por clave, persistida en una bitácora.
+
+    Atributos:
+        ruta (str): Bitácora NDJSON del registro.
+        maximo (int): Claves que se conservan como máximo.
+        ttl (float): Segundos durante los que una clave se repite.
+    """
+
+    def __init__(self, ruta: str, maximo: int, ttl: float) -> None:
+        """
+        Inicializa el registro; la bitácora se lee en el primer uso.
+
+        Args:
+            ruta (str): Bitácora NDJSON del registro.
+            maximo (int): Claves que se conservan como máximo.
+            ttl (float): Segundos durante los que una clave se repite.
+        """
+        self.ruta = ruta
+        self.maximo = max(1, maximo)
+        self.ttl = ttl
+        self._entradas: "OrderedDict[str, Entrada]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._en_curso: Dict[str, Future] = {}
+        self._journal: Optional[Journal] = None
+        self._cargado = False
+        self._anexados = 0
+
+    def ejecutar(
+        self, clave: str, huella: str, operacion: Callable[[], Tuple[int, Any]]
+    ) -> Tuple[int, Any, bool]:
+        """
+        Ejecuta la operación una sola vez por clave y repite su resultado.
+
+        Args:
+            clave (str): Clave de idempotencia enviada por el cliente.
+            huella (str): Identifica la petición (método, ruta y datos); una
+                clave solo se repite para la misma huella.
+            operacion (Callable[[], Tuple[int, Any]]): Escritura a ejecutar;
+                retorna el estado y el cuerpo (valores JSON) a guardar. Si
+                lanza una excepción no se guarda nada.
+
+        Returns:
+            Tuple[int, Any, bool]: Estado, cuerpo y si fue una repetición.
+
+        Raises:
+            ClaveReutilizadaError: Si la clave se usó con otra huella.
+        """
+        while True:
+            # El lock solo se toma para buscar la clave o anotarla en curso;
+            # la operación se ejecuta sin él.
+            with self._lock:
+                entrada = self._buscar(clave)
+                pendiente = self._en_curso.get(clave) if entrada is None else None
+                propia = entrada is None and pendiente is None
+                if propia:
+                    pendiente = self._en_curso[clave] = Future()
+            if entrada is None and not propia:
+                # Un duplicado concurrente espera a que termine el primero; si
+                # el primero falló no hay nada que repetir y se vuelve a intentar.
+                try:
+                    entrada = pendiente.result()
+                except Exception:
+                    continue
+            if entrada is not None:
+                _, huella_guardada, estado, cuerpo = entrada
+                if huella_guardada != huella:
+                    idempotencia_total.incrementar("conflicto")
+                    raise ClaveReutilizadaError(clave)
+                idempotencia_total.incrementar("repetida")
+                return estado, cuerpo, True
+            try:
+                estado, cuerpo = operacion()
+                entrada = (time.time() + self.ttl, huella, estado, cuerpo)
+                # El fsync se espera sin el lock, así las demás claves no
+                # esperan al disco y sus registros comparten el mismo fsync.
+                anexado = self._guardar(clave, entrada)
+                if anexado is not None:
+                    journal, numero = anexado
+                    journal.confirmar(numero)
+            except BaseException as exc:
+                with self._lock:
+                    self._en_curso.pop(clave, None)
+                pendiente.set_exception(exc)
+                raise
+            pendiente.set_result(entrada)
+            idempotencia_total.incrementar("ejecutada")
+            return estado, cuerpo, False
+
+    def _buscar(self, clave: str) -> Optional[Entrada]:
+        """
+        Retorna la entrada vigente de una clave, marcándola como recién usada.
+        Debe llamarse con el lock tomado.
+        """
+        self._cargar()
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        if entrada[0] <= time.time():
+            del self._entradas[clave]
+            return None
+        self._entradas.move_to_end(clave)
+        return entrada
+
+    def _guardar(self, clave: str, entrada: Entrada) -> Anexado:
+        """
+        Guarda una entrada en memoria, la anexa a la bitácora y da la clave
+        por terminada.
+
+        Returns:
+            Anexado: Bitácora y número del registro para Journal.confirmar(),
+                o None si no hay que esperar ningún fsync.
+        """
+        with self._lock:
+            self._en_curso.pop(clave, None)
+            self._agregar(clave, entrada)
+            anexado = self._anexar(_registro(clave, entrada))
+            self._anexados += 1
+            if self._anexados > 2 * self.maximo:
+                self._compactar()
+            return anexado
+
+    def _agregar(self, clave: str, entrada: Entrada) -> None:
+        """
+        Agrega una entrada en memoria y descarta las vencidas y las que sobran.
+        Debe llamarse con el lock tomado.
+        """
+        self._entradas[clave] = entrada
+        self._entradas.move_to_end(clave)
+        ahora = time.time()
+        while self._entradas:
+            primera = next(iter(self._entradas.values()))
+            if len(self._entradas) <= self.maximo and primera[0] > ahora:
+                break
+            self._entradas.popitem(last=False)
+
+    def _cargar(self) -> None:
+        """
+        Lee la bitácora la primera vez. Debe llamarse con el lock tomado.
+        """
+        if self._cargado:
+            return
+        self._leer_bitacora(0)
+        self._cargado = True
+
+    def _leer_bitacora(self, desde: int) -> None:
+        """
+        Aplica los registros de la bitácora desde un byte. Debe llamarse con
+        el lock tomado.
+        """
+        for registro in Journal.leer(self.ruta, desde):
+            self._agregar(registro["clave"], (
+                registro["vence"], registro["huella"], registro["estado"], registro["cuerpo"],
+            ))
+            self._anexados += 1
+
+    def _anexar(self, registro: dict) -> Anexado:
+        """
+        Anexa un registro a la bitácora sin esperar el fsync. Debe llamarse
+        con el lock tomado; la confirmación se hace después de soltarlo.
+        """
+        if self._journal is None:
+            self._journal = Journal(
+                self.ruta, settings.journal_lote_fsync, settings.journal_intervalo_fsync,
+                settings.journal_esperar_fsync,
+            )
+        return self._journal, self._journal.registrar(registro)
+
+    def _compactar(self) -> None:
+        """
+        Reescribe la bitácora con las entradas vigentes. Debe llamarse con el
+        lock tomado.
+        """
+        if self._journal is not None:
+            self._journal.cerrar()
+            self._journal = None
+        self._escribir_entradas()
+
+    def _escribir_entradas(self) -> None:
+        """
+        Escribe la bitácora con las entradas en memoria, de forma atómica.
+        """
+        lineas = "".join(
+            _linea(_registro(clave, entrada)) for clave, entrada in self._entradas.items()
+        ).encode("utf-8")
+        directorio = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(directorio, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            os.chmod(temporal, permisos_destino(self.ruta))
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(lineas)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, self.ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        bytes_escritos_total.incrementar("idempotencia", valor=len(lineas))
+        self._anexados = len(self._entradas)
+
+    def muestras_metricas(self) -> list:
+        """
+        Retorna la cantidad de claves guardadas para /metrics.
+
+        Returns:
+            list: Muestras (nombre, tipo, ayuda, series) de metricas.py.
+        """
+        return [(
+            "inventario_idempotencia_claves", "gauge", "Claves de idempotencia guardadas.",
+            [({}, len(self._entradas))],
+        )]
+
+
+class RegistroIdempotenciaCompartido(RegistroIdempotencia):
+    """
+    Registro que varios procesos (workers) comparten sobre la misma bitácora.
+
+    Cada ejecución toma un lock entre procesos, aplica lo que anexaron los
+    demás (un contador de generación avisa si hay algo nuevo, ver
+    coordinacion.py) y anexa su resultado sin buffer, así que un reintento que
+    llega a otro worker también se repite. Como el lock se mantiene durante la
+    operación, las escrituras con clave quedan serializadas entre procesos.
+    """
+
+    _ANEXOS = 0
+    _COMPACTACIONES = 1
+
+    def __init__(self, ruta: str, maximo: int, ttl: float) -> None:
+        """
+        Inicializa el registro y abre el lock y los contadores junto a la bitácora.
+
+        Args:
+            ruta (str): Bitácora NDJSON del registro.
+            maximo (int): Claves que se conservan como máximo.
+            ttl (float): Segundos durante los que una clave se repite.
+        """
+        super().__init__(ruta, maximo, ttl)
+        self._bloqueo = BloqueoProcesos(ruta + ".lock")
+        self._contador = ContadorGeneracion(ruta + ".generacion", ranuras=2)
+        self._leido = 0
+        self._vistos = (0, 0)
+
+    def ejecutar(
+        self, clave: str, huella: str, operacion: Callable[[], Tuple[int, Any]]
+    ) -> Tuple[int, Any, bool]:
+        """
+        Igual que RegistroIdempotencia.ejecutar, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().ejecutar(clave, huella, operacion)
+
+    def _cargar(self) -> None:
+        """
+        Aplica lo que otros procesos anexaron desde la última lectura, o
+        relee la bitácora entera si otro proceso la compactó.
+        """
+        vistos = (self._contador.leer(self._ANEXOS), self._contador.leer(self._COMPACTACIONES))
+        if self._cargado and vistos == self._vistos:
+            return
+        desde = self._leido
+        if not self._cargado or vistos[1] != self._vistos[1]:
+            self._entradas.clear()
+            self._anexados = 0
+            desde = 0
+        self._leido = os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+        self._leer_bitacora(desde)
+        self._vistos = vistos
+        self._cargado = True
+
+    def _anexar(self, registro: dict) -> Anexado:
+        """
+        Anexa un registro (visible de inmediato para los demás procesos) y
+        publica una generación nueva. Escribe sin buffer ni fsync, así que no
+        queda nada que confirmar.
+        """
+        datos = _linea(registro).encode("utf-8")
+        with open(self.ruta, "ab") as archivo:
+            archivo.write(datos)
+            self._leido = archivo.tell()
+        bytes_escritos_total.incrementar("idempotencia", valor=len(datos))
+        self._vistos = (self._contador.incrementar(self._ANEXOS), self._vistos[1])
+        return None
+
+    def _compactar(self) -> None:
+        """
+        Reescribe la bitácora y avisa a los demás procesos que la relean.
+        """
+        self._escribir_entradas()
+        self._leido = os.path.getsize(self.ruta)
+        self._vistos = (self._vistos[0], self._contador.incrementar(self._COMPACTACIONES))
+
+
+def crear_registro_idempotencia() -> RegistroIdempotencia:
+    """
+    Crea el registro de idempotencia según la configuración.
+
+    Returns:
+        RegistroIdempotencia: Registro seleccionado (la variante compartida si
+            hay más de un worker).
+    """
+    clase = RegistroIdempotenciaCompartido if settings.workers > 1 else RegistroIdempotencia
+    return clase(settings.idempotencia_path, settings.idempotencia_max, settings.idempotencia_ttl)
+
+
+_registro_idempotencia: Optional[RegistroIdempotencia] = None
+_registro_lock = threading.Lock()
+
+
+def obtener_registro_idempotencia() -> RegistroIdempotencia:
+    """
+    Retorna el registro de idempotencia compartido, creándolo la primera vez.
+
+    Returns:
+        RegistroIdempotencia: Registro compartido.
+    """
+    global _registro_idempotencia
+    with _registro_lock:
+        if _registro_idempotencia is None:
+            _registro_idempotencia = crear_registro_idempotencia()
+            registro_metricas.colector("idempotencia", _registro_idempotencia.muestras_metricas)
+        return _registro_idempotencia
@@ -0,0 +1,270 @@
+"""
+Índice de stock mantenido de forma incremental.
+
+Guarda el stock total, el conjunto de productos agotados y una lista de pares
+(cantidad, ID) ordenada con bisect. Cada cambio de stock cuesta O(log n) en la
+búsqueda y las consultas "stock <= umbral" cuestan O(log n + k), sin recorrer
+todo el catálogo.
+
+IndiceStockCompacto guarda lo mismo sin objetos por producto: las cantidades
+en un mapa denso por ID y la lista ordenada como dos columnas "array('q')"
+paralelas (cantidades e IDs), ordenadas juntas por (cantidad, ID). Solo este
+índice limita los valores: IDs y cantidades de 64 bits con signo.
+"""
+
+import bisect
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.helpers.mapa_denso import MapaDenso
+
+# Rango de "array('q')". El mínimo marca las entradas ausentes del mapa
+# denso, así que no es una cantidad válida.
+_MINIMO = -(2 ** 63)
+_MAXIMO = 2 ** 63 - 1
+_AUSENTE = _MINIMO
+
+
+class StockFueraDeRangoError(ValueError):
+    """
+    Se lanza cuando un ID o una cantidad no caben en el almacenamiento.
+    """
+
+
+class IndiceStock:
+    """
+    Agregados de stock por producto actualizados en cada escritura.
+
+    Atributos:
+        total (int): Suma del stock de todos los productos.
+        agotados (Set[int]): IDs de productos con stock cero.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa el índice vacío.
+        """
+        self.total = 0
+        self.agotados: Set[int] = set()
+        self._cantidades: Dict[int, int] = {}
+        self._ordenados: List[Tuple[int, int]] = []
+
+    def reconstruir(self, cantidades: Iterable[Tuple[int, int]]) -> None:
+        """
+        Reconstruye el índice completo a partir de pares (ID, cantidad).
+
+        Args:
+            cantidades (Iterable[Tuple[int, int]]): Stock actual de cada producto.
+        """
+        self._cantidades = dict(cantidades)
+        self._ordenados = sorted((cantidad, pid) for pid, cantidad in self._cantidades.items())
+        self.total = sum(self._cantidades.values())
+        self.agotados = {pid for pid, cantidad in self._cantidades.items() if cantidad == 0}
+
+    def cantidad(self, producto_id: int) -> Optional[int]:
+        """
+        Retorna el stock registrado de un producto en O(1).
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[int]: Cantidad actual o None si el producto no está indexado.
+        """
+        return self._cantidades.get(producto_id)
+
+    def validar(self, producto_id: int, cantidad: int) -> None:
+        """
+        Comprueba que el producto se pueda indexar; este índice no tiene límites.
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Stock del producto.
+        """
+
+    def actualizar(self, producto_id: int, cantidad: int) -> None:
+        """
+        Registra el stock nuevo de un producto (alta o modificación).
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Stock actual del producto.
+        """
+        anterior = self._cantidades.get(producto_id)
+        if anterior == cantidad:
+            return
+        if anterior is not None:
+            self._quitar(producto_id, anterior)
+        self._cantidades[producto_id] = cantidad
+        bisect.insort(self._ordenados, (cantidad, producto_id))
+        self.total += cantidad
+        if cantidad == 0:
+            self.agotados.add(producto_id)
+
+    def eliminar(self, producto_id: int) -> None:
+        """
+        Quita un producto del índice.
+
+        Args:
+            producto_id (int): ID del producto.
+        """
+        anterior = self._cantidades.pop(producto_id, None)
+        if anterior is not None:
+            self._quitar(producto_id, anterior)
+
+    def _quitar(self, producto_id: int, cantidad: int) -> None:
+        """
+        Descuenta del índice la entrada (cantidad, ID) de un producto.
+        """
+        posicion = bisect.bisect_left(self._ordenados, (cantidad, producto_id))
+        del self._ordenados[posicion]
+        self.total -= cantidad
+        self.agotados.discard(producto_id)
+
+    def hasta(self, umbral: int) -> List[int]:
+        """
+        Retorna los IDs con stock menor o igual al umbral, de menor a mayor stock.
+
+        Args:
+            umbral (int): Stock máximo incluido.
+
+        Returns:
+            List[int]: IDs de los productos que cumplen la condición.
+        """
+        fin = bisect.bisect_right(self._ordenados, (umbral, float("inf")))
+        return [pid for _, pid in self._ordenados[:fin]]
+
+
+class IndiceStockCompacto(IndiceStock):
+    """
+    Variante de IndiceStock con cantidades y orden en arreglos de enteros.
+
+    Requiere IDs y cantidades de 64 bits con signo (sin el mínimo, -2**63).
+
+    Atributos:
+        total (int): Suma del stock de todos los productos.
+        agotados (Set[int]): IDs de productos con stock cero.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa el índice vacío.
+        """
+        self.total = 0
+        self.agotados: Set[int] = set()
+        self._cantidades = MapaDenso(vacio=_AUSENTE)
+        self._orden_cantidades = array("q")
+        self._orden_ids = array("q")
+
+    def reconstruir(self, cantidades: Iterable[Tuple[int, int]]) -> None:
+        """
+        Reconstruye el índice completo a partir de pares (ID, cantidad).
+
+        Args:
+            cantidades (Iterable[Tuple[int, int]]): Stock actual de cada producto.
+        """
+        self._cantidades = MapaDenso(vacio=_AUSENTE)
+        self.total = 0
+        self.agotados = set()
+        pares = []
+        for pid, cantidad in cantidades:
+            self.validar(pid, cantidad)
+            self._cantidades[pid] = cantidad
+            pares.append((cantidad, pid))
+            self.total += cantidad
+            if cantidad == 0:
+                self.agotados.add(pid)
+        pares.sort()
+        self._orden_cantidades = array("q", (cantidad for cantidad, _ in pares))
+        self._orden_ids = array("q", (pid for _, pid in pares))
+
+    def cantidad(self, producto_id: int) -> Optional[int]:
+        """
+        Retorna el stock registrado de un producto en O(1).
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[int]: Cantidad actual o None si el producto no está indexado.
+        """
+        cantidad = self._cantidades.get(producto_id)
+        return None if cantidad == _AUSENTE else cantidad
+
+    def validar(self, producto_id: int, cantidad: int) -> None:
+        """
+        Comprueba que el producto quepa en el índice, antes de modificar nada.
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Stock del producto.
+
+        Raises:
+            StockFueraDeRangoError: Si el ID o la cantidad no caben.
+        """
+        if not (_MINIMO <= producto_id <= _MAXIMO and _MINIMO < cantidad <= _MAXIMO):
+            raise StockFueraDeRangoError(producto_id)
+
+    def _posicion(self, cantidad: int, producto_id: int) -> int:
+        """
+        Retorna dónde va (cantidad, ID) en las columnas ordenadas.
+        """
+        desde = bisect.bisect_left(self._orden_cantidades, cantidad)
+        hasta = bisect.bisect_right(self._orden_cantidades, cantidad, desde)
+        return bisect.bisect_left(self._orden_ids, producto_id, desde, hasta)
+
+    def actualizar(self, producto_id: int, cantidad: int) -> None:
+        """
+        Registra el stock nuevo de un producto (alta o modificación).
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Stock actual del producto.
+        """
+        self.validar(producto_id, cantidad)
+        anterior = self._cantidades.get(producto_id)
+        if anterior == cantidad:
+            return
+        if anterior != _AUSENTE:
+            self._quitar(producto_id, anterior)
+        self._cantidades[producto_id] = cantidad
+        posicion = self._posicion(cantidad, producto_id)
+        self._orden_cantidades.insert(posicion, cantidad)
+        self._orden_ids.insert(posicion, producto_id)
+        self.total += cantidad
+        if cantidad == 0:
+            self.agotados.add(producto_id)
+
+    def eliminar(self, producto_id: int) -> None:
+        """
+        Quita un producto del índice.
+
+        Args:
+            producto_id (int): ID del producto.
+        """
+        anterior = self._cantidades.quitar(producto_id)
+        if anterior != _AUSENTE:
+            self._quitar(producto_id, anterior)
+
+    def _quitar(self, producto_id: int, cantidad: int) -> None:
+        """
+        Descuenta del índice la entrada (cantidad, ID) de un producto.
+        """
+        posicion = self._posicion(cantidad, producto_id)
+        del self._orden_cantidades[posicion]
+        del self._orden_ids[posicion]
+        self.total -= cantidad
+        self.agotados.discard(producto_id)
+
+    def hasta(self, umbral: int) -> List[int]:
+        """
+        Retorna los IDs con stock menor o igual al umbral, de menor a mayor stock.
+
+        Args:
+            umbral (int): Stock máximo incluido.
+
+        Returns:
+            List[int]: IDs de los productos que cumplen la condición.
+        """
+        fin = bisect.bisect_right(self._orden_cantidades, umbral)
+        return self._orden_ids[:fin].tolist()
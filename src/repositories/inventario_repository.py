@@ -2,23 +2,41 @@
 Módulo de repositorio para la gestión del inventario.
 
 Este módulo administra el stock de productos almacenados, permitiendo
-consultar, modificar y eliminar cantidades.
+consultar, modificar y retirar cantidades. Las cantidades viven en el almacén
+de productos compartido (campo "cantidad"), de modo que la API de productos y
+la de inventario nunca divergen.
 """
 
-from typing import Optional
+from typing import List, Optional
+
+from src.repositories.producto_store import (
+    ProductoStore,
+    StockInsuficienteError,
+    obtener_producto_store,
+)
 
 
 class InventarioRepository:
     """
     Repositorio que gestiona el inventario de productos y sus cantidades.
+
+    Es la única vía de acceso a las cantidades para el inventario: lee y escribe
+    sobre el almacén de productos, que mantiene el stock total, los agotados y
+    el orden por cantidad de forma incremental.
+
+    Atributos:
+        store (ProductoStore): Almacén de productos compartido.
     """
 
-    def __init__(self):
+    def __init__(self, store: Optional[ProductoStore] = None):
         """
-        Inicializa el inventario como un diccionario vacío donde
-        la clave es el ID del producto y el valor es la cantidad en stock.
+        Inicializa el repositorio sobre el almacén de productos.
+
+        Args:
+            store (Optional[ProductoStore]): Almacén a usar. Por defecto, el
+                compartido para PRODUCTOS_PATH.
         """
-        self._stock = {}
+        self.store = store or obtener_producto_store()
 
     def obtener_cantidad(self, producto_id: int) -> Optional[int]:
         """
@@ -30,40 +48,111 @@ class InventarioRepository:
         Returns:
             Optional[int]: Cantidad disponible o None si no existe.
         """
-        return self._stock.get(producto_id)
+        return self.store.cantidad(producto_id)
 
-    def agregar_stock(self, producto_id: int, cantidad: int) -> None:
+    def agregar_stock(self, producto_id: int, cantidad: int) -> Optional[int]:
         """
-        Agrega una cantidad al stock del producto.
+        Agrega una cantidad al stock del producto de forma atómica.
 
         Args:
             producto_id (int): ID del producto.
             cantidad (int): Cantidad a agregar. Puede ser positiva o negativa.
+
+        Returns:
+            Optional[int]: Cantidad resultante o None si el producto no existe.
+
+        Raises:
+            StockInsuficienteError: Si el stock resultante sería negativo.
+        """
+        producto = self.store.ajustar_cantidad(producto_id, cantidad)
+        return producto["cantidad"] if producto is not None else None
+
+    def descontar_stock(self, producto_id: int, cantidad: int) -> bool:
+        """
+        Descuenta stock solo si hay unidades suficientes.
+
+        Args:
+            producto_id (int): ID del producto.
+            cantidad (int): Cantidad a descontar.
+
+        Returns:
+            bool: True si se descontó, False si el stock era insuficiente
+            o el producto no existe.
         """
-        actual = self._stock.get(producto_id, 0)
-        self._stock[producto_id] = actual + cantidad
+        try:
+            return self.store.ajustar_cantidad(producto_id, -cantidad) is not None
+        except StockInsuficienteError:
+            return False
 
-    def establecer_stock(self, producto_id: int, cantidad: int) -> None:
+    def establecer_stock(self, producto_id: int, cantidad: int) -> Optional[int]:
         """
         Establece la cantidad exacta de stock de un producto.
 
         Args:
             producto_id (int): ID del producto.
             cantidad (int): Cantidad exacta a establecer.
+
+        Returns:
+            Optional[int]: Cantidad establecida o None si el producto no existe.
         """
-        self._stock[producto_id] = cantidad
+        producto = self.store.actualizar(producto_id, {"cantidad": cantidad})
+        return producto["cantidad"] if producto is not None else None
 
     def eliminar_producto(self, producto_id: int) -> bool:
         """
-        Elimina el producto del inventario.
+        Retira el producto del inventario dejando su stock en cero.
+
+        El producto sigue en el catálogo; para borrarlo se usa la API de productos.
 
         Args:
-            producto_id (int): ID del producto a eliminar.
+            producto_id (int): ID del producto a retirar.
 
         Returns:
-            bool: True si se eliminó, False si no existía.
+            bool: True si se retiró, False si no existía.
         """
-        if producto_id in self._stock:
-            del self._stock[producto_id]
-            return True
-        return False
+        return self.establecer_stock(producto_id, 0) is not None
+
+    def stock_total(self) -> int:
+        """
+        Retorna la suma del stock de todos los productos.
+
+        Returns:
+            int: Stock total.
+        """
+        return self.store.stock_total()
+
+    def productos_bajo_stock(self, umbral: int) -> List[dict]:
+        """
+        Retorna los productos con stock menor o igual al umbral.
+
+        Args:
+            umbral (int): Stock máximo incluido.
+
+        Returns:
+            List[dict]: Productos de menor a mayor stock.
+        """
+        return self.store.bajo_stock(umbral)
+
+    def productos_agotados(self) -> List[dict]:
+        """
+        Retorna los productos con stock cero.
+
+        Returns:
+            List[dict]: Productos agotados, ordenados por ID.
+        """
+        return self.store.agotados()
+
+
+def crear_inventario_repository(ruta: Optional[str] = None) -> InventarioRepository:
+    """
+    Crea el repositorio de inventario sobre el almacén de productos compartido.
+
+    El almacén ya resuelve el modo configurado (JSON, bitácora o SQLite).
+
+    Args:
+        ruta (Optional[str]): Ruta al archivo JSON de productos.
+
+    Returns:
+        InventarioRepository: Repositorio de inventario.
+    """
+    return InventarioRepository(obtener_producto_store(ruta))
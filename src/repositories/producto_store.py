@@ -0,0 +1,1617 @@
+"""
+Almacén en memoria de productos indexado por ID.
+
+Carga el archivo JSON de productos una sola vez, aplica las mutaciones en
+memoria y las escribe en disco (write-through). Solo vuelve a leer el archivo
+cuando su firma (mtime, tamaño, inodo) cambia por una escritura externa. Si
+una escritura falla, los cambios en memoria se descartan y se vuelve a leer
+el archivo.
+
+En modo "journal" cada mutación se anexa a una bitácora en lugar de reescribir
+el catálogo, y un compactador en segundo plano la pliega en el snapshot.
+En modo "sqlite" los productos viven en una tabla indexada por ID.
+
+Con varios workers (WORKERS > 1) en modo "json" cada escritura se hace con un
+lock entre procesos y publica un contador de generación compartido, con el
+que los demás procesos saben cuándo recargar (ver coordinacion.py). Con
+CATALOGO_MAPEADO los workers no parsean el JSON: mapean en memoria un
+catálogo binario que se escribe junto a él (ver catalogo_binario.py).
+
+Con PRODUCTOS_COMPACTOS (modos "json" y "journal") los productos en memoria se
+guardan en columnas (ver tabla_productos.py) en lugar de un diccionario por
+producto, y el índice de stock y la lista de IDs usan arreglos de enteros.
+"""
+
+import bisect
+import os
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.config.settings import settings
+from src.helpers.coordinacion import BloqueoProcesos, ContadorGeneracion
+from src.helpers.journal import Journal
+from src.helpers.json_utils import leer_json, escribir_json
+from src.helpers.locks import LocksPorClave
+from src.helpers.sqlite_utils import PoolSqlite, obtener_pool
+from src.repositories.catalogo_binario import (
+    CatalogoBinario,
+    CatalogoMapeado,
+    abrir_catalogo,
+    escribir_catalogo,
+)
+from src.repositories.indice_stock import (
+    IndiceStock,
+    IndiceStockCompacto,
+    StockFueraDeRangoError,
+)
+from src.repositories.tabla_productos import TablaProductos, cabe
+
+
+class StockInsuficienteError(Exception):
+    """
+    Se lanza cuando un ajuste dejaría el stock de un producto por debajo de cero.
+    """
+
+
+class ConflictoVersionError(Exception):
+    """
+    Se lanza cuando la versión esperada de un producto no coincide con la actual.
+    """
+
+
+class ProductoNoEncontradoError(Exception):
+    """
+    Se lanza (o se reporta por ítem en un lote) cuando un producto no existe.
+    """
+
+
+class CambioDescartadoError(Exception):
+    """
+    Se lanza cuando un cambio se descartó porque falló la escritura que
+    debía persistirlo (la de otro hilo que lo incluía).
+    """
+
+
+# Elemento de un lote: ID del producto y función que modifica su copia de trabajo.
+CambioLote = Tuple[int, Callable[[dict], None]]
+ResultadoItem = Union[dict, Exception]
+
+
+def _resolver_lote(
+    actuales: Dict[int, dict],
+    cambios: List[CambioLote],
+    todo_o_nada: bool,
+    validar: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[bool, List[ResultadoItem], Dict[int, dict]]:
+    """
+    Aplica los cambios de un lote sobre copias de trabajo de los productos.
+
+    Un mismo producto puede aparecer varias veces; cada cambio ve el efecto
+    de los anteriores. Un cambio que falla no modifica su copia.
+
+    Args:
+        actuales (Dict[int, dict]): Productos involucrados, por ID.
+        cambios (List[CambioLote]): Cambios a aplicar en orden.
+        todo_o_nada (bool): Si es True, cualquier fallo descarta el lote entero.
+        validar (Optional[Callable[[int, int], None]]): Comprueba que el índice
+            de stock admita el producto resultante (ID y cantidad).
+
+    Returns:
+        Tuple[bool, List[ResultadoItem], Dict[int, dict]]: Si el lote se aplica,
+        el resultado de cada ítem (copia del producto o excepción) y los
+        productos modificados a persistir.
+    """
+    trabajo: Dict[int, dict] = {}
+    resultados: List[ResultadoItem] = []
+    for producto_id, cambio in cambios:
+        producto = trabajo.get(producto_id) or actuales.get(producto_id)
+        if producto is None:
+            resultados.append(ProductoNoEncontradoError(producto_id))
+            continue
+        candidato = dict(producto)
+        try:
+            cambio(candidato)
+            if validar is not None:
+                validar(producto_id, candidato.get("cantidad", 0))
+        except (StockInsuficienteError, ConflictoVersionError, StockFueraDeRangoError) as exc:
+            resultados.append(exc)
+            continue
+        trabajo[producto_id] = candidato
+        resultados.append(candidato)
+    fallos = any(isinstance(r, Exception) for r in resultados)
+    if todo_o_nada and fallos:
+        return False, resultados, {}
+    return True, resultados, trabajo
+
+
+class ProductoStore:
+    """
+    Almacén de productos con índice por ID y recarga según la firma del archivo.
+
+    Cada producto lleva un campo "version" que aumenta con cada escritura y
+    permite control de concurrencia optimista. Las operaciones de
+    lectura-modificación-escritura se serializan por producto con locks
+    segmentados, así que productos distintos no compiten entre sí.
+
+    Los ETag de las lecturas se arman sin serializar productos a partir de
+    la versión de cada producto y del estado persistido del catálogo, así que
+    todos los procesos que leen los mismos datos dan la misma marca, también
+    después de reiniciar (ver marca()).
+
+    Atributos:
+        ruta (str): Ruta al archivo JSON de productos.
+        aciertos (int): Lecturas servidas desde memoria sin tocar el archivo.
+        recargas (int): Veces que el archivo se ha parseado completo.
+        compacto (bool): Si los productos se guardan en columnas.
+    """
+
+    def __init__(self, ruta: str, compacto: bool = False) -> None:
+        """
+        Inicializa el almacén sin cargar todavía el archivo.
+
+        Args:
+            ruta (str): Ruta al archivo JSON de productos.
+            compacto (bool): Guardar los productos en columnas en lugar de
+                un diccionario por producto.
+        """
+        self.ruta = ruta
+        self.compacto = compacto
+        self.aciertos = 0
+        self.recargas = 0
+        self._productos: Dict[int, dict] = TablaProductos() if compacto else {}
+        self._ultimo_id = 0
+        self._ids_ordenados: List[int] = array("q") if compacto else []
+        self._indice_stock = IndiceStockCompacto() if compacto else IndiceStock()
+        self._firma: Optional[Tuple[int, int, int]] = None
+        self._generacion = 0
+        self._generacion_volcada = 0
+        # Rangos (desde, hasta] de generaciones descartadas por un volcado fallido.
+        self._descartes: List[Tuple[int, int]] = []
+        # Último cambio de cada hilo pendiente de volcar: su generación o, en
+        # modo journal, el número de su registro en la bitácora.
+        self._pendiente = threading.local()
+        self._lock = threading.RLock()
+        self._lock_volcado = threading.Lock()
+        self._locks = LocksPorClave()
+
+    def _firma_archivo(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Calcula la firma actual del archivo en disco.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: (mtime_ns, tamaño, inodo) o None si no existe.
+        """
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+
+    def _cargar(self, productos: List[dict]) -> None:
+        """
+        Reemplaza el índice en memoria por los productos indicados.
+
+        Args:
+            productos (List[dict]): Productos leídos del almacenamiento.
+        """
+        if self.compacto:
+            self._productos = TablaProductos(productos)
+        else:
+            self._productos = {p["id"]: p for p in productos}
+        self._reindexar()
+
+    def _reindexar(self) -> None:
+        """
+        Reconstruye el último ID y la lista ordenada de IDs usada para paginar.
+        """
+        if self.compacto:
+            self._ids_ordenados = array("q", self._productos)
+            cantidades = self._productos.cantidades()
+        else:
+            self._ids_ordenados = sorted(self._productos)
+            cantidades = ((pid, p.get("cantidad", 0)) for pid, p in self._productos.items())
+        self._ultimo_id = self._ids_ordenados[-1] if self._ids_ordenados else 0
+        self._indice_stock.reconstruir(cantidades)
+
+    def marca(self, producto_id: Optional[int] = None) -> Optional[str]:
+        """
+        Retorna una marca que cambia cada vez que cambia el catálogo o, si se
+        indica un ID, cada vez que cambia ese producto.
+
+        No serializa productos. La de un producto es su ID y su versión, que
+        aumenta con cada escritura; la del catálogo sale del estado persistido
+        (ver _marca_catalogo()). Ninguna depende del proceso, así que los
+        workers coinciden y un reinicio no invalida las marcas de los clientes.
+
+        Args:
+            producto_id (Optional[int]): ID del producto, o None para el catálogo.
+
+        Returns:
+            Optional[str]: Marca opaca apta para un ETag, o None si se indicó
+                un ID y ese producto no existe.
+        """
+        with self._lock:
+            if producto_id is None:
+                return self._marca_catalogo()
+            version = self._version(producto_id)
+            return None if version is None else f"{producto_id}-{version}"
+
+    def _marca_catalogo(self) -> str:
+        """
+        Retorna la marca del catálogo: la firma del archivo y, si hay cambios
+        en memoria todavía sin escribir, la generación pendiente. Debe
+        llamarse con el lock tomado.
+        """
+        self._sincronizar()
+        marca = "-".join(map(str, self._firma)) if self._firma is not None else "0"
+        if self._generacion != self._generacion_volcada:
+            marca += f"+{self._generacion}"
+        return marca
+
+    def _version(self, producto_id: int) -> Optional[int]:
+        """
+        Retorna la versión de un producto o None si no existe. Debe llamarse
+        con el lock tomado.
+        """
+        self._sincronizar()
+        producto = self._productos.get(producto_id)
+        return None if producto is None else producto.get("version", 0)
+
+    def _sincronizar(self) -> None:
+        """
+        Recarga el archivo solo si su firma cambió desde la última lectura o escritura.
+
+        Mientras haya cambios en memoria pendientes de volcar, la memoria es
+        más reciente que el disco y no se recarga.
+        """
+        if self._generacion != self._generacion_volcada:
+            self.aciertos += 1
+            return
+        firma = self._firma_archivo()
+        if firma is not None and firma == self._firma:
+            self.aciertos += 1
+            return
+        self._cargar(leer_json(self.ruta) if firma is not None else [])
+        self._firma = firma
+        self.recargas += 1
+
+    def _volcar(self) -> None:
+        """
+        Escribe el catálogo completo en disco si hay cambios pendientes.
+
+        Se llama sin el lock principal: la copia del catálogo se toma bajo el
+        lock, pero la escritura ocurre fuera de él, de modo que las lecturas
+        siguen atendiéndose mientras se vuelca. Si otro hilo ya volcó una
+        generación que incluye los cambios propios, no se vuelve a escribir.
+
+        Si la escritura falla, los cambios pendientes se descartan (ver
+        _descartar()) y la excepción se propaga; los demás hilos con cambios
+        en esa escritura reciben CambioDescartadoError.
+
+        Raises:
+            CambioDescartadoError: Si el cambio de este hilo se descartó por
+                un volcado fallido de otro hilo.
+        """
+        propia = getattr(self._pendiente, "generacion", 0)
+        self._pendiente.generacion = 0
+        with self._lock_volcado:
+            with self._lock:
+                if any(desde < propia <= hasta for desde, hasta in self._descartes):
+                    raise CambioDescartadoError(propia)
+                generacion = self._generacion
+                if generacion == self._generacion_volcada:
+                    return
+                productos = list(self._productos.values())
+            try:
+                self._escribir(productos)
+            except BaseException:
+                with self._lock:
+                    self._descartar()
+                raise
+            with self._lock:
+                self._firma = self._firma_archivo()
+                self._generacion_volcada = generacion
+
+    def _descartar(self) -> None:
+        """
+        Descarta los cambios en memoria que no se pudieron volcar. Debe
+        llamarse con el lock tomado.
+
+        La memoria vuelve a ser copia del disco: la próxima lectura recarga
+        el archivo, así no se sirven valores que nunca se escribieron.
+        """
+        self._descartes.append((self._generacion_volcada, self._generacion))
+        self._generacion_volcada = self._generacion
+        self._firma = None
+
+    def _escribir(self, productos: List[dict]) -> None:
+        """
+        Escribe el catálogo completo en el archivo JSON.
+
+        Args:
+            productos (List[dict]): Productos a escribir.
+        """
+        escribir_json(self.ruta, productos)
+
+    def _registrar_guardado(self, producto: dict) -> None:
+        """
+        Marca la inserción o reemplazo de un producto como pendiente de volcar.
+
+        Args:
+            producto (dict): Producto guardado.
+        """
+        self._generacion += 1
+        self._pendiente.generacion = self._generacion
+
+    def _registrar_eliminado(self, producto_id: int) -> None:
+        """
+        Marca la eliminación de un producto como pendiente de volcar.
+
+        Args:
+            producto_id (int): ID del producto eliminado.
+        """
+        self._generacion += 1
+        self._pendiente.generacion = self._generacion
+
+    @staticmethod
+    def _verificar_version(producto: dict, version_esperada: Optional[int]) -> None:
+        """
+        Comprueba la versión esperada de un producto, si se indicó.
+
+        Args:
+            producto (dict): Producto actual.
+            version_esperada (Optional[int]): Versión que el cliente leyó.
+
+        Raises:
+            ConflictoVersionError: Si el producto cambió desde esa versión.
+        """
+        if version_esperada is not None and producto.get("version", 0) != version_esperada:
+            raise ConflictoVersionError(producto["id"])
+
+    def listar(self) -> List[dict]:
+        """
+        Retorna una copia de todos los productos en orden de inserción.
+
+        Returns:
+            List[dict]: Productos almacenados.
+        """
+        with self._lock:
+            self._sincronizar()
+            return [dict(p) for p in self._productos.values()]
+
+    def listar_sin_copia(self) -> List[dict]:
+        """
+        Retorna todos los productos sin copiarlos, para serializarlos.
+
+        Los productos guardados nunca se modifican en el lugar (cada escritura
+        inserta un diccionario nuevo), así que es seguro leerlos, pero quien
+        llama no debe modificarlos. En modo compacto cada producto se arma al
+        leerlo, así que igualmente son diccionarios nuevos.
+
+        Returns:
+            List[dict]: Productos almacenados, de solo lectura.
+        """
+        with self._lock:
+            self._sincronizar()
+            return list(self._productos.values())
+
+    def obtener(self, producto_id: int) -> Optional[dict]:
+        """
+        Busca un producto por su ID.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[dict]: Copia del producto o None si no existe.
+        """
+        with self._lock:
+            self._sincronizar()
+            producto = self._productos.get(producto_id)
+            return dict(producto) if producto is not None else None
+
+    def cantidad(self, producto_id: int) -> Optional[int]:
+        """
+        Retorna el stock de un producto en O(1), sin copiar el producto.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[int]: Cantidad disponible o None si no existe.
+        """
+        with self._lock:
+            self._sincronizar()
+            return self._indice_stock.cantidad(producto_id)
+
+    def pagina(self, despues_de: int = 0, limite: int = 100) -> List[dict]:
+        """
+        Retorna una página de productos ordenada por ID (paginación por clave).
+
+        Args:
+            despues_de (int): Cursor; se devuelven productos con ID mayor a este.
+            limite (int): Máximo de productos a devolver.
+
+        Returns:
+            List[dict]: Copia de los productos de la página.
+        """
+        with self._lock:
+            self._sincronizar()
+            inicio = bisect.bisect_right(self._ids_ordenados, despues_de)
+            ids = self._ids_ordenados[inicio:inicio + limite]
+            return [dict(self._productos[producto_id]) for producto_id in ids]
+
+    def guardar(self, producto: dict) -> dict:
+        """
+        Inserta o reemplaza un producto, incrementa su versión y lo persiste.
+
+        Args:
+            producto (dict): Producto completo, incluido su ID.
+
+        Returns:
+            dict: Copia del producto guardado.
+        """
+        with self._lock:
+            guardado = self._insertar(producto)
+        self._volcar()
+        return guardado
+
+    def _insertar(self, producto: dict) -> dict:
+        """
+        Inserta o reemplaza un producto en memoria. Debe llamarse con el lock tomado.
+
+        Args:
+            producto (dict): Producto completo, incluido su ID.
+
+        Returns:
+            dict: Copia del producto guardado con su nueva versión.
+
+        Raises:
+            StockFueraDeRangoError: Si el índice de stock no admite el producto;
+                en ese caso no se modifica nada.
+        """
+        self._sincronizar()
+        # Antes de tocar nada: un producto que el índice no admite no debe
+        # quedar en memoria sin persistir.
+        self._indice_stock.validar(producto["id"], producto.get("cantidad", 0))
+        anterior = self._productos.get(producto["id"])
+        producto = dict(producto)
+        producto["version"] = (anterior.get("version", 0) if anterior else 0) + 1
+        self._productos[producto["id"]] = producto
+        if anterior is None:
+            if producto["id"] > self._ultimo_id:
+                self._ids_ordenados.append(producto["id"])
+                self._ultimo_id = producto["id"]
+            else:
+                bisect.insort(self._ids_ordenados, producto["id"])
+        self._indice_stock.actualizar(producto["id"], producto.get("cantidad", 0))
+        self._registrar_guardado(producto)
+        return dict(producto)
+
+    def crear(self, datos: dict) -> dict:
+        """
+        Crea un producto asignándole el siguiente ID libre.
+
+        Args:
+            datos (dict): Campos del producto sin ID.
+
+        Returns:
+            dict: Copia del producto creado.
+        """
+        with self._lock:
+            self._sincronizar()
+            producto = dict(datos)
+            producto["id"] = self._ultimo_id + 1
+            producto.setdefault("ventas", 0)
+            creado = self._insertar(producto)
+        self._volcar()
+        return creado
+
+    def actualizar(
+        self, producto_id: int, cambios: dict, version_esperada: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Aplica cambios parciales a un producto.
+
+        Args:
+            producto_id (int): ID del producto.
+            cambios (dict): Campos a modificar.
+            version_esperada (Optional[int]): Versión leída por el cliente, si se exige.
+
+        Returns:
+            Optional[dict]: Copia del producto actualizado o None si no existe.
+
+        Raises:
+            ConflictoVersionError: Si la versión no coincide.
+        """
+        with self._locks.bloqueo(producto_id):
+            producto = self.obtener(producto_id)
+            if producto is None:
+                return None
+            self._verificar_version(producto, version_esperada)
+            producto.update(cambios)
+            return self.guardar(producto)
+
+    def eliminar(self, producto_id: int) -> bool:
+        """
+        Elimina un producto por su ID y persiste el cambio.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            bool: True si se eliminó, False si no existía.
+        """
+        with self._locks.bloqueo(producto_id):
+            with self._lock:
+                self._sincronizar()
+                if self._productos.pop(producto_id, None) is None:
+                    return False
+                del self._ids_ordenados[bisect.bisect_left(self._ids_ordenados, producto_id)]
+                self._indice_stock.eliminar(producto_id)
+                self._registrar_eliminado(producto_id)
+            self._volcar()
+            return True
+
+    def ajustar_cantidad(
+        self, producto_id: int, delta: int, version_esperada: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Suma o resta unidades al stock de un producto de forma atómica.
+
+        Args:
+            producto_id (int): ID del producto.
+            delta (int): Unidades a sumar (negativo para descontar).
+            version_esperada (Optional[int]): Versión leída por el cliente, si se exige.
+
+        Returns:
+            Optional[dict]: Copia del producto actualizado o None si no existe.
+
+        Raises:
+            StockInsuficienteError: Si el stock resultante sería negativo.
+            ConflictoVersionError: Si la versión no coincide.
+            StockFueraDeRangoError: Si el stock resultante no cabe en el índice.
+        """
+        with self._locks.bloqueo(producto_id):
+            producto = self.obtener(producto_id)
+            if producto is None:
+                return None
+            self._verificar_version(producto, version_esperada)
+            if producto["cantidad"] + delta < 0:
+                raise StockInsuficienteError(producto_id)
+            producto["cantidad"] += delta
+            return self.guardar(producto)
+
+    def incrementar_ventas(self, producto_id: int) -> Optional[dict]:
+        """
+        Suma una venta al contador del producto de forma atómica.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[dict]: Copia del producto actualizado o None si no existe.
+        """
+        with self._locks.bloqueo(producto_id):
+            producto = self.obtener(producto_id)
+            if producto is None:
+                return None
+            producto["ventas"] = producto.get("ventas", 0) + 1
+            return self.guardar(producto)
+
+    def _aplicar_lote(
+        self, cambios: List[CambioLote], todo_o_nada: bool
+    ) -> Tuple[bool, List[ResultadoItem]]:
+        """
+        Aplica un lote de cambios con una sola carga y un solo volcado.
+
+        Args:
+            cambios (List[CambioLote]): Cambios a aplicar en orden.
+            todo_o_nada (bool): Si es True, cualquier fallo descarta el lote entero.
+
+        Returns:
+            Tuple[bool, List[ResultadoItem]]: Si el lote se aplicó y el resultado por ítem.
+        """
+        with self._locks.bloqueo_multiple(producto_id for producto_id, _ in cambios):
+            with self._lock:
+                self._sincronizar()
+                aplicado, resultados, modificados = _resolver_lote(
+                    self._productos, cambios, todo_o_nada, self._indice_stock.validar
+                )
+                guardados = {pid: self._insertar(p) for pid, p in modificados.items()}
+            self._volcar()
+        return aplicado, self._resultados_finales(resultados, guardados)
+
+    @staticmethod
+    def _resultados_finales(
+        resultados: List[ResultadoItem], guardados: Dict[int, dict]
+    ) -> List[ResultadoItem]:
+        """
+        Completa los resultados de un lote con la versión final de cada producto.
+        """
+        for resultado in resultados:
+            if isinstance(resultado, dict) and resultado["id"] in guardados:
+                resultado["version"] = guardados[resultado["id"]]["version"]
+        return resultados
+
+    def crear_lote(self, lista_datos: List[dict]) -> List[dict]:
+        """
+        Crea varios productos con una sola carga y un solo volcado.
+
+        Args:
+            lista_datos (List[dict]): Campos de cada producto sin ID.
+
+        Returns:
+            List[dict]: Productos creados, en el mismo orden.
+        """
+        with self._lock:
+            self._sincronizar()
+            # Se validan todos antes de insertar el primero: un lote que el
+            # índice no admite no deja productos a medio crear.
+            for desplazamiento, datos in enumerate(lista_datos, start=1):
+                self._indice_stock.validar(
+                    self._ultimo_id + desplazamiento, datos.get("cantidad", 0)
+                )
+            creados = []
+            for datos in lista_datos:
+                producto = dict(datos)
+                producto["id"] = self._ultimo_id + 1
+                producto.setdefault("ventas", 0)
+                creados.append(self._insertar(producto))
+        self._volcar()
+        return creados
+
+    def actualizar_lote(
+        self, items: Iterable[Tuple[int, dict, Optional[int]]], todo_o_nada: bool = False
+    ) -> Tuple[bool, List[ResultadoItem]]:
+        """
+        Aplica cambios parciales a varios productos en un solo ciclo.
+
+        Args:
+            items (Iterable[Tuple[int, dict, Optional[int]]]): (ID, cambios, versión esperada).
+            todo_o_nada (bool): Si es True, cualquier fallo descarta el lote entero.
+
+        Returns:
+            Tuple[bool, List[ResultadoItem]]: Si el lote se aplicó y el resultado por ítem.
+        """
+        def cambio(datos: dict, version: Optional[int]) -> Callable[[dict], None]:
+            def aplicar(producto: dict) -> None:
+                self._verificar_version(producto, version)
+                producto.update(datos)
+            return aplicar
+
+        return self._aplicar_lote(
+            [(pid, cambio(datos, version)) for pid, datos, version in items], todo_o_nada
+        )
+
+    def ajustar_cantidades(
+        self, items: Iterable[Tuple[int, int, Optional[int]]], todo_o_nada: bool = False
+    ) -> Tuple[bool, List[ResultadoItem]]:
+        """
+        Ajusta el stock de varios productos en un solo ciclo.
+
+        Args:
+            items (Iterable[Tuple[int, int, Optional[int]]]): (ID, delta, versión esperada).
+            todo_o_nada (bool): Si es True, cualquier fallo descarta el lote entero.
+
+        Returns:
+            Tuple[bool, List[ResultadoItem]]: Si el lote se aplicó y el resultado por ítem.
+        """
+        def cambio(delta: int, version: Optional[int]) -> Callable[[dict], None]:
+            def aplicar(producto: dict) -> None:
+                self._verificar_version(producto, version)
+                if producto["cantidad"] + delta < 0:
+                    raise StockInsuficienteError(producto["id"])
+                producto["cantidad"] += delta
+            return aplicar
+
+        return self._aplicar_lote(
+            [(pid, cambio(delta, version)) for pid, delta, version in items], todo_o_nada
+        )
+
+    def incrementar_ventas_lote(
+        self, producto_ids: Iterable[int], todo_o_nada: bool = False
+    ) -> Tuple[bool, List[ResultadoItem]]:
+        """
+        Suma una venta a cada producto indicado en un solo ciclo.
+
+        Args:
+            producto_ids (Iterable[int]): IDs vendidos; pueden repetirse.
+            todo_o_nada (bool): Si es True, cualquier fallo descarta el lote entero.
+
+        Returns:
+            Tuple[bool, List[ResultadoItem]]: Si el lote se aplicó y el resultado por ítem.
+        """
+        def aplicar(producto: dict) -> None:
+            producto["ventas"] = producto.get("ventas", 0) + 1
+
+        return self._aplicar_lote([(pid, aplicar) for pid in producto_ids], todo_o_nada)
+
+    def stock_total(self) -> int:
+        """
+        Retorna la suma del stock de todos los productos en O(1).
+
+        Returns:
+            int: Stock total.
+        """
+        with self._lock:
+            self._sincronizar()
+            return self._indice_stock.total
+
+    def bajo_stock(self, umbral: int) -> List[dict]:
+        """
+        Retorna los productos con stock menor o igual al umbral en O(log n + k).
+
+        Args:
+            umbral (int): Stock máximo incluido.
+
+        Returns:
+            List[dict]: Copia de los productos, de menor a mayor stock.
+        """
+        with self._lock:
+            self._sincronizar()
+            return [dict(self._productos[pid]) for pid in self._indice_stock.hasta(umbral)]
+
+    def agotados(self) -> List[dict]:
+        """
+        Retorna los productos con stock cero sin recorrer el catálogo.
+
+        Returns:
+            List[dict]: Copia de los productos agotados, ordenados por ID.
+        """
+        with self._lock:
+            self._sincronizar()
+            return [dict(self._productos[pid]) for pid in sorted(self._indice_stock.agotados)]
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores de uso del almacén.
+
+        Returns:
+            dict: Aciertos, recargas y cantidad de productos en memoria.
+        """
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "recargas": self.recargas,
+                "productos": len(self._productos),
+            }
+
+
+class ProductoStoreCompartido(ProductoStore):
+    """
+    Almacén JSON que varios procesos (workers) escriben sobre el mismo archivo.
+
+    Cada escritura toma un lock entre procesos, relee el archivo si otro
+    proceso lo cambió, aplica el cambio, vuelca el catálogo e incrementa un
+    contador de generación compartido. Las lecturas comparan ese contador con
+    el último que vieron (sin stat del archivo) y recargan solo si cambió.
+    Dentro de un proceso las escrituras quedan serializadas por el mismo lock.
+    """
+
+    def __init__(self, ruta: str, compacto: bool = False) -> None:
+        """
+        Inicializa el almacén y abre el lock y el contador junto al archivo.
+
+        Args:
+            ruta (str): Ruta al archivo JSON de productos.
+            compacto (bool): Guardar los productos en columnas.
+        """
+        super().__init__(ruta, compacto)
+        self._bloqueo = BloqueoProcesos(ruta + ".lock")
+        self._contador = ContadorGeneracion(ruta + ".generacion")
+        self._generacion_vista: Optional[int] = None
+
+    def _sincronizar(self) -> None:
+        """
+        Recarga el archivo si otro proceso publicó una generación nueva.
+
+        El contador se lee antes que el archivo: si otro proceso escribe en el
+        medio, a lo sumo se recarga una vez de más.
+        """
+        if self._generacion != self._generacion_volcada:
+            self.aciertos += 1
+            return
+        generacion = self._contador.leer()
+        if generacion == self._generacion_vista:
+            self.aciertos += 1
+            return
+        firma = self._firma_archivo()
+        self._cargar(leer_json(self.ruta) if firma is not None else [])
+        self._firma = firma
+        self._generacion_vista = generacion
+        self.recargas += 1
+
+    def _marca_catalogo(self) -> str:
+        """
+        Retorna la generación compartida seguida de la marca de
+        ProductoStore._marca_catalogo(). Debe llamarse con el lock tomado.
+        """
+        marca = super()._marca_catalogo()
+        return f"{self._generacion_vista}-{marca}"
+
+    def _descartar(self) -> None:
+        """
+        Igual que ProductoStore._descartar, y olvida la generación vista para
+        que la próxima lectura recargue aunque nadie haya publicado otra.
+        """
+        super()._descartar()
+        self._generacion_vista = None
+
+    def _volcar(self) -> None:
+        """
+        Vuelca el catálogo y publica la generación nueva. Debe llamarse con
+        el lock entre procesos tomado.
+        """
+        with self._lock:
+            pendiente = self._generacion != self._generacion_volcada
+        super()._volcar()
+        if pendiente:
+            self._generacion_vista = self._contador.incrementar()
+
+    def guardar(self, producto: dict) -> dict:
+        """
+        Igual que ProductoStore.guardar, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().guardar(producto)
+
+    def crear(self, datos: dict) -> dict:
+        """
+        Igual que ProductoStore.crear, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().crear(datos)
+
+    def actualizar(
+        self, producto_id: int, cambios: dict, version_esperada: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Igual que ProductoStore.actualizar, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().actualizar(producto_id, cambios, version_esperada)
+
+    def eliminar(self, producto_id: int) -> bool:
+        """
+        Igual que ProductoStore.eliminar, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().eliminar(producto_id)
+
+    def ajustar_cantidad(
+        self, producto_id: int, delta: int, version_esperada: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Igual que ProductoStore.ajustar_cantidad, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().ajustar_cantidad(producto_id, delta, version_esperada)
+
+    def incrementar_ventas(self, producto_id: int) -> Optional[dict]:
+        """
+        Igual que ProductoStore.incrementar_ventas, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().incrementar_ventas(producto_id)
+
+    def _aplicar_lote(
+        self, cambios: List[CambioLote], todo_o_nada: bool
+    ) -> Tuple[bool, List[ResultadoItem]]:
+        """
+        Igual que ProductoStore._aplicar_lote, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super()._aplicar_lote(cambios, todo_o_nada)
+
+    def crear_lote(self, lista_datos: List[dict]) -> List[dict]:
+        """
+        Igual que ProductoStore.crear_lote, con el lock entre procesos tomado.
+        """
+        with self._bloqueo:
+            return super().crear_lote(lista_datos)
+
+
+class ProductoStoreMapeado(ProductoStoreCompartido):
+    """
+    Almacén compartido entre workers que no parsea el catálogo en cada proceso.
+
+    Junto al JSON se escribe un catálogo binario (ver catalogo_binario.py) que
+    cada worker mapea en memoria: las páginas las comparte el sistema
+    operativo, recargar es volver a mapear el archivo y leer un producto
+    decodifica solo su registro. Cada proceso guarda aparte solo la lista de
+    IDs y el índice de stock compactos, así que usa los mismos rangos que
+    PRODUCTOS_COMPACTOS. A cambio, cada escritura también reescribe el
+    catálogo binario.
+
+    Atributos:
+        ruta_catalogo (str): Ruta del catálogo binario.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        """
+        Inicializa el almacén sin mapear todavía el catálogo.
+
+        Args:
+            ruta (str): Ruta al archivo JSON de productos.
+        """
+        super().__init__(ruta, compacto=True)
+        self.ruta_catalogo = ruta + ".catalogo"
+        self._catalogo_escrito: Optional[CatalogoBinario] = None
+
+    def _sincronizar(self) -> None:
+        """
+        Vuelve a mapear el catálogo si otro proceso publicó una generación nueva.
+
+        Si el catálogo binario falta o no corresponde al JSON actual (primer
+        arranque, caída entre las dos escrituras, edición manual del JSON),
+        se regenera desde el JSON.
+        """
+        if self._generacion != self._generacion_volcada:
+            self.aciertos += 1
+            return
+        generacion = self._contador.leer()
+        if generacion == self._generacion_vista:
+            self.aciertos += 1
+            return
+        firma = self._firma_archivo()
+        catalogo = abrir_catalogo(self.ruta_catalogo, firma or (0, 0, 0))
+        if catalogo is None:
+            productos = leer_json(self.ruta) if firma is not None else []
+            escribir_catalogo(self.ruta_catalogo, productos, firma or (0, 0, 0))
+            catalogo = CatalogoBinario(self.ruta_catalogo)
+        self._productos = CatalogoMapeado(catalogo)
+        self._reindexar()
+        self._firma = firma
+        self._generacion_vista = generacion
+        self.recargas += 1
+
+    def _escribir(self, productos: List[dict]) -> None:
+        """
+        Escribe el JSON y, después, el catálogo binario con su firma.
+        """
+        super()._escribir(productos)
+        escribir_catalogo(self.ruta_catalogo, productos, self._firma_archivo())
+        self._catalogo_escrito = CatalogoBinario(self.ruta_catalogo)
+
+    def _volcar(self) -> None:
+        """
+        Vuelca y publica la generación nueva, y pasa a leer del catálogo
+        recién escrito en lugar de los cambios pendientes en memoria.
+        """
+        super()._volcar()
+        catalogo, self._catalogo_escrito = self._catalogo_escrito, None
+        if catalogo is not None:
+            with self._lock:
+                if self._generacion == self._generacion_volcada:
+                    self._productos = CatalogoMapeado(catalogo)
+
+
+class ProductoStoreJournal(ProductoStore):
+    """
+    Almacén de productos persistido como snapshot más bitácora de mutaciones.
+
+    Cada guardado o eliminación anexa un único registro compacto a la
+    bitácora, con costo O(1) respecto al tamaño del catálogo. Al superar el
+    umbral de registros, un hilo compacta la bitácora en un snapshot nuevo
+    escrito de forma atómica. Al arrancar se reproduce snapshot + bitácora.
+
+    Los registros se anexan con el lock del almacén tomado, pero la espera del
+    fsync (con esperar_fsync) ocurre en _volcar(), ya sin él: así los cambios
+    concurrentes comparten un mismo fsync y las lecturas no esperan al disco.
+
+    Atributos:
+        compactaciones (int): Compactaciones completadas.
+    """
+
+    def __init__(
+        self,
+        ruta: str,
+        lote_fsync: int = 64,
+        intervalo_fsync: float = 0.05,
+        umbral_compactacion: int = 10000,
+        compacto: bool = False,
+        esperar_fsync: bool = False,
+    ) -> None:
+        """
+        Inicializa el almacén y abre la bitácora asociada al snapshot.
+
+        Args:
+            ruta (str): Ruta al snapshot JSON de productos.
+            lote_fsync (int): Registros que fuerzan un fsync inmediato.
+            intervalo_fsync (float): Segundos máximos entre fsync agrupados.
+            umbral_compactacion (int): Registros de bitácora que disparan la compactación.
+            compacto (bool): Guardar los productos en columnas.
+            esperar_fsync (bool): Confirmar cada cambio recién cuando un fsync lo cubre.
+        """
+        super().__init__(ruta, compacto)
+        self.umbral_compactacion = umbral_compactacion
+        self.compactaciones = 0
+        self._compactando = False
+        self._journal = Journal(ruta + ".journal", lote_fsync, intervalo_fsync, esperar_fsync)
+
+    def _sincronizar(self) -> None:
+        """
+        Carga snapshot y bitácoras una única vez; después sirve siempre desde memoria.
+        """
+        if self._firma is not None:
+            self.aciertos += 1
+            return
+        self._cargar(leer_json(self.ruta) if os.path.exists(self.ruta) else [])
+        for bitacora in (self._journal.ruta + ".compactando", self._journal.ruta):
+            leidos = 0
+            for registro in Journal.leer(bitacora):
+                leidos += 1
+                if registro["op"] == "put":
+                    self._productos[registro["producto"]["id"]] = registro["producto"]
+                else:
+                    self._productos.pop(registro["id"], None)
+        # La bitácora no se cuenta al abrirla: los registros reproducidos de
+        # la actual (la última leída) cuentan para el umbral de compactación.
+        self._journal.registros += leidos
+        self._reindexar()
+        self._firma = self._firma_archivo() or (0, 0, 0)
+        self.recargas += 1
+
+    def _marca_catalogo(self) -> str:
+        """
+        Retorna la marca del catálogo: la firma del snapshot y el inodo y
+        tamaño de la bitácora, que crece con cada registro. Debe llamarse con
+        el lock tomado.
+        """
+        self._sincronizar()
+        return "-".join(map(str, (*self._firma, self._journal.inodo, self._journal.tamano)))
+
+    def _registrar_guardado(self, producto: dict) -> None:
+        """
+        Anexa un registro de guardado a la bitácora.
+
+        Args:
+            producto (dict): Producto guardado.
+        """
+        self._pendiente.numero = self._journal.registrar({"op": "put", "producto": producto})
+        self._programar_compactacion()
+
+    def _registrar_eliminado(self, producto_id: int) -> None:
+        """
+        Anexa un registro de eliminación a la bitácora.
+
+        Args:
+            producto_id (int): ID del producto eliminado.
+        """
+        self._pendiente.numero = self._journal.registrar({"op": "del", "id": producto_id})
+        self._programar_compactacion()
+
+    def _volcar(self) -> None:
+        """
+        Espera al fsync que cubre los registros que anexó este hilo. Se llama
+        sin el lock principal, como en ProductoStore; el catálogo nunca se
+        reescribe aquí, eso lo hace la compactación.
+        """
+        numero = getattr(self._pendiente, "numero", 0)
+        if numero:
+            self._pendiente.numero = 0
+            self._journal.confirmar(numero)
+
+    def _programar_compactacion(self) -> None:
+        """
+        Lanza la compactación en segundo plano si la bitácora superó el umbral.
+        """
+        if self._compactando or self._journal.registros < self.umbral_compactacion:
+            return
+        self._compactando = True
+        threading.Thread(target=self.compactar, daemon=True).start()
+
+    def compactar(self) -> None:
+        """
+        Pliega la bitácora en un snapshot nuevo escrito de forma atómica.
+
+        La bitácora se rota bajo el lock; el snapshot se escribe fuera de él,
+        así las mutaciones concurrentes siguen anexándose a la bitácora nueva.
+        """
+        try:
+            with self._lock:
+                self._sincronizar()
+                productos = list(self._productos.values())
+                rotada = self._journal.rotar()
+            escribir_json(self.ruta, productos)
+            with self._lock:
+                self._firma = self._firma_archivo()
+            os.remove(rotada)
+            self.compactaciones += 1
+        finally:
+            self._compactando = False
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores del almacén más el estado de la bitácora.
+
+        Returns:
+            dict: Aciertos, recargas, productos, registros en bitácora y compactaciones.
+        """
+        datos = super().estadisticas()
+        datos["registros_journal"] = self._journal.registros
+        datos["compactaciones"] = self.compactaciones
+        return datos
+
+
+class ProductoStoreSqlite(ProductoStore):
+    """
+    Almacén de productos respaldado por la tabla "productos" de SQLite.
+
+    Las búsquedas usan la clave primaria y los ajustes de stock son una única
+    sentencia UPDATE condicionada (stock y, opcionalmente, versión), sin
+    lectura-modificación-escritura.
+    """
+
+    COLUMNAS = ("id", "nombre", "descripcion", "precio", "cantidad", "ventas")
+
+    def __init__(self, pool: PoolSqlite) -> None:
+        """
+        Inicializa el almacén sobre un pool de conexiones.
+
+        Args:
+            pool (PoolSqlite): Pool de conexiones a la base de datos.
+        """
+        super().__init__(pool.ruta)
+        self.pool = pool
+
+    @staticmethod
+    def _validar_cantidad(producto_id: int, cantidad: int) -> None:
+        """
+        Comprueba que una cantidad quepa en una columna INTEGER de SQLite.
+
+        Raises:
+            StockFueraDeRangoError: Si no cabe en 64 bits con signo.
+        """
+        if not cabe(cantidad, "q"):
+            raise StockFueraDeRangoError(producto_id)
+
+    def _marca_catalogo(self) -> str:
+        """
+        Retorna el contador de cambios que los triggers de la tabla productos
+        mantienen en la base, compartido por todas las conexiones.
+        """
+        return str(self.pool.conexion().execute(
+            "SELECT cambios FROM cambios_catalogo WHERE id = 1"
+        ).fetchone()[0])
+
+    def _version(self, producto_id: int) -> Optional[int]:
+        """
+        Retorna la versión de un producto con una búsqueda por clave primaria.
+        """
+        fila = self.pool.conexion().execute(
+            "SELECT version FROM productos WHERE id = ?", (producto_id,)
+        ).fetchone()
+        return fila[0] if fila is not None else None
+
+    def listar(self) -> List[dict]:
+        """
+        Retorna todos los productos ordenados por ID.
+
+        Returns:
+            List[dict]: Productos almacenados.
+        """
+        filas = self.pool.conexion().execute("SELECT * FROM productos ORDER BY id")
+        self.aciertos += 1
+        return [dict(fila) for fila in filas]
+
+    def listar_sin_copia(self) -> List[dict]:
+        """
+        Retorna todos los productos; las filas ya son diccionarios nuevos.
+
+        Returns:
+            List[dict]: Productos almacenados.
+        """
+        return self.listar()
+
+    def obtener(self, producto_id: int) -> Optional[dict]:
+        """
+        Busca un producto por su ID.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[dict]: Producto o None si no existe.
+        """
+        fila = self.pool.conexion().execute(
+            "SELECT * FROM productos WHERE id = ?", (producto_id,)
+        ).fetchone()
+        self.aciertos += 1
+        return dict(fila) if fila is not None else None
+
+    def cantidad(self, producto_id: int) -> Optional[int]:
+        """
+        Retorna el stock de un producto por su clave primaria.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[int]: Cantidad disponible o None si no existe.
+        """
+        fila = self.pool.conexion().execute(
+            "SELECT cantidad FROM productos WHERE id = ?", (producto_id,)
+        ).fetchone()
+        self.aciertos += 1
+        return fila[0] if fila is not None else None
+
+    def pagina(self, despues_de: int = 0, limite: int = 100) -> List[dict]:
+        """
+        Retorna una página de productos ordenada por ID usando la clave primaria.
+
+        Args:
+            despues_de (int): Cursor; se devuelven productos con ID mayor a este.
+            limite (int): Máximo de productos a devolver.
+
+        Returns:
+            List[dict]: Productos de la página.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT * FROM productos WHERE id > ? ORDER BY id LIMIT ?", (despues_de, limite)
+        )
+        self.aciertos += 1
+        return [dict(fila) for fila in filas]
+
+    def guardar(self, producto: dict) -> dict:
+        """
+        Inserta o reemplaza un producto e incrementa su versión.
+
+        Args:
+            producto (dict): Producto completo, incluido su ID.
+
+        Returns:
+            dict: Producto guardado.
+        """
+        self._validar_cantidad(producto["id"], producto.get("cantidad", 0))
+        valores = dict(producto)
+        valores.setdefault("descripcion", "")
+        valores.setdefault("ventas", 0)
+        with self.pool.transaccion() as conexion:
+            conexion.execute(
+                "INSERT INTO productos (id, nombre, descripcion, precio, cantidad, ventas, version) "
+                "VALUES (:id, :nombre, :descripcion, :precio, :cantidad, :ventas, 1) "
+                "ON CONFLICT(id) DO UPDATE SET nombre = excluded.nombre, "
+                "descripcion = excluded.descripcion, precio = excluded.precio, "
+                "cantidad = excluded.cantidad, ventas = excluded.ventas, "
+                "version = productos.version + 1",
+                {columna: valores[columna] for columna in self.COLUMNAS},
+            )
+            fila = conexion.execute(
+                "SELECT * FROM productos WHERE id = ?", (valores["id"],)
+            ).fetchone()
+        return dict(fila)
+
+    def crear(self, datos: dict) -> dict:
+        """
+        Crea un producto; SQLite asigna el siguiente ID de la clave primaria.
+
+        Args:
+            datos (dict): Campos del producto sin ID.
+
+        Returns:
+            dict: Producto creado.
+        """
+        self._validar_cantidad(0, datos.get("cantidad", 0))
+        with self.pool.transaccion() as conexion:
+            cursor = conexion.execute(
+                "INSERT INTO productos (nombre, descripcion, precio, cantidad, ventas, version) "
+                "VALUES (?, ?, ?, ?, ?, 1)",
+                (
+                    datos["nombre"], datos.get("descripcion", ""), datos["precio"],
+                    datos.get("cantidad", 0), datos.get("ventas", 0),
+                ),
+            )
+            fila = conexion.execute(
+                "SELECT * FROM productos WHERE id = ?", (cursor.lastrowid,)
+            ).fetchone()
+        return dict(fila)
+
+    def _actualizar_condicionado(
+        self,
+        producto_id: int,
+        asignaciones: str,
+        parametros: tuple,
+        condicion: str = "",
+        parametros_condicion: tuple = (),
+        version_esperada: Optional[int] = None,
+    ) -> Tuple[Optional[dict], bool]:
+        """
+        Ejecuta un UPDATE por ID con condición y versión opcionales.
+
+        Args:
+            producto_id (int): ID del producto.
+            asignaciones (str): Fragmento SET de la sentencia.
+            parametros (tuple): Parámetros de las asignaciones.
+            condicion (str): Condición adicional del WHERE.
+            parametros_condicion (tuple): Parámetros de la condición adicional.
+            version_esperada (Optional[int]): Versión exigida, si se indicó.
+
+        Returns:
+            Tuple[Optional[dict], bool]: Fila resultante y si el UPDATE aplicó.
+        """
+        sentencia = f"UPDATE productos SET {asignaciones}, version = version + 1 WHERE id = ?"
+        argumentos = [*parametros, producto_id]
+        if condicion:
+            sentencia += f" AND {condicion}"
+            argumentos.extend(parametros_condicion)
+        if version_esperada is not None:
+            sentencia += " AND version = ?"
+            argumentos.append(version_esperada)
+        with self.pool.transaccion() as conexion:
+            cursor = conexion.execute(sentencia, argumentos)
+            fila = conexion.execute(
+                "SELECT * FROM productos WHERE id = ?", (producto_id,)
+            ).fetchone()
+        return (dict(fila) if fila is not None else None), cursor.rowcount > 0
+
+    def actualizar(
+        self, producto_id: int, cambios: dict, version_esperada: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Aplica cambios parciales con un único UPDATE.
+
+        Args:
+            producto_id (int): ID del producto.
+            cambios (dict): Campos a modificar.
+            version_esperada (Optional[int]): Versión leída por el cliente, si se exige.
+
+        Returns:
+            Optional[dict]: Producto actualizado o None si no existe.
+
+        Raises:
+            ConflictoVersionError: Si la versión no coincide.
+            StockFueraDeRangoError: Si la cantidad indicada no cabe en la
+                columna INTEGER (64 bits).
+        """
+        if "cantidad" in cambios:
+            self._validar_cantidad(producto_id, cambios["cantidad"])
+        columnas = {c: v for c, v in cambios.items() if c in self.COLUMNAS and c != "id"}
+        asignaciones = ", ".join(f"{columna} = ?" for columna in columnas) or "id = id"
+        producto, aplicado = self._actualizar_condicionado(
+            producto_id, asignaciones, tuple(columnas.values()),
+            version_esperada=version_esperada,
+        )
+        if producto is not None and not aplicado:
+            raise ConflictoVersionError(producto_id)
+        return producto
+
+    def eliminar(self, producto_id: int) -> bool:
+        """
+        Elimina un producto por su ID.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            bool: True si se eliminó, False si no existía.
+        """
+        cursor = self.pool.conexion().execute(
+            "DELETE FROM productos WHERE id = ?", (producto_id,)
+        )
+        return cursor.rowcount > 0
+
+    def ajustar_cantidad(
+        self, producto_id: int, delta: int, version_esperada: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Ajusta el stock con un único UPDATE que nunca lo deja por debajo de
+        cero ni fuera del rango de la columna INTEGER (64 bits).
+
+        Args:
+            producto_id (int): ID del producto.
+            delta (int): Unidades a sumar (negativo para descontar).
+            version_esperada (Optional[int]): Versión leída por el cliente, si se exige.
+
+        Returns:
+            Optional[dict]: Producto actualizado o None si no existe.
+
+        Raises:
+            StockInsuficienteError: Si el stock resultante sería negativo.
+            ConflictoVersionError: Si la versión no coincide.
+            StockFueraDeRangoError: Si el stock resultante no cabe en 64 bits.
+        """
+        self._validar_cantidad(producto_id, delta)
+        # Si la suma desborda, SQLite la calcula como REAL y el BETWEEN la rechaza.
+        producto, aplicado = self._actualizar_condicionado(
+            producto_id, "cantidad = cantidad + ?", (delta,),
+            condicion="cantidad + ? BETWEEN 0 AND ?",
+            parametros_condicion=(delta, 2 ** 63 - 1),
+            version_esperada=version_esperada,
+        )
+        if producto is None or aplicado:
+            return producto
+        self._verificar_version(producto, version_esperada)
+        if producto["cantidad"] + delta < 0:
+            raise StockInsuficienteError(producto_id)
+        raise StockFueraDeRangoError(producto_id)
+
+    def incrementar_ventas(self, producto_id: int) -> Optional[dict]:
+        """
+        Suma una venta al contador del producto con un único UPDATE.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[dict]: Producto actualizado o None si no existe.
+        """
+        producto, _ = self._actualizar_condicionado(producto_id, "ventas = ventas + 1", ())
+        return producto
+
+    def _aplicar_lote(
+        self, cambios: List[CambioLote], todo_o_nada: bool
+    ) -> Tuple[bool, List[ResultadoItem]]:
+        """
+        Aplica un lote de cambios dentro de una única transacción de escritura.
+
+        Args:
+            cambios (List[CambioLote]): Cambios a aplicar en orden.
+            todo_o_nada (bool): Si es True, cualquier fallo descarta el lote entero.
+
+        Returns:
+            Tuple[bool, List[ResultadoItem]]: Si el lote se aplicó y el resultado por ítem.
+        """
+        ids = list({producto_id for producto_id, _ in cambios})
+        with self.pool.transaccion() as conexion:
+            actuales: Dict[int, dict] = {}
+            for inicio in range(0, len(ids), 500):
+                tramo = ids[inicio:inicio + 500]
+                marcadores = ", ".join("?" * len(tramo))
+                for fila in conexion.execute(
+                    f"SELECT * FROM productos WHERE id IN ({marcadores})", tramo
+                ):
+                    actuales[fila["id"]] = dict(fila)
+            aplicado, resultados, modificados = _resolver_lote(
+                actuales, cambios, todo_o_nada, self._validar_cantidad
+            )
+            for producto in modificados.values():
+                producto["version"] = actuales[producto["id"]]["version"] + 1
+            conexion.executemany(
+                "UPDATE productos SET nombre = :nombre, descripcion = :descripcion, "
+                "precio = :precio, cantidad = :cantidad, ventas = :ventas, "
+                "version = :version WHERE id = :id",
+                list(modificados.values()),
+            )
+        return aplicado, self._resultados_finales(resultados, modificados)
+
+    def crear_lote(self, lista_datos: List[dict]) -> List[dict]:
+        """
+        Crea varios productos dentro de una única transacción.
+
+        Args:
+            lista_datos (List[dict]): Campos de cada producto sin ID.
+
+        Returns:
+            List[dict]: Productos creados, en el mismo orden.
+
+        Raises:
+            StockFueraDeRangoError: Si alguna cantidad no cabe en 64 bits; en
+                ese caso no se crea ninguno.
+        """
+        for datos in lista_datos:
+            self._validar_cantidad(0, datos.get("cantidad", 0))
+        creados = []
+        with self.pool.transaccion() as conexion:
+            for datos in lista_datos:
+                producto = {
+                    "nombre": datos["nombre"], "descripcion": datos.get("descripcion", ""),
+                    "precio": datos["precio"], "cantidad": datos.get("cantidad", 0),
+                    "ventas": datos.get("ventas", 0), "version": 1,
+                }
+                cursor = conexion.execute(
+                    "INSERT INTO productos (nombre, descripcion, precio, cantidad, ventas, version) "
+                    "VALUES (:nombre, :descripcion, :precio, :cantidad, :ventas, :version)",
+                    producto,
+                )
+                producto["id"] = cursor.lastrowid
+                creados.append(producto)
+        return creados
+
+    def stock_total(self) -> int:
+        """
+        Retorna el stock total que mantienen los triggers de la tabla productos.
+
+        Returns:
+            int: Stock total.
+        """
+        return self.pool.conexion().execute(
+            "SELECT total FROM agregados_stock WHERE id = 1"
+        ).fetchone()[0]
+
+    def bajo_stock(self, umbral: int) -> List[dict]:
+        """
+        Retorna los productos con stock menor o igual al umbral usando el índice por cantidad.
+
+        Args:
+            umbral (int): Stock máximo incluido.
+
+        Returns:
+            List[dict]: Productos, de menor a mayor stock.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT * FROM productos WHERE cantidad <= ? ORDER BY cantidad, id", (umbral,)
+        )
+        return [dict(fila) for fila in filas]
+
+    def agotados(self) -> List[dict]:
+        """
+        Retorna los productos con stock cero usando el índice por cantidad.
+
+        Returns:
+            List[dict]: Productos agotados, ordenados por ID.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT * FROM productos WHERE cantidad = 0 ORDER BY id"
+        )
+        return [dict(fila) for fila in filas]
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores de uso del almacén.
+
+        Returns:
+            dict: Lecturas servidas y cantidad de productos en la tabla.
+        """
+        total = self.pool.conexion().execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+        return {"aciertos": self.aciertos, "recargas": self.recargas, "productos": total}
+
+
+def crear_producto_store(ruta: str) -> ProductoStore:
+    """
+    Crea el almacén de productos según el modo de almacenamiento configurado.
+
+    Args:
+        ruta (str): Ruta al archivo JSON de productos.
+
+    Returns:
+        ProductoStore: Almacén JSON completo, con bitácora o SQLite.
+
+    Raises:
+        ValueError: Si se pide el modo "journal" con más de un worker.
+    """
+    if settings.almacenamiento == "sqlite":
+        return ProductoStoreSqlite(obtener_pool(settings.sqlite_path))
+    if settings.workers > 1:
+        if settings.almacenamiento == "journal":
+            raise ValueError('ALMACENAMIENTO="journal" no admite varios workers; use "json" o "sqlite"')
+        if settings.catalogo_mapeado:
+            return ProductoStoreMapeado(ruta)
+        return ProductoStoreCompartido(ruta, compacto=settings.productos_compactos)
+    if settings.almacenamiento == "journal":
+        return ProductoStoreJournal(
+            ruta,
+            lote_fsync=settings.journal_lote_fsync,
+            intervalo_fsync=settings.journal_intervalo_fsync,
+            esperar_fsync=settings.journal_esperar_fsync,
+            umbral_compactacion=settings.journal_umbral_compactacion,
+            compacto=settings.productos_compactos,
+        )
+    return ProductoStore(ruta, compacto=settings.productos_compactos)
+
+
+_stores: Dict[str, ProductoStore] = {}
+_stores_lock = threading.Lock()
+
+
+def obtener_producto_store(ruta: Optional[str] = None) -> ProductoStore:
+    """
+    Retorna el almacén compartido para un archivo de productos, creándolo la primera vez.
+
+    Productos e inventario deben leer y escribir sobre la misma instancia: dos
+    almacenes sobre el mismo archivo (o la misma bitácora) se pisarían.
+
+    Args:
+        ruta (Optional[str]): Ruta al archivo JSON de productos. Por defecto
+            la configurada en PRODUCTOS_PATH.
+
+    Returns:
+        ProductoStore: Almacén asociado a la ruta.
+    """
+    clave = os.path.abspath(ruta or settings.productos_path)
+    with _stores_lock:
+        if clave not in _stores:
+            _stores[clave] = crear_producto_store(clave)
+        return _stores[clave]
@@ -0,0 +1,382 @@
+"""
+Rollups de ventas por producto en cubetas de hora, día y mes (UTC).
+
+Cada venta suma a su cubeta horaria, diaria y mensual en el momento de
+guardarse, así que un reporte por rango no recorre el historial: la serie de
+un producto lee una cubeta por intervalo, y el total de un rango se arma con
+meses completos en el centro, días en los bordes y horas en los extremos, a lo
+sumo unas decenas de cubetas sea cual sea el volumen de ventas.
+
+En modo JSON los rollups viven en memoria y se rellenan al reproducir el libro
+de ventas. En SQLite son la tabla "ventas_rollup", mantenida por triggers.
+
+Reconstrucción desde el historial (SQLite):
+    python -m src.repositories.rollups_ventas
+"""
+
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.helpers.sqlite_utils import RECONSTRUIR_ROLLUPS, PoolSqlite, obtener_pool
+from src.repositories.ventas_columnar import marca_de_tiempo
+
+GRANULARIDADES = ("hora", "dia", "mes")
+
+_EPOCA = date(1970, 1, 1)
+
+# (cubeta, ventas, unidades, ingresos)
+FilaRollup = Tuple[int, int, int, float]
+
+
+def cubeta(granularidad: str, marca: float) -> int:
+    """
+    Retorna el número de cubeta que contiene una marca de tiempo.
+
+    Horas y días se cuentan desde la época; los meses como año * 12 + mes - 1.
+
+    Args:
+        granularidad (str): "hora", "dia" o "mes".
+        marca (float): Segundos desde la época.
+
+    Returns:
+        int: Número de cubeta.
+    """
+    if granularidad == "hora":
+        return int(marca // 3600)
+    if granularidad == "dia":
+        return int(marca // 86400)
+    fecha = datetime.fromtimestamp(marca, timezone.utc)
+    return fecha.year * 12 + fecha.month - 1
+
+
+def inicio_cubeta(granularidad: str, numero: int) -> datetime:
+    """
+    Retorna el instante (UTC) en que empieza una cubeta.
+
+    Args:
+        granularidad (str): "hora", "dia" o "mes".
+        numero (int): Número de cubeta.
+
+    Returns:
+        datetime: Inicio de la cubeta.
+    """
+    if granularidad == "hora":
+        return datetime.fromtimestamp(numero * 3600, timezone.utc)
+    if granularidad == "dia":
+        return datetime.fromtimestamp(numero * 86400, timezone.utc)
+    return datetime(numero // 12, numero % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _dia_inicio_mes(mes: int) -> int:
+    """
+    Retorna el día (desde la época) en que empieza un mes.
+    """
+    return (date(mes // 12, mes % 12 + 1, 1) - _EPOCA).days
+
+
+def descomponer_rango(desde: float, hasta: float) -> List[Tuple[str, int, int]]:
+    """
+    Cubre el rango [desde, hasta) con la menor cantidad de cubetas.
+
+    Los extremos se redondean hacia afuera a la hora: se incluyen la hora que
+    contiene desde y la que contiene hasta (salvo que hasta caiga justo al
+    comienzo de una hora), así que un rango que termina ahora incluye la hora
+    en curso. Devuelve tramos (granularidad, primera cubeta, cubeta final
+    excluida) que no se solapan.
+
+    Args:
+        desde (float): Inicio del rango en segundos desde la época.
+        hasta (float): Fin (excluido) del rango en segundos desde la época.
+
+    Returns:
+        List[Tuple[str, int, int]]: Tramos de cubetas a sumar.
+    """
+    hora_ini, hora_fin = int(desde // 3600), int(-(-hasta // 3600))
+    if hora_ini >= hora_fin:
+        return []
+    dia_ini, dia_fin = -(-hora_ini // 24), hora_fin // 24
+    if dia_ini >= dia_fin:
+        return [("hora", hora_ini, hora_fin)]
+    tramos = [("hora", hora_ini, dia_ini * 24), ("hora", dia_fin * 24, hora_fin)]
+    mes_ini = cubeta("mes", dia_ini * 86400)
+    if _dia_inicio_mes(mes_ini) != dia_ini:
+        mes_ini += 1
+    mes_fin = cubeta("mes", dia_fin * 86400)
+    if mes_ini >= mes_fin:
+        tramos.append(("dia", dia_ini, dia_fin))
+    else:
+        tramos += [
+            ("dia", dia_ini, _dia_inicio_mes(mes_ini)),
+            ("mes", mes_ini, mes_fin),
+            ("dia", _dia_inicio_mes(mes_fin), dia_fin),
+        ]
+    return [tramo for tramo in tramos if tramo[1] < tramo[2]]
+
+
+def _acumular(
+    cubetas: Dict[str, Dict[int, Dict[int, List]]],
+    producto_id: int,
+    cantidad: int,
+    total: float,
+    marca: float,
+    signo: int,
+) -> None:
+    """
+    Suma (o resta, con signo -1) una venta a sus tres cubetas en un juego de cubetas.
+    """
+    for granularidad in GRANULARIDADES:
+        por_cubeta = cubetas[granularidad].setdefault(producto_id, {})
+        numero = cubeta(granularidad, marca)
+        fila = por_cubeta.setdefault(numero, [0, 0, 0.0])
+        fila[0] += signo
+        fila[1] += signo * cantidad
+        fila[2] += signo * total
+        if fila[0] == 0:
+            del por_cubeta[numero]
+
+
+class RollupsVentas:
+    """
+    Rollups en memoria: por granularidad, producto y cubeta, las ventas,
+    unidades e ingresos acumulados.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa los rollups vacíos.
+        """
+        self._cubetas: Dict[str, Dict[int, Dict[int, List]]] = {g: {} for g in GRANULARIDADES}
+        self._lock = threading.Lock()
+
+    def _sumar(self, producto_id: int, cantidad: int, total: float, marca: float, signo: int) -> None:
+        """
+        Suma (o resta, con signo -1) una venta a sus tres cubetas.
+        """
+        with self._lock:
+            _acumular(self._cubetas, producto_id, cantidad, total, marca, signo)
+
+    def agregar(self, producto_id: int, cantidad: int, total: float, fecha: Optional[datetime]) -> None:
+        """
+        Suma una venta a sus cubetas. Las ventas sin fecha no se acumulan.
+
+        Args:
+            producto_id (int): ID del producto vendido.
+            cantidad (int): Unidades vendidas.
+            total (float): Total cobrado.
+            fecha (Optional[datetime]): Momento de la venta.
+        """
+        if fecha is not None:
+            self._sumar(producto_id, cantidad, total, marca_de_tiempo(fecha), 1)
+
+    def agregar_lote(self, ventas: Iterable) -> None:
+        """
+        Suma varias ventas a sus cubetas tomando el lock una sola vez.
+
+        Args:
+            ventas (Iterable[Venta]): Ventas a sumar; las que no tienen fecha no se acumulan.
+        """
+        with self._lock:
+            for venta in ventas:
+                if venta.fecha is not None:
+                    _acumular(
+                        self._cubetas, venta.producto_id, venta.cantidad, venta.total,
+                        marca_de_tiempo(venta.fecha), 1,
+                    )
+
+    def quitar(self, producto_id: int, cantidad: int, total: float, fecha: Optional[datetime]) -> None:
+        """
+        Descuenta una venta eliminada de sus cubetas.
+
+        Args:
+            producto_id (int): ID del producto vendido.
+            cantidad (int): Unidades vendidas.
+            total (float): Total cobrado.
+            fecha (Optional[datetime]): Momento de la venta.
+        """
+        if fecha is not None:
+            self._sumar(producto_id, cantidad, total, marca_de_tiempo(fecha), -1)
+
+    def reconstruir(self, ventas: Iterable) -> None:
+        """
+        Recalcula todos los rollups a partir del historial de ventas.
+
+        Args:
+            ventas (Iterable[Venta]): Ventas vigentes.
+        """
+        # Las cubetas nuevas se arman aparte y se publican de una vez: una
+        # consulta concurrente ve las anteriores o las nuevas, nunca a medias.
+        cubetas: Dict[str, Dict[int, Dict[int, List]]] = {g: {} for g in GRANULARIDADES}
+        for venta in ventas:
+            if venta.fecha is not None:
+                _acumular(
+                    cubetas, venta.producto_id, venta.cantidad, venta.total,
+                    marca_de_tiempo(venta.fecha), 1,
+                )
+        with self._lock:
+            self._cubetas = cubetas
+
+    def exportar(self) -> dict:
+        """
+        Retorna las cubetas para una instantánea, sin copiarlas: deben
+        serializarse antes de la siguiente venta.
+
+        Returns:
+            dict: Granularidad → producto → cubeta → [ventas, unidades, ingresos].
+        """
+        with self._lock:
+            return self._cubetas
+
+    def importar(self, cubetas: dict) -> None:
+        """
+        Reemplaza las cubetas por las de una instantánea (ver exportar()).
+
+        Args:
+            cubetas (dict): Valor retornado por exportar().
+        """
+        with self._lock:
+            self._cubetas = cubetas
+
+    def serie(self, producto_id: int, granularidad: str, inicio: int, fin: int) -> List[FilaRollup]:
+        """
+        Retorna las cubetas con ventas de un producto en [inicio, fin).
+
+        Args:
+            producto_id (int): ID del producto.
+            granularidad (str): "hora", "dia" o "mes".
+            inicio (int): Primera cubeta incluida.
+            fin (int): Cubeta final excluida.
+
+        Returns:
+            List[FilaRollup]: (cubeta, ventas, unidades, ingresos) en orden.
+        """
+        with self._lock:
+            por_cubeta = self._cubetas[granularidad].get(producto_id, {})
+            if fin - inicio > len(por_cubeta):
+                numeros = sorted(n for n in por_cubeta if inicio <= n < fin)
+            else:
+                numeros = [n for n in range(inicio, fin) if n in por_cubeta]
+            return [(n, *por_cubeta[n]) for n in numeros]
+
+    def totales(self, producto_id: int, desde: float, hasta: float) -> Tuple[int, int, float]:
+        """
+        Suma las ventas de un producto en un rango combinando pocas cubetas.
+
+        Args:
+            producto_id (int): ID del producto.
+            desde (float): Inicio del rango en segundos desde la época.
+            hasta (float): Fin del rango en segundos desde la época (ver
+                descomponer_rango() para el redondeo a la hora).
+
+        Returns:
+            Tuple[int, int, float]: Ventas, unidades e ingresos.
+        """
+        ventas, unidades, ingresos = 0, 0, 0.0
+        for granularidad, inicio, fin in descomponer_rango(desde, hasta):
+            for _, n, u, i in self.serie(producto_id, granularidad, inicio, fin):
+                ventas, unidades, ingresos = ventas + n, unidades + u, ingresos + i
+        return ventas, unidades, ingresos
+
+
+class RollupsVentasSqlite:
+    """
+    Rollups sobre la tabla "ventas_rollup", que los triggers de "ventas"
+    mantienen al día en la misma transacción que cada alta o baja.
+    """
+
+    def __init__(self, pool: PoolSqlite) -> None:
+        """
+        Inicializa los rollups y los calcula si la tabla está recién creada.
+
+        Args:
+            pool (PoolSqlite): Pool de conexiones a la base de datos.
+        """
+        self.pool = pool
+        conexion = self.pool.conexion()
+        vacia = conexion.execute("SELECT 1 FROM ventas_rollup LIMIT 1").fetchone() is None
+        con_ventas = conexion.execute(
+            "SELECT 1 FROM ventas WHERE fecha IS NOT NULL LIMIT 1"
+        ).fetchone() is not None
+        if vacia and con_ventas:
+            self.reconstruir()
+
+    def agregar(self, producto_id: int, cantidad: int, total: float, fecha: Optional[datetime]) -> None:
+        """
+        No hace nada: el trigger de inserción ya sumó la venta.
+        """
+
+    def agregar_lote(self, ventas: Iterable) -> None:
+        """
+        No hace nada: el trigger de inserción ya sumó las ventas.
+        """
+
+    def quitar(self, producto_id: int, cantidad: int, total: float, fecha: Optional[datetime]) -> None:
+        """
+        No hace nada: el trigger de borrado ya descontó la venta.
+        """
+
+    def reconstruir(self, ventas: Optional[Iterable] = None) -> None:
+        """
+        Recalcula la tabla de rollups desde la tabla de ventas.
+
+        Args:
+            ventas: Ignorado; el historial se lee de la base de datos.
+        """
+        with self.pool.transaccion() as conexion:
+            for sentencia in RECONSTRUIR_ROLLUPS:
+                conexion.execute(sentencia)
+
+    def serie(self, producto_id: int, granularidad: str, inicio: int, fin: int) -> List[FilaRollup]:
+        """
+        Retorna las cubetas con ventas de un producto en [inicio, fin).
+
+        Args:
+            producto_id (int): ID del producto.
+            granularidad (str): "hora", "dia" o "mes".
+            inicio (int): Primera cubeta incluida.
+            fin (int): Cubeta final excluida.
+
+        Returns:
+            List[FilaRollup]: (cubeta, ventas, unidades, ingresos) en orden.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT cubeta, ventas, unidades, ingresos FROM ventas_rollup "
+            "WHERE producto_id = ? AND granularidad = ? AND cubeta >= ? AND cubeta < ? "
+            "ORDER BY cubeta",
+            (producto_id, granularidad, inicio, fin),
+        )
+        return [tuple(fila) for fila in filas]
+
+    def totales(self, producto_id: int, desde: float, hasta: float) -> Tuple[int, int, float]:
+        """
+        Suma las ventas de un producto en un rango combinando pocas cubetas.
+
+        Args:
+            producto_id (int): ID del producto.
+            desde (float): Inicio del rango en segundos desde la época.
+            hasta (float): Fin del rango en segundos desde la época (ver
+                descomponer_rango() para el redondeo a la hora).
+
+        Returns:
+            Tuple[int, int, float]: Ventas, unidades e ingresos.
+        """
+        tramos = descomponer_rango(desde, hasta)
+        if not tramos:
+            return 0, 0, 0.0
+        condicion = " OR ".join(["(granularidad = ? AND cubeta >= ? AND cubeta < ?)"] * len(tramos))
+        fila = self.pool.conexion().execute(
+            "SELECT COALESCE(SUM(ventas), 0), COALESCE(SUM(unidades), 0), "
+            "COALESCE(SUM(ingresos), 0.0) FROM ventas_rollup "
+            f"WHERE producto_id = ? AND ({condicion})",
+            (producto_id, *[valor for tramo in tramos for valor in tramo]),
+        ).fetchone()
+        return fila[0], fila[1], fila[2]
+
+
+if __name__ == "__main__":
+    if settings.almacenamiento != "sqlite":
+        print("En modo JSON los rollups se reconstruyen en memoria al reproducir el libro de ventas.")
+    else:
+        RollupsVentasSqlite(obtener_pool(settings.sqlite_path)).reconstruir()
+        print("Rollups de ventas reconstruidos.")
@@ -0,0 +1,201 @@
+"""
+Tabla compacta de productos para el modo PRODUCTOS_COMPACTOS.
+
+Reemplaza al diccionario ID → dict del almacén. Cada producto ocupa una fila
+repartida en columnas: los campos numéricos en arreglos "array" de tipo fijo
+(8 bytes por valor, sin objetos encajonados) y nombre y descripción en listas
+que solo guardan la referencia a la cadena. Un mapa denso por ID (ver
+mapa_denso.py) ubica la fila de cada producto; las filas liberadas por una
+baja se reutilizan.
+
+Se comporta como un MutableMapping[int, dict]: leer un producto construye un
+diccionario nuevo a partir de su fila, así que quien lo recibe puede
+modificarlo sin afectar a la tabla. Los campos que no forman parte del esquema,
+o cuyo tipo no cabe en su columna, se conservan aparte por fila.
+"""
+
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from src.helpers.mapa_denso import MapaDenso
+
+# Columnas numéricas: nombre del campo y código de tipo del arreglo.
+NUMERICAS = (("precio", "d"), ("cantidad", "q"), ("ventas", "q"), ("version", "q"))
+TEXTO = ("nombre", "descripcion")
+CAMPOS = frozenset(("id", *TEXTO, *(campo for campo, _ in NUMERICAS)))
+
+
+def cabe(valor: Any, tipo: str) -> bool:
+    """
+    Indica si un valor puede guardarse sin pérdida en una columna del tipo dado.
+    """
+    if tipo == "d":
+        return type(valor) is float or (type(valor) is int and abs(valor) < 2 ** 53)
+    return type(valor) is int and -(2 ** 63) <= valor < 2 ** 63
+
+
+class TablaProductos(MutableMapping):
+    """
+    Productos en columnas paralelas indexadas por fila.
+
+    Se recorren en orden de ID.
+    """
+
+    def __init__(self, productos: Iterable[dict] = ()) -> None:
+        """
+        Inicializa la tabla, opcionalmente con productos iniciales.
+
+        Args:
+            productos (Iterable[dict]): Productos completos, con su ID.
+        """
+        self._filas = MapaDenso()
+        self._texto: Dict[str, List[Any]] = {campo: [] for campo in TEXTO}
+        self._numeros: Dict[str, array] = {campo: array(tipo) for campo, tipo in NUMERICAS}
+        self._extras: Dict[int, dict] = {}
+        self._libres = array("q")
+        self._anexar(productos)
+
+    def __len__(self) -> int:
+        """
+        Retorna la cantidad de productos.
+        """
+        return len(self._filas)
+
+    def __contains__(self, producto_id: object) -> bool:
+        """
+        Indica si hay un producto con ese ID.
+        """
+        return self._filas.get(producto_id) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Recorre los IDs en orden ascendente.
+        """
+        return self._filas.claves()
+
+    def __getitem__(self, producto_id: int) -> dict:
+        """
+        Construye un diccionario nuevo con los datos del producto.
+
+        Raises:
+            KeyError: Si no hay un producto con ese ID.
+        """
+        fila = self._filas.get(producto_id)
+        if fila < 0:
+            raise KeyError(producto_id)
+        numeros = self._numeros
+        producto = {
+            "id": producto_id,
+            "nombre": self._texto["nombre"][fila],
+            "descripcion": self._texto["descripcion"][fila],
+            "precio": numeros["precio"][fila],
+            "cantidad": numeros["cantidad"][fila],
+            "ventas": numeros["ventas"][fila],
+            "version": numeros["version"][fila],
+        }
+        extras = self._extras.get(fila)
+        if extras:
+            producto.update(extras)
+        return producto
+
+    def get(self, producto_id: int, defecto: Any = None) -> Any:
+        """
+        Retorna el producto o el valor por defecto si no existe.
+        """
+        return self[producto_id] if producto_id in self else defecto
+
+    def __setitem__(self, producto_id: int, producto: dict) -> None:
+        """
+        Inserta o reemplaza un producto en su fila.
+        """
+        fila = self._filas.get(producto_id)
+        if fila < 0:
+            fila = self._libres.pop() if self._libres else self._nueva_fila()
+            self._filas[producto_id] = fila
+        extras = {
+            campo: valor for campo, valor in producto.items()
+            if campo != "id" and campo not in self._texto and campo not in self._numeros
+        }
+        for campo, columna in self._texto.items():
+            columna[fila] = producto.get(campo, "")
+        for campo, tipo in NUMERICAS:
+            valor = producto.get(campo, 0)
+            if cabe(valor, tipo):
+                self._numeros[campo][fila] = valor
+            else:
+                self._numeros[campo][fila] = 0
+                extras[campo] = valor
+        if extras:
+            self._extras[fila] = extras
+        else:
+            self._extras.pop(fila, None)
+
+    def __delitem__(self, producto_id: int) -> None:
+        """
+        Quita un producto y deja su fila libre para reutilizarla.
+
+        Raises:
+            KeyError: Si no hay un producto con ese ID.
+        """
+        fila = self._filas.quitar(producto_id)
+        if fila < 0:
+            raise KeyError(producto_id)
+        for columna in self._texto.values():
+            columna[fila] = None
+        self._extras.pop(fila, None)
+        self._libres.append(fila)
+
+    def _anexar(self, productos: Iterable[dict]) -> None:
+        """
+        Carga productos nuevos agregando filas al final de las columnas.
+
+        Es la ruta de la carga inicial: los productos con exactamente los
+        campos del esquema y tipos esperados se anexan sin pasar por
+        __setitem__; el resto (IDs repetidos, campos extra, valores fuera de
+        tipo) usa la ruta general.
+        """
+        nombre, descripcion = (self._texto[campo] for campo in TEXTO)
+        precio, cantidad, ventas, version = (self._numeros[campo] for campo, _ in NUMERICAS)
+        for producto in productos:
+            producto_id = producto["id"]
+            numeros = (
+                producto.get("cantidad", 0), producto.get("ventas", 0), producto.get("version", 0)
+            )
+            if (
+                producto_id in self
+                or not producto.keys() <= CAMPOS
+                or type(producto.get("precio", 0.0)) is not float
+                or not all(cabe(valor, "q") for valor in numeros)
+            ):
+                self[producto_id] = producto
+                continue
+            self._filas[producto_id] = len(precio)
+            nombre.append(producto.get("nombre", ""))
+            descripcion.append(producto.get("descripcion", ""))
+            precio.append(producto.get("precio", 0.0))
+            cantidad.append(numeros[0])
+            ventas.append(numeros[1])
+            version.append(numeros[2])
+
+    def _nueva_fila(self) -> int:
+        """
+        Agrega una fila vacía al final de todas las columnas.
+        """
+        for columna in self._texto.values():
+            columna.append(None)
+        for columna in self._numeros.values():
+            columna.append(0)
+        return len(self._texto["nombre"]) - 1
+
+    def cantidades(self) -> Iterator[Tuple[int, int]]:
+        """
+        Recorre los pares (ID, cantidad) sin construir los productos.
+
+        Yields:
+            Tuple[int, int]: ID y stock de cada producto, en orden de ID.
+        """
+        columna = self._numeros["cantidad"]
+        for producto_id in self:
+            fila = self._filas.get(producto_id)
+            yield producto_id, self._extras.get(fila, {}).get("cantidad", columna[fila])
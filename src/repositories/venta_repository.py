@@ -2,48 +2,279 @@
 Repositorio para la gestión de ventas.
 
 Este módulo contiene funciones para leer, guardar y eliminar datos de ventas
-desde un archivo JSON. El repositorio es responsable únicamente del acceso
-y persistencia de datos.
+desde un libro NDJSON segmentado o una tabla SQLite. El repositorio es responsable
+únicamente del acceso y persistencia de datos.
+
+Con varios workers (WORKERS > 1) se usan las variantes "Compartido", que
+coordinan las escrituras entre procesos y mantienen al día la copia en
+memoria de cada uno (ver coordinacion.py).
 """
 
 import json
-from typing import List, Optional
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 from src.models.venta import Venta
 from src.config.settings import settings
+from src.helpers.coordinacion import BloqueoProcesos, ContadorGeneracion
+from src.helpers.indice_texto import IndiceTexto, normalizar, tokenizar
+from src.helpers.instantanea import cargar_instantanea, guardar_instantanea
+from src.helpers.journal import Journal
+from src.helpers.libro_segmentado import LibroSegmentado, Pendiente
+from src.helpers.sqlite_utils import PoolSqlite, obtener_pool
+from src.repositories.rollups_ventas import RollupsVentas, RollupsVentasSqlite
+from src.repositories.ventas_columnar import VentasColumnar, marca_de_tiempo
 
 
 class VentaRepository:
     """
     Clase encargada de interactuar con el origen de datos de ventas.
+
+    Las ventas se persisten en un libro NDJSON de solo anexado partido en
+    segmentos diarios (o por tamaño): registrar una venta anexa una línea en
+    lugar de reescribir el historial, y eliminarla anexa una lápida
+    ({"op": "del"}). Al arrancar se reproducen los segmentos en orden.
+
+    En memoria las ventas se indexan por ID (en orden de inserción) y por
+    producto, de modo que buscar, eliminar o listar las ventas de un producto
+    no recorre todo el historial. Los IDs salen de un contador monótono que
+    nunca reutiliza el de una venta eliminada. Además se mantiene una copia
+    columnar (ver ventas_columnar.py) y rollups por hora, día y mes (ver
+    rollups_ventas.py) para la analítica, y un índice de texto sobre el
+    nombre del cliente para filtrar sin recorrer todas las ventas.
+
+    Con INSTANTANEAS activado, todo ese estado se guarda en una instantánea
+    binaria (ver instantanea.py) junto con cuántos bytes de cada segmento
+    refleja. Al arrancar se carga la instantánea y solo se reproduce lo que
+    se anexó después; si no sirve (otra versión, segmentos reescritos) se
+    reproduce el libro completo y se escribe una nueva.
+
+    Atributos:
+        columnas (VentasColumnar): Ventas vigentes en columnas paralelas.
+        rollups (RollupsVentas): Ventas acumuladas por producto y período.
+        clientes (IndiceTexto): Ventas indexadas por nombre de cliente.
     """
 
     def __init__(self) -> None:
         """
-        Inicializa el repositorio cargando el archivo de ventas desde la ruta configurada.
+        Inicializa el repositorio reproduciendo el libro de ventas configurado.
+        """
+        self.ventas_path = Path(settings.ventas_path)
+        self.libro = LibroSegmentado(
+            settings.ventas_segmentos_dir,
+            "ventas",
+            max_bytes=settings.ventas_segmento_max_bytes,
+            lote_fsync=settings.journal_lote_fsync,
+            intervalo_fsync=settings.journal_intervalo_fsync,
+            esperar_fsync=settings.journal_esperar_fsync,
+        )
+        self._ventas: Dict[int, Venta] = {}
+        self._por_producto: Dict[int, Dict[int, Venta]] = {}
+        self.columnas = VentasColumnar()
+        self.rollups = RollupsVentas()
+        self.clientes = IndiceTexto()
+        self._siguiente_id = 1
+        self._lock = threading.Lock()
+        self.ruta_instantanea = os.path.join(settings.ventas_segmentos_dir, "ventas.instantanea")
+        self._cargar_ventas()
+
+    @property
+    def ventas(self) -> List[Venta]:
+        """
+        Lista de ventas en orden de inserción.
+        """
+        return list(self._ventas.values())
+
+    def _indexar(self, venta: Venta) -> None:
+        """
+        Agrega una venta a los índices por ID y por producto.
+
+        Args:
+            venta (Venta): Venta a indexar.
+        """
+        self._indexar_lote([venta])
+
+    def _indexar_lote(self, ventas: List[Venta]) -> None:
+        """
+        Agrega varias ventas a los índices; la copia columnar y los rollups
+        se actualizan con una sola llamada para todo el lote.
+
+        Args:
+            ventas (List[Venta]): Ventas a indexar.
         """
-        self.ventas_path = Path(settings.VENTAS_PATH)
-        self.ventas = self._cargar_ventas()
+        for venta in ventas:
+            self._ventas[venta.id] = venta
+            self._por_producto.setdefault(venta.producto_id, {})[venta.id] = venta
+            if venta.cliente:
+                self.clientes.agregar(venta.id, [(venta.cliente, 1)])
+        self.columnas.agregar_lote([
+            (venta.id, venta.producto_id, venta.cantidad, venta.total, marca_de_tiempo(venta.fecha))
+            for venta in ventas
+        ])
+        self.rollups.agregar_lote(ventas)
 
-    def _cargar_ventas(self) -> List[Venta]:
+    def _desindexar(self, venta_id: int) -> Optional[Venta]:
         """
-        Carga las ventas desde el archivo JSON.
+        Quita una venta de los índices por ID y por producto.
+
+        Args:
+            venta_id (int): ID de la venta.
 
         Returns:
-            List[Venta]: Lista de ventas cargadas.
+            Optional[Venta]: Venta quitada o None si no estaba indexada.
+        """
+        venta = self._ventas.pop(venta_id, None)
+        if venta is None:
+            return None
+        ventas_producto = self._por_producto[venta.producto_id]
+        del ventas_producto[venta_id]
+        if not ventas_producto:
+            del self._por_producto[venta.producto_id]
+        self.columnas.quitar(venta_id)
+        self.rollups.quitar(venta.producto_id, venta.cantidad, venta.total, venta.fecha)
+        self.clientes.quitar(venta_id)
+        return venta
+
+    def _importar_json_heredado(self) -> None:
+        """
+        Pasa al libro las ventas del antiguo archivo JSON, si lo hay.
+
+        Solo se hace cuando todavía no existe ningún segmento; a partir de
+        entonces el archivo JSON deja de leerse. Las ventas se anexan en un
+        solo lote (una escritura y un fsync al cerrar) en vez de una por una.
         """
         if not self.ventas_path.exists():
-            return []
+            return
         with open(self.ventas_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-            return [Venta(**venta) for venta in data]
+        self.libro.registrar_lote([{"op": "put", "venta": venta} for venta in data])
+        self.libro.cerrar()
+
+    def _cargar_ventas(self) -> None:
+        """
+        Reconstruye los índices a partir de la instantánea, si la hay, y de
+        los registros del libro que no refleja.
 
-    def _guardar_ventas(self) -> None:
+        Los segmentos se leen de a uno y línea a línea; las lápidas quitan la
+        venta correspondiente. Si hubo que reproducir al menos
+        INSTANTANEA_UMBRAL registros, se guarda una instantánea nueva.
         """
-        Guarda la lista de ventas en el archivo JSON.
+        if not self.libro.segmentos():
+            self._importar_json_heredado()
+        segmentos = [(ruta, os.path.getsize(ruta)) for ruta in self.libro.segmentos()]
+        leidos = self._restaurar_instantanea(segmentos) if settings.instantaneas else {}
+        reproducidos = self._reproducir(segmentos, leidos)
+        if settings.instantaneas and reproducidos >= settings.instantanea_umbral:
+            self._escribir_instantanea()
+
+    def _reproducir(self, segmentos: List[Tuple[str, int]], leidos: Dict[str, int]) -> int:
+        """
+        Aplica los registros de cada segmento a partir de los bytes ya leídos.
+
+        Args:
+            segmentos (List[Tuple[str, int]]): Ruta y tamaño de cada segmento.
+            leidos (Dict[str, int]): Bytes ya reflejados en memoria, por nombre de segmento.
+
+        Returns:
+            int: Registros aplicados.
+        """
+        reproducidos = 0
+        ultimo_id = self._siguiente_id - 1
+        for ruta, tamano in segmentos:
+            desde = leidos.get(os.path.basename(ruta), 0)
+            if desde >= tamano:
+                continue
+            for registro in Journal.leer(ruta, desde):
+                reproducidos += 1
+                if registro["op"] == "put":
+                    venta = Venta(**registro["venta"])
+                    self._indexar(venta)
+                    ultimo_id = max(ultimo_id, venta.id)
+                else:
+                    self._desindexar(registro["id"])
+        self._siguiente_id = ultimo_id + 1
+        self._segmentos_leidos = {os.path.basename(ruta): tamano for ruta, tamano in segmentos}
+        return reproducidos
+
+    def _restaurar_instantanea(self, segmentos: List[Tuple[str, int]]) -> Dict[str, int]:
         """
-        with open(self.ventas_path, "w", encoding="utf-8") as f:
-            json.dump([venta.dict() for venta in self.ventas], f, ensure_ascii=False, indent=4)
+        Carga la instantánea si sigue siendo un prefijo del libro.
+
+        Sirve si los segmentos que refleja siguen ahí con el mismo tamaño
+        (salvo el último, que pudo crecer) y los segmentos nuevos son
+        posteriores. Si no, se descarta y el libro se reproduce completo.
+
+        Args:
+            segmentos (List[Tuple[str, int]]): Ruta y tamaño de cada segmento actual.
+
+        Returns:
+            Dict[str, int]: Bytes ya reflejados por segmento (vacío si no se cargó).
+        """
+        datos = cargar_instantanea(self.ruta_instantanea, "ventas")
+        if datos is None:
+            return {}
+        leidos = dict(datos["segmentos"])
+        actuales = {os.path.basename(ruta): tamano for ruta, tamano in segmentos}
+        ultimo = datos["segmentos"][-1][0] if datos["segmentos"] else ""
+        for nombre, tamano in leidos.items():
+            actual = actuales.get(nombre)
+            if actual is None or actual < tamano or (actual > tamano and nombre != ultimo):
+                return {}
+        if any(nombre not in leidos and nombre < ultimo for nombre in actuales):
+            return {}
+
+        ventas = self._ventas
+        por_producto = self._por_producto
+        # Las ventas se validaron al guardarlas: se arman sin volver a validar.
+        for venta_id, producto_id, cantidad, total, cliente, fecha in datos["ventas"]:
+            venta = Venta.model_construct(
+                id=venta_id, producto_id=producto_id, cantidad=cantidad, total=total,
+                cliente=cliente, fecha=datetime.fromisoformat(fecha) if fecha else None,
+            )
+            ventas[venta_id] = venta
+            por_producto.setdefault(producto_id, {})[venta_id] = venta
+        self.columnas.importar(datos["columnas"])
+        self.rollups.importar(datos["rollups"])
+        self.clientes.importar(datos["clientes"])
+        self._siguiente_id = datos["siguiente_id"]
+        return leidos
+
+    def _escribir_instantanea(self) -> None:
+        """
+        Guarda el estado en memoria y los bytes del libro que refleja.
+        Debe llamarse con el lock tomado o antes de publicar el repositorio.
+        """
+        guardar_instantanea(self.ruta_instantanea, "ventas", {
+            "segmentos": sorted(self._segmentos_leidos.items()),
+            "siguiente_id": self._siguiente_id,
+            "ventas": [
+                (v.id, v.producto_id, v.cantidad, v.total, v.cliente, v.fecha.isoformat() if v.fecha else None)
+                for v in self._ventas.values()
+            ],
+            "columnas": self.columnas.exportar(),
+            "rollups": self.rollups.exportar(),
+            "clientes": self.clientes.exportar(),
+        })
+
+    def sincronizar(self) -> None:
+        """
+        Incorpora las ventas que registraron otros procesos. Con un solo
+        proceso la memoria siempre está al día y no hace nada.
+        """
+
+    def guardar_instantanea(self) -> None:
+        """
+        Vuelca el libro y guarda una instantánea del estado actual, para que
+        el próximo arranque no reproduzca el historial completo.
+        """
+        with self._lock:
+            self.libro.cerrar()
+            self._segmentos_leidos = {
+                os.path.basename(ruta): os.path.getsize(ruta) for ruta in self.libro.segmentos()
+            }
+            self._escribir_instantanea()
 
     def obtener_todas_las_ventas(self) -> List[Venta]:
         """
@@ -52,7 +283,7 @@ class VentaRepository:
         Returns:
             List[Venta]: Lista completa de ventas.
         """
-        return self.ventas
+        return list(self._ventas.values())
 
     def obtener_venta_por_id(self, venta_id: int) -> Optional[Venta]:
         """
@@ -64,26 +295,378 @@ class VentaRepository:
         Returns:
             Optional[Venta]: Venta si se encuentra, None en caso contrario.
         """
-        for venta in self.ventas:
-            if venta.id == venta_id:
-                return venta
-        return None
+        return self._ventas.get(venta_id)
 
     def obtener_ventas_filtradas(self, cliente: str) -> List[Venta]:
         """
-        Filtra ventas por nombre parcial del cliente.
+        Filtra ventas por nombre parcial del cliente, sin distinguir tildes
+        ni mayúsculas.
+
+        El índice de clientes aporta los candidatos y solo ellos se comparan
+        contra la subcadena completa. Si la primera palabra buscada tiene
+        menos de tres letras (puede ser el final de una palabra, que el índice
+        no encuentra), se recorren todas las ventas.
 
         Args:
             cliente (str): Subcadena del nombre del cliente.
 
         Returns:
-            List[Venta]: Lista de ventas que coinciden con el filtro.
+            List[Venta]: Lista de ventas que coinciden con el filtro, por ID.
         """
+        buscado = normalizar(cliente)
+        terminos = tokenizar(cliente)
+        if terminos and len(terminos[0]) >= 3:
+            candidatas = (self._ventas.get(i) for i in sorted(self.clientes.buscar(cliente)))
+        else:
+            candidatas = list(self._ventas.values())
         return [
-            venta for venta in self.ventas
-            if cliente.lower() in venta.cliente.lower()
+            venta for venta in candidatas
+            if venta is not None and venta.cliente and buscado in normalizar(venta.cliente)
         ]
 
+    def obtener_ventas_por_producto(self, producto_id: int) -> List[Venta]:
+        """
+        Retorna las ventas de un producto usando el índice por producto.
+
+        Args:
+            producto_id (int): ID del producto vendido.
+
+        Returns:
+            List[Venta]: Ventas del producto.
+        """
+        return list(self._por_producto.get(producto_id, {}).values())
+
+    def guardar_venta(self, venta: Venta) -> Venta:
+        """
+        Agrega una nueva venta y la anexa al libro.
+
+        Args:
+            venta (Venta): Venta a agregar.
+
+        Returns:
+            Venta: Venta creada.
+        """
+        self.libro.confirmar(self._anexar_ventas([venta]))
+        return venta
+
+    def guardar_ventas(self, ventas: List[Venta]) -> List[Venta]:
+        """
+        Agrega varias ventas y las anexa al libro con una sola escritura.
+
+        Args:
+            ventas (List[Venta]): Ventas a agregar.
+
+        Returns:
+            List[Venta]: Ventas creadas, en el mismo orden.
+        """
+        self.libro.confirmar(self._anexar_ventas(ventas))
+        return ventas
+
+    def eliminar_venta_por_id(self, venta_id: int) -> bool:
+        """
+        Elimina una venta por su ID anexando una lápida al libro.
+
+        Args:
+            venta_id (int): ID de la venta a eliminar.
+
+        Returns:
+            bool: True si se eliminó, False si no se encontró.
+        """
+        eliminada, pendiente = self._anexar_eliminacion(venta_id)
+        self.libro.confirmar(pendiente)
+        return eliminada
+
+    def _anexar_ventas(self, ventas: List[Venta]) -> Pendiente:
+        """
+        Asigna IDs, indexa las ventas y las anexa al libro con una sola
+        escritura, sin esperar al fsync: quien llama confirma el registro
+        retornado después de soltar sus locks, así las altas concurrentes
+        comparten el mismo fsync.
+
+        Args:
+            ventas (List[Venta]): Ventas a agregar.
+
+        Returns:
+            Pendiente: Registro a confirmar con libro.confirmar().
+        """
+        ahora = datetime.now(timezone.utc)
+        for venta in ventas:
+            if venta.fecha is None:
+                venta.fecha = ahora
+        with self._lock:
+            for venta in ventas:
+                venta.id = self._siguiente_id
+                self._siguiente_id += 1
+            self._indexar_lote(ventas)
+            return self.libro.registrar_lote(
+                [{"op": "put", "venta": venta.model_dump(mode="json")} for venta in ventas]
+            )
+
+    def _anexar_eliminacion(self, venta_id: int) -> Tuple[bool, Pendiente]:
+        """
+        Desindexa una venta y anexa su lápida, sin esperar al fsync.
+
+        Args:
+            venta_id (int): ID de la venta a eliminar.
+
+        Returns:
+            Tuple[bool, Pendiente]: Si se eliminó y el registro a confirmar.
+        """
+        with self._lock:
+            if self._desindexar(venta_id) is None:
+                return False, None
+            return True, self.libro.registrar({"op": "del", "id": venta_id})
+
+    def reconstruir_rollups(self) -> None:
+        """
+        Recalcula los rollups a partir de las ventas vigentes.
+        """
+        with self._lock:
+            self.rollups.reconstruir(list(self._ventas.values()))
+
+
+class VentaRepositoryCompartido(VentaRepository):
+    """
+    Libro de ventas que varios procesos (workers) anexan a la vez.
+
+    Cada alta o baja toma un lock entre procesos, incorpora antes lo que
+    anexaron los demás, escribe, pasa el registro al sistema operativo e
+    incrementa un contador de generación compartido. Las lecturas comparan el
+    contador con el último visto y, si cambió, reproducen solo los bytes
+    nuevos de cada segmento. Los IDs siguen siendo únicos porque se asignan
+    con el lock tomado y el libro al día.
+    """
+
+    def __init__(self) -> None:
+        """
+        Abre el lock y el contador del libro y carga las ventas con el lock
+        tomado, para no leer un registro a medio escribir.
+        """
+        os.makedirs(settings.ventas_segmentos_dir, exist_ok=True)
+        self._bloqueo = BloqueoProcesos(os.path.join(settings.ventas_segmentos_dir, "ventas.lock"))
+        self._contador = ContadorGeneracion(
+            os.path.join(settings.ventas_segmentos_dir, "ventas.generacion")
+        )
+        with self._bloqueo:
+            self._generacion_vista = self._contador.leer()
+            super().__init__()
+
+    def _ponerse_al_dia(self) -> None:
+        """
+        Reproduce lo anexado por otros procesos. Debe llamarse con el lock
+        entre procesos tomado.
+        """
+        generacion = self._contador.leer()
+        if generacion == self._generacion_vista:
+            return
+        rutas = self.libro.segmentos()
+        self.libro.seguir_ultimo(rutas)
+        with self._lock:
+            self._reproducir([(ruta, os.path.getsize(ruta)) for ruta in rutas], self._segmentos_leidos)
+        self._generacion_vista = generacion
+
+    def _publicar(self) -> None:
+        """
+        Hace visible lo escrito y avanza la generación. Debe llamarse con el
+        lock entre procesos tomado.
+        """
+        posicion = self.libro.vaciar()
+        if posicion is not None:
+            ruta, tamano = posicion
+            self._segmentos_leidos[os.path.basename(ruta)] = tamano
+        self._generacion_vista = self._contador.incrementar()
+
+    def sincronizar(self) -> None:
+        """
+        Incorpora las ventas que registraron otros procesos, si las hay.
+        """
+        if self._contador.leer() != self._generacion_vista:
+            with self._bloqueo:
+                self._ponerse_al_dia()
+
+    def obtener_todas_las_ventas(self) -> List[Venta]:
+        """
+        Igual que VentaRepository.obtener_todas_las_ventas, con el libro al día.
+        """
+        self.sincronizar()
+        return super().obtener_todas_las_ventas()
+
+    def obtener_venta_por_id(self, venta_id: int) -> Optional[Venta]:
+        """
+        Igual que VentaRepository.obtener_venta_por_id, con el libro al día.
+        """
+        self.sincronizar()
+        return super().obtener_venta_por_id(venta_id)
+
+    def obtener_ventas_filtradas(self, cliente: str) -> List[Venta]:
+        """
+        Igual que VentaRepository.obtener_ventas_filtradas, con el libro al día.
+        """
+        self.sincronizar()
+        return super().obtener_ventas_filtradas(cliente)
+
+    def obtener_ventas_por_producto(self, producto_id: int) -> List[Venta]:
+        """
+        Igual que VentaRepository.obtener_ventas_por_producto, con el libro al día.
+        """
+        self.sincronizar()
+        return super().obtener_ventas_por_producto(producto_id)
+
+    def guardar_venta(self, venta: Venta) -> Venta:
+        """
+        Igual que VentaRepository.guardar_venta, coordinado entre procesos.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            pendiente = self._anexar_ventas([venta])
+            self._publicar()
+        self.libro.confirmar(pendiente)
+        return venta
+
+    def guardar_ventas(self, ventas: List[Venta]) -> List[Venta]:
+        """
+        Igual que VentaRepository.guardar_ventas, coordinado entre procesos.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            pendiente = self._anexar_ventas(ventas)
+            self._publicar()
+        self.libro.confirmar(pendiente)
+        return ventas
+
+    def eliminar_venta_por_id(self, venta_id: int) -> bool:
+        """
+        Igual que VentaRepository.eliminar_venta_por_id, coordinado entre procesos.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            eliminada, pendiente = self._anexar_eliminacion(venta_id)
+            if eliminada:
+                self._publicar()
+        self.libro.confirmar(pendiente)
+        return eliminada
+
+    def reconstruir_rollups(self) -> None:
+        """
+        Igual que VentaRepository.reconstruir_rollups, con el libro al día.
+        """
+        self.sincronizar()
+        super().reconstruir_rollups()
+
+    def guardar_instantanea(self) -> None:
+        """
+        Igual que VentaRepository.guardar_instantanea, con el libro al día:
+        la instantánea no debe declarar bytes que este proceso no reprodujo.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            super().guardar_instantanea()
+
+
+class VentaRepositorySqlite:
+    """
+    Repositorio de ventas sobre la tabla "ventas" de SQLite.
+
+    Las búsquedas por ID usan la clave primaria y las búsquedas por producto
+    el índice sobre "producto_id". El ID lo asigna la base de datos.
+
+    Atributos:
+        columnas (VentasColumnar): Ventas en columnas para la analítica, cargadas
+            al iniciar y actualizadas con cada alta o baja de este proceso.
+        rollups (RollupsVentasSqlite): Ventas acumuladas por producto y período,
+            mantenidas por triggers.
+    """
+
+    def __init__(self, pool: PoolSqlite) -> None:
+        """
+        Inicializa el repositorio sobre un pool de conexiones.
+
+        Args:
+            pool (PoolSqlite): Pool de conexiones a la base de datos.
+        """
+        self.pool = pool
+        self.columnas = VentasColumnar()
+        self.rollups = RollupsVentasSqlite(pool)
+        self._ultimo_id = 0
+        self._cargar_columnas()
+
+    def _cargar_columnas(self) -> None:
+        """
+        Agrega a la copia columnar las ventas con ID mayor al último cargado.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT id, producto_id, cantidad, total, fecha FROM ventas WHERE id > ? ORDER BY id",
+            (self._ultimo_id,),
+        )
+        for fila in filas:
+            fecha = datetime.fromisoformat(fila["fecha"]) if fila["fecha"] else None
+            self.columnas.agregar(
+                fila["id"], fila["producto_id"], fila["cantidad"], fila["total"],
+                marca_de_tiempo(fecha),
+            )
+            self._ultimo_id = fila["id"]
+
+    def sincronizar(self) -> None:
+        """
+        Incorpora a la copia columnar las ventas registradas por otros
+        procesos. Con un solo proceso siempre está al día y no hace nada.
+        """
+
+    def obtener_todas_las_ventas(self) -> List[Venta]:
+        """
+        Retorna todas las ventas almacenadas.
+
+        Returns:
+            List[Venta]: Lista completa de ventas.
+        """
+        filas = self.pool.conexion().execute("SELECT * FROM ventas ORDER BY id")
+        return [Venta(**dict(fila)) for fila in filas]
+
+    def obtener_venta_por_id(self, venta_id: int) -> Optional[Venta]:
+        """
+        Busca una venta por su ID.
+
+        Args:
+            venta_id (int): ID de la venta a buscar.
+
+        Returns:
+            Optional[Venta]: Venta si se encuentra, None en caso contrario.
+        """
+        fila = self.pool.conexion().execute(
+            "SELECT * FROM ventas WHERE id = ?", (venta_id,)
+        ).fetchone()
+        return Venta(**dict(fila)) if fila is not None else None
+
+    def obtener_ventas_filtradas(self, cliente: str) -> List[Venta]:
+        """
+        Filtra ventas por nombre parcial del cliente.
+
+        Args:
+            cliente (str): Subcadena del nombre del cliente.
+
+        Returns:
+            List[Venta]: Lista de ventas que coinciden con el filtro.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT * FROM ventas WHERE cliente LIKE ? ORDER BY id", (f"%{cliente}%",)
+        )
+        return [Venta(**dict(fila)) for fila in filas]
+
+    def obtener_ventas_por_producto(self, producto_id: int) -> List[Venta]:
+        """
+        Retorna las ventas de un producto usando el índice por producto.
+
+        Args:
+            producto_id (int): ID del producto vendido.
+
+        Returns:
+            List[Venta]: Ventas del producto.
+        """
+        filas = self.pool.conexion().execute(
+            "SELECT * FROM ventas WHERE producto_id = ? ORDER BY id", (producto_id,)
+        )
+        return [Venta(**dict(fila)) for fila in filas]
+
     def guardar_venta(self, venta: Venta) -> Venta:
         """
         Agrega una nueva venta y la guarda.
@@ -94,11 +677,60 @@ class VentaRepository:
         Returns:
             Venta: Venta creada.
         """
-        venta.id = len(self.ventas) + 1
-        self.ventas.append(venta)
-        self._guardar_ventas()
+        if venta.fecha is None:
+            venta.fecha = datetime.now(timezone.utc)
+        cursor = self.pool.conexion().execute(
+            "INSERT INTO ventas (producto_id, cantidad, total, cliente, fecha) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (venta.producto_id, venta.cantidad, venta.total, venta.cliente,
+             venta.fecha.isoformat()),
+        )
+        venta.id = cursor.lastrowid
+        self.columnas.agregar(
+            venta.id, venta.producto_id, venta.cantidad, venta.total, marca_de_tiempo(venta.fecha)
+        )
+        self._ultimo_id = max(self._ultimo_id, venta.id)
         return venta
 
+    def guardar_ventas(self, ventas: List[Venta]) -> List[Venta]:
+        """
+        Agrega varias ventas con un solo executemany en una transacción.
+
+        Dentro de la transacción de escritura nadie más inserta, así que los
+        IDs asignados son consecutivos y terminan en last_insert_rowid().
+
+        Args:
+            ventas (List[Venta]): Ventas a agregar.
+
+        Returns:
+            List[Venta]: Ventas creadas, en el mismo orden.
+        """
+        if not ventas:
+            return ventas
+        ahora = datetime.now(timezone.utc)
+        for venta in ventas:
+            if venta.fecha is None:
+                venta.fecha = ahora
+        with self.pool.transaccion() as conexion:
+            conexion.executemany(
+                "INSERT INTO ventas (producto_id, cantidad, total, cliente, fecha) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (venta.producto_id, venta.cantidad, venta.total, venta.cliente,
+                     venta.fecha.isoformat())
+                    for venta in ventas
+                ],
+            )
+            ultimo = conexion.execute("SELECT last_insert_rowid()").fetchone()[0]
+        for desplazamiento, venta in enumerate(ventas):
+            venta.id = ultimo - len(ventas) + 1 + desplazamiento
+        self.columnas.agregar_lote([
+            (venta.id, venta.producto_id, venta.cantidad, venta.total, marca_de_tiempo(venta.fecha))
+            for venta in ventas
+        ])
+        self._ultimo_id = max(self._ultimo_id, ultimo)
+        return ventas
+
     def eliminar_venta_por_id(self, venta_id: int) -> bool:
         """
         Elimina una venta por su ID.
@@ -109,9 +741,147 @@ class VentaRepository:
         Returns:
             bool: True si se eliminó, False si no se encontró.
         """
-        for i, venta in enumerate(self.ventas):
-            if venta.id == venta_id:
-                del self.ventas[i]
-                self._guardar_ventas()
-                return True
-        return False
+        cursor = self.pool.conexion().execute(
+            "DELETE FROM ventas WHERE id = ?", (venta_id,)
+        )
+        self.columnas.quitar(venta_id)
+        return cursor.rowcount > 0
+
+    def reconstruir_rollups(self) -> None:
+        """
+        Recalcula la tabla de rollups a partir de la tabla de ventas.
+        """
+        self.rollups.reconstruir()
+
+
+class VentaRepositorySqliteCompartido(VentaRepositorySqlite):
+    """
+    Repositorio SQLite cuando varios procesos (workers) registran ventas.
+
+    La tabla ya es compartida; lo que cada proceso guarda aparte es la copia
+    columnar para la analítica. Cada alta incrementa un contador compartido de
+    altas y cada baja uno de bajas. Al ver altas nuevas se leen solo las filas
+    con ID mayor a la última cargada; al ver bajas (raras) se recarga la copia.
+    """
+
+    ALTAS = 0
+    BAJAS = 1
+
+    def __init__(self, pool: PoolSqlite) -> None:
+        """
+        Abre el lock y los contadores junto a la base de datos y carga la
+        copia columnar.
+
+        Args:
+            pool (PoolSqlite): Pool de conexiones a la base de datos.
+        """
+        self._bloqueo = BloqueoProcesos(pool.ruta + ".ventas.lock")
+        self._contador = ContadorGeneracion(pool.ruta + ".ventas.generacion", ranuras=2)
+        with self._bloqueo:
+            self._vistas = self._generaciones()
+            super().__init__(pool)
+
+    def _generaciones(self) -> Tuple[int, int]:
+        """
+        Retorna los contadores de altas y bajas actuales.
+        """
+        return self._contador.leer(self.ALTAS), self._contador.leer(self.BAJAS)
+
+    def _ponerse_al_dia(self) -> None:
+        """
+        Actualiza la copia columnar. Debe llamarse con el lock entre procesos tomado.
+        """
+        generaciones = self._generaciones()
+        if generaciones[1] != self._vistas[1]:
+            self.columnas = VentasColumnar()
+            self._ultimo_id = 0
+            self._cargar_columnas()
+        elif generaciones[0] != self._vistas[0]:
+            self._cargar_columnas()
+        self._vistas = generaciones
+
+    def sincronizar(self) -> None:
+        """
+        Incorpora a la copia columnar las altas y bajas de otros procesos, si las hay.
+        """
+        if self._generaciones() != self._vistas:
+            with self._bloqueo:
+                self._ponerse_al_dia()
+
+    def guardar_venta(self, venta: Venta) -> Venta:
+        """
+        Igual que VentaRepositorySqlite.guardar_venta, coordinado entre procesos.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            venta = super().guardar_venta(venta)
+            self._vistas = (self._contador.incrementar(self.ALTAS), self._vistas[1])
+        return venta
+
+    def guardar_ventas(self, ventas: List[Venta]) -> List[Venta]:
+        """
+        Igual que VentaRepositorySqlite.guardar_ventas, coordinado entre procesos.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            ventas = super().guardar_ventas(ventas)
+            self._vistas = (self._contador.incrementar(self.ALTAS), self._vistas[1])
+        return ventas
+
+    def eliminar_venta_por_id(self, venta_id: int) -> bool:
+        """
+        Igual que VentaRepositorySqlite.eliminar_venta_por_id, coordinado entre procesos.
+        """
+        with self._bloqueo:
+            self._ponerse_al_dia()
+            eliminada = super().eliminar_venta_por_id(venta_id)
+            if eliminada:
+                self._vistas = (self._vistas[0], self._contador.incrementar(self.BAJAS))
+        return eliminada
+
+
+def crear_venta_repository():
+    """
+    Crea el repositorio de ventas según el almacenamiento configurado.
+
+    Returns:
+        VentaRepository | VentaRepositorySqlite: Repositorio seleccionado (la
+            variante compartida si hay más de un worker).
+    """
+    compartido = settings.workers > 1
+    if settings.almacenamiento == "sqlite":
+        pool = obtener_pool(settings.sqlite_path)
+        return VentaRepositorySqliteCompartido(pool) if compartido else VentaRepositorySqlite(pool)
+    return VentaRepositoryCompartido() if compartido else VentaRepository()
+
+
+_repositorio: Optional[Union[VentaRepository, VentaRepositorySqlite]] = None
+_repositorio_lock = threading.Lock()
+
+
+def obtener_venta_repository() -> Union[VentaRepository, VentaRepositorySqlite]:
+    """
+    Retorna el repositorio de ventas compartido, creándolo la primera vez.
+
+    Quien registra ventas y quien las analiza deben usar la misma instancia
+    para ver los mismos índices en memoria.
+
+    Returns:
+        VentaRepository | VentaRepositorySqlite: Repositorio compartido.
+    """
+    global _repositorio
+    with _repositorio_lock:
+        if _repositorio is None:
+            _repositorio = crear_venta_repository()
+        return _repositorio
+
+
+def venta_repository_cargado() -> Optional[Union[VentaRepository, VentaRepositorySqlite]]:
+    """
+    Retorna el repositorio compartido si ya se creó, sin crearlo.
+
+    Returns:
+        VentaRepository | VentaRepositorySqlite | None: Repositorio o None.
+    """
+    with _repositorio_lock:
+        return _repositorio
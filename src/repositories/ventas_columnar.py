@@ -0,0 +1,231 @@
+"""
+Almacén columnar de ventas para analítica.
+
+Guarda cada venta como una fila repartida en columnas paralelas (arreglos
+"array" de tipo fijo: producto, cantidad, total, fecha y marca de vigencia),
+en lugar de objetos Pydantic. Las agregaciones por producto se calculan de una
+pasada con NumPy (bincount) si está instalado, leyendo los arreglos sin
+copiarlos; si no, con un único bucle sobre las columnas. NumPy es opcional.
+"""
+
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+
+class AgregadoProducto(NamedTuple):
+    """
+    Totales de ventas de un producto.
+
+    Atributos:
+        producto_id (int): ID del producto.
+        ventas (int): Cantidad de ventas registradas.
+        unidades (int): Unidades vendidas.
+        ingresos (float): Suma de los totales cobrados.
+    """
+    producto_id: int
+    ventas: int
+    unidades: int
+    ingresos: float
+
+
+def marca_de_tiempo(fecha: Optional[datetime]) -> float:
+    """
+    Convierte una fecha a segundos desde la época (0 si la venta no tiene fecha).
+
+    Las fechas sin zona horaria se interpretan en UTC.
+
+    Args:
+        fecha (Optional[datetime]): Fecha de la venta.
+
+    Returns:
+        float: Marca de tiempo en segundos.
+    """
+    if fecha is None:
+        return 0.0
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.timestamp()
+
+
+class VentasColumnar:
+    """
+    Ventas en columnas paralelas, con altas O(1) y bajas por marca de vigencia.
+
+    Atributos:
+        usa_numpy (bool): Si las agregaciones se vectorizan con NumPy.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa las columnas vacías.
+        """
+        self.usa_numpy = np is not None
+        self._producto_id = array("q")
+        self._cantidad = array("q")
+        self._total = array("d")
+        self._fecha = array("d")
+        self._vigente = array("b")
+        self._filas: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Retorna la cantidad de ventas vigentes.
+        """
+        return len(self._filas)
+
+    def agregar(
+        self, venta_id: int, producto_id: int, cantidad: int, total: float, fecha: float
+    ) -> None:
+        """
+        Anexa una venta como una fila nueva.
+
+        Args:
+            venta_id (int): ID de la venta.
+            producto_id (int): ID del producto vendido.
+            cantidad (int): Unidades vendidas.
+            total (float): Total cobrado.
+            fecha (float): Marca de tiempo en segundos.
+        """
+        self.agregar_lote([(venta_id, producto_id, cantidad, total, fecha)])
+
+    def agregar_lote(self, filas: List[Tuple[int, int, int, float, float]]) -> None:
+        """
+        Anexa varias ventas tomando el lock una sola vez.
+
+        Args:
+            filas (List[Tuple[int, int, int, float, float]]): (ID de la venta,
+                ID del producto, cantidad, total, marca de tiempo) de cada venta.
+        """
+        with self._lock:
+            primera = len(self._producto_id)
+            for desplazamiento, (venta_id, producto_id, cantidad, total, fecha) in enumerate(filas):
+                self._filas[venta_id] = primera + desplazamiento
+                self._producto_id.append(producto_id)
+                self._cantidad.append(cantidad)
+                self._total.append(total)
+                self._fecha.append(fecha)
+            self._vigente.extend([1] * len(filas))
+
+    def quitar(self, venta_id: int) -> None:
+        """
+        Marca una venta como eliminada; su fila deja de contar en las agregaciones.
+
+        Args:
+            venta_id (int): ID de la venta.
+        """
+        with self._lock:
+            fila = self._filas.pop(venta_id, None)
+            if fila is not None:
+                self._vigente[fila] = 0
+
+    def exportar(self) -> tuple:
+        """
+        Retorna las columnas como valores simples, para una instantánea.
+
+        Returns:
+            tuple: Bytes de cada columna y el mapa ID → fila.
+        """
+        with self._lock:
+            columnas = (self._producto_id, self._cantidad, self._total, self._fecha, self._vigente)
+            return tuple(columna.tobytes() for columna in columnas) + (dict(self._filas),)
+
+    def importar(self, datos: tuple) -> None:
+        """
+        Reemplaza las columnas por las de una instantánea (ver exportar()).
+
+        Args:
+            datos (tuple): Valores retornados por exportar().
+        """
+        *columnas, filas = datos
+        with self._lock:
+            for columna, contenido in zip(
+                (self._producto_id, self._cantidad, self._total, self._fecha, self._vigente), columnas
+            ):
+                del columna[:]
+                columna.frombytes(contenido)
+            self._filas = filas
+
+    def por_producto(
+        self, desde: Optional[float] = None, hasta: Optional[float] = None
+    ) -> List[AgregadoProducto]:
+        """
+        Agrupa las ventas vigentes por producto, opcionalmente en un rango de fechas.
+
+        Args:
+            desde (Optional[float]): Marca de tiempo mínima incluida.
+            hasta (Optional[float]): Marca de tiempo máxima excluida.
+
+        Returns:
+            List[AgregadoProducto]: Totales por producto, ordenados por ID.
+        """
+        with self._lock:
+            if not self._filas:
+                return []
+            if self.usa_numpy:
+                return self._por_producto_numpy(desde, hasta)
+            return self._por_producto_python(desde, hasta)
+
+    def _por_producto_numpy(
+        self, desde: Optional[float], hasta: Optional[float]
+    ) -> List[AgregadoProducto]:
+        """
+        Agrupación vectorizada con bincount. Debe llamarse con el lock tomado.
+        """
+        producto_id = np.frombuffer(self._producto_id, dtype=np.int64)
+        cantidad = np.frombuffer(self._cantidad, dtype=np.int64)
+        total = np.frombuffer(self._total, dtype=np.float64)
+        # Sin bajas ni rango de fechas se agregan las columnas tal cual, sin copiarlas.
+        if len(self._filas) < len(self._producto_id) or desde is not None or hasta is not None:
+            mascara = np.frombuffer(self._vigente, dtype=np.int8).astype(bool)
+            fecha = np.frombuffer(self._fecha, dtype=np.float64)
+            if desde is not None:
+                mascara &= fecha >= desde
+            if hasta is not None:
+                mascara &= fecha < hasta
+            producto_id, cantidad, total = producto_id[mascara], cantidad[mascara], total[mascara]
+        if producto_id.size == 0:
+            return []
+        largo = int(producto_id.max()) + 1
+        ventas = np.bincount(producto_id, minlength=largo)
+        unidades = np.bincount(producto_id, weights=cantidad, minlength=largo)
+        ingresos = np.bincount(producto_id, weights=total, minlength=largo)
+        ids = np.flatnonzero(ventas)
+        return [
+            AgregadoProducto(pid, n, int(u), i)
+            for pid, n, u, i in zip(
+                ids.tolist(), ventas[ids].tolist(), unidades[ids].tolist(), ingresos[ids].tolist()
+            )
+        ]
+
+    def _por_producto_python(
+        self, desde: Optional[float], hasta: Optional[float]
+    ) -> List[AgregadoProducto]:
+        """
+        Agrupación en un único recorrido de las columnas. Debe llamarse con el lock tomado.
+        """
+        acumulado: Dict[int, List] = {}
+        for pid, cantidad, total, fecha, vigente in zip(
+            self._producto_id, self._cantidad, self._total, self._fecha, self._vigente
+        ):
+            if not vigente:
+                continue
+            if (desde is not None and fecha < desde) or (hasta is not None and fecha >= hasta):
+                continue
+            fila = acumulado.get(pid)
+            if fila is None:
+                acumulado[pid] = [1, cantidad, total]
+            else:
+                fila[0] += 1
+                fila[1] += cantidad
+                fila[2] += total
+        return [
+            AgregadoProducto(pid, *acumulado[pid]) for pid in sorted(acumulado)
+        ]
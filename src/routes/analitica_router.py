@@ -0,0 +1,107 @@
+"""
+Router de analítica. Expone la rentabilidad por producto, rankings de
+productos más vendidos y totales de ventas, con filtro opcional por fechas,
+y reportes por período servidos desde los rollups de hora, día y mes.
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Query
+
+from src.controllers.analitica_controller import AnaliticaController
+from src.schemas.analitica_schema import (
+    CubetaVentas,
+    RentabilidadProducto,
+    ResumenVentas,
+    TotalesPeriodo,
+)
+from src.services.analitica_service import AnaliticaService
+
+router = APIRouter()
+controller = AnaliticaController(AnaliticaService())
+
+
+@router.get(
+    "/productos",
+    response_model=List[RentabilidadProducto],
+    summary="Rentabilidad por producto"
+)
+async def rentabilidad_por_producto(
+    desde: Optional[datetime] = Query(None, description="Fecha mínima incluida"),
+    hasta: Optional[datetime] = Query(None, description="Fecha máxima excluida"),
+) -> List[RentabilidadProducto]:
+    """
+    Retorna ventas, unidades, ingresos y desvío de precio de cada producto
+    vendido, de mayor a menor ingreso.
+    """
+    return await controller.rentabilidad_por_producto(desde, hasta)
+
+
+@router.get(
+    "/top",
+    response_model=List[RentabilidadProducto],
+    summary="Productos más vendidos"
+)
+async def top_productos(
+    por: Literal["ingresos", "unidades", "ventas"] = Query("ingresos"),
+    limite: int = Query(10, ge=1, le=1000),
+    desde: Optional[datetime] = Query(None, description="Fecha mínima incluida"),
+    hasta: Optional[datetime] = Query(None, description="Fecha máxima excluida"),
+) -> List[RentabilidadProducto]:
+    """
+    Retorna los productos con mayor valor en el criterio indicado.
+    """
+    return await controller.top_productos(por, limite, desde, hasta)
+
+
+@router.get("/resumen", response_model=ResumenVentas, summary="Totales de ventas")
+async def resumen(
+    desde: Optional[datetime] = Query(None, description="Fecha mínima incluida"),
+    hasta: Optional[datetime] = Query(None, description="Fecha máxima excluida"),
+) -> ResumenVentas:
+    """
+    Retorna los totales de ventas, unidades, ingresos y desvío de precio.
+    """
+    return await controller.resumen(desde, hasta)
+
+
+@router.get(
+    "/productos/{producto_id}/serie",
+    response_model=List[CubetaVentas],
+    summary="Ventas de un producto por período"
+)
+async def serie(
+    producto_id: int,
+    granularidad: Literal["hora", "dia", "mes"] = Query("dia"),
+    desde: Optional[datetime] = Query(None, description="Por defecto, 30 días antes de hasta"),
+    hasta: Optional[datetime] = Query(None, description="Por defecto, ahora"),
+) -> List[CubetaVentas]:
+    """
+    Retorna las ventas del producto por hora, día o mes (UTC), solo para los
+    períodos con ventas.
+    """
+    return await controller.serie(producto_id, granularidad, desde, hasta)
+
+
+@router.get(
+    "/productos/{producto_id}/periodo",
+    response_model=TotalesPeriodo,
+    summary="Ventas de un producto en un rango"
+)
+async def totales_periodo(
+    producto_id: int,
+    desde: Optional[datetime] = Query(None, description="Por defecto, 30 días antes de hasta"),
+    hasta: Optional[datetime] = Query(None, description="Por defecto, ahora"),
+) -> TotalesPeriodo:
+    """
+    Retorna las ventas del producto en el rango (redondeado a la hora).
+    """
+    return await controller.totales_periodo(producto_id, desde, hasta)
+
+
+@router.post("/rollups/reconstruir", summary="Reconstruir rollups de ventas")
+async def reconstruir_rollups() -> dict:
+    """
+    Recalcula los rollups por hora, día y mes desde el historial de ventas.
+    """
+    return await controller.reconstruir_rollups()
@@ -9,7 +9,11 @@ facilitando su integración dentro de la instancia principal de FastAPI.
 from fastapi import APIRouter
 
 # Importaciones locales
+from src.routes.analitica_router import router as analitica_router
+from src.routes.inventario_router import router as inventario_router
+from src.routes.metricas_router import router as metricas_router
 from src.routes.producto_router import router as producto_router
+from src.routes.salud_router import router as salud_router
 
 api_router = APIRouter()
 
@@ -19,3 +23,30 @@ api_router.include_router(
     prefix="/productos",
     tags=["Productos"]
 )
+
+# Incluir el subrouter de inventario
+api_router.include_router(
+    inventario_router,
+    prefix="/inventario",
+    tags=["Inventario"]
+)
+
+# Incluir el subrouter de analítica
+api_router.include_router(
+    analitica_router,
+    prefix="/analitica",
+    tags=["Analítica"]
+)
+
+# Incluir el subrouter de métricas (GET /metrics, sin prefijo)
+api_router.include_router(
+    metricas_router,
+    tags=["Métricas"]
+)
+
+# Incluir el subrouter de salud (vivacidad y disponibilidad)
+api_router.include_router(
+    salud_router,
+    prefix="/salud",
+    tags=["Salud"]
+)
@@ -1,17 +1,30 @@
 """
 Router de inventario. Expone endpoints relacionados con el stock de productos,
-como listar productos con stock bajo o agotados.
+como consultar y ajustar cantidades o listar productos con stock bajo o agotados.
 """
 
 from typing import List
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Body, Query, HTTPException
 
 
 from src.controllers.inventario_controller import InventarioController
+from src.schemas.inventario_schema import InventarioResponse
 from src.schemas.producto_schema import ProductoResponse
+from src.services.inventario_service import InventarioService
 
 router = APIRouter()
-controller = InventarioController()
+controller = InventarioController(InventarioService())
+
+
+@router.get("/total", summary="Stock total")
+async def obtener_stock_total() -> dict:
+    """
+    Retorna la suma del stock de todos los productos.
+
+    Returns:
+        dict: Stock total bajo la clave "stock_total".
+    """
+    return {"stock_total": await controller.obtener_stock_total()}
 
 
 @router.get(
@@ -32,8 +45,7 @@ async def listar_productos_stock_bajo(
         List[ProductoResponse]: Lista de productos con bajo stock.
     """
     try:
-        productos = controller.listar_productos_stock_bajo(umbral)
-        return [ProductoResponse.from_orm(p) for p in productos]
+        return await controller.listar_productos_stock_bajo(umbral)
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -54,10 +66,67 @@ async def listar_productos_agotados() -> List[ProductoResponse]:
         List[ProductoResponse]: Lista de productos agotados.
     """
     try:
-        productos = controller.listar_productos_agotados()
-        return [ProductoResponse.from_orm(p) for p in productos]
+        return await controller.listar_productos_agotados()
     except Exception as exc:
         raise HTTPException(
             status_code=500,
             detail="Error interno al listar productos agotados"
         ) from exc
+
+
+@router.get("/{producto_id}", response_model=InventarioResponse, summary="Consultar stock")
+async def obtener_stock(producto_id: int) -> InventarioResponse:
+    """
+    Retorna el stock actual de un producto.
+
+    Args:
+        producto_id (int): ID del producto.
+
+    Returns:
+        InventarioResponse: Stock del producto.
+    """
+    return await controller.obtener_stock(producto_id)
+
+
+@router.put("/{producto_id}", response_model=InventarioResponse, summary="Establecer stock")
+async def establecer_stock(
+    producto_id: int,
+    cantidad: int = Body(..., ge=0, embed=True),
+) -> InventarioResponse:
+    """
+    Fija el stock exacto de un producto.
+
+    Args:
+        producto_id (int): ID del producto.
+        cantidad (int): Stock a establecer.
+
+    Returns:
+        InventarioResponse: Stock resultante.
+    """
+    return await controller.establecer_stock(producto_id, cantidad)
+
+
+@router.put(
+    "/{producto_id}/agregar-stock",
+    response_model=InventarioResponse,
+    summary="Agregar o descontar stock"
+)
+async def agregar_stock(
+    producto_id: int,
+    cantidad: int = Body(..., embed=True),
+) -> InventarioResponse:
+    """
+    Suma una cantidad al stock de un producto de forma atómica.
+
+    Una cantidad negativa descuenta unidades; responde 400 si no alcanzan y
+    422 si el almacenamiento no admite el stock resultante (más de 64 bits
+    en modo compacto o SQLite).
+
+    Args:
+        producto_id (int): ID del producto.
+        cantidad (int): Unidades a sumar.
+
+    Returns:
+        InventarioResponse: Stock resultante.
+    """
+    return await controller.agregar_stock(producto_id, cantidad)
@@ -0,0 +1,28 @@
+"""
+Router de métricas. Expone las métricas de la aplicación en el formato de
+texto de Prometheus para que un servidor de monitoreo las recolecte.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.controllers.metricas_controller import MetricasController
+from src.helpers.metricas import registro_metricas
+
+router = APIRouter()
+controller = MetricasController(registro_metricas)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Métricas de Prometheus")
+async def exportar_metricas() -> PlainTextResponse:
+    """
+    Retorna contadores de peticiones, histogramas de latencia, peticiones en
+    curso, bytes leídos y escritos, y el estado del pool de E/S, del almacén
+    de productos y de la caché JSON.
+
+    Returns:
+        PlainTextResponse: Exposición en formato de texto 0.0.4.
+    """
+    return PlainTextResponse(
+        await controller.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
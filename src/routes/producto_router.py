@@ -2,14 +2,20 @@
 Router para endpoints CRUD de productos.
 """
 
-from typing import List
-from fastapi import APIRouter, Body
+from typing import List, Optional
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.config.settings import settings
 from src.services.producto_service import ProductoService
 from src.controllers.producto_controller import ProductoController
 from src.schemas.producto_schema import (
+    ActualizacionLote,
+    AjusteStockLote,
     ProductoCreate,
     ProductoUpdate,
-    ProductoResponse
+    ProductoResponse,
+    ResultadoLote,
+    VentaLote,
 )
 
 router = APIRouter()
@@ -17,20 +23,204 @@ service = ProductoService()
 controller = ProductoController(service)
 
 
-@router.get("/", response_model=List[ProductoResponse])
-async def listar_productos():
+def _version_esperada(if_match: Optional[str]) -> Optional[int]:
     """
-    Lista todos los productos.
+    Interpreta la cabecera If-Match como la versión esperada del producto.
+
+    Acepta la versión sola o entre comillas (3, "3", W/"3"); "*" o la ausencia
+    de la cabecera desactivan la comprobación.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    valor = if_match.strip().removeprefix("W/").strip('"')
+    if not valor.isdigit():
+        raise HTTPException(status_code=400, detail="If-Match debe ser una versión numérica")
+    return int(valor)
+
+
+def _coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indica si la cabecera If-None-Match incluye el ETag actual.
+
+    La comparación es débil, como pide HTTP para If-None-Match: "W/<etag>"
+    también coincide.
+    """
+    if if_none_match is None:
+        return False
+    etiquetas = {etiqueta.strip().removeprefix("W/") for etiqueta in if_none_match.split(",")}
+    return etag in etiquetas
+
+
+def _clave_idempotencia(idempotency_key: Optional[str]) -> Optional[str]:
+    """
+    Valida la cabecera Idempotency-Key (de 1 a 255 caracteres).
+    """
+    if idempotency_key is None:
+        return None
+    clave = idempotency_key.strip()
+    if not 0 < len(clave) <= 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key debe tener de 1 a 255 caracteres")
+    return clave
+
+
+def _respuesta_idempotente(resultado: tuple, response: Response):
+    """
+    Arma la respuesta de una escritura que admite Idempotency-Key.
+
+    La repetida lleva la cabecera Idempotent-Replayed, también cuando lo que
+    se repite es un error 4xx, que se responde con su estado original.
+    """
+    estado, cuerpo, repetida = resultado
+    cabeceras = {"Idempotent-Replayed": "true"} if repetida else None
+    if estado != 200:
+        return JSONResponse(status_code=estado, content={"detail": cuerpo}, headers=cabeceras)
+    if cabeceras:
+        response.headers.update(cabeceras)
+    return cuerpo
+
+
+def _cabeceras_cache(etag: str) -> dict:
+    """
+    Cabeceras de caché de una lectura de productos.
+    """
+    return {"ETag": etag, "Cache-Control": settings.cache_control_productos}
+
+
+def _estado_lote(resultado: ResultadoLote, response: Response) -> ResultadoLote:
+    """
+    Responde 409 cuando un lote todo-o-nada se descartó por completo.
+    """
+    if not resultado.aplicado:
+        response.status_code = 409
+    return resultado
+
+
+@router.post("/bulk", response_model=List[ProductoResponse])
+async def crear_productos(productos: List[ProductoCreate]):
+    """
+    Crea varios productos con una sola lectura y una sola escritura del catálogo.
     """
-    return await controller.listar_productos()
+    return await controller.crear_productos(productos)
 
 
-@router.get("/{producto_id}", response_model=ProductoResponse)
-async def obtener_producto(producto_id: int):
+@router.put("/bulk", response_model=ResultadoLote)
+async def actualizar_productos(
+    items: List[ActualizacionLote],
+    response: Response,
+    todo_o_nada: bool = Query(False, description="Descartar el lote si algún ítem falla"),
+):
     """
-    Retorna un producto por ID.
+    Actualiza varios productos en un solo ciclo; informa el resultado de cada ítem.
     """
-    return await controller.obtener_producto(producto_id)
+    return _estado_lote(await controller.actualizar_productos(items, todo_o_nada), response)
+
+
+@router.put("/ajustar-stock/bulk", response_model=ResultadoLote)
+async def ajustar_stock_lote(
+    items: List[AjusteStockLote],
+    response: Response,
+    todo_o_nada: bool = Query(False, description="Descartar el lote si algún ítem falla"),
+):
+    """
+    Ajusta el stock de varios productos en un solo ciclo; informa el resultado de cada ítem.
+    """
+    return _estado_lote(await controller.ajustar_stock_lote(items, todo_o_nada), response)
+
+
+@router.post("/ventas/bulk", response_model=ResultadoLote)
+async def registrar_ventas_lote(
+    items: List[VentaLote],
+    response: Response,
+    todo_o_nada: bool = Query(False, description="Descartar el lote si algún ítem falla"),
+):
+    """
+    Registra varias ventas en un solo ciclo; informa el resultado de cada ítem.
+    """
+    return _estado_lote(await controller.registrar_ventas_lote(items, todo_o_nada), response)
+
+
+@router.get("/", response_model=None, responses={200: {"model": List[ProductoResponse]}})
+async def listar_productos(
+    limit: Optional[int] = Query(
+        None, ge=1, le=settings.pagina_max_limite, description="Productos por página"
+    ),
+    cursor: Optional[int] = Query(
+        None, ge=0, description="ID del último producto de la página anterior"
+    ),
+    formato: str = Query("json", pattern="^(json|ndjson)$", description="json o ndjson"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Lista los productos.
+
+    Sin limit ni cursor devuelve el catálogo completo, serializado desde la
+    caché de JSON por producto sin volver a validarlo. Con limit devuelve una
+    página ordenada por ID, serializada igual, y, si hay más, la cabecera
+    X-Next-Cursor con el cursor de la siguiente. Con formato=ndjson transmite un producto por línea
+    a medida que se lee el almacén.
+
+    En JSON la respuesta lleva un ETag del catálogo; si coincide con
+    If-None-Match se responde 304 sin leer ni serializar productos.
+    """
+    if formato == "ndjson":
+        return StreamingResponse(
+            controller.transmitir_productos(cursor or 0, limit),
+            media_type="application/x-ndjson",
+        )
+    etag = await controller.etag_catalogo()
+    if _coincide_etag(if_none_match, etag):
+        return Response(status_code=304, headers=_cabeceras_cache(etag))
+    cabeceras = _cabeceras_cache(etag)
+    if limit is None and cursor is None:
+        contenido = await controller.listar_productos_json()
+    else:
+        contenido, siguiente = await controller.listar_pagina_json(
+            cursor or 0, limit or settings.pagina_max_limite
+        )
+        if siguiente is not None:
+            cabeceras["X-Next-Cursor"] = str(siguiente)
+    return Response(content=contenido, media_type="application/json", headers=cabeceras)
+
+
+@router.get("/buscar", response_model=None, responses={200: {"model": List[ProductoResponse]}})
+async def buscar_productos(
+    q: str = Query(..., min_length=1, description="Texto a buscar en nombre y descripción"),
+    limite: int = Query(
+        20, ge=1, le=settings.pagina_max_limite, description="Máximo de resultados"
+    ),
+):
+    """
+    Busca productos por nombre y descripción, del más relevante al menos relevante.
+
+    Ignora tildes y mayúsculas y admite palabras incompletas, así que sirve
+    para autocompletar. Las coincidencias en el nombre pesan más que en la
+    descripción, y las exactas más que por prefijo o subcadena.
+    """
+    return Response(
+        content=await controller.buscar_productos_json(q, limite),
+        media_type="application/json",
+    )
+
+
+@router.get("/{producto_id}", response_model=None, responses={200: {"model": ProductoResponse}})
+async def obtener_producto(producto_id: int, if_none_match: Optional[str] = Header(None)):
+    """
+    Retorna un producto por ID, serializado desde la caché de JSON.
+
+    La respuesta lleva un ETag del producto; si coincide con If-None-Match se
+    responde 304 sin leer ni serializar el producto. Un producto que no
+    existe responde 404 aunque la petición traiga un ETag.
+    """
+    etag = await controller.etag_producto(producto_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    if _coincide_etag(if_none_match, etag):
+        return Response(status_code=304, headers=_cabeceras_cache(etag))
+    return Response(
+        content=await controller.obtener_producto_json(producto_id),
+        media_type="application/json",
+        headers=_cabeceras_cache(etag),
+    )
 
 
 @router.post("/", response_model=ProductoResponse)
@@ -42,11 +232,17 @@ async def crear_producto(producto: ProductoCreate):
 
 
 @router.put("/{producto_id}", response_model=ProductoResponse)
-async def actualizar_producto(producto_id: int, data: ProductoUpdate):
+async def actualizar_producto(
+    producto_id: int,
+    data: ProductoUpdate,
+    if_match: Optional[str] = Header(None),
+):
     """
     Actualiza un producto existente.
+
+    Con la cabecera If-Match, responde 409 si la versión ya no es la actual.
     """
-    return await controller.actualizar_producto(producto_id, data)
+    return await controller.actualizar_producto(producto_id, data, _version_esperada(if_match))
 
 
 @router.delete("/{producto_id}", response_model=bool)
@@ -58,16 +254,37 @@ async def eliminar_producto(producto_id: int):
 
 
 @router.put("/{producto_id}/ajustar-stock", response_model=ProductoResponse)
-async def ajustar_stock(producto_id: int, cantidad: int = Body(...)):
+async def ajustar_stock(
+    producto_id: int,
+    response: Response,
+    cantidad: int = Body(...),
+    if_match: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+):
     """
     Ajusta el stock del producto.
+
+    Con la cabecera If-Match, responde 409 si la versión ya no es la actual.
+    Con Idempotency-Key, un reintento recibe la primera respuesta sin volver
+    a ajustar.
     """
-    return await controller.ajustar_stock(producto_id, cantidad)
+    resultado = await controller.ajustar_stock(
+        producto_id, cantidad, _version_esperada(if_match), _clave_idempotencia(idempotency_key)
+    )
+    return _respuesta_idempotente(resultado, response)
 
 
 @router.post("/{producto_id}/venta")
-async def registrar_venta(producto_id: int):
+async def registrar_venta(
+    producto_id: int,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+):
     """
     Registra una venta del producto con el ID proporcionado.
+
+    Con Idempotency-Key, un reintento recibe la primera respuesta sin volver
+    a registrar la venta.
     """
-    return await controller.registrar_venta(producto_id)
+    resultado = await controller.registrar_venta(producto_id, _clave_idempotencia(idempotency_key))
+    return _respuesta_idempotente(resultado, response)
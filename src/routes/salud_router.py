@@ -0,0 +1,44 @@
+"""
+Router de salud. Separa la vivacidad (el proceso responde) de la disponibilidad
+(los datos están cargados), para que un orquestador no reinicie una instancia
+que solo está precalentando ni le envíe tráfico antes de tiempo.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.controllers.salud_controller import SaludController
+from src.schemas.salud_schema import EstadoSalud
+from src.services.salud_service import salud_service
+
+router = APIRouter()
+controller = SaludController(salud_service)
+
+
+@router.get("/vivo", summary="Vivacidad")
+async def vivo() -> dict:
+    """
+    Responde 200 mientras el proceso atienda peticiones.
+
+    Returns:
+        dict: Estado "vivo".
+    """
+    return {"estado": "vivo"}
+
+
+@router.get(
+    "/listo",
+    response_model=EstadoSalud,
+    responses={503: {"model": EstadoSalud, "description": "Precalentando o con error"}},
+    summary="Disponibilidad",
+)
+async def listo() -> JSONResponse:
+    """
+    Responde 200 cuando los datos están cargados y 503 mientras se precalientan
+    o si el precalentamiento falló.
+
+    Returns:
+        JSONResponse: Estado de arranque.
+    """
+    estado = controller.estado_arranque()
+    return JSONResponse(estado.model_dump(), status_code=200 if estado.listo else 503)
@@ -0,0 +1,85 @@
+"""
+Schemas Pydantic para las respuestas de analítica de ventas.
+"""
+
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class RentabilidadProducto(BaseModel):
+    """
+    Ventas y rentabilidad de un producto.
+
+    Atributos:
+        producto_id (int): ID del producto.
+        nombre (Optional[str]): Nombre del producto, si sigue en el catálogo.
+        ventas (int): Cantidad de ventas registradas.
+        unidades (int): Unidades vendidas.
+        ingresos (float): Suma de los totales cobrados.
+        precio (Optional[float]): Precio de catálogo actual.
+        desvio_precio (Optional[float]): Ingresos menos unidades por precio de
+            catálogo actual; distinto de cero si el precio cambió tras las ventas.
+    """
+    producto_id: int
+    nombre: Optional[str] = None
+    ventas: int
+    unidades: int
+    ingresos: float
+    precio: Optional[float] = None
+    desvio_precio: Optional[float] = None
+
+
+class ResumenVentas(BaseModel):
+    """
+    Totales de ventas de todo el catálogo.
+
+    Atributos:
+        productos (int): Productos con al menos una venta.
+        ventas (int): Cantidad de ventas registradas.
+        unidades (int): Unidades vendidas.
+        ingresos (float): Suma de los totales cobrados.
+        desvio_precio (float): Suma de los desvíos de precio de los productos
+            en catálogo.
+    """
+    productos: int
+    ventas: int
+    unidades: int
+    ingresos: float
+    desvio_precio: float
+
+
+class CubetaVentas(BaseModel):
+    """
+    Ventas de un producto en una cubeta de tiempo.
+
+    Atributos:
+        inicio (datetime): Inicio de la cubeta (UTC).
+        ventas (int): Cantidad de ventas registradas.
+        unidades (int): Unidades vendidas.
+        ingresos (float): Suma de los totales cobrados.
+    """
+    inicio: datetime
+    ventas: int
+    unidades: int
+    ingresos: float
+
+
+class TotalesPeriodo(BaseModel):
+    """
+    Ventas de un producto acumuladas en un rango de fechas.
+
+    Atributos:
+        producto_id (int): ID del producto.
+        desde (datetime): Inicio del rango.
+        hasta (datetime): Fin (excluido) del rango.
+        ventas (int): Cantidad de ventas registradas.
+        unidades (int): Unidades vendidas.
+        ingresos (float): Suma de los totales cobrados.
+    """
+    producto_id: int
+    desde: datetime
+    hasta: datetime
+    ventas: int
+    unidades: int
+    ingresos: float
@@ -3,7 +3,7 @@ Schemas Pydantic para la entidad Inventario.
 """
 
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class InventarioBase(BaseModel):
@@ -33,12 +33,8 @@ class InventarioUpdate(BaseModel):
 class InventarioResponse(InventarioBase):
     """
     Schema para la respuesta del inventario.
-    Incluye el ID del registro.
+    Incluye el ID del registro, que coincide con el ID del producto.
     """
     id: int
 
-    class Config:
-        """
-        Configuración para permitir compatibilidad con ORMs.
-        """
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -3,7 +3,7 @@ Schemas Pydantic para la entidad Producto. Se utilizan para validación y serial
 de datos en las operaciones de entrada y salida de la API.
 """
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
 
 
@@ -48,6 +48,80 @@ class ProductoResponse(ProductoBase):
 
     Atributos:
         id (int): Identificador único.
+        version (int): Versión del producto, para control de concurrencia optimista.
     """
     id: int
+    version: int = 0
     model_config = ConfigDict(from_attributes=True)
+
+
+class ActualizacionLote(BaseModel):
+    """
+    Ítem de una actualización por lote.
+
+    Atributos:
+        producto_id (int): ID del producto a actualizar.
+        datos (ProductoUpdate): Campos a modificar.
+        version (Optional[int]): Versión esperada del producto, si se exige.
+    """
+    producto_id: int
+    datos: ProductoUpdate
+    version: Optional[int] = None
+
+
+class AjusteStockLote(BaseModel):
+    """
+    Ítem de un ajuste de stock por lote.
+
+    Atributos:
+        producto_id (int): ID del producto a ajustar.
+        cantidad (int): Unidades a sumar (negativo para descontar).
+        version (Optional[int]): Versión esperada del producto, si se exige.
+    """
+    producto_id: int
+    cantidad: int
+    version: Optional[int] = None
+
+
+class VentaLote(BaseModel):
+    """
+    Ítem de un registro de ventas por lote.
+
+    Atributos:
+        producto_id (int): ID del producto vendido.
+    """
+    producto_id: int
+
+
+class ResultadoItemLote(BaseModel):
+    """
+    Resultado de un ítem dentro de una operación por lote.
+
+    Atributos:
+        indice (int): Posición del ítem en el lote recibido.
+        producto_id (Optional[int]): ID del producto afectado.
+        ok (bool): Si el ítem pudo aplicarse.
+        status (int): Código HTTP equivalente al resultado del ítem.
+        producto (Optional[ProductoResponse]): Producto resultante, si se aplicó.
+        ventas_totales (Optional[int]): Ventas acumuladas, en lotes de ventas.
+        error (Optional[str]): Motivo del fallo, si lo hubo.
+    """
+    indice: int
+    producto_id: Optional[int] = None
+    ok: bool
+    status: int
+    producto: Optional[ProductoResponse] = None
+    ventas_totales: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ResultadoLote(BaseModel):
+    """
+    Resultado de una operación por lote.
+
+    Atributos:
+        aplicado (bool): False si el lote se descartó por ser todo-o-nada.
+        resultados (List[ResultadoItemLote]): Resultado de cada ítem, en orden.
+    """
+    aplicado: bool
+    resultados: List[ResultadoItemLote]
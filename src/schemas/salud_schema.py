@@ -0,0 +1,22 @@
+"""
+Schemas Pydantic para las respuestas de salud de la API.
+"""
+
+from typing import Optional
+from pydantic import BaseModel
+
+
+class EstadoSalud(BaseModel):
+    """
+    Estado de arranque de la API.
+
+    Atributos:
+        estado (str): "sin_precalentar", "precalentando", "listo" o "error".
+        listo (bool): Si la API puede recibir tráfico.
+        segundos (Optional[float]): Duración del precalentamiento, si terminó.
+        error (Optional[str]): Error del precalentamiento, si falló.
+    """
+    estado: str
+    listo: bool
+    segundos: Optional[float] = None
+    error: Optional[str] = None
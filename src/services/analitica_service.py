@@ -0,0 +1,186 @@
+"""
+Servicio de analítica de ventas: ingresos, unidades y desvío de precio por producto.
+
+Las agregaciones se hacen sobre la copia columnar de las ventas que mantiene
+el repositorio, y luego se cruzan con el precio actual de cada producto. Los
+reportes por período leen los rollups por hora, día y mes.
+"""
+
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from src.repositories.producto_store import ProductoStore, obtener_producto_store
+from src.repositories.rollups_ventas import cubeta, inicio_cubeta
+from src.repositories.venta_repository import obtener_venta_repository
+from src.repositories.ventas_columnar import marca_de_tiempo
+from src.schemas.analitica_schema import (
+    CubetaVentas,
+    RentabilidadProducto,
+    ResumenVentas,
+    TotalesPeriodo,
+)
+
+# Rango por defecto de los reportes por período.
+RANGO_POR_DEFECTO = timedelta(days=30)
+
+
+class AnaliticaService:
+    """
+    Calcula rentabilidad por producto, rankings y totales de ventas.
+    """
+
+    def __init__(self, ventas_repo=None, store: Optional[ProductoStore] = None):
+        """
+        Inicializa el servicio sobre el repositorio de ventas y el almacén de productos.
+
+        Args:
+            ventas_repo: Repositorio de ventas. Por defecto, el compartido.
+            store (Optional[ProductoStore]): Almacén de productos. Por defecto, el compartido.
+        """
+        self._ventas_repo = ventas_repo
+        self._store = store
+
+    @property
+    def ventas_repo(self):
+        """
+        Repositorio de ventas compartido, obtenido (y cargado) en el primer uso.
+        """
+        if self._ventas_repo is None:
+            self._ventas_repo = obtener_venta_repository()
+        return self._ventas_repo
+
+    @property
+    def store(self) -> ProductoStore:
+        """
+        Almacén de productos compartido, obtenido en el primer uso.
+        """
+        if self._store is None:
+            self._store = obtener_producto_store()
+        return self._store
+
+    def rentabilidad_por_producto(
+        self, desde: Optional[datetime] = None, hasta: Optional[datetime] = None
+    ) -> List[RentabilidadProducto]:
+        """
+        Retorna ventas, unidades, ingresos y desvío de precio de cada producto
+        vendido, de mayor a menor ingreso.
+
+        El desvío de precio es la diferencia entre lo cobrado y las unidades
+        valoradas al precio de catálogo actual: como cada venta se cobra al
+        precio del momento, solo es distinto de cero si el precio cambió
+        desde entonces. Es None si el producto ya no existe.
+        """
+        self.ventas_repo.sincronizar()
+        agregados = self.ventas_repo.columnas.por_producto(
+            marca_de_tiempo(desde) if desde is not None else None,
+            marca_de_tiempo(hasta) if hasta is not None else None,
+        )
+        catalogo = {p["id"]: p for p in self.store.listar_sin_copia()}
+        filas = []
+        for agregado in agregados:
+            producto = catalogo.get(agregado.producto_id)
+            if producto is None:
+                filas.append(RentabilidadProducto(**agregado._asdict()))
+                continue
+            filas.append(RentabilidadProducto(
+                **agregado._asdict(),
+                nombre=producto["nombre"],
+                precio=producto["precio"],
+                desvio_precio=agregado.ingresos - agregado.unidades * producto["precio"],
+            ))
+        filas.sort(key=lambda fila: fila.ingresos, reverse=True)
+        return filas
+
+    def top_productos(
+        self,
+        por: str = "ingresos",
+        limite: int = 10,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+    ) -> List[RentabilidadProducto]:
+        """
+        Retorna los productos con mayor valor en el criterio indicado.
+        """
+        filas = self.rentabilidad_por_producto(desde, hasta)
+        return heapq.nlargest(
+            limite, filas,
+            key=lambda fila: getattr(fila, por) if getattr(fila, por) is not None else float("-inf"),
+        )
+
+    def resumen(
+        self, desde: Optional[datetime] = None, hasta: Optional[datetime] = None
+    ) -> ResumenVentas:
+        """
+        Retorna los totales de ventas de todo el catálogo.
+        """
+        filas = self.rentabilidad_por_producto(desde, hasta)
+        return ResumenVentas(
+            productos=len(filas),
+            ventas=sum(fila.ventas for fila in filas),
+            unidades=sum(fila.unidades for fila in filas),
+            ingresos=sum(fila.ingresos for fila in filas),
+            desvio_precio=sum(
+                fila.desvio_precio for fila in filas if fila.desvio_precio is not None
+            ),
+        )
+
+    @staticmethod
+    def _rango(
+        desde: Optional[datetime], hasta: Optional[datetime]
+    ) -> Tuple[datetime, datetime]:
+        """
+        Completa un rango de fechas: hasta ahora y desde RANGO_POR_DEFECTO antes.
+        """
+        hasta = hasta or datetime.now(timezone.utc)
+        return desde or hasta - RANGO_POR_DEFECTO, hasta
+
+    def serie(
+        self,
+        producto_id: int,
+        granularidad: str = "dia",
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+    ) -> List[CubetaVentas]:
+        """
+        Retorna las ventas de un producto por hora, día o mes en un rango,
+        solo para las cubetas con ventas.
+        """
+        desde, hasta = self._rango(desde, hasta)
+        inicio = cubeta(granularidad, marca_de_tiempo(desde))
+        fin = cubeta(granularidad, marca_de_tiempo(hasta))
+        # La cubeta donde cae "hasta" se incluye si el rango entra en ella.
+        if marca_de_tiempo(hasta) > inicio_cubeta(granularidad, fin).timestamp():
+            fin += 1
+        self.ventas_repo.sincronizar()
+        return [
+            CubetaVentas(inicio=inicio_cubeta(granularidad, numero), ventas=n, unidades=u, ingresos=i)
+            for numero, n, u, i in self.ventas_repo.rollups.serie(producto_id, granularidad, inicio, fin)
+        ]
+
+    def totales_periodo(
+        self,
+        producto_id: int,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+    ) -> TotalesPeriodo:
+        """
+        Retorna las ventas de un producto en un rango, redondeado a la hora,
+        sumando pocas cubetas de mes, día y hora.
+        """
+        desde, hasta = self._rango(desde, hasta)
+        self.ventas_repo.sincronizar()
+        ventas, unidades, ingresos = self.ventas_repo.rollups.totales(
+            producto_id, marca_de_tiempo(desde), marca_de_tiempo(hasta)
+        )
+        return TotalesPeriodo(
+            producto_id=producto_id, desde=desde, hasta=hasta,
+            ventas=ventas, unidades=unidades, ingresos=ingresos,
+        )
+
+    def reconstruir_rollups(self) -> dict:
+        """
+        Recalcula los rollups desde el historial de ventas.
+        """
+        self.ventas_repo.reconstruir_rollups()
+        return {"mensaje": "Rollups reconstruidos"}
@@ -2,9 +2,15 @@
 Servicio que gestiona la lógica de negocio para inventario.
 """
 
-from typing import List
-from src.models.producto import Producto
-from src.repositories.producto_repository import ProductoRepository
+from typing import List, Optional
+from fastapi import HTTPException
+from src.repositories.inventario_repository import (
+    InventarioRepository,
+    crear_inventario_repository,
+)
+from src.repositories.producto_store import StockFueraDeRangoError, StockInsuficienteError
+from src.schemas.inventario_schema import InventarioResponse
+from src.schemas.producto_schema import ProductoResponse
 
 
 class InventarioService:
@@ -12,22 +18,76 @@ class InventarioService:
     Lógica para operaciones de inventario basadas en productos.
     """
 
-    def __init__(self):
+    def __init__(self, repo: Optional[InventarioRepository] = None):
         """
-        Inicializa con un repositorio de productos.
+        Inicializa con el repositorio de inventario.
+
+        Args:
+            repo (Optional[InventarioRepository]): Repositorio a usar. Por
+                defecto, el construido sobre el almacén de productos compartido.
+        """
+        self._repo = repo
+
+    @property
+    def repo(self) -> InventarioRepository:
+        """
+        Repositorio de inventario, creado en el primer uso.
+        """
+        if self._repo is None:
+            self._repo = crear_inventario_repository()
+        return self._repo
+
+    @staticmethod
+    def _respuesta(producto_id: int, cantidad: Optional[int]) -> InventarioResponse:
+        """
+        Construye la respuesta de inventario o responde 404 si el producto no existe.
+        """
+        if cantidad is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        return InventarioResponse(id=producto_id, producto_id=producto_id, cantidad=cantidad)
+
+    def obtener_stock(self, producto_id: int) -> InventarioResponse:
+        """
+        Devuelve el stock de un producto.
         """
-        self.repo = ProductoRepository()
+        return self._respuesta(producto_id, self.repo.obtener_cantidad(producto_id))
+
+    def agregar_stock(self, producto_id: int, cantidad: int) -> InventarioResponse:
+        """
+        Suma (o resta, si es negativa) una cantidad al stock de un producto.
+        """
+        try:
+            nueva = self.repo.agregar_stock(producto_id, cantidad)
+        except StockInsuficienteError:
+            raise HTTPException(status_code=400, detail="Stock insuficiente para descontar")
+        except StockFueraDeRangoError as exc:
+            raise HTTPException(status_code=422, detail="Stock fuera de rango") from exc
+        return self._respuesta(producto_id, nueva)
+
+    def establecer_stock(self, producto_id: int, cantidad: int) -> InventarioResponse:
+        """
+        Fija el stock exacto de un producto.
+        """
+        try:
+            nueva = self.repo.establecer_stock(producto_id, cantidad)
+        except StockFueraDeRangoError as exc:
+            raise HTTPException(status_code=422, detail="Stock fuera de rango") from exc
+        return self._respuesta(producto_id, nueva)
 
     def obtener_stock_total(self) -> int:
         """
-        Suma el stock de todos los productos.
+        Suma el stock de todos los productos (agregado mantenido por el almacén).
         """
-        productos = self.repo.obtener_productos()
-        return sum(p.stock for p in productos)
+        return self.repo.stock_total()
 
-    def listar_productos_bajo_stock(self, umbral: int = 5) -> List[Producto]:
+    def listar_productos_bajo_stock(self, umbral: int = 5) -> List[ProductoResponse]:
         """
         Devuelve productos con stock menor o igual al umbral.
         """
-        productos = self.repo.obtener_productos()
-        return [p for p in productos if p.stock <= umbral]
+        return [ProductoResponse(**p) for p in self.repo.productos_bajo_stock(umbral)]
+
+    def listar_productos_agotados(self) -> List[ProductoResponse]:
+        """
+        Devuelve productos con stock cero.
+        """
+        return [ProductoResponse(**p) for p in self.repo.productos_agotados()]
@@ -1,112 +1,484 @@
 """
 Servicio para la lógica de negocio relacionada con productos.
-Maneja lectura, escritura y modificación de productos en archivo JSON.
+Maneja lectura, escritura y modificación de productos a través del almacén en memoria.
 """
 
-import os
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 from fastapi import HTTPException
-from src.helpers.json_utils import leer_json, escribir_json
-from src.schemas.producto_schema import ProductoResponse
+from fastapi.encoders import jsonable_encoder
+from src.config.settings import settings
+from src.helpers.indice_texto import IndiceTexto
+from src.helpers.metricas import registro_metricas
+from src.helpers.serializacion import CacheJson
+from src.models.venta import Venta
+from src.repositories.producto_store import (
+    ConflictoVersionError,
+    ProductoNoEncontradoError,
+    StockFueraDeRangoError,
+    StockInsuficienteError,
+    obtener_producto_store,
+)
+from src.repositories.idempotencia_store import (
+    ClaveReutilizadaError,
+    RegistroIdempotencia,
+    obtener_registro_idempotencia,
+)
+from src.repositories.venta_repository import obtener_venta_repository
+from src.schemas.producto_schema import (
+    ProductoResponse,
+    ResultadoItemLote,
+    ResultadoLote,
+)
+
+# Código HTTP y mensaje de cada error que puede reportar un ítem de un lote.
+ERRORES_LOTE = {
+    ProductoNoEncontradoError: (404, "Producto no encontrado"),
+    StockInsuficienteError: (400, "Stock insuficiente para descontar"),
+    ConflictoVersionError: (409, "Conflicto de versión"),
+    StockFueraDeRangoError: (422, "Stock fuera de rango"),
+}
 
 
 class ProductoService:
     """
     Servicio de productos. Implementa la lógica CRUD y ajustes de stock.
+
+    El almacén y el repositorio de ventas se obtienen en el primer uso, así
+    que crear el servicio (al importar los routers) no carga datos. Se pueden
+    inyectar al crearlo, por ejemplo para usar otro modo de almacenamiento.
     """
 
-    def __init__(self):
-        self.ruta_productos = os.path.join("src", "data", "productos.json")
+    def __init__(self, ruta_productos: Optional[str] = None, ventas_repo=None, store=None):
+        self.ruta_productos = ruta_productos
+        self._store = store
+        self._ventas_repo = ventas_repo
+        self._idempotencia: Optional[RegistroIdempotencia] = None
+        self.cache_json = CacheJson()
+        self.indice_texto: Optional[IndiceTexto] = None
+        self._indice_lock = threading.Lock()
+        self._recargas_vistas = 0
+        registro_metricas.colector("productos", self.muestras_metricas)
 
-    def listar_productos(self) -> list[ProductoResponse]:
+    @property
+    def store(self):
         """
-        Retorna la lista completa de productos.
+        Almacén de productos compartido, obtenido en el primer uso.
         """
-        productos = leer_json(self.ruta_productos)
-        return [ProductoResponse(**p) for p in productos]
+        if self._store is None:
+            self._store = obtener_producto_store(self.ruta_productos)
+        return self._store
 
-    def registrar_venta(self, producto_id: int) -> dict:
+    @property
+    def ventas_repo(self):
         """
-        Registra una venta sumando +1 al campo ventas.
+        Repositorio de ventas compartido, obtenido (y cargado) en el primer uso.
+        """
+        if self._ventas_repo is None:
+            self._ventas_repo = obtener_venta_repository()
+        return self._ventas_repo
+
+    @property
+    def idempotencia(self) -> RegistroIdempotencia:
+        """
+        Registro de respuestas por Idempotency-Key, obtenido en el primer uso.
+        """
+        if self._idempotencia is None:
+            self._idempotencia = obtener_registro_idempotencia()
+        return self._idempotencia
+
+    def idempotente(
+        self, clave: str, huella: str, funcion: Callable[..., Any], *args: Any
+    ) -> Tuple[int, Any, bool]:
+        """
+        Ejecuta una escritura una sola vez por clave de idempotencia.
+
+        Se guarda la primera respuesta, también si es un error 4xx, y los
+        reintentos con la misma clave la reciben sin volver a escribir. Los
+        errores 4xx se retornan como estado y detalle, no como excepción, para
+        que la repetición se responda igual que la primera vez. Los errores
+        5xx no se guardan, así que un reintento vuelve a ejecutar.
 
         Args:
-            producto_id (int): ID del producto a vender.
+            clave (str): Valor de la cabecera Idempotency-Key.
+            huella (str): Identifica la petición; la misma clave con otra
+                petición responde 422.
+            funcion (Callable[..., Any]): Método del servicio a ejecutar.
+            *args (Any): Argumentos del método.
 
         Returns:
-            dict: Mensaje de éxito con ventas totales.
+            Tuple[int, Any, bool]: Estado HTTP, respuesta (valores JSON; el
+            detalle si es un error) y si fue una repetición.
+        """
+        def operacion() -> Tuple[int, Any]:
+            try:
+                return 200, jsonable_encoder(funcion(*args))
+            except HTTPException as exc:
+                if exc.status_code >= 500:
+                    raise
+                return exc.status_code, exc.detail
+
+        try:
+            estado, cuerpo, repetida = self.idempotencia.ejecutar(clave, huella, operacion)
+        except ClaveReutilizadaError as exc:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key ya usada con otra petición"
+            ) from exc
+        return estado, cuerpo, repetida
+
+    def _vigilar_recargas(self) -> None:
+        """
+        Vacía la caché JSON y descarta el índice de búsqueda si el almacén
+        recargó datos escritos por otro proceso.
+        """
+        if self.store.recargas != self._recargas_vistas:
+            self._recargas_vistas = self.store.recargas
+            self.cache_json.olvidar()
+            with self._indice_lock:
+                self.indice_texto = None
+
+    @staticmethod
+    def _campos_busqueda(producto: dict) -> List[Tuple[str, int]]:
+        """
+        Retorna los textos indexados de un producto: el nombre pesa el doble
+        que la descripción.
+        """
+        return [(producto.get("nombre"), 2), (producto.get("descripcion"), 1)]
+
+    def _indice(self) -> IndiceTexto:
+        """
+        Retorna el índice de búsqueda, construyéndolo la primera vez que se
+        usa (o tras una recarga del almacén).
+        """
+        self._vigilar_recargas()
+        with self._indice_lock:
+            if self.indice_texto is None:
+                indice = IndiceTexto()
+                for producto in self.store.listar_sin_copia():
+                    indice.agregar(producto["id"], self._campos_busqueda(producto))
+                self.indice_texto = indice
+            return self.indice_texto
+
+    def _reindexar(self, productos: Iterable[dict]) -> None:
+        """
+        Actualiza en el índice de búsqueda, si ya está construido, los productos
+        recién escritos.
+        """
+        with self._indice_lock:
+            if self.indice_texto is not None:
+                for producto in productos:
+                    self.indice_texto.agregar(producto["id"], self._campos_busqueda(producto))
+
+    def buscar_productos_json(self, consulta: str, limite: int) -> bytes:
+        """
+        Busca productos por nombre y descripción y los retorna codificados como
+        arreglo JSON, del más relevante al menos relevante.
+
+        Las palabras se comparan sin tildes ni mayúsculas; cada una debe
+        coincidir exacta, por prefijo o (desde tres letras) por subcadena.
+
+        Args:
+            consulta (str): Texto a buscar.
+            limite (int): Máximo de productos a retornar.
+
+        Returns:
+            bytes: Arreglo JSON de productos.
+        """
+        ids = self._indice().buscar(consulta, limite)
+        productos = [p for p in map(self.store.obtener, ids) if p is not None]
+        return self.cache_json.codificar_lista(productos)
+
+    def etag_catalogo(self) -> str:
+        """
+        Retorna el ETag del catálogo, que cambia con cualquier alta, baja o
+        modificación de productos. No lee ni serializa productos.
+        """
+        return f'"{self.store.marca()}"'
+
+    def etag_producto(self, producto_id: int) -> Optional[str]:
+        """
+        Retorna el ETag de un producto, que cambia solo cuando ese producto
+        cambia, o None si no existe. No lee ni serializa el producto.
+        """
+        marca = self.store.marca(producto_id)
+        return None if marca is None else f'"{marca}"'
+
+    def listar_productos_json(self) -> bytes:
+        """
+        Retorna el catálogo completo ya codificado como arreglo JSON.
+
+        Reutiliza los bytes de cada producto que no cambió desde la última vez,
+        sin construir ni validar modelos Pydantic.
+        """
+        productos = self.store.listar_sin_copia()
+        self._vigilar_recargas()
+        return self.cache_json.codificar_lista(productos)
+
+    def obtener_producto_json(self, producto_id: int) -> bytes:
+        """
+        Retorna un producto ya codificado como JSON.
+        """
+        producto = self.store.obtener(producto_id)
+        if producto is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        self._vigilar_recargas()
+        return self.cache_json.codificar(producto)
+
+    def tramo_productos_json(self, cursor: int, limite: int) -> Tuple[bytes, Optional[int], int]:
+        """
+        Retorna un tramo de productos codificado como NDJSON.
+
+        Returns:
+            Tuple[bytes, Optional[int], int]: Líneas NDJSON, ID del último producto
+            del tramo y cantidad de productos incluidos.
+        """
+        productos = self.store.pagina(cursor, limite)
+        self._vigilar_recargas()
+        lineas = b"".join(self.cache_json.codificar(p) + b"\n" for p in productos)
+        return lineas, (productos[-1]["id"] if productos else None), len(productos)
+
+    def listar_pagina_json(self, cursor: int = 0, limite: int = 100) -> Tuple[bytes, Optional[int]]:
+        """
+        Retorna una página de productos con ID mayor al cursor, ordenada por ID
+        y ya codificada como arreglo JSON desde la caché.
+
+        Returns:
+            Tuple[bytes, Optional[int]]: Arreglo JSON de la página y cursor de
+            la página siguiente (None si es la última).
+        """
+        productos = self.store.pagina(cursor, limite + 1)
+        self._vigilar_recargas()
+        siguiente = productos[limite - 1]["id"] if len(productos) > limite else None
+        return self.cache_json.codificar_lista(productos[:limite]), siguiente
+
+    def _anotar_venta(self, producto: dict) -> None:
+        """
+        Anota en el repositorio de ventas la venta de una unidad al precio actual.
+
+        Los productos sin precio positivo solo suman al contador del producto.
+        """
+        self._anotar_ventas([producto])
+
+    def _anotar_ventas(self, productos: Iterable[dict]) -> None:
+        """
+        Anota la venta de una unidad de cada producto con una sola escritura
+        en el repositorio de ventas.
         """
-        productos = leer_json(self.ruta_productos)
-        for producto in productos:
-            if producto["id"] == producto_id:
-                producto["ventas"] = producto.get("ventas", 0) + 1
-                escribir_json(self.ruta_productos, productos)
-                return {
-                    "mensaje": "Venta registrada",
-                    "producto_id": producto_id,
-                    "ventas_totales": producto["ventas"]
-                }
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+        ventas = [
+            Venta(id=0, producto_id=producto["id"], cantidad=1, total=producto["precio"])
+            for producto in productos
+            if producto["precio"] > 0
+        ]
+        if ventas:
+            self.ventas_repo.guardar_ventas(ventas)
 
-    def obtener_producto(self, producto_id: int) -> ProductoResponse:
+    def registrar_venta(self, producto_id: int) -> dict:
         """
-        Retorna un producto dado su ID.
+        Registra una venta sumando +1 al campo ventas y anotándola en el
+        repositorio de ventas.
+
+        Args:
+            producto_id (int): ID del producto a vender.
+
+        Returns:
+            dict: Mensaje de éxito con ventas totales.
         """
-        productos = leer_json(self.ruta_productos)
-        for producto in productos:
-            if producto["id"] == producto_id:
-                return ProductoResponse(**producto)
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+        producto = self.store.incrementar_ventas(producto_id)
+        if producto is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        self._anotar_venta(producto)
+        return {
+            "mensaje": "Venta registrada",
+            "producto_id": producto_id,
+            "ventas_totales": producto["ventas"]
+        }
 
     def crear_producto(self, data: dict) -> ProductoResponse:
         """
         Crea un nuevo producto con un ID único.
         """
-        productos = leer_json(self.ruta_productos)
-        ids = [p["id"] for p in productos]
-        nuevo_id = max(ids, default=0) + 1
-        data["id"] = nuevo_id
         data["ventas"] = 0
-        productos.append(data)
-        escribir_json(self.ruta_productos, productos)
-        return ProductoResponse(**data)
+        try:
+            producto = self.store.crear(data)
+        except StockFueraDeRangoError as exc:
+            raise HTTPException(status_code=422, detail="Stock fuera de rango") from exc
+        self._reindexar([producto])
+        return ProductoResponse(**producto)
 
-    def actualizar_producto(self, producto_id: int, data: dict) -> ProductoResponse:
+    def actualizar_producto(
+        self, producto_id: int, data: dict, version_esperada: Optional[int] = None
+    ) -> ProductoResponse:
         """
         Actualiza los datos de un producto existente.
+
+        Si se indica version_esperada y el producto cambió desde entonces,
+        responde 409 en lugar de sobrescribir el cambio concurrente.
         """
-        productos = leer_json(self.ruta_productos)
-        for producto in productos:
-            if producto["id"] == producto_id:
-                producto.update(data)
-                escribir_json(self.ruta_productos, productos)
-                return ProductoResponse(**producto)
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+        try:
+            producto = self.store.actualizar(producto_id, data, version_esperada)
+        except ConflictoVersionError as exc:
+            raise HTTPException(status_code=409, detail="Conflicto de versión") from exc
+        except StockFueraDeRangoError as exc:
+            raise HTTPException(status_code=422, detail="Stock fuera de rango") from exc
+        if producto is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        self._reindexar([producto])
+        return ProductoResponse(**producto)
 
     def eliminar_producto(self, producto_id: int) -> bool:
         """
         Elimina un producto por su ID.
         """
-        productos = leer_json(self.ruta_productos)
-        for i, producto in enumerate(productos):
-            if producto["id"] == producto_id:
-                productos.pop(i)
-                escribir_json(self.ruta_productos, productos)
-                return True
-        return False
+        self.cache_json.olvidar(producto_id)
+        eliminado = self.store.eliminar(producto_id)
+        with self._indice_lock:
+            if self.indice_texto is not None:
+                self.indice_texto.quitar(producto_id)
+        return eliminado
 
-    def ajustar_stock(self, producto_id: int, cantidad: int) -> ProductoResponse:
+    def ajustar_stock(
+        self, producto_id: int, cantidad: int, version_esperada: Optional[int] = None
+    ) -> ProductoResponse:
         """
         Suma o resta cantidad al stock del producto.
+
+        Los ajustes concurrentes sobre el mismo producto se serializan; con
+        version_esperada, un cambio concurrente responde 409.
+        """
+        try:
+            producto = self.store.ajustar_cantidad(producto_id, cantidad, version_esperada)
+        except ConflictoVersionError as exc:
+            raise HTTPException(status_code=409, detail="Conflicto de versión") from exc
+        except StockInsuficienteError as exc:
+            raise HTTPException(
+                status_code=400,
+                detail="Stock insuficiente para descontar"
+            ) from exc
+        except StockFueraDeRangoError as exc:
+            raise HTTPException(status_code=422, detail="Stock fuera de rango") from exc
+        if producto is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        return ProductoResponse(**producto)
+
+    def estadisticas_store(self) -> dict:
+        """
+        Retorna los contadores de aciertos y recargas del almacén de productos.
+        """
+        return self.store.estadisticas()
+
+    def muestras_metricas(self) -> list:
+        """
+        Retorna los contadores del almacén y de la caché JSON para /metrics.
+
+        Returns:
+            list: Muestras (nombre, tipo, ayuda, series) de metricas.py.
+        """
+        if self._store is None:
+            return self.cache_json.muestras_metricas()
+        datos = self.estadisticas_store()
+        muestras = [
+            (f"inventario_store_{clave}_total", "counter", f"Almacén de productos: {clave}.", [({}, valor)])
+            for clave, valor in datos.items() if clave != "productos"
+        ]
+        consultas = datos["aciertos"] + datos["recargas"]
+        muestras += [
+            ("inventario_store_productos", "gauge", "Productos en memoria.", [({}, datos["productos"])]),
+            ("inventario_store_ratio_aciertos", "gauge",
+             "Fracción de lecturas del almacén servidas sin recargar el archivo.",
+             [({}, datos["aciertos"] / consultas if consultas else 0)]),
+        ]
+        return muestras + self.cache_json.muestras_metricas()
+
+    @staticmethod
+    def _validar_tamano_lote(cantidad: int) -> None:
+        """
+        Rechaza lotes vacíos o mayores al máximo configurado.
+        """
+        if cantidad == 0:
+            raise HTTPException(status_code=422, detail="El lote está vacío")
+        if cantidad > settings.lote_max_items:
+            raise HTTPException(
+                status_code=413,
+                detail=f"El lote supera el máximo de {settings.lote_max_items} ítems"
+            )
+
+    @staticmethod
+    def _resultado_lote(
+        aplicado: bool, resultados: list, producto_ids: List[int], ventas: bool = False
+    ) -> ResultadoLote:
+        """
+        Convierte el resultado del almacén en la respuesta por ítem del lote.
+        """
+        items = []
+        for indice, (producto_id, resultado) in enumerate(zip(producto_ids, resultados)):
+            if isinstance(resultado, Exception):
+                status, error = ERRORES_LOTE[type(resultado)]
+                items.append(ResultadoItemLote(
+                    indice=indice, producto_id=producto_id, ok=False, status=status, error=error
+                ))
+            elif not aplicado:
+                items.append(ResultadoItemLote(
+                    indice=indice, producto_id=producto_id, ok=False, status=424,
+                    error="No aplicado: otro ítem del lote falló"
+                ))
+            else:
+                items.append(ResultadoItemLote(
+                    indice=indice,
+                    producto_id=producto_id,
+                    ok=True,
+                    status=200,
+                    producto=ProductoResponse(**resultado),
+                    ventas_totales=resultado.get("ventas") if ventas else None,
+                ))
+        return ResultadoLote(aplicado=aplicado, resultados=items)
+
+    def crear_productos(self, lista: List[dict]) -> List[ProductoResponse]:
+        """
+        Crea varios productos con una sola lectura y una sola escritura.
+        """
+        self._validar_tamano_lote(len(lista))
+        for data in lista:
+            data["ventas"] = 0
+        try:
+            productos = self.store.crear_lote(lista)
+        except StockFueraDeRangoError as exc:
+            raise HTTPException(status_code=422, detail="Stock fuera de rango") from exc
+        self._reindexar(productos)
+        return [ProductoResponse(**p) for p in productos]
+
+    def actualizar_productos(self, items: List[dict], todo_o_nada: bool = False) -> ResultadoLote:
+        """
+        Actualiza varios productos con una sola lectura y una sola escritura.
+
+        Cada ítem trae producto_id, datos (campos a modificar) y version opcional.
+        """
+        self._validar_tamano_lote(len(items))
+        aplicado, resultados = self.store.actualizar_lote(
+            [(i["producto_id"], i["datos"], i.get("version")) for i in items], todo_o_nada
+        )
+        if aplicado:
+            self._reindexar(r for r in resultados if not isinstance(r, Exception))
+        return self._resultado_lote(aplicado, resultados, [i["producto_id"] for i in items])
+
+    def ajustar_stock_lote(self, items: List[dict], todo_o_nada: bool = False) -> ResultadoLote:
+        """
+        Ajusta el stock de varios productos con una sola lectura y una sola escritura.
+
+        Cada ítem trae producto_id, cantidad y version opcional.
+        """
+        self._validar_tamano_lote(len(items))
+        aplicado, resultados = self.store.ajustar_cantidades(
+            [(i["producto_id"], i["cantidad"], i.get("version")) for i in items], todo_o_nada
+        )
+        return self._resultado_lote(aplicado, resultados, [i["producto_id"] for i in items])
+
+    def registrar_ventas_lote(self, producto_ids: List[int], todo_o_nada: bool = False) -> ResultadoLote:
+        """
+        Registra una venta por cada ID indicado con una sola lectura y una sola escritura.
         """
-        productos = leer_json(self.ruta_productos)
-        for producto in productos:
-            if producto["id"] == producto_id:
-                nuevo_stock = producto["cantidad"] + cantidad
-                if nuevo_stock < 0:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Stock insuficiente para descontar"
-                    )
-                producto["cantidad"] = nuevo_stock
-                escribir_json(self.ruta_productos, productos)
-                return ProductoResponse(**producto)
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+        self._validar_tamano_lote(len(producto_ids))
+        aplicado, resultados = self.store.incrementar_ventas_lote(producto_ids, todo_o_nada)
+        if aplicado:
+            self._anotar_ventas(r for r in resultados if not isinstance(r, Exception))
+        return self._resultado_lote(aplicado, resultados, producto_ids, ventas=True)
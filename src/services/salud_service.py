@@ -0,0 +1,103 @@
+"""
+Servicio de salud: precalentamiento de los datos y estado de arranque.
+
+Al importar la aplicación no se carga ningún dato; el almacén de productos y
+el repositorio de ventas se crean en su primer uso. Con PRECALENTAR, el
+arranque los carga en segundo plano y la API queda "lista" al terminar, de
+modo que un balanceador puede esperar a /salud/listo sin retrasar /salud/vivo.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from src.config.settings import settings
+from src.repositories.producto_store import obtener_producto_store
+from src.repositories.venta_repository import (
+    VentaRepository,
+    obtener_venta_repository,
+    venta_repository_cargado,
+)
+from src.schemas.salud_schema import EstadoSalud
+
+logger = logging.getLogger("inventario_app")
+
+
+class SaludService:
+    """
+    Lleva el estado del precalentamiento y guarda las instantáneas al cerrar.
+
+    Atributos:
+        estado (str): "sin_precalentar", "precalentando", "listo" o "error".
+        segundos (Optional[float]): Duración del precalentamiento, si terminó.
+        error (Optional[str]): Error del precalentamiento, si falló.
+    """
+
+    def __init__(self) -> None:
+        self.estado = "sin_precalentar"
+        self.segundos: Optional[float] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def marcar_precalentando(self) -> None:
+        """
+        Marca la API como no lista hasta que termine precalentar().
+        """
+        with self._lock:
+            self.estado = "precalentando"
+            self.segundos = None
+            self.error = None
+
+    def precalentar(self) -> None:
+        """
+        Carga el almacén de productos y el repositorio de ventas.
+
+        Un error no detiene la API: queda registrado, /salud/listo responde
+        503 y los datos se vuelven a intentar cargar en el primer uso.
+        """
+        inicio = time.perf_counter()
+        try:
+            obtener_producto_store().stock_total()
+            obtener_venta_repository()
+        except Exception as error:
+            logger.exception("Falló el precalentamiento de datos")
+            with self._lock:
+                self.estado = "error"
+                self.error = f"{type(error).__name__}: {error}"
+                self.segundos = round(time.perf_counter() - inicio, 3)
+            return
+        with self._lock:
+            self.estado = "listo"
+            self.segundos = round(time.perf_counter() - inicio, 3)
+        logger.info("Datos precalentados en %.3f s", self.segundos)
+
+    def estado_arranque(self) -> EstadoSalud:
+        """
+        Retorna el estado de arranque.
+
+        Sin precalentamiento la API está lista desde el inicio: cada dato se
+        carga en su primera petición.
+
+        Returns:
+            EstadoSalud: Estado actual.
+        """
+        with self._lock:
+            return EstadoSalud(
+                estado=self.estado,
+                listo=self.estado in ("sin_precalentar", "listo"),
+                segundos=self.segundos,
+                error=self.error,
+            )
+
+    def guardar_instantaneas(self) -> None:
+        """
+        Guarda la instantánea del libro de ventas si el repositorio se cargó,
+        para que el próximo arranque no reproduzca el historial.
+        """
+        repositorio = venta_repository_cargado()
+        if settings.instantaneas and isinstance(repositorio, VentaRepository):
+            repositorio.guardar_instantanea()
+
+
+salud_service = SaludService()
@@ -0,0 +1,99 @@
+"""
+Utilidades compartidas por las pruebas: almacenes de productos en cada modo.
+"""
+
+import os
+
+import pytest
+
+from src.config.settings import settings
+from src.helpers.json_utils import escribir_json
+from src.helpers.sqlite_utils import PoolSqlite
+from src.repositories.producto_store import (
+    ProductoStore,
+    ProductoStoreJournal,
+    ProductoStoreSqlite,
+)
+
+
+@pytest.fixture(params=("json", "compacto", "journal", "sqlite"))
+def modo_store(request):
+    """
+    Modo de almacenamiento de productos: las pruebas que lo usan corren en todos.
+    """
+    return request.param
+
+
+@pytest.fixture
+def rutas_ventas(tmp_path, monkeypatch):
+    """
+    Apunta el libro de ventas a tmp_path, sin instantáneas.
+    """
+    monkeypatch.setattr(settings, "ventas_path", str(tmp_path / "ventas.json"))
+    monkeypatch.setattr(settings, "ventas_segmentos_dir", str(tmp_path / "ventas"))
+    monkeypatch.setattr(settings, "instantaneas", False)
+    return tmp_path
+
+
+@pytest.fixture
+def crear_store(tmp_path):
+    """
+    Retorna una función que crea un almacén del modo indicado con los
+    productos dados, cada uno sobre archivos propios en tmp_path.
+    """
+    creados = []
+
+    def crear(modo, productos):
+        ruta = str(tmp_path / f"{modo}-{len(creados)}.json")
+        escribir_json(ruta, productos)
+        if modo == "journal":
+            store = ProductoStoreJournal(ruta)
+        elif modo == "sqlite":
+            store = ProductoStoreSqlite(PoolSqlite(os.path.splitext(ruta)[0] + ".db"))
+            for producto in productos:
+                store.guardar(producto)
+        else:
+            store = ProductoStore(ruta, compacto=modo == "compacto")
+        creados.append(store)
+        return store
+
+    yield crear
+    for store in creados:
+        if isinstance(store, ProductoStoreJournal):
+            store._journal.cerrar()
+        elif isinstance(store, ProductoStoreSqlite):
+            store.pool.cerrar()
+
+
+@pytest.fixture
+def cliente_productos(crear_store, rutas_ventas, monkeypatch):
+    """
+    Cliente HTTP del router de productos sobre un almacén JSON con tres
+    productos, un libro de ventas y un registro de idempotencia propios.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.helpers.serializacion import CacheJson
+    from src.repositories.idempotencia_store import RegistroIdempotencia
+    from src.repositories.venta_repository import VentaRepository
+    from src.routes import producto_router
+
+    store = crear_store("json", [
+        {"id": pid, "nombre": f"Producto {pid}", "descripcion": "", "precio": 10.0,
+         "cantidad": 5, "ventas": 0}
+        for pid in (1, 2, 3)
+    ])
+    service = producto_router.service
+    ventas = VentaRepository()
+    monkeypatch.setattr(service, "_store", store)
+    monkeypatch.setattr(service, "_ventas_repo", ventas)
+    monkeypatch.setattr(service, "_idempotencia", RegistroIdempotencia(
+        str(rutas_ventas / "idempotencia.ndjson"), maximo=100, ttl=60.0,
+    ))
+    monkeypatch.setattr(service, "cache_json", CacheJson())
+    monkeypatch.setattr(service, "indice_texto", None)
+    app = FastAPI()
+    app.include_router(producto_router.router, prefix="/productos")
+    yield TestClient(app)
+    ventas.libro.cerrar()
@@ -0,0 +1,70 @@
+"""
+Pruebas del control de admisión.
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.helpers import admision
+from src.helpers.admision import LimiteConcurrencia, MiddlewareAdmision
+
+
+def test_vencer_con_el_lugar_ya_cedido_no_lo_pierde(monkeypatch):
+    limite = LimiteConcurrencia("lectura", limite=1, cola=4, presupuesto=1.0)
+
+    async def vence_tras_ceder(turno, timeout):
+        # La petición admitida termina y cede su lugar justo cuando vence la espera.
+        limite.salir(0.0)
+        raise asyncio.TimeoutError
+
+    async def escenario():
+        assert await limite.entrar() is None
+        monkeypatch.setattr(admision.asyncio, "wait_for", vence_tras_ceder)
+        assert await limite.entrar() == "vencida"
+        monkeypatch.undo()
+        assert limite.en_curso == 0
+        assert await limite.entrar() is None
+
+    asyncio.run(escenario())
+
+
+def test_sobre_el_limite_encola_y_luego_responde_503():
+    app = FastAPI()
+    liberar = asyncio.Event()
+
+    @app.get("/lenta")
+    async def lenta():
+        await liberar.wait()
+        return {"ok": True}
+
+    @app.get("/salud/")
+    async def salud():
+        return {"estado": "ok"}
+
+    @app.post("/escritura")
+    async def escritura():
+        return {"ok": True}
+
+    app.add_middleware(MiddlewareAdmision, lecturas=1, escrituras=1, cola=1, presupuesto=5.0)
+
+    async def escenario():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://prueba") as cliente:
+            admitida = asyncio.create_task(cliente.get("/lenta"))
+            await asyncio.sleep(0.05)
+            encolada = asyncio.create_task(cliente.get("/lenta"))
+            await asyncio.sleep(0.05)
+            rechazada = await cliente.get("/lenta")
+            assert rechazada.status_code == 503
+            assert int(rechazada.headers["Retry-After"]) >= 1
+            # Las sondas y la otra clase no se ven afectadas por la saturación.
+            assert (await cliente.get("/salud/")).status_code == 200
+            assert (await cliente.post("/escritura")).status_code == 200
+            assert not encolada.done()
+            liberar.set()
+            assert (await admitida).status_code == 200
+            assert (await encolada).status_code == 200
+
+    asyncio.run(escenario())
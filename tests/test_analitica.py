@@ -0,0 +1,28 @@
+"""
+Pruebas de la analítica de ventas por producto.
+"""
+
+from src.models.venta import Venta
+from src.repositories.venta_repository import VentaRepository
+from src.services.analitica_service import AnaliticaService
+
+
+def test_desvio_de_precio_solo_aparece_si_el_precio_cambio(rutas_ventas, crear_store):
+    store = crear_store("json", [
+        {"id": pid, "nombre": f"p{pid}", "descripcion": "", "precio": 10.0, "cantidad": 5, "ventas": 0}
+        for pid in (1, 2)
+    ])
+    ventas = VentaRepository()
+    try:
+        ventas.guardar_ventas([
+            Venta(id=0, producto_id=pid, cantidad=1, total=10.0) for pid in (1, 1, 2)
+        ])
+        service = AnaliticaService(ventas_repo=ventas, store=store)
+        assert [f.desvio_precio for f in service.rentabilidad_por_producto()] == [0.0, 0.0]
+        store.actualizar(2, {"precio": 12.5})
+        filas = {f.producto_id: f for f in service.rentabilidad_por_producto()}
+        assert filas[1].desvio_precio == 0.0 and filas[2].desvio_precio == -2.5
+        assert service.resumen().desvio_precio == -2.5
+        assert [f.producto_id for f in service.top_productos("unidades", 1)] == [1]
+    finally:
+        ventas.libro.cerrar()
@@ -0,0 +1,34 @@
+"""
+Pruebas de los permisos de los archivos escritos de forma atómica.
+"""
+
+import os
+import stat
+
+from src.helpers import archivos
+from src.helpers.json_utils import escribir_json
+from src.repositories.catalogo_binario import escribir_catalogo
+
+
+def _permisos(ruta):
+    return stat.S_IMODE(os.stat(ruta).st_mode)
+
+
+def test_archivo_nuevo_respeta_la_mascara(tmp_path, monkeypatch):
+    monkeypatch.setattr(archivos, "_UMASK", 0o022)
+    ruta = tmp_path / "productos.json"
+    escribir_json(str(ruta), [])
+    assert _permisos(ruta) == 0o644
+
+
+def test_reemplazo_conserva_los_permisos_anteriores(tmp_path):
+    ruta = tmp_path / "productos.json"
+    ruta.write_text("[]")
+    os.chmod(ruta, 0o640)
+    escribir_json(str(ruta), [{"id": 1}])
+    assert _permisos(ruta) == 0o640
+    catalogo = tmp_path / "productos.bin"
+    catalogo.write_bytes(b"")
+    os.chmod(catalogo, 0o664)
+    escribir_catalogo(str(catalogo), [], (0, 0, 0))
+    assert _permisos(catalogo) == 0o664
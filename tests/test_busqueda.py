@@ -0,0 +1,57 @@
+"""
+Pruebas de la búsqueda de texto sobre productos y clientes de ventas.
+"""
+
+import json
+
+from src.helpers.indice_texto import IndiceTexto
+from src.models.venta import Venta
+from src.repositories.venta_repository import VentaRepository
+from src.services.producto_service import ProductoService
+
+
+def test_indice_ignora_tildes_y_admite_prefijos_y_subcadenas():
+    indice = IndiceTexto()
+    indice.agregar(1, [("Cámara IP exterior", 2), ("Visión nocturna", 1)])
+    indice.agregar(2, [("Sensor de movimiento", 2), ("Para cámara de seguridad", 1)])
+    indice.agregar(3, [("Cerradura", 2), ("Con teclado", 1)])
+    assert indice.buscar("camara") == [1, 2]
+    assert indice.buscar("CAM") == [1, 2]
+    assert indice.buscar("vision noct") == [1]
+    assert indice.buscar("ecla") == [3]
+    assert indice.buscar("sirena") == []
+    indice.quitar(1)
+    assert indice.buscar("camara") == [2]
+
+
+def test_buscar_productos_refleja_altas_y_cambios(crear_store):
+    store = crear_store("json", [
+        {"id": 1, "nombre": "Alarma", "descripcion": "Con sirena", "precio": 1.0, "cantidad": 1, "ventas": 0},
+    ])
+    service = ProductoService(store=store)
+
+    def buscar(consulta):
+        return [p["id"] for p in json.loads(service.buscar_productos_json(consulta, 10))]
+
+    assert buscar("sirena") == [1]
+    creado = service.crear_producto(
+        {"nombre": "Sirena exterior", "descripcion": "", "precio": 2.0, "cantidad": 3}
+    )
+    # La coincidencia en el nombre pesa más que en la descripción.
+    assert buscar("sirena") == [creado.id, 1]
+    service.actualizar_producto(1, {"descripcion": "Inalámbrica"})
+    assert buscar("sirena") == [creado.id]
+    service.eliminar_producto(creado.id)
+    assert buscar("sirena") == []
+
+
+def test_filtrar_ventas_por_cliente(rutas_ventas):
+    repositorio = VentaRepository()
+    for cliente in ("Ana Pérez", "Juan Pereira", "Anabel Ruiz", None):
+        repositorio.guardar_venta(Venta(id=0, producto_id=1, cantidad=1, total=5.0, cliente=cliente))
+    assert [v.cliente for v in repositorio.obtener_ventas_filtradas("perez")] == ["Ana Pérez"]
+    assert [v.cliente for v in repositorio.obtener_ventas_filtradas("PER")] == ["Ana Pérez", "Juan Pereira"]
+    assert [v.cliente for v in repositorio.obtener_ventas_filtradas("an")] == ["Ana Pérez", "Juan Pereira", "Anabel Ruiz"]
+    repositorio.eliminar_venta_por_id(1)
+    assert repositorio.obtener_ventas_filtradas("perez") == []
+    repositorio.libro.cerrar()
@@ -0,0 +1,117 @@
+"""
+Pruebas del catálogo binario mapeado en memoria y de ProductoStoreMapeado.
+"""
+
+import pytest
+
+from src.helpers.json_utils import escribir_json
+from src.repositories.catalogo_binario import (
+    CatalogoBinario,
+    CatalogoMapeado,
+    abrir_catalogo,
+    escribir_catalogo,
+)
+from src.repositories.producto_store import ProductoStoreMapeado
+
+FIRMA = (1, 2, 3)
+
+
+def _producto(pid, **campos):
+    producto = {"id": pid, "nombre": f"Producto {pid}", "descripcion": "", "precio": 10.0,
+                "cantidad": 5, "ventas": 0, "version": 1}
+    producto.update(campos)
+    return producto
+
+
+@pytest.fixture
+def productos():
+    return [
+        _producto(3, nombre="Café ☕", descripcion="tostado"),
+        _producto(1, color="rojo", etiquetas=["a", "b"]),
+        _producto(2, nombre=None, descripcion=7, cantidad=2 ** 64),
+        _producto(4, cantidad=0, precio=2.5),
+    ]
+
+
+@pytest.fixture
+def catalogo(tmp_path, productos):
+    ruta = str(tmp_path / "productos.catalogo")
+    escribir_catalogo(ruta, productos, FIRMA)
+    return CatalogoBinario(ruta)
+
+
+def test_ida_y_vuelta_conserva_extras_y_valores_fuera_de_columna(catalogo, productos):
+    assert len(catalogo) == 4 and list(catalogo.ids()) == [1, 2, 3, 4]
+    esperados = {producto["id"]: producto for producto in productos}
+    for posicion, producto_id in enumerate(catalogo.ids()):
+        assert catalogo.producto(posicion) == esperados[producto_id]
+    assert catalogo.posicion(3) == 2 and catalogo.posicion(5) == -1
+
+
+def test_cantidades_decodifica_solo_las_que_no_caben(catalogo, monkeypatch):
+    decodificados = []
+    producto = CatalogoBinario.producto
+
+    def contar(self, posicion):
+        decodificados.append(posicion)
+        return producto(self, posicion)
+
+    monkeypatch.setattr(CatalogoBinario, "producto", contar)
+    assert list(catalogo.cantidades()) == [(1, 5), (2, 2 ** 64), (3, 5), (4, 0)]
+    # El 4 tiene cantidad 0 de verdad y sin extras: no hace falta decodificarlo.
+    assert decodificados == [1]
+
+
+def test_abrir_rechaza_otra_firma_o_un_archivo_danado(tmp_path, catalogo):
+    assert abrir_catalogo(catalogo.ruta, FIRMA).firma == FIRMA
+    assert abrir_catalogo(catalogo.ruta, (1, 2, 4)) is None
+    assert abrir_catalogo(str(tmp_path / "falta.catalogo"), FIRMA) is None
+    with open(catalogo.ruta, "rb") as archivo:
+        contenido = archivo.read()
+    danado = tmp_path / "danado.catalogo"
+    danado.write_bytes(contenido[:-1])
+    assert abrir_catalogo(str(danado), FIRMA) is None
+
+
+def test_mapeado_superpone_cambios_y_bajas_en_orden(catalogo):
+    mapeado = CatalogoMapeado(catalogo)
+    assert len(mapeado) == 4 and list(mapeado) == [1, 2, 3, 4]
+    mapeado[0] = _producto(0)
+    mapeado[3] = _producto(3, cantidad=9)
+    del mapeado[2]
+    assert list(mapeado) == [0, 1, 3, 4] and len(mapeado) == 4
+    assert 2 not in mapeado and mapeado.get(2) is None
+    assert mapeado[3]["cantidad"] == 9
+    assert list(mapeado.cantidades()) == [(0, 5), (1, 5), (3, 9), (4, 0)]
+    mapeado[2] = _producto(2)
+    del mapeado[0]
+    assert list(mapeado) == [1, 2, 3, 4] and len(mapeado) == 4
+    with pytest.raises(KeyError):
+        del mapeado[0]
+    # Lo leído es una copia: modificarla no cambia el catálogo.
+    mapeado[1]["cantidad"] = 100
+    assert mapeado[1]["cantidad"] == 5
+
+
+def test_store_regenera_el_catalogo_si_no_corresponde_al_json(tmp_path):
+    ruta = str(tmp_path / "productos.json")
+    escribir_json(ruta, [_producto(1), _producto(2, cantidad=7)])
+    escribir_catalogo(ruta + ".catalogo", [_producto(1, nombre="viejo")], FIRMA)
+    store = ProductoStoreMapeado(ruta)
+    assert store.obtener(1)["nombre"] == "Producto 1"
+    assert store.cantidad(2) == 7
+    assert CatalogoBinario(store.ruta_catalogo).firma == store._firma_archivo()
+
+
+def test_store_vuelve_a_mapear_lo_que_escribe_otro_worker(tmp_path):
+    ruta = str(tmp_path / "productos.json")
+    escribir_json(ruta, [_producto(1), _producto(2)])
+    uno, otro = ProductoStoreMapeado(ruta), ProductoStoreMapeado(ruta)
+    assert otro.cantidad(1) == 5
+    recargas = otro.recargas
+    uno.ajustar_cantidad(1, 10)
+    uno.eliminar(2)
+    assert isinstance(uno._productos, CatalogoMapeado) and not uno._productos._cambios
+    assert otro.cantidad(1) == 15 and otro.obtener(2) is None
+    assert otro.recargas == recargas + 1
+    assert [producto["id"] for producto in otro.bajo_stock(20)] == [1]
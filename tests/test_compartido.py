@@ -0,0 +1,139 @@
+"""
+Pruebas de las variantes compartidas entre workers: dos instancias sobre los
+mismos archivos hacen de dos procesos, y los ajustes concurrentes también se
+prueban con procesos reales.
+"""
+
+import multiprocessing
+import threading
+
+import pytest
+
+from src.helpers.coordinacion import BloqueoProcesos, ContadorGeneracion
+from src.helpers.json_utils import escribir_json
+from src.models.venta import Venta
+from src.repositories.idempotencia_store import RegistroIdempotenciaCompartido
+from src.repositories.producto_store import ProductoStoreCompartido
+from src.repositories.venta_repository import VentaRepositoryCompartido
+
+
+@pytest.fixture
+def ruta_productos(tmp_path):
+    ruta = str(tmp_path / "productos.json")
+    escribir_json(ruta, [
+        {"id": pid, "nombre": f"Producto {pid}", "descripcion": "", "precio": 10.0,
+         "cantidad": 100, "ventas": 0}
+        for pid in (1, 2)
+    ])
+    return ruta
+
+
+def _ajustar(ruta, veces):
+    store = ProductoStoreCompartido(ruta)
+    for _ in range(veces):
+        store.ajustar_cantidad(1, -1)
+
+
+def test_contador_y_bloqueo_se_ven_entre_instancias(tmp_path):
+    ruta = str(tmp_path / "datos")
+    uno = ContadorGeneracion(ruta + ".generacion", ranuras=2)
+    otro = ContadorGeneracion(ruta + ".generacion", ranuras=2)
+    assert uno.incrementar(1) == 1
+    assert (otro.leer(0), otro.leer(1)) == (0, 1)
+    assert otro.incrementar(1) == 2 and uno.leer(1) == 2
+
+    bloqueo, ajeno = BloqueoProcesos(ruta + ".lock"), BloqueoProcesos(ruta + ".lock")
+    tomado = threading.Event()
+
+    def tomar():
+        with ajeno:
+            tomado.set()
+
+    with bloqueo, bloqueo:
+        # Reentrante en el hilo que lo tiene; otro descriptor espera al flock.
+        hilo = threading.Thread(target=tomar)
+        hilo.start()
+        assert not tomado.wait(0.2)
+    assert tomado.wait(5)
+    hilo.join()
+
+
+def test_escritura_de_un_worker_se_ve_en_el_otro(ruta_productos):
+    uno = ProductoStoreCompartido(ruta_productos)
+    otro = ProductoStoreCompartido(ruta_productos, compacto=True)
+    assert otro.cantidad(1) == 100
+    recargas = otro.recargas
+    assert otro.cantidad(1) == 100 and otro.recargas == recargas
+    uno.ajustar_cantidad(1, -3)
+    creado = uno.crear({"nombre": "Nuevo", "descripcion": "", "precio": 1.0, "cantidad": 2})
+    assert otro.cantidad(1) == 97
+    assert otro.obtener(creado["id"])["nombre"] == "Nuevo"
+    assert otro.recargas == recargas + 1
+    assert otro.marca() == uno.marca()
+    otro.eliminar(2)
+    assert uno.obtener(2) is None
+
+
+def test_ajustes_concurrentes_entre_instancias_no_se_pierden(ruta_productos):
+    stores = [ProductoStoreCompartido(ruta_productos) for _ in range(2)]
+    hilos = [
+        threading.Thread(target=lambda s=store: [s.ajustar_cantidad(1, -1) for _ in range(20)])
+        for store in stores for _ in range(2)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert [store.cantidad(1) for store in stores] == [20, 20]
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requiere fork"
+)
+def test_ajustes_concurrentes_entre_procesos_no_se_pierden(ruta_productos):
+    contexto = multiprocessing.get_context("fork")
+    procesos = [contexto.Process(target=_ajustar, args=(ruta_productos, 25)) for _ in range(4)]
+    for proceso in procesos:
+        proceso.start()
+    for proceso in procesos:
+        proceso.join(30)
+    assert [proceso.exitcode for proceso in procesos] == [0] * 4
+    assert ProductoStoreCompartido(ruta_productos).cantidad(1) == 0
+
+
+def test_ventas_de_un_worker_se_ven_en_el_otro(rutas_ventas):
+    uno, otro = VentaRepositoryCompartido(), VentaRepositoryCompartido()
+    try:
+        def vender(repositorio, producto_id):
+            for _ in range(10):
+                repositorio.guardar_venta(
+                    Venta(id=0, producto_id=producto_id, cantidad=1, total=10.0, cliente="Ana")
+                )
+
+        hilos = [threading.Thread(target=vender, args=(r, p)) for r, p in ((uno, 1), (otro, 2))]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        ids = sorted(venta.id for venta in uno.obtener_todas_las_ventas())
+        assert ids == list(range(1, 21))
+        assert sorted(venta.id for venta in otro.obtener_todas_las_ventas()) == ids
+        assert len(otro.obtener_ventas_por_producto(1)) == 10
+        assert otro.eliminar_venta_por_id(ids[0])
+        assert uno.obtener_venta_por_id(ids[0]) is None
+    finally:
+        uno.libro.cerrar()
+        otro.libro.cerrar()
+
+
+def test_clave_registrada_en_un_worker_se_repite_en_el_otro(tmp_path):
+    ruta = str(tmp_path / "idempotencia.ndjson")
+    uno = RegistroIdempotenciaCompartido(ruta, maximo=2, ttl=60.0)
+    otro = RegistroIdempotenciaCompartido(ruta, maximo=2, ttl=60.0)
+    assert uno.ejecutar("k", "h", lambda: (201, "hecho")) == (201, "hecho", False)
+    assert otro.ejecutar("k", "h", lambda: (500, None)) == (201, "hecho", True)
+    # Al compactar, el otro relee la bitácora en lugar de seguir desde su posición.
+    for clave in ("a", "b", "c", "d", "e"):
+        otro.ejecutar(clave, "h", lambda clave=clave: (200, clave))
+    assert uno.ejecutar("e", "h", lambda: (500, None)) == (200, "e", True)
+    assert uno.ejecutar("a", "h", lambda: (200, "de nuevo")) == (200, "de nuevo", False)
@@ -0,0 +1,61 @@
+"""
+Pruebas del ejecutor de E/S bloqueante.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.helpers.ejecutor import EjecutorIO
+
+
+def test_llamadas_bloqueantes_no_detienen_el_event_loop():
+    ejecutor = EjecutorIO(hilos=2)
+    en_curso = []
+    maximo = []
+    lock = threading.Lock()
+
+    def bloqueante():
+        with lock:
+            en_curso.append(1)
+            maximo.append(len(en_curso))
+        time.sleep(0.1)
+        with lock:
+            en_curso.pop()
+        return threading.current_thread().name
+
+    async def escenario():
+        latidos = 0
+
+        async def latir():
+            nonlocal latidos
+            while True:
+                await asyncio.sleep(0.01)
+                latidos += 1
+
+        latido = asyncio.create_task(latir())
+        nombres = await asyncio.gather(*(ejecutor.ejecutar(bloqueante) for _ in range(4)))
+        latido.cancel()
+        return nombres, latidos
+
+    nombres, latidos = asyncio.run(escenario())
+    assert all(nombre.startswith("io") for nombre in nombres)
+    # El loop siguió atendiendo mientras el pool trabajaba.
+    assert latidos >= 10
+    # Nunca más llamadas simultáneas que hilos del pool.
+    assert max(maximo) <= 2
+    assert ejecutor.estadisticas()["completadas"] == 4
+    assert ejecutor.estadisticas()["en_cola"] == 0
+
+
+def test_las_excepciones_se_propagan():
+    ejecutor = EjecutorIO(hilos=1)
+
+    def falla():
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        asyncio.run(ejecutor.ejecutar(falla))
+    assert ejecutor.estadisticas()["en_curso"] == 0
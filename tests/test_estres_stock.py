@@ -0,0 +1,44 @@
+"""
+Prueba de estrés de descuentos de stock concurrentes sobre un mismo producto,
+en cada modo de almacenamiento (ver también benchmarks/estres_stock.py).
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.producto_service import ProductoService
+
+TAREAS = 32
+AJUSTES = 20
+
+
+async def _martillar(service):
+    async def tarea():
+        exitos = 0
+        for _ in range(AJUSTES):
+            try:
+                producto = await asyncio.to_thread(service.ajustar_stock, 1, -1)
+            except HTTPException as exc:
+                assert exc.status_code == 400
+            else:
+                assert producto.cantidad >= 0
+                exitos += 1
+        return exitos
+
+    return sum(await asyncio.gather(*(tarea() for _ in range(TAREAS))))
+
+
+@pytest.mark.parametrize("stock_inicial", [TAREAS * AJUSTES + 50, TAREAS * AJUSTES // 2])
+def test_descuentos_concurrentes_no_pierden_actualizaciones(modo_store, crear_store, stock_inicial):
+    store = crear_store(modo_store, [{
+        "id": 1, "nombre": "SKU", "descripcion": "", "precio": 1.0,
+        "cantidad": stock_inicial, "ventas": 0,
+    }])
+    service = ProductoService(store=store)
+    exitos = asyncio.run(_martillar(service))
+    final = store.obtener(1)["cantidad"]
+    assert final >= 0
+    assert final == stock_inicial - exitos
+    assert exitos == min(stock_inicial, TAREAS * AJUSTES)
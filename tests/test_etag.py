@@ -0,0 +1,66 @@
+"""
+Pruebas de las lecturas condicionales de productos (ETag e If-None-Match).
+"""
+
+from src.helpers.sqlite_utils import PoolSqlite
+from src.repositories.producto_store import (
+    ProductoStore,
+    ProductoStoreJournal,
+    ProductoStoreSqlite,
+)
+
+
+def test_producto_responde_304_con_etag_coincidente(cliente_productos):
+    primera = cliente_productos.get("/productos/1")
+    etag = primera.headers["ETag"]
+    repetida = cliente_productos.get("/productos/1", headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    assert repetida.content == b""
+    assert repetida.headers["ETag"] == etag
+    debil = cliente_productos.get("/productos/1", headers={"If-None-Match": f'"otro", W/{etag}'})
+    assert debil.status_code == 304
+
+
+def test_un_cambio_invalida_solo_el_etag_de_ese_producto(cliente_productos):
+    etag_1 = cliente_productos.get("/productos/1").headers["ETag"]
+    etag_2 = cliente_productos.get("/productos/2").headers["ETag"]
+    assert etag_1 != etag_2
+    cliente_productos.put("/productos/1/ajustar-stock", json=1)
+    cambiado = cliente_productos.get("/productos/1", headers={"If-None-Match": etag_1})
+    assert cambiado.status_code == 200
+    assert cambiado.json()["cantidad"] == 6
+    assert cliente_productos.get("/productos/2", headers={"If-None-Match": etag_2}).status_code == 304
+
+
+def test_producto_inexistente_responde_404_aunque_traiga_etag(cliente_productos):
+    etag = cliente_productos.get("/productos/3").headers["ETag"]
+    cliente_productos.delete("/productos/3")
+    assert cliente_productos.get("/productos/3", headers={"If-None-Match": etag}).status_code == 404
+
+
+def _reabrir(store):
+    if isinstance(store, ProductoStoreJournal):
+        store._journal.cerrar()
+        return ProductoStoreJournal(store.ruta)
+    if isinstance(store, ProductoStoreSqlite):
+        return ProductoStoreSqlite(PoolSqlite(store.pool.ruta))
+    return ProductoStore(store.ruta, compacto=store.compacto)
+
+
+def test_las_marcas_no_dependen_del_proceso(modo_store, crear_store):
+    store = crear_store(modo_store, [
+        {"id": pid, "nombre": f"P{pid}", "descripcion": "", "precio": 1.0, "cantidad": 5, "ventas": 0}
+        for pid in (1, 2)
+    ])
+    store.ajustar_cantidad(1, 1)
+    catalogo, producto = store.marca(), store.marca(1)
+    otro = _reabrir(store)
+    # Otra instancia (otro worker, o el mismo proceso reiniciado) da las mismas marcas.
+    assert (otro.marca(), otro.marca(1)) == (catalogo, producto)
+    otro.ajustar_cantidad(2, 1)
+    assert otro.marca() != catalogo
+    assert otro.marca(1) == producto
+    if isinstance(otro, ProductoStoreJournal):
+        otro._journal.cerrar()
+    elif isinstance(otro, ProductoStoreSqlite):
+        otro.pool.cerrar()
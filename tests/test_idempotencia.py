@@ -0,0 +1,120 @@
+"""
+Pruebas de Idempotency-Key en las escrituras de stock y ventas.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from src.config.settings import settings
+from src.repositories.idempotencia_store import ClaveReutilizadaError, RegistroIdempotencia
+from src.routes import producto_router
+
+
+def test_reintento_repite_la_respuesta_sin_volver_a_ajustar(cliente_productos):
+    cabeceras = {"Idempotency-Key": "ajuste-1"}
+    primera = cliente_productos.put("/productos/1/ajustar-stock", json=-2, headers=cabeceras)
+    repetida = cliente_productos.put("/productos/1/ajustar-stock", json=-2, headers=cabeceras)
+    assert primera.status_code == repetida.status_code == 200
+    assert "Idempotent-Replayed" not in primera.headers
+    assert repetida.headers["Idempotent-Replayed"] == "true"
+    assert repetida.json() == primera.json()
+    assert cliente_productos.get("/productos/1").json()["cantidad"] == 3
+
+
+def test_reintento_de_venta_registra_una_sola(cliente_productos):
+    cabeceras = {"Idempotency-Key": "venta-1"}
+    for _ in range(3):
+        respuesta = cliente_productos.post("/productos/2/venta", headers=cabeceras)
+        assert respuesta.json()["ventas_totales"] == 1
+    service = producto_router.service
+    assert service.store.obtener(2)["ventas"] == 1
+    assert len(service.ventas_repo.obtener_ventas_por_producto(2)) == 1
+
+
+def test_error_4xx_se_repite_con_la_cabecera(cliente_productos):
+    cabeceras = {"Idempotency-Key": "ajuste-grande"}
+    primera = cliente_productos.put("/productos/1/ajustar-stock", json=-50, headers=cabeceras)
+    assert primera.status_code == 400
+    # Aunque ahora el stock alcanzaría, la clave repite el primer resultado.
+    cliente_productos.put("/productos/1/ajustar-stock", json=100)
+    repetida = cliente_productos.put("/productos/1/ajustar-stock", json=-50, headers=cabeceras)
+    assert repetida.status_code == 400
+    assert repetida.headers["Idempotent-Replayed"] == "true"
+    assert repetida.json() == primera.json()
+
+
+def test_misma_clave_con_otra_peticion_responde_422(cliente_productos):
+    cabeceras = {"Idempotency-Key": "reusada"}
+    assert cliente_productos.put("/productos/1/ajustar-stock", json=1, headers=cabeceras).status_code == 200
+    assert cliente_productos.put("/productos/1/ajustar-stock", json=2, headers=cabeceras).status_code == 422
+
+
+def test_duplicados_en_curso_esperan_a_la_primera_ejecucion(tmp_path):
+    registro = RegistroIdempotencia(str(tmp_path / "idempotencia.ndjson"), maximo=10, ttl=60.0)
+    ejecuciones = []
+    liberar = threading.Event()
+
+    def operacion():
+        ejecuciones.append(1)
+        liberar.wait(5)
+        return 200, {"ok": len(ejecuciones)}
+
+    resultados = []
+    hilos = [
+        threading.Thread(target=lambda: resultados.append(registro.ejecutar("k", "h", operacion)))
+        for _ in range(8)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(0.1)
+    # Otra clave no espera a la que está en curso.
+    assert registro.ejecutar("otra", "h", lambda: (200, "libre")) == (200, "libre", False)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join()
+    assert len(ejecuciones) == 1
+    assert sorted(repetida for _, _, repetida in resultados) == [False] + [True] * 7
+    assert {tuple(cuerpo.items()) for _, cuerpo, _ in resultados} == {(("ok", 1),)}
+
+
+def test_las_claves_sobreviven_a_un_reinicio(tmp_path):
+    ruta = str(tmp_path / "idempotencia.ndjson")
+    RegistroIdempotencia(ruta, maximo=10, ttl=60.0).ejecutar("k", "h", lambda: (201, "hecho"))
+    reabierto = RegistroIdempotencia(ruta, maximo=10, ttl=60.0)
+    assert reabierto.ejecutar("k", "h", lambda: (500, "otra vez")) == (201, "hecho", True)
+    with pytest.raises(ClaveReutilizadaError):
+        reabierto.ejecutar("k", "otra", lambda: (200, None))
+
+
+def test_el_fsync_se_espera_sin_bloquear_las_demas_claves(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "journal_esperar_fsync", True)
+    monkeypatch.setattr(settings, "journal_intervalo_fsync", 60.0)
+    registro = RegistroIdempotencia(str(tmp_path / "idempotencia.ndjson"), maximo=10, ttl=60.0)
+    registro.ejecutar("guardada", "h", lambda: (200, "antes"))
+    real = os.fsync
+    en_fsync = threading.Event()
+    liberar = threading.Event()
+
+    def fsync_lento(descriptor):
+        en_fsync.set()
+        liberar.wait(5)
+        real(descriptor)
+
+    monkeypatch.setattr(os, "fsync", fsync_lento)
+    resultados = []
+    hilo = threading.Thread(
+        target=lambda: resultados.append(registro.ejecutar("lenta", "h", lambda: (201, "nueva")))
+    )
+    hilo.start()
+    assert en_fsync.wait(5)
+    # Mientras la primera espera al disco, otra clave se repite sin esperar.
+    inicio = time.monotonic()
+    assert registro.ejecutar("guardada", "h", lambda: (500, None)) == (200, "antes", True)
+    assert time.monotonic() - inicio < 1
+    assert resultados == []
+    liberar.set()
+    hilo.join()
+    assert resultados == [(201, "nueva", False)]
@@ -0,0 +1,40 @@
+"""
+Pruebas de los agregados de stock mantenidos de forma incremental.
+"""
+
+import random
+
+
+def _productos(cantidades):
+    return [
+        {"id": pid, "nombre": f"p{pid}", "descripcion": "", "precio": 1.0, "cantidad": c, "ventas": 0}
+        for pid, c in cantidades.items()
+    ]
+
+
+def test_agregados_coinciden_con_recalcular(modo_store, crear_store):
+    azar = random.Random(7)
+    esperado = {pid: azar.randint(0, 8) for pid in range(1, 41)}
+    store = crear_store(modo_store, _productos(esperado))
+    for _ in range(300):
+        operacion = azar.random()
+        if operacion < 0.6 and esperado:
+            pid = azar.choice(list(esperado))
+            delta = azar.randint(-esperado[pid], 5)
+            store.ajustar_cantidad(pid, delta)
+            esperado[pid] += delta
+        elif operacion < 0.8 and esperado:
+            pid = azar.choice(list(esperado))
+            store.eliminar(pid)
+            del esperado[pid]
+        else:
+            cantidad = azar.randint(0, 8)
+            creado = store.crear({"nombre": "n", "descripcion": "", "precio": 1.0, "cantidad": cantidad})
+            esperado[creado["id"]] = cantidad
+
+    assert store.stock_total() == sum(esperado.values())
+    assert [p["id"] for p in store.agotados()] == sorted(pid for pid, c in esperado.items() if c == 0)
+    bajo = store.bajo_stock(3)
+    assert {p["id"] for p in bajo} == {pid for pid, c in esperado.items() if c <= 3}
+    assert [p["cantidad"] for p in bajo] == sorted(p["cantidad"] for p in bajo)
+
@@ -0,0 +1,94 @@
+"""
+Pruebas de la bitácora de mutaciones y del almacén de productos en modo "journal".
+"""
+
+import json
+import os
+import threading
+import time
+
+from src.repositories.producto_store import ProductoStoreJournal
+
+
+def _escribir_catalogo(ruta, cantidad_productos, stock=10):
+    productos = [
+        {"id": i, "nombre": f"p{i}", "descripcion": "", "precio": 1.0, "cantidad": stock, "ventas": 0}
+        for i in range(1, cantidad_productos + 1)
+    ]
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(productos, archivo)
+
+
+def test_ajustes_concurrentes_comparten_fsync(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "productos.json")
+    _escribir_catalogo(ruta, 32)
+    store = ProductoStoreJournal(ruta, intervalo_fsync=60, esperar_fsync=True)
+    store.listar()
+    real = os.fsync
+    llamadas = []
+
+    def fsync_lento(descriptor):
+        llamadas.append(descriptor)
+        time.sleep(0.2)
+        real(descriptor)
+
+    monkeypatch.setattr(os, "fsync", fsync_lento)
+    hilos = [
+        threading.Thread(target=store.ajustar_cantidad, args=(producto_id, -1))
+        for producto_id in range(1, 33)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(0.05)
+    inicio = time.monotonic()
+    assert store.obtener(1) is not None
+    assert time.monotonic() - inicio < 0.1
+    for hilo in hilos:
+        hilo.join()
+    assert len(llamadas) <= 3
+    assert store.stock_total() == 32 * 9
+
+
+def test_reabrir_tras_una_caida_reproduce_la_bitacora(tmp_path):
+    ruta = str(tmp_path / "productos.json")
+    _escribir_catalogo(ruta, 3)
+    store = ProductoStoreJournal(ruta, intervalo_fsync=60)
+    store.ajustar_cantidad(1, -4)
+    store.actualizar(2, {"nombre": "renombrado"})
+    store.eliminar(3)
+    creado = store.crear({"nombre": "nuevo", "descripcion": "", "precio": 2.0, "cantidad": 7})
+    # Caída a mitad de la escritura siguiente: queda una línea cortada al final.
+    with open(ruta + ".journal", "a", encoding="utf-8") as bitacora:
+        bitacora.write('{"op":"put","producto":{"id":1,')
+
+    reabierto = ProductoStoreJournal(ruta, intervalo_fsync=60)
+    assert reabierto.obtener(1)["cantidad"] == 6
+    assert reabierto.obtener(2)["nombre"] == "renombrado"
+    assert reabierto.obtener(3) is None
+    assert reabierto.obtener(creado["id"])["cantidad"] == 7
+    assert reabierto.stock_total() == 6 + 10 + 7
+
+    # Lo que se anexa después de la línea cortada también se conserva.
+    reabierto.ajustar_cantidad(2, 5)
+    store._journal.cerrar()
+    reabierto._journal.cerrar()
+    assert ProductoStoreJournal(ruta).obtener(2)["cantidad"] == 15
+
+
+def test_reabrir_tras_una_compactacion_interrumpida(tmp_path):
+    ruta = str(tmp_path / "productos.json")
+    _escribir_catalogo(ruta, 2)
+    store = ProductoStoreJournal(ruta, intervalo_fsync=60)
+    store.ajustar_cantidad(1, -1)
+    # La compactación rotó la bitácora pero no llegó a escribir el snapshot.
+    store._journal.rotar()
+    store.ajustar_cantidad(2, -2)
+    store._journal.cerrar()
+
+    reabierto = ProductoStoreJournal(ruta, intervalo_fsync=60)
+    assert reabierto.obtener(1)["cantidad"] == 9
+    assert reabierto.obtener(2)["cantidad"] == 8
+    reabierto.compactar()
+    reabierto._journal.cerrar()
+    assert not os.path.exists(ruta + ".journal.compactando")
+    assert ProductoStoreJournal(ruta).stock_total() == 17
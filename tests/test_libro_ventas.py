@@ -0,0 +1,66 @@
+"""
+Pruebas del libro de ventas segmentado y de VentaRepository.
+"""
+
+import json
+import os
+import threading
+import time
+
+from src.config.settings import settings
+from src.helpers.journal import Journal
+from src.models.venta import Venta
+from src.repositories.venta_repository import VentaRepository
+
+
+def _venta(producto_id=1):
+    return Venta(id=0, producto_id=producto_id, cantidad=1, total=10.0, cliente="Ana")
+
+
+def test_ventas_concurrentes_comparten_fsync(rutas_ventas, monkeypatch):
+    monkeypatch.setattr(settings, "journal_esperar_fsync", True)
+    monkeypatch.setattr(settings, "journal_intervalo_fsync", 60.0)
+    repositorio = VentaRepository()
+    repositorio.guardar_venta(_venta())
+    real = os.fsync
+    llamadas = []
+
+    def fsync_lento(descriptor):
+        llamadas.append(descriptor)
+        time.sleep(0.2)
+        real(descriptor)
+
+    monkeypatch.setattr(os, "fsync", fsync_lento)
+    hilos = [threading.Thread(target=repositorio.guardar_venta, args=(_venta(i),)) for i in range(32)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    repositorio.libro.cerrar()
+    assert len(llamadas) <= 4
+    assert len(repositorio.obtener_todas_las_ventas()) == 33
+
+
+def test_ventas_del_json_heredado_se_importan_en_un_lote(rutas_ventas, monkeypatch):
+    heredadas = [
+        {"id": i, "producto_id": 1, "cantidad": 1, "total": 10.0, "fecha": "2024-01-01T00:00:00"}
+        for i in range(1, 501)
+    ]
+    (rutas_ventas / "ventas.json").write_text(json.dumps(heredadas), encoding="utf-8")
+    lotes = []
+    registrar_lote = Journal.registrar_lote
+
+    def contar_lotes(journal, registros):
+        lotes.append(len(registros))
+        return registrar_lote(journal, registros)
+
+    monkeypatch.setattr(Journal, "registrar_lote", contar_lotes)
+    repositorio = VentaRepository()
+    assert lotes == [500]
+    assert len(repositorio.obtener_todas_las_ventas()) == 500
+    repositorio.libro.cerrar()
+    # Con el segmento ya escrito, el JSON heredado no se vuelve a importar.
+    reabierto = VentaRepository()
+    assert lotes == [500]
+    assert len(reabierto.obtener_todas_las_ventas()) == 500
+    reabierto.libro.cerrar()
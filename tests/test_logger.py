@@ -0,0 +1,68 @@
+"""
+Pruebas del logging por cola acotada y del log de accesos muestreado.
+"""
+
+import json
+import logging
+import queue
+import time
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.helpers.logger import ColaAcotadaHandler, FormateadorJson, MiddlewareAccesos
+
+
+def _registro(mensaje, *args, **extra):
+    registro = logging.LogRecord("prueba", logging.INFO, __file__, 1, mensaje, args, None)
+    registro.__dict__.update(extra)
+    return registro
+
+
+def test_cola_llena_descarta_sin_bloquear():
+    cola = queue.Queue(maxsize=2)
+    handler = ColaAcotadaHandler(cola)
+    inicio = time.monotonic()
+    for numero in range(5):
+        handler.handle(_registro("mensaje %d", numero))
+    assert time.monotonic() - inicio < 0.5
+    assert handler.descartados == 3
+    assert [cola.get_nowait().msg for _ in range(2)] == ["mensaje 0", "mensaje 1"]
+
+
+def test_formato_json_una_linea_con_los_campos_extra():
+    linea = FormateadorJson().format(_registro("GET %s", "/productos/", estado=200))
+    assert "\n" not in linea
+    datos = json.loads(linea)
+    assert datos["mensaje"] == "GET /productos/"
+    assert datos["nivel"] == "INFO"
+    assert datos["estado"] == 200
+
+
+def _cliente(tasa):
+    app = FastAPI()
+
+    @app.get("/bien")
+    async def bien():
+        return {}
+
+    @app.get("/mal")
+    async def mal():
+        raise HTTPException(status_code=503)
+
+    app.add_middleware(MiddlewareAccesos, tasa=tasa)
+    return TestClient(app)
+
+
+def test_accesos_muestreados_registran_siempre_los_5xx(caplog):
+    caplog.set_level(logging.INFO, logger="inventario_app.accesos")
+    cliente = _cliente(tasa=0.0)
+    for _ in range(10):
+        cliente.get("/bien")
+    cliente.get("/mal")
+    assert [r.estado for r in caplog.records] == [503]
+
+    caplog.clear()
+    cliente = _cliente(tasa=1.0)
+    cliente.get("/bien")
+    assert [(r.path, r.estado) for r in caplog.records] == [("/bien", 200)]
@@ -0,0 +1,141 @@
+"""
+Pruebas de los endpoints por lote de productos, stock y ventas.
+"""
+
+import pytest
+
+from src.config.settings import settings
+from src.repositories import producto_store
+from src.routes import producto_router
+
+
+@pytest.fixture
+def escrituras(monkeypatch):
+    """
+    Cuenta las escrituras del catálogo JSON.
+    """
+    llamadas = []
+    escribir = producto_store.escribir_json
+
+    def contar(ruta, datos):
+        llamadas.append(len(datos))
+        escribir(ruta, datos)
+
+    monkeypatch.setattr(producto_store, "escribir_json", contar)
+    return llamadas
+
+
+def _estados(respuesta):
+    return [item["status"] for item in respuesta.json()["resultados"]]
+
+
+def _cantidades(cliente):
+    return [producto["cantidad"] for producto in cliente.get("/productos/").json()]
+
+
+def test_crear_por_lote_escribe_una_vez(cliente_productos, escrituras):
+    nuevos = [
+        {"nombre": f"Nuevo {i}", "descripcion": "", "precio": 1.0, "cantidad": i}
+        for i in range(5)
+    ]
+    respuesta = cliente_productos.post("/productos/bulk", json=nuevos)
+    assert respuesta.status_code == 200
+    assert [p["id"] for p in respuesta.json()] == [4, 5, 6, 7, 8]
+    assert escrituras == [8]
+    assert cliente_productos.get("/productos/8").json()["nombre"] == "Nuevo 4"
+
+
+def test_actualizar_por_lote_informa_cada_item(cliente_productos, escrituras):
+    version = cliente_productos.get("/productos/3").json()["version"]
+    respuesta = cliente_productos.put("/productos/bulk", json=[
+        {"producto_id": 1, "datos": {"nombre": "Renombrado"}},
+        {"producto_id": 9, "datos": {"precio": 1.0}},
+        {"producto_id": 2, "datos": {"cantidad": 8}, "version": 99},
+        {"producto_id": 3, "datos": {"precio": 12.5}, "version": version},
+    ])
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert cuerpo["aplicado"] is True
+    assert _estados(respuesta) == [200, 404, 409, 200]
+    assert [item["indice"] for item in cuerpo["resultados"]] == [0, 1, 2, 3]
+    assert cuerpo["resultados"][0]["producto"]["nombre"] == "Renombrado"
+    assert cuerpo["resultados"][1]["error"] == "Producto no encontrado"
+    assert len(escrituras) == 1
+    assert cliente_productos.get("/productos/3").json()["precio"] == 12.5
+    assert cliente_productos.get("/productos/2").json()["cantidad"] == 5
+
+
+def test_ajustar_stock_por_lote_acumula_sobre_el_mismo_producto(cliente_productos, escrituras):
+    respuesta = cliente_productos.put("/productos/ajustar-stock/bulk", json=[
+        {"producto_id": 1, "cantidad": -3},
+        {"producto_id": 1, "cantidad": -3},
+        {"producto_id": 2, "cantidad": 4},
+        {"producto_id": 4, "cantidad": 1},
+    ])
+    assert respuesta.status_code == 200
+    assert _estados(respuesta) == [200, 400, 200, 404]
+    assert respuesta.json()["resultados"][1]["error"] == "Stock insuficiente para descontar"
+    assert len(escrituras) == 1
+    assert _cantidades(cliente_productos) == [2, 9, 5]
+
+
+def test_ajuste_fuera_de_rango_es_422_por_item(cliente_productos, crear_store, monkeypatch):
+    store = crear_store("compacto", [
+        {"id": 1, "nombre": "SKU", "descripcion": "", "precio": 1.0, "cantidad": 2 ** 63 - 1, "ventas": 0},
+    ])
+    monkeypatch.setattr(producto_router.service, "_store", store)
+    respuesta = cliente_productos.put("/productos/ajustar-stock/bulk", json=[
+        {"producto_id": 1, "cantidad": 1},
+        {"producto_id": 1, "cantidad": -1},
+    ])
+    assert _estados(respuesta) == [422, 200]
+    assert store.cantidad(1) == 2 ** 63 - 2
+
+
+@pytest.mark.parametrize("ruta, items", [
+    ("/productos/bulk", [
+        {"producto_id": 1, "datos": {"cantidad": 0}},
+        {"producto_id": 2, "datos": {"cantidad": 0}, "version": 7},
+    ]),
+    ("/productos/ajustar-stock/bulk", [
+        {"producto_id": 1, "cantidad": -5},
+        {"producto_id": 2, "cantidad": -6},
+    ]),
+])
+def test_todo_o_nada_no_aplica_nada_si_un_item_falla(cliente_productos, escrituras, ruta, items):
+    respuesta = cliente_productos.put(ruta, params={"todo_o_nada": True}, json=items)
+    assert respuesta.status_code == 409
+    assert respuesta.json()["aplicado"] is False
+    assert _estados(respuesta)[0] == 424
+    assert _estados(respuesta)[1] in (400, 409)
+    assert escrituras == []
+    assert _cantidades(cliente_productos) == [5, 5, 5]
+
+
+def test_ventas_por_lote(cliente_productos, escrituras):
+    respuesta = cliente_productos.post("/productos/ventas/bulk", json=[
+        {"producto_id": 1}, {"producto_id": 1}, {"producto_id": 5},
+    ])
+    assert respuesta.status_code == 200
+    assert _estados(respuesta) == [200, 200, 404]
+    assert [item["ventas_totales"] for item in respuesta.json()["resultados"]] == [1, 2, None]
+    assert len(escrituras) == 1
+    ventas = producto_router.service.ventas_repo
+    assert len(ventas.obtener_ventas_por_producto(1)) == 2
+
+    descartado = cliente_productos.post(
+        "/productos/ventas/bulk", params={"todo_o_nada": True},
+        json=[{"producto_id": 2}, {"producto_id": 5}],
+    )
+    assert descartado.status_code == 409
+    assert _estados(descartado) == [424, 404]
+    assert len(escrituras) == 1
+    assert ventas.obtener_ventas_por_producto(2) == []
+    assert producto_router.service.store.obtener(2)["ventas"] == 0
+
+
+def test_lote_vacio_o_demasiado_grande(cliente_productos, monkeypatch):
+    assert cliente_productos.put("/productos/ajustar-stock/bulk", json=[]).status_code == 422
+    monkeypatch.setattr(settings, "lote_max_items", 2)
+    items = [{"producto_id": 1, "cantidad": 1}] * 3
+    assert cliente_productos.put("/productos/ajustar-stock/bulk", json=items).status_code == 413
@@ -0,0 +1,108 @@
+"""
+Pruebas de la paginación por cursor y del listado NDJSON de productos.
+"""
+
+import json
+
+import pytest
+
+from src.config.settings import settings
+from src.routes import producto_router
+
+
+@pytest.fixture
+def cliente(cliente_productos):
+    """
+    Cliente con diez productos (IDs 1 a 10).
+    """
+    cliente_productos.post("/productos/bulk", json=[
+        {"nombre": f"Producto {i}", "descripcion": "", "precio": 10.0, "cantidad": 5}
+        for i in range(4, 11)
+    ])
+    return cliente_productos
+
+
+@pytest.fixture
+def tramos(monkeypatch):
+    """
+    Achica el tramo NDJSON a 3 productos y anota el tamaño de cada lectura.
+    """
+    monkeypatch.setattr(settings, "ndjson_tramo", 3)
+    service = producto_router.service
+    pedidos = []
+    tramo = service.tramo_productos_json
+
+    def contar(cursor, limite):
+        pedidos.append((cursor, limite))
+        return tramo(cursor, limite)
+
+    monkeypatch.setattr(service, "tramo_productos_json", contar)
+    return pedidos
+
+
+def _paginas(cliente, limit):
+    paginas, cursor = [], None
+    while True:
+        params = {"limit": limit} if cursor is None else {"limit": limit, "cursor": cursor}
+        respuesta = cliente.get("/productos/", params=params)
+        assert respuesta.status_code == 200
+        paginas.append([producto["id"] for producto in respuesta.json()])
+        cursor = respuesta.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return paginas
+
+
+def _ndjson(respuesta):
+    assert respuesta.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(linea)["id"] for linea in respuesta.text.splitlines()]
+
+
+def test_paginas_por_cursor_recorren_el_catalogo(cliente):
+    assert _paginas(cliente, 4) == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+    # Si la última página llena justo el límite, no anuncia otra vacía.
+    assert _paginas(cliente, 5) == [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]]
+    assert _paginas(cliente, 20) == [list(range(1, 11))]
+
+
+def test_cursor_salta_los_huecos_de_las_bajas(cliente):
+    for producto_id in (3, 4, 5, 9, 10):
+        assert cliente.delete(f"/productos/{producto_id}").status_code == 200
+    assert _paginas(cliente, 2) == [[1, 2], [6, 7], [8]]
+    respuesta = cliente.get("/productos/", params={"limit": 2, "cursor": 3})
+    assert [p["id"] for p in respuesta.json()] == [6, 7]
+    # Un cursor que apunta a un producto borrado sigue desde el siguiente ID.
+    respuesta = cliente.get("/productos/", params={"cursor": 8})
+    assert respuesta.json() == [] and "X-Next-Cursor" not in respuesta.headers
+
+
+def test_limite_fuera_de_rango_es_422(cliente):
+    assert cliente.get("/productos/", params={"limit": 0}).status_code == 422
+    limite = settings.pagina_max_limite + 1
+    assert cliente.get("/productos/", params={"limit": limite}).status_code == 422
+
+
+def test_ndjson_lee_por_tramos(cliente, tramos):
+    respuesta = cliente.get("/productos/", params={"formato": "ndjson"})
+    assert _ndjson(respuesta) == list(range(1, 11))
+    assert tramos == [(0, 3), (3, 3), (6, 3), (9, 3)]
+
+
+def test_ndjson_con_limite_que_no_es_multiplo_del_tramo(cliente, tramos):
+    respuesta = cliente.get("/productos/", params={"formato": "ndjson", "limit": 7, "cursor": 1})
+    assert _ndjson(respuesta) == [2, 3, 4, 5, 6, 7, 8]
+    # El último tramo pide solo lo que falta para el límite.
+    assert tramos == [(1, 3), (4, 3), (7, 1)]
+
+
+def test_ndjson_con_limite_exacto_no_pide_otro_tramo(cliente, tramos):
+    respuesta = cliente.get("/productos/", params={"formato": "ndjson", "limit": 6})
+    assert _ndjson(respuesta) == [1, 2, 3, 4, 5, 6]
+    assert tramos == [(0, 3), (3, 3)]
+
+
+def test_ndjson_con_bajas_y_catalogo_agotado(cliente, tramos):
+    for producto_id in (2, 3, 4):
+        cliente.delete(f"/productos/{producto_id}")
+    respuesta = cliente.get("/productos/", params={"formato": "ndjson", "limit": 8})
+    assert _ndjson(respuesta) == [1, 5, 6, 7, 8, 9, 10]
+    assert tramos == [(0, 3), (6, 3), (9, 2)]
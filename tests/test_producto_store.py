@@ -0,0 +1,75 @@
+"""
+Pruebas del almacén de productos en memoria con escritura en disco.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.helpers.json_utils import escribir_json, leer_json
+from src.repositories import producto_store
+from src.repositories.producto_store import CambioDescartadoError
+
+
+def _producto(producto_id, cantidad=5):
+    return {"id": producto_id, "nombre": f"P{producto_id}", "descripcion": "", "precio": 1.0,
+            "cantidad": cantidad, "ventas": 0}
+
+
+@pytest.fixture(params=("json", "compacto"))
+def store(request, crear_store):
+    return crear_store(request.param, [_producto(1), _producto(2)])
+
+
+def _disco_lleno(monkeypatch):
+    def fallar(ruta, datos):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(producto_store, "escribir_json", fallar)
+
+
+def test_escritura_fallida_descarta_el_cambio_en_memoria(store, monkeypatch):
+    _disco_lleno(monkeypatch)
+    with pytest.raises(OSError):
+        store.ajustar_cantidad(1, -3)
+    assert store.obtener(1)["cantidad"] == 5
+    monkeypatch.undo()
+    # El almacén vuelve a seguir al archivo: una edición externa se ve.
+    escribir_json(store.ruta, [_producto(1, 99), _producto(2)])
+    assert store.obtener(1)["cantidad"] == 99
+    store.ajustar_cantidad(1, 1)
+    assert leer_json(store.ruta)[0]["cantidad"] == 100
+
+
+def test_cambio_incluido_en_una_escritura_fallida_no_se_confirma(store, monkeypatch):
+    # Otro hilo hace su cambio mientras la escritura del primero está en curso.
+    escribiendo = threading.Event()
+    soltar = threading.Event()
+    errores = []
+
+    def escritura_lenta(ruta, datos):
+        escribiendo.set()
+        soltar.wait(5)
+        raise OSError(28, "No space left on device")
+
+    def ajustar(producto_id):
+        try:
+            store.ajustar_cantidad(producto_id, -1)
+        except Exception as exc:
+            errores.append(type(exc))
+
+    monkeypatch.setattr(producto_store, "escribir_json", escritura_lenta)
+    primero = threading.Thread(target=ajustar, args=(1,))
+    primero.start()
+    escribiendo.wait(5)
+    segundo = threading.Thread(target=ajustar, args=(2,))
+    segundo.start()
+    while store.cantidad(2) != 4:
+        time.sleep(0.01)
+    soltar.set()
+    primero.join()
+    segundo.join()
+    assert sorted(errores, key=lambda e: e.__name__) == [CambioDescartadoError, OSError]
+    assert store.obtener(1)["cantidad"] == 5
+    assert store.obtener(2)["cantidad"] == 5
@@ -0,0 +1,75 @@
+"""
+Pruebas de los rollups de ventas en memoria y de la descomposición de rangos.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.repositories.rollups_ventas import RollupsVentas, descomponer_rango
+
+_HORA = 3600
+
+
+def _horas_cubiertas(tramos):
+    """
+    Retorna las horas (desde la época) que cubren los tramos, con repeticiones.
+    """
+    horas = []
+    for granularidad, inicio, fin in tramos:
+        for numero in range(inicio, fin):
+            if granularidad == "hora":
+                horas.append(numero)
+            elif granularidad == "dia":
+                horas.extend(range(numero * 24, numero * 24 + 24))
+            else:
+                comienzo = datetime(numero // 12, numero % 12 + 1, 1, tzinfo=timezone.utc)
+                siguiente = datetime(
+                    (numero + 1) // 12, (numero + 1) % 12 + 1, 1, tzinfo=timezone.utc
+                )
+                horas.extend(range(
+                    int(comienzo.timestamp()) // _HORA, int(siguiente.timestamp()) // _HORA
+                ))
+    return horas
+
+
+def test_descomponer_rango_incluye_la_hora_de_hasta():
+    hora = 480_000
+    assert descomponer_rango(hora * _HORA, hora * _HORA + 1800) == [("hora", hora, hora + 1)]
+    assert descomponer_rango(hora * _HORA + 10, hora * _HORA + 20) == [("hora", hora, hora + 1)]
+
+
+def test_descomponer_rango_excluye_hasta_en_el_borde_de_la_hora():
+    hora = 480_000
+    assert descomponer_rango(hora * _HORA, (hora + 2) * _HORA) == [("hora", hora, hora + 2)]
+    assert descomponer_rango(hora * _HORA, hora * _HORA) == []
+
+
+def test_descomponer_rango_cubre_cada_hora_una_vez():
+    desde = datetime(2025, 1, 30, 22, 15, tzinfo=timezone.utc).timestamp()
+    hasta = datetime(2025, 5, 2, 3, 40, tzinfo=timezone.utc).timestamp()
+    horas = _horas_cubiertas(descomponer_rango(desde, hasta))
+    assert horas and len(horas) == len(set(horas))
+    assert sorted(horas) == list(range(int(desde // _HORA), int(hasta // _HORA) + 1))
+
+
+def test_totales_incluye_la_venta_de_la_hora_en_curso():
+    rollups = RollupsVentas()
+    ahora = datetime.now(timezone.utc)
+    rollups.agregar(1, 3, 30.0, ahora - timedelta(days=3))
+    rollups.agregar(1, 2, 20.0, ahora)
+    desde = (ahora - timedelta(days=40)).timestamp()
+    assert rollups.totales(1, desde, ahora.timestamp()) == (2, 5, 50.0)
+
+
+def test_reconstruir_reemplaza_las_cubetas():
+    rollups = RollupsVentas()
+    fecha = datetime(2025, 3, 10, 12, 30, tzinfo=timezone.utc)
+    rollups.agregar(1, 9, 90.0, fecha)
+    rollups.reconstruir([
+        SimpleNamespace(producto_id=1, cantidad=1, total=10.0, fecha=fecha),
+        SimpleNamespace(producto_id=2, cantidad=4, total=40.0, fecha=fecha),
+        SimpleNamespace(producto_id=2, cantidad=1, total=5.0, fecha=None),
+    ])
+    desde, hasta = fecha.timestamp() - 86400, fecha.timestamp() + 86400
+    assert rollups.totales(1, desde, hasta) == (1, 1, 10.0)
+    assert rollups.totales(2, desde, hasta) == (1, 4, 40.0)
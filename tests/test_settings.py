@@ -0,0 +1,16 @@
+"""
+Pruebas de la validación de la configuración.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from src.config.settings import Settings
+
+
+def test_almacenamiento_rechaza_modos_desconocidos(monkeypatch):
+    monkeypatch.setenv("ALMACENAMIENTO", "sqlite")
+    assert Settings().almacenamiento == "sqlite"
+    monkeypatch.setenv("ALMACENAMIENTO", "sqllite")
+    with pytest.raises(ValidationError):
+        Settings()
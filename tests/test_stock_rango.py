@@ -0,0 +1,101 @@
+"""
+Pruebas del rango de stock admitido en cada modo de almacenamiento.
+
+Solo el modo compacto y SQLite tienen límite (64 bits con signo); fuera de él
+la API responde 422 sin modificar nada. JSON y journal admiten cualquier entero.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.repositories.indice_stock import IndiceStockCompacto
+from src.repositories.inventario_repository import InventarioRepository
+from src.routes import inventario_router
+from src.services.producto_service import ProductoService
+
+LIMITE = 2 ** 63
+INICIAL = LIMITE - 10
+
+
+@pytest.fixture
+def store(modo_store, crear_store):
+    return crear_store(modo_store, [{
+        "id": 1, "nombre": "SKU", "descripcion": "", "precio": 1.0,
+        "cantidad": INICIAL, "ventas": 0,
+    }])
+
+
+@pytest.fixture
+def acotado(modo_store):
+    return modo_store in ("compacto", "sqlite")
+
+
+@pytest.fixture
+def cliente(store, monkeypatch):
+    monkeypatch.setattr(
+        inventario_router.controller.service, "_repo", InventarioRepository(store)
+    )
+    app = FastAPI()
+    app.include_router(inventario_router.router, prefix="/inventario")
+    return TestClient(app)
+
+
+def test_stock_mas_alla_de_32_bits_se_admite_en_todos_los_modos(crear_store, modo_store):
+    store = crear_store(modo_store, [{
+        "id": 1, "nombre": "SKU", "descripcion": "", "precio": 1.0, "cantidad": 5, "ventas": 0,
+    }])
+    assert store.ajustar_cantidad(1, 2 ** 40)["cantidad"] == 2 ** 40 + 5
+    assert store.actualizar(1, {"cantidad": 2 ** 31})["cantidad"] == 2 ** 31
+    assert [p["id"] for p in store.bajo_stock(2 ** 31)] == [1]
+
+
+def test_agregar_stock_fuera_de_rango(cliente, store, acotado):
+    respuesta = cliente.put("/inventario/1/agregar-stock", json={"cantidad": 20})
+    if acotado:
+        assert respuesta.status_code == 422
+        assert store.cantidad(1) == INICIAL
+    else:
+        assert respuesta.status_code == 200
+        assert respuesta.json()["cantidad"] == INICIAL + 20
+    respuesta = cliente.put("/inventario/1/agregar-stock", json={"cantidad": -INICIAL})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["cantidad"] == (0 if acotado else 20)
+
+
+def test_establecer_stock_fuera_de_rango(cliente, store, acotado):
+    respuesta = cliente.put("/inventario/1", json={"cantidad": LIMITE})
+    assert respuesta.status_code == (422 if acotado else 200)
+    assert store.cantidad(1) == (INICIAL if acotado else LIMITE)
+
+
+def test_ajuste_por_lote_valida_el_stock_resultante(store, acotado):
+    service = ProductoService(store=store)
+    resultado = service.ajustar_stock_lote([{"producto_id": 1, "cantidad": 20}])
+    assert resultado.resultados[0].status == (422 if acotado else 200)
+    assert store.cantidad(1) == (INICIAL if acotado else INICIAL + 20)
+
+
+def test_crear_productos_fuera_de_rango_no_crea_ninguno(store, acotado):
+    service = ProductoService(store=store)
+    lista = [
+        {"nombre": "a", "descripcion": "", "precio": 1.0, "cantidad": 1},
+        {"nombre": "b", "descripcion": "", "precio": 1.0, "cantidad": LIMITE},
+    ]
+    if not acotado:
+        assert len(service.crear_productos(lista)) == 2
+        return
+    with pytest.raises(Exception) as error:
+        service.crear_productos(lista)
+    assert getattr(error.value, "status_code", None) == 422
+    assert len(store.listar()) == 1
+
+
+def test_indice_compacto_ordena_por_cantidad_e_id():
+    indice = IndiceStockCompacto()
+    indice.reconstruir([(3, 2 ** 40), (1, 0), (2 ** 40, 7), (2, 7)])
+    assert indice.hasta(2 ** 62) == [1, 2, 2 ** 40, 3]
+    indice.actualizar(2, 2 ** 41)
+    indice.eliminar(1)
+    assert indice.hasta(LIMITE) == [2 ** 40, 3, 2]
+    assert indice.total == 7 + 2 ** 40 + 2 ** 41